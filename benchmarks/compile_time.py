@@ -0,0 +1,53 @@
+#! /usr/bin/env python
+"""
+Measure the compilation time of a small function as more and more code
+gets compiled in the process.  The compilation time should stay flat:
+compiling a function must not become slower because unrelated functions
+were compiled before.
+"""
+from __future__ import print_function, division, absolute_import
+import itertools
+import timeit
+
+from numba import jit, types
+from numba.targets.registry import CPUOverloaded
+
+
+def probe(x, y):
+    return x * y + 1
+
+
+def reductions(a):
+    return a.sum() + a.prod() + a.mean() + a.min() + a.max()
+
+
+def filler_signatures():
+    """
+    Signatures of reductions() compiling new internal implementations
+    (which are shared by the whole process) each time.
+    """
+    dtypes = [types.int32, types.int64, types.float32, types.float64]
+    for ndim, layout, dtype in itertools.product(range(1, 5), 'CFA',
+                                                 dtypes):
+        yield (types.Array(dtype, ndim, layout),)
+
+
+def compile_probe():
+    jit("float64(float64, float64)", nopython=True)(probe)
+
+
+def main(step=8, repeat=5):
+    codegen = CPUOverloaded.targetdescr.target_context.jit_codegen()
+    disp = jit(nopython=True)(reductions)
+    sigs = list(filler_signatures())
+
+    print("%10s %10s %18s" % ("fillers", "libraries", "probe compile (ms)"))
+    for i in range(0, len(sigs) + 1, step):
+        best = min(timeit.repeat(compile_probe, number=1, repeat=repeat))
+        print("%10d %10d %18.2f" % (i, len(codegen._libraries), best * 1e3))
+        for sig in sigs[i:i + step]:
+            disp.compile(sig)
+
+
+if __name__ == '__main__':
+    main()
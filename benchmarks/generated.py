@@ -0,0 +1,23 @@
+"""
+Generators of large Python functions, for measuring the time taken by
+the various compilation stages.
+"""
+from __future__ import print_function, division, absolute_import
+
+
+def make_function(nstmts):
+    """
+    Generate a straight-line numeric function of *nstmts* statements.
+    """
+    ops = ['+', '-', '*', '/']
+    lines = ["def f(a, b, c):"]
+    names = ['a', 'b', 'c']
+    for i in range(nstmts):
+        lhs, rhs = names[-1], names[-1 - (i % 3)]
+        name = "v%d" % i
+        lines.append("    %s = %s %s %s" % (name, lhs, ops[i % len(ops)], rhs))
+        names.append(name)
+    lines.append("    return %s" % names[-1])
+    ns = {}
+    exec("\n".join(lines), ns)
+    return ns['f']
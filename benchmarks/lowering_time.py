@@ -0,0 +1,87 @@
+#! /usr/bin/env python
+"""
+Measure the lowering time of large generated functions, and the cost of
+looking up lowering implementations (targets.base.Overloads.find()) with
+and without the signature index.
+"""
+from __future__ import print_function, division, absolute_import
+import timeit
+
+from numba import compiler, jit, types
+from numba.targets.registry import CPUOverloaded
+from numba.tests.support import linear_find
+
+from generated import make_function
+
+
+def _is_concrete(ty):
+    return not isinstance(ty, (types.Kind, types.VarArg)) and ty != types.Any
+
+
+def lookup_queries(context, min_versions=50):
+    """
+    Yield (overloads, signature) pairs for the concrete signatures
+    registered for heavily overloaded functions (operators, mostly).
+    """
+    for overloads in list(context.defns.values()):
+        if len(overloads.versions) < min_versions:
+            continue
+        for sig, _ in overloads.versions:
+            if all(_is_concrete(a) for a in sig.args):
+                yield overloads, sig
+
+
+def bench_lookup(repeat=5):
+    context = CPUOverloaded.targetdescr.target_context
+    queries = list(lookup_queries(context))
+
+    def indexed():
+        for overloads, sig in queries:
+            overloads._cache.clear()
+            overloads.find(sig)
+
+    def memoized():
+        for overloads, sig in queries:
+            overloads.find(sig)
+
+    def linear():
+        for overloads, sig in queries:
+            linear_find(overloads, sig)
+
+    print("%d lookups" % len(queries))
+    for name, func in [("linear scan", linear), ("indexed", indexed),
+                       ("memoized", memoized)]:
+        best = min(timeit.repeat(func, number=1, repeat=repeat))
+        print("%12s %10.2f us/lookup" % (name, best / len(queries) * 1e6))
+
+
+def bench_lowering(sizes=(100, 500, 2000)):
+    orig_stage = compiler.native_lowering_stage
+    timings = []
+
+    def timed_stage(*args, **kws):
+        t = timeit.default_timer()
+        try:
+            return orig_stage(*args, **kws)
+        finally:
+            timings.append(timeit.default_timer() - t)
+
+    compiler.native_lowering_stage = timed_stage
+    try:
+        print("%10s %16s" % ("statements", "lowering (ms)"))
+        for n in sizes:
+            del timings[:]
+            jit("float64(float64, int64, float64)", nopython=True)(
+                make_function(n))
+            print("%10d %16.2f" % (n, sum(timings) * 1e3))
+    finally:
+        compiler.native_lowering_stage = orig_stage
+
+
+def main():
+    bench_lowering()
+    bench_lookup()
+
+
+if __name__ == '__main__':
+    main()
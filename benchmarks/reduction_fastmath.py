@@ -0,0 +1,53 @@
+#! /usr/bin/env python
+"""
+Measure the throughput of array reductions compiled with and without
+the ``fastmath`` option, which lets LLVM vectorize them.
+"""
+from __future__ import print_function, division, absolute_import
+import timeit
+
+import numpy as np
+
+from numba import jit
+
+
+def array_sum(a):
+    return a.sum()
+
+def array_mean(a):
+    return a.mean()
+
+def array_var(a):
+    return a.var()
+
+def array_std(a):
+    return a.std()
+
+def loop_sum(a):
+    c = 0.0
+    for v in a:
+        c += v
+    return c
+
+
+def main(size=1000000, repeat=5, number=20):
+    funcs = [array_sum, array_mean, array_var, array_std, loop_sum]
+    print("%12s %10s %16s %16s %8s" % ("function", "dtype", "strict (GB/s)",
+                                       "fastmath (GB/s)", "speedup"))
+    for dtype in (np.float64, np.float32):
+        a = np.random.random(size).astype(dtype)
+        for pyfunc in funcs:
+            throughputs = []
+            for fastmath in (False, True):
+                cfunc = jit(nopython=True, fastmath=fastmath)(pyfunc)
+                cfunc(a)
+                best = min(timeit.repeat(lambda: cfunc(a), number=number,
+                                         repeat=repeat)) / number
+                throughputs.append(a.nbytes / best / 1e9)
+            print("%12s %10s %16.2f %16.2f %8.2f"
+                  % (pyfunc.__name__, np.dtype(dtype).name, throughputs[0],
+                     throughputs[1], throughputs[1] / throughputs[0]))
+
+
+if __name__ == '__main__':
+    main()
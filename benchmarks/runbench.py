@@ -0,0 +1,197 @@
+#! /usr/bin/env python
+"""
+Run the benchmark suite in the ``suite`` directory, optionally writing
+the results as JSON and comparing them against baseline results
+recorded with a previous build.
+
+    python runbench.py -o results.json
+    python runbench.py --compare baseline.json [--threshold 1.2]
+
+When comparing, the exit status is 1 if any benchmark got slower than
+the baseline by more than the threshold factor.
+"""
+from __future__ import print_function, division, absolute_import
+import argparse
+import gc
+import itertools
+import json
+import os
+import platform
+import re
+import sys
+import timeit
+
+BENCHMARK_PREFIX = 'bench_'
+SUITE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'suite')
+
+
+try:
+    from importlib import import_module
+except ImportError:
+    # Approximative fallback for Python < 2.7
+    def import_module(modulename):
+        module = __import__(modulename)
+        for comp in modulename.split('.')[1:]:
+            module = getattr(module, comp)
+        return module
+
+
+def discover_modules():
+    sys.path.insert(0, os.path.dirname(SUITE_DIR))
+    for path in sorted(os.listdir(SUITE_DIR)):
+        root, ext = os.path.splitext(path)
+        if root.startswith(BENCHMARK_PREFIX) and ext == '.py':
+            yield import_module('suite.' + root)
+
+
+def discover_classes(module):
+    for name in sorted(dir(module)):
+        obj = getattr(module, name)
+        if (isinstance(obj, type) and obj.__module__ == module.__name__
+            and any(attr.startswith(('time_', 'track_'))
+                    for attr in dir(obj))):
+            yield obj
+
+
+def get_param_combinations(cls):
+    """
+    Return the list of parameter tuples benchmarks of *cls* are run with.
+    """
+    params = getattr(cls, 'params', None)
+    if params is None:
+        return [()]
+    if not params or not isinstance(params[0], list):
+        params = [params]
+    return list(itertools.product(*params))
+
+
+def benchmark_name(module, cls, method, params):
+    name = "%s.%s.%s" % (module.__name__.split('.')[-1], cls.__name__, method)
+    if params:
+        name += "(%s)" % ", ".join(str(p) for p in params)
+    return name
+
+
+def measure_time(func, repeat, min_time=0.2):
+    """
+    Return the best time of *func* in seconds, calibrating the number
+    of calls per measurement so that each takes at least *min_time*.
+    """
+    number = 1
+    while True:
+        t = timeit.timeit(func, number=number)
+        if t >= min_time or number >= 1e6:
+            break
+        number *= 10 if t < min_time / 10 else 2
+    times = [t] + timeit.repeat(func, number=number, repeat=repeat - 1)
+    return min(times) / number
+
+
+def run_suite(pattern=None, repeat=5):
+    """
+    Run all benchmarks whose name matches the regular expression
+    *pattern*, and return a dict mapping benchmark names to results.
+    """
+    results = {}
+    for module in discover_modules():
+        for cls in discover_classes(module):
+            methods = sorted(attr for attr in dir(cls)
+                             if attr.startswith(('time_', 'track_')))
+            for params in get_param_combinations(cls):
+                names = [benchmark_name(module, cls, method, params)
+                         for method in methods]
+                if pattern is not None and not any(re.search(pattern, name)
+                                                   for name in names):
+                    continue
+                bench = cls()
+                if hasattr(bench, 'setup'):
+                    bench.setup(*params)
+                for method, name in zip(methods, names):
+                    if pattern is not None and not re.search(pattern, name):
+                        continue
+                    func = getattr(bench, method)
+                    gc.collect()
+                    if method.startswith('time_'):
+                        value = measure_time(lambda: func(*params), repeat)
+                        kind = 'time'
+                    else:
+                        value = func(*params)
+                        kind = 'track'
+                    results[name] = dict(kind=kind, value=value,
+                                         unit='seconds')
+                    print("%-70s %12.3e" % (name, value))
+                    sys.stdout.flush()
+    return results
+
+
+def get_environment():
+    import numba
+    import numpy
+    return dict(numba_version=numba.__version__,
+                numpy_version=numpy.__version__,
+                python_version=platform.python_version(),
+                machine=platform.machine(),
+                node=platform.node())
+
+
+def compare(results, baseline, threshold):
+    """
+    Print a comparison of *results* against *baseline*, and return the
+    names of the benchmarks which regressed by more than *threshold*.
+    """
+    regressions = []
+    print()
+    print("%-70s %10s %10s %8s" % ("benchmark", "baseline", "current",
+                                   "ratio"))
+    for name in sorted(results):
+        if name not in baseline:
+            continue
+        old = baseline[name]['value']
+        new = results[name]['value']
+        if old <= 0:
+            continue
+        ratio = new / old
+        marker = ''
+        if ratio > threshold:
+            marker = '  SLOWER'
+            regressions.append(name)
+        elif ratio < 1 / threshold:
+            marker = '  faster'
+        print("%-70s %10.3e %10.3e %8.2f%s" % (name, old, new, ratio, marker))
+    return regressions
+
+
+def main(args=None):
+    description = __doc__.strip().split('\n')[0]
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('-o', '--output',
+                        help="write results as JSON to this file")
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help="compare against results in this JSON file")
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help="slowdown factor considered a regression "
+                        "(default 1.2)")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="number of measurements per benchmark")
+    parser.add_argument('-b', '--bench', metavar='REGEX',
+                        help="only run benchmarks matching this regex")
+    args = parser.parse_args(args)
+
+    results = run_suite(args.bench, args.repeat)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(dict(environment=get_environment(), results=results),
+                      f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print("\n%d benchmark(s) regressed by more than %.2fx"
+                  % (len(regressions), args.threshold))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
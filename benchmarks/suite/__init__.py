@@ -0,0 +1,13 @@
+"""
+Benchmark suite run by ``runbench.py``.
+
+Each ``bench_*`` module defines benchmark classes in the style of
+airspeed velocity (asv):
+
+- ``time_*`` methods are timed;
+- ``track_*`` methods return a value (in seconds) which is recorded as is;
+- an optional ``params`` class attribute gives a list of parameter values
+  (or a list of such lists), which are passed to each method;
+- an optional ``setup()`` method is called with the same parameters
+  before measuring the benchmark methods.
+"""
@@ -0,0 +1,68 @@
+"""
+Benchmarks of compilation latency, in total and per pipeline stage.
+"""
+from __future__ import print_function, division, absolute_import
+
+from numba import jit, profiling
+
+
+def scalar_func(x, y):
+    z = 0
+    for i in range(x):
+        z += i * y
+    return z
+
+
+def array_func(a):
+    s = 0.0
+    for i in range(a.shape[0]):
+        s += a[i] * 2
+    return s + a.sum()
+
+
+_funcs = {
+    'scalar': (scalar_func, "float64(int64, float64)"),
+    'array': (array_func, "float64(float64[:])"),
+    }
+
+
+class Compile(object):
+    params = sorted(_funcs)
+
+    def _compile(self, kind):
+        pyfunc, sig = _funcs[kind]
+        jit(sig, nopython=True)(pyfunc)
+
+    def setup(self, kind):
+        # Warm up the internal implementations shared by all functions
+        self._compile(kind)
+
+    def time_compile(self, kind):
+        self._compile(kind)
+
+
+class CompileStages(object):
+    """
+    Time spent in each stage of the compiler pipeline, as recorded by
+    numba.profiling.
+    """
+    params = [sorted(_funcs),
+              ['analyzing bytecode', 'nopython frontend', 'annotate type',
+               'nopython mode backend', 'llvm finalize']]
+
+    def setup(self, kind, stage):
+        pyfunc, sig = _funcs[kind]
+        jit(sig, nopython=True)(pyfunc)
+        profiles = []
+        profiling.add_listener(profiles.append)
+        try:
+            jit(sig, nopython=True)(pyfunc)
+        finally:
+            profiling.remove_listener(profiles.append)
+        self.profile = profiles[-1]
+
+    def track_stage_time(self, kind, stage):
+        if stage == 'llvm finalize':
+            # Part of the backend stage
+            return sum(t.duration for t in self.profile.llvm)
+        return self.profile.get_stage_times().get(stage, 0.0)
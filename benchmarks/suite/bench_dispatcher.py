@@ -0,0 +1,113 @@
+"""
+Benchmarks of the dispatcher call overhead and argument unboxing.
+"""
+from __future__ import print_function, division, absolute_import
+import array
+import ctypes
+
+import numpy as np
+
+from numba import jit, types
+
+
+def ignore(x):
+    return 0
+
+
+def ignore5(a, b, c, d, e):
+    return 0
+
+
+class UserType(object):
+    _numba_type_ = types.float64
+
+    def __float__(self):
+        return 1.0
+
+
+_record = np.zeros(1, dtype=[('a', np.int32), ('b', np.float64)])
+_proto = ctypes.CFUNCTYPE(ctypes.c_double, ctypes.c_double)
+
+arguments = {
+    'int': lambda: 1,
+    'float': lambda: 1.5,
+    'complex': lambda: 1.5j,
+    'bool': lambda: True,
+    'none': lambda: None,
+    'array_scalar': lambda: np.float32(1.5),
+    'record': lambda: _record[0],
+    'array': lambda: np.zeros(10),
+    'array_2d_f': lambda: np.zeros((3, 3), order='F'),
+    'uni_tuple': lambda: (1, 2, 3),
+    'tuple': lambda: (1, 2.5, True),
+    'nested_tuple': lambda: ((1, 2), (3.5, None)),
+    'ctypes_func': lambda: _proto(lambda x: x),
+    'bytearray': lambda: bytearray(b"abc"),
+    'pyarray': lambda: array.array('d', [1.0, 2.0]),
+    'user_type': lambda: UserType(),
+    }
+
+
+class CallOverhead(object):
+    """
+    Calling a trivial function with one argument: this measures the
+    dispatcher's type resolution, plus the unboxing of the argument.
+    Calling a builtin function with the same argument gives a baseline.
+    """
+    params = sorted(arguments)
+
+    def setup(self, kind):
+        self.arg = arguments[kind]()
+        self.func = jit(ignore)
+        self.func(self.arg)
+
+    def time_call(self, kind):
+        func = self.func
+        arg = self.arg
+        for i in range(1000):
+            func(arg)
+
+    def time_builtin_call(self, kind):
+        func = id
+        arg = self.arg
+        for i in range(1000):
+            func(arg)
+
+
+class Unboxing(object):
+    """
+    Calling a nopython function with five arguments of the same kind:
+    this stresses the unboxing code in pythonapi.to_native_value().
+    """
+    params = ['int', 'float', 'complex', 'bool', 'array', 'array_2d_f',
+              'record', 'uni_tuple', 'tuple']
+
+    def setup(self, kind):
+        self.args = [arguments[kind]() for i in range(5)]
+        self.func = jit(nopython=True)(ignore5)
+        self.func(*self.args)
+
+    def time_call(self, kind):
+        func = self.func
+        a, b, c, d, e = self.args
+        for i in range(1000):
+            func(a, b, c, d, e)
+
+
+class NamedArguments(object):
+    """
+    Calling with keyword arguments and defaults goes through a slower
+    path of the dispatcher.
+    """
+
+    def setup(self):
+        @jit(nopython=True)
+        def func(a, b=1, c=2.5):
+            return 0
+        func(1, c=2.5)
+        self.func = func
+
+    def time_call_named(self):
+        func = self.func
+        for i in range(1000):
+            func(1, c=2.5)
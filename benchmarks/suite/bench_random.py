@@ -0,0 +1,66 @@
+"""
+Benchmarks of random number generation in nopython mode.
+"""
+from __future__ import print_function, division, absolute_import
+
+import random
+
+import numpy as np
+
+from numba import jit
+
+
+@jit(nopython=True)
+def np_random(n):
+    s = 0.0
+    for i in range(n):
+        s += np.random.random()
+    return s
+
+@jit(nopython=True)
+def np_normal(n):
+    s = 0.0
+    for i in range(n):
+        s += np.random.normal(0.0, 1.0)
+    return s
+
+@jit(nopython=True)
+def np_randint(n):
+    s = 0
+    for i in range(n):
+        s += np.random.randint(0, 100)
+    return s
+
+@jit(nopython=True)
+def py_random(n):
+    s = 0.0
+    for i in range(n):
+        s += random.random()
+    return s
+
+@jit(nopython=True)
+def py_gauss(n):
+    s = 0.0
+    for i in range(n):
+        s += random.gauss(0.0, 1.0)
+    return s
+
+
+_funcs = {
+    'np.random.random': np_random,
+    'np.random.normal': np_normal,
+    'np.random.randint': np_randint,
+    'random.random': py_random,
+    'random.gauss': py_gauss,
+    }
+
+
+class RandomGeneration(object):
+    params = sorted(_funcs)
+
+    def setup(self, name):
+        self.func = _funcs[name]
+        self.func(1)
+
+    def time_generate(self, name):
+        self.func(100000)
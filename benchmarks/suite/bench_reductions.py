@@ -0,0 +1,62 @@
+"""
+Benchmarks of array reductions in nopython mode.
+"""
+from __future__ import print_function, division, absolute_import
+
+import numpy as np
+
+from numba import jit
+
+
+def array_sum(a):
+    return a.sum()
+
+def array_prod(a):
+    return a.prod()
+
+def array_mean(a):
+    return a.mean()
+
+def array_var(a):
+    return a.var()
+
+def array_std(a):
+    return a.std()
+
+def array_min(a):
+    return a.min()
+
+def array_max(a):
+    return a.max()
+
+def array_argmin(a):
+    return a.argmin()
+
+
+_funcs = {
+    'sum': array_sum,
+    'prod': array_prod,
+    'mean': array_mean,
+    'var': array_var,
+    'std': array_std,
+    'min': array_min,
+    'max': array_max,
+    'argmin': array_argmin,
+    }
+
+
+class Reductions(object):
+    params = [sorted(_funcs), ['int64', 'float32', 'float64'],
+              ['contiguous', 'strided']]
+
+    def setup(self, name, dtype, layout):
+        a = (np.random.random(2000000) * 10 + 0.5).astype(dtype)
+        if layout == 'strided':
+            self.a = a[::2]
+        else:
+            self.a = a[:1000000]
+        self.func = jit(nopython=True)(_funcs[name])
+        self.func(self.a)
+
+    def time_reduce(self, name, dtype, layout):
+        self.func(self.a)
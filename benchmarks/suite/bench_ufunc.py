@@ -0,0 +1,79 @@
+"""
+Benchmarks of the throughput of ufunc and gufunc loops.
+"""
+from __future__ import print_function, division, absolute_import
+
+import numpy as np
+
+from numba import vectorize, guvectorize
+
+
+def axpy(a, x, y):
+    return a * x + y
+
+
+def matvec(m, v, out):
+    for i in range(m.shape[0]):
+        s = 0.0
+        for j in range(m.shape[1]):
+            s += m[i, j] * v[j]
+        out[i] = s
+
+
+class Ufunc(object):
+    params = [['float32', 'float64'], ['contiguous', 'strided', 'scalar']]
+
+    def setup(self, dtype, layout):
+        n = 1000000
+        self.ufunc = vectorize(["float32(float32, float32, float32)",
+                                "float64(float64, float64, float64)"])(axpy)
+        x = np.arange(2 * n, dtype=dtype)
+        if layout == 'strided':
+            x = x[::2]
+        else:
+            x = x[:n]
+        self.x = x
+        self.y = np.ones(n, dtype=dtype)
+        self.a = x[0] if layout == 'scalar' else x.copy()
+        self.out = np.empty(n, dtype=dtype)
+
+    def time_ufunc(self, dtype, layout):
+        self.ufunc(self.a, self.x, self.y, self.out)
+
+
+class UfuncBroadcast(object):
+    """
+    Throughput of a ternary ufunc for each mix of contiguous ('C') and
+    broadcast scalar ('S') inputs, and with a strided ('A') input, which
+    takes the general loop.
+    """
+    params = [['float32', 'float64'],
+              ['CCC', 'SCC', 'CSC', 'CCS', 'SSC', 'SCS', 'CSS', 'ACC']]
+
+    def setup(self, dtype, layouts):
+        n = 1000000
+        self.ufunc = vectorize(["float32(float32, float32, float32)",
+                                "float64(float64, float64, float64)"])(axpy)
+        base = np.arange(2 * n, dtype=dtype)
+        operands = {'C': base[:n], 'S': base[1], 'A': base[::2]}
+        self.args = [operands[c] for c in layouts]
+        self.out = np.empty(n, dtype=dtype)
+
+    def time_ufunc(self, dtype, layouts):
+        self.ufunc(*(self.args + [self.out]))
+
+
+class GUfunc(object):
+    params = [4, 64]
+
+    def setup(self, size):
+        self.gufunc = guvectorize(["void(float64[:,:], float64[:], "
+                                   "float64[:])"],
+                                  "(m,n),(n)->(m)")(matvec)
+        count = 2 ** 20 // (size * size)
+        self.m = np.random.random((count, size, size))
+        self.v = np.random.random((count, size))
+        self.out = np.empty((count, size))
+
+    def time_gufunc(self, size):
+        self.gufunc(self.m, self.v, self.out)
@@ -0,0 +1,58 @@
+#! /usr/bin/env python
+"""
+Measure the time spent in type inference for generated straight-line
+functions of increasing size, comparing the worklist-based constrain
+propagation with applying every constrain until the typesets stop
+growing.
+"""
+from __future__ import print_function, division, absolute_import
+import timeit
+
+from numba import bytecode, compiler, typeinfer, typing, types
+
+from generated import make_function
+
+
+def exhaustive_propagate(infer):
+    """
+    Reference propagation: apply all constrains until nothing changes.
+    """
+    oldtoken = None
+    while infer.get_state_token() != oldtoken:
+        oldtoken = infer.get_state_token()
+        for constrain in infer.constrains.constrains:
+            constrain(infer.context, infer.typevars)
+
+
+def infer_types(ctx, interp, args, exhaustive):
+    infer = typeinfer.TypeInferer(ctx, interp)
+    for index, (name, ty) in enumerate(zip(interp.argspec.args, args)):
+        infer.seed_argument(name, index, ty)
+    infer.build_constrain()
+    if exhaustive:
+        exhaustive_propagate(infer)
+    else:
+        infer.propagate()
+    return infer.unify()
+
+
+def main(sizes=(100, 500, 1000, 2000, 5000), repeat=3):
+    args = (types.float64, types.int64, types.float64)
+    print("%10s %16s %16s" % ("statements", "worklist (ms)",
+                              "exhaustive (ms)"))
+    ctx = typing.Context()
+    for n in sizes:
+        interp = compiler.translate_stage(
+            bytecode.ByteCode(func=make_function(n)))
+        timings = []
+        for exhaustive in (False, True):
+            def run():
+                # Don't let the resolution cache carry over between runs
+                ctx.invalidate_resolution_cache()
+                infer_types(ctx, interp, args, exhaustive)
+            timings.append(min(timeit.repeat(run, number=1, repeat=repeat)))
+        print("%10d %16.2f %16.2f" % (n, timings[0] * 1e3, timings[1] * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -24,6 +24,9 @@ typedef struct DispatcherObject{
     PyObject *argnames;
     /* Tuple of default values */
     PyObject *defargs;
+    /* Number of calls to a definition after which _tier_up() is called
+       with the definition's index (0 to disable) */
+    int tier_threshold;
 } DispatcherObject;
 
 static int tc_int8;
@@ -41,15 +44,30 @@ static int tc_complex128;
 static int BASIC_TYPECODES[12];
 
 static int tc_intp;
+static int tc_boolean;
+static int tc_none;
+static int tc_pyobject;
 
 static PyObject* typecache;
 static PyObject* ndarray_typecache;
+/* Maps (type, restype, argtypes) of ctypes function pointers to typecodes */
+static PyObject* ctypes_typecache;
+/* Maps (type, format, itemsize, ndim, layout, readonly) of buffers to
+   typecodes */
+static PyObject* buffer_typecache;
+/* Maps the _numba_type_ of user objects to typecodes; this also keeps
+   the Numba types alive, so that their typecodes remain valid */
+static PyObject* user_typecache;
+
+/* ctypes._CFuncPtr */
+static PyTypeObject* ctypes_funcptr_type;
 
 static
 PyObject* init_types(PyObject *self, PyObject *args)
 {
     PyObject *tmpobj;
     PyObject* dict = PySequence_Fast_GET_ITEM(args, 0);
+    PyObject* funcptr_type = PySequence_Fast_GET_ITEM(args, 1);
     int index = 0;
 
     #define UNWRAP_TYPE(S)                                              \
@@ -75,6 +93,23 @@ PyObject* init_types(PyObject *self, PyObject *args)
 
     #undef UNWRAP_TYPE
 
+    #define UNWRAP_OTHER_TYPE(S, NAME)                                  \
+        if(!(tmpobj = PyDict_GetItemString(dict, NAME))) return NULL;  \
+        else tc_##S = PyLong_AsLong(tmpobj);
+
+    UNWRAP_OTHER_TYPE(boolean, "bool")
+    UNWRAP_OTHER_TYPE(none, "none")
+    UNWRAP_OTHER_TYPE(pyobject, "pyobject")
+
+    #undef UNWRAP_OTHER_TYPE
+
+    if (!PyType_Check(funcptr_type)) {
+        PyErr_SetString(PyExc_TypeError, "expected ctypes._CFuncPtr");
+        return NULL;
+    }
+    Py_INCREF(funcptr_type);
+    ctypes_funcptr_type = (PyTypeObject *) funcptr_type;
+
     switch(sizeof(void*)) {
     case 4:
         tc_intp = tc_int32;
@@ -89,7 +124,12 @@ PyObject* init_types(PyObject *self, PyObject *args)
 
     typecache = PyDict_New();
     ndarray_typecache = PyDict_New();
-    if (typecache == NULL || ndarray_typecache == NULL) {
+    ctypes_typecache = PyDict_New();
+    buffer_typecache = PyDict_New();
+    user_typecache = PyDict_New();
+    if (typecache == NULL || ndarray_typecache == NULL ||
+        ctypes_typecache == NULL || buffer_typecache == NULL ||
+        user_typecache == NULL) {
         PyErr_SetString(PyExc_RuntimeError, "failed to create type cache");
         return NULL;
     }
@@ -135,6 +175,7 @@ Dispatcher_init(DispatcherObject *self, PyObject *args, PyObject *kwds)
     self->firstdef = NULL;
     self->fallbackdef = NULL;
     self->interpdef = NULL;
+    self->tier_threshold = 0;
     return 0;
 }
 
@@ -150,15 +191,22 @@ PyObject*
 Dispatcher_Insert(DispatcherObject *self, PyObject *args)
 {
     PyObject *sigtup, *cfunc;
+    PyObject *entryobj = NULL;
+    void *entry = NULL;
     int i, sigsz;
     int *sig;
     int objectmode = 0;
     int interpmode = 0;
 
-    if (!PyArg_ParseTuple(args, "OO|ii", &sigtup,
-                          &cfunc, &objectmode, &interpmode)) {
+    if (!PyArg_ParseTuple(args, "OO|iiO", &sigtup,
+                          &cfunc, &objectmode, &interpmode, &entryobj)) {
         return NULL;
     }
+    if (entryobj != NULL) {
+        entry = PyLong_AsVoidPtr(entryobj);
+        if (entry == NULL && PyErr_Occurred())
+            return NULL;
+    }
 
     if (!interpmode && !PyObject_TypeCheck(cfunc, &PyCFunction_Type) ) {
         PyErr_SetString(PyExc_TypeError, "must be builtin_function_or_method");
@@ -175,7 +223,7 @@ Dispatcher_Insert(DispatcherObject *self, PyObject *args)
     if (!interpmode) {
         /* The reference to cfunc is borrowed; this only works because the
            derived Python class also stores an (owned) reference to cfunc. */
-        dispatcher_add_defn(self->dispatcher, sig, (void*) cfunc);
+        dispatcher_add_defn(self->dispatcher, sig, (void*) cfunc, entry);
 
         /* Add first definition */
         if (!self->firstdef) {
@@ -196,7 +244,52 @@ Dispatcher_Insert(DispatcherObject *self, PyObject *args)
     Py_RETURN_NONE;
 }
 
+static
+PyObject*
+Dispatcher_Replace(DispatcherObject *self, PyObject *args)
+{
+    PyObject *cfunc, *old;
+    PyObject *entryobj = NULL;
+    void *entry = NULL;
+    int index;
+
+    if (!PyArg_ParseTuple(args, "iO|O", &index, &cfunc, &entryobj)) {
+        return NULL;
+    }
+    if (entryobj != NULL) {
+        entry = PyLong_AsVoidPtr(entryobj);
+        if (entry == NULL && PyErr_Occurred())
+            return NULL;
+    }
+    if (!PyObject_TypeCheck(cfunc, &PyCFunction_Type) ) {
+        PyErr_SetString(PyExc_TypeError, "must be builtin_function_or_method");
+        return NULL;
+    }
+    if (index < 0 || index >= dispatcher_count(self->dispatcher)) {
+        PyErr_SetString(PyExc_IndexError, "definition index out of range");
+        return NULL;
+    }
+
+    /* As in Dispatcher_Insert, the reference to cfunc is borrowed.  The
+       derived Python class must also keep the old cfunc alive, since it
+       may still be executing in another thread. */
+    old = (PyObject *) dispatcher_replace_defn(self->dispatcher, index,
+                                               (void *) cfunc, entry);
+    if (self->firstdef == old) {
+        self->firstdef = cfunc;
+    }
+    if (self->fallbackdef == old) {
+        self->fallbackdef = cfunc;
+    }
+
+    Py_RETURN_NONE;
+}
+
 static PyObject *str_typeof_pyval = NULL;
+static PyObject *str_argtypes = NULL;
+static PyObject *str_restype = NULL;
+static PyObject *str_numba_type = NULL;
+static PyObject *str_code = NULL;
 
 /* For void types, we need to keep a reference to the returned type object so
    that it cannot be deleted. This is because of the following events occurring
@@ -430,6 +523,256 @@ int typecode_arrayscalar(DispatcherObject *dispatcher, PyObject* aryscalar) {
     return BASIC_TYPECODES[typecode];
 }
 
+static int typecode(DispatcherObject *dispatcher, PyObject *val);
+
+/* Typecodes of tuples, keyed on the typecodes of their items.  This is
+   a fixed-size open addressing hash table; entries are never removed. */
+
+#define N_TUPLE_ITEMS 8     /* Fast path for tuples of up to 8 items */
+#define N_TUPLE_CACHE 512   /* Must be a power of two */
+#define N_TUPLE_PROBES 8
+
+typedef struct {
+    int nitems;             /* -1 for an empty slot */
+    int items[N_TUPLE_ITEMS];
+    int typecode;
+} tuple_cache_entry;
+
+static tuple_cache_entry tuple_typecache[N_TUPLE_CACHE];
+
+/* The typecode of a Python int inside a tuple.  Unlike arguments, tuple
+   items are typed according to their value by
+   BaseContext.get_number_type().  -1 is returned (without an exception
+   set) if the value is out of the supported range. */
+static
+int typecode_int_item(PyObject *val) {
+#if PY_VERSION_HEX >= 0x02070000
+    int overflow;
+    PY_LONG_LONG v = PyLong_AsLongLongAndOverflow(val, &overflow);
+    if (overflow == 0) {
+        if (v == -1 && PyErr_Occurred()) {
+            PyErr_Clear();
+            return -1;
+        }
+        if (v > -(1LL << 31) && v < (1LL << 31))
+            return tc_int32;
+        if (v != PY_LLONG_MIN)
+            return tc_int64;
+    }
+    else if (overflow > 0) {
+        PyLong_AsUnsignedLongLong(val);
+        if (!PyErr_Occurred())
+            return tc_uint64;
+        PyErr_Clear();
+    }
+#endif
+    return -1;
+}
+
+/* The typecode of a tuple item, as typed by
+   BaseContext.resolve_value_type().  -1 is returned without an exception
+   set if the item isn't handled here. */
+static
+int typecode_tuple_item(DispatcherObject *dispatcher, PyObject *val) {
+    PyTypeObject *tyobj = Py_TYPE(val);
+    int code;
+
+    if (tyobj == &PyInt_Type || tyobj == &PyLong_Type)
+        return typecode_int_item(val);
+    else if (tyobj == &PyFloat_Type)
+        return tc_float64;
+    else if (tyobj == &PyComplex_Type)
+        return tc_complex128;
+    else if (tyobj == &PyBool_Type)
+        return tc_boolean;
+    else if (val == Py_None)
+        return tc_none;
+    else if (PyTuple_Check(val))
+        return typecode(dispatcher, val);
+    else if (PyArray_IsScalar(val, Generic) || PyArray_Check(val)) {
+        /* Arguments of types unsupported by Numba are typed as pyobject,
+           but tuple items aren't */
+        code = typecode(dispatcher, val);
+        return code == tc_pyobject ? -1 : code;
+    }
+    return -1;
+}
+
+static
+int typecode_tuple(DispatcherObject *dispatcher, PyObject *tup) {
+    int items[N_TUPLE_ITEMS];
+    Py_ssize_t i, n = PyTuple_GET_SIZE(tup);
+    unsigned int hash = (unsigned int) n;
+    int probe, typecode;
+    tuple_cache_entry *entry;
+
+    if (n > N_TUPLE_ITEMS)
+        return typecode_fallback(dispatcher, tup);
+
+    for (i = 0; i < n; ++i) {
+        items[i] = typecode_tuple_item(dispatcher, PyTuple_GET_ITEM(tup, i));
+        if (items[i] == -1) {
+            if (PyErr_Occurred())
+                return -1;
+            return typecode_fallback(dispatcher, tup);
+        }
+        hash = (hash * 1000003U) ^ (unsigned int) items[i];
+    }
+
+    for (probe = 0; probe < N_TUPLE_PROBES; ++probe) {
+        entry = &tuple_typecache[(hash + probe) & (N_TUPLE_CACHE - 1)];
+        if (entry->nitems == -1) {
+            /* Not found: resolve through fallback then populate cache */
+            typecode = typecode_fallback_keep_ref(dispatcher, tup);
+            if (typecode != -1) {
+                entry->nitems = (int) n;
+                memcpy(entry->items, items, n * sizeof(int));
+                entry->typecode = typecode;
+            }
+            return typecode;
+        }
+        if (entry->nitems == n &&
+            memcmp(entry->items, items, n * sizeof(int)) == 0)
+            return entry->typecode;
+    }
+    /* Too many collisions: don't cache */
+    return typecode_fallback(dispatcher, tup);
+}
+
+/* Look up *key* in the *cache* dict, resolving the typecode of *val*
+   through fallback and populating the cache if not found.  The
+   reference to *key* is stolen. */
+static
+int typecode_from_dict(DispatcherObject *dispatcher, PyObject *cache,
+                       PyObject *key, PyObject *val) {
+    PyObject *tmpobject;
+    int typecode;
+
+    if (key == NULL)
+        return -1;
+    tmpobject = PyDict_GetItem(cache, key);
+    if (tmpobject != NULL) {
+        typecode = PyLong_AsLong(tmpobject);
+    }
+    else {
+        typecode = typecode_fallback_keep_ref(dispatcher, val);
+        if (typecode != -1) {
+            tmpobject = PyLong_FromLong(typecode);
+            if (tmpobject == NULL ||
+                PyDict_SetItem(cache, key, tmpobject) < 0)
+                typecode = -1;
+            Py_XDECREF(tmpobject);
+        }
+    }
+    Py_DECREF(key);
+    return typecode;
+}
+
+static
+int typecode_ctypes_funcptr(DispatcherObject *dispatcher, PyObject *val) {
+    PyObject *argtypes, *restype, *key;
+
+    /* The Numba type only depends on the function's signature */
+    argtypes = PyObject_GetAttr(val, str_argtypes);
+    if (argtypes == NULL)
+        return -1;
+    if (!PyTuple_Check(argtypes)) {
+        /* No argtypes defined, let the fallback raise an error */
+        Py_DECREF(argtypes);
+        return typecode_fallback(dispatcher, val);
+    }
+    restype = PyObject_GetAttr(val, str_restype);
+    if (restype == NULL) {
+        Py_DECREF(argtypes);
+        return -1;
+    }
+    key = PyTuple_Pack(3, (PyObject *) Py_TYPE(val), restype, argtypes);
+    Py_DECREF(argtypes);
+    Py_DECREF(restype);
+    return typecode_from_dict(dispatcher, ctypes_typecache, key, val);
+}
+
+#if PY_VERSION_HEX >= 0x02070000
+static
+int typecode_buffer(DispatcherObject *dispatcher, PyObject *val) {
+    Py_buffer view;
+    PyObject *key;
+    char layout = 'A';
+
+    /* Same flags as memoryview() */
+    if (PyObject_GetBuffer(val, &view, PyBUF_FULL_RO) < 0) {
+        PyErr_Clear();
+        return typecode_fallback(dispatcher, val);
+    }
+    /* Same as bufproto.infer_layout() */
+#if PY_MAJOR_VERSION >= 3
+    if (PyBuffer_IsContiguous(&view, 'C'))
+        layout = 'C';
+    else if (PyBuffer_IsContiguous(&view, 'F'))
+        layout = 'F';
+#else
+    if (view.ndim == 1 && view.strides != NULL &&
+        view.strides[0] == view.itemsize)
+        layout = 'C';
+#endif
+    key = Py_BuildValue("(Osnici)", (PyObject *) Py_TYPE(val),
+                        view.format != NULL ? view.format : "B",
+                        view.itemsize, view.ndim, layout, view.readonly);
+    PyBuffer_Release(&view);
+    return typecode_from_dict(dispatcher, buffer_typecache, key, val);
+}
+#endif
+
+/* Whether *val* is an instance of a Python class which isn't typed as a
+   number or a string, i.e. whose Numba type is given by its
+   _numba_type_ attribute, if any. */
+static
+int is_user_object(PyObject *val) {
+    if (!PyType_HasFeature(Py_TYPE(val), Py_TPFLAGS_HEAPTYPE))
+        return 0;
+    if (PyLong_Check(val) || PyFloat_Check(val) || PyComplex_Check(val) ||
+        PyUnicode_Check(val) || PyBytes_Check(val))
+        return 0;
+#if PY_MAJOR_VERSION < 3
+    if (PyInt_Check(val))
+        return 0;
+#endif
+    return 1;
+}
+
+static
+int typecode_user_object(DispatcherObject *dispatcher, PyObject *val) {
+    PyObject *tmptype, *tmpcode;
+    int typecode;
+
+    /* Same as BaseContext.resolve_argument_type() */
+    tmptype = PyObject_GetAttr(val, str_numba_type);
+    if (tmptype == NULL) {
+        if (!PyErr_ExceptionMatches(PyExc_AttributeError))
+            return -1;
+        PyErr_Clear();
+        return tc_pyobject;
+    }
+    /* The cache holds a reference to the Numba type, which must outlive
+       the use of its typecode (see _typecode_fallback()) */
+    tmpcode = PyDict_GetItem(user_typecache, tmptype);
+    if (tmpcode != NULL) {
+        Py_DECREF(tmptype);
+        return PyLong_AsLong(tmpcode);
+    }
+    tmpcode = PyObject_GetAttr(tmptype, str_code);
+    if (tmpcode == NULL) {
+        Py_DECREF(tmptype);
+        return -1;
+    }
+    typecode = PyLong_AsLong(tmpcode);
+    if (typecode != -1 && PyDict_SetItem(user_typecache, tmptype,
+                                         tmpcode) < 0)
+        typecode = -1;
+    Py_DECREF(tmpcode);
+    Py_DECREF(tmptype);
+    return typecode;
+}
 
 static
 int typecode(DispatcherObject *dispatcher, PyObject *val) {
@@ -443,6 +786,10 @@ int typecode(DispatcherObject *dispatcher, PyObject *val) {
         return tc_float64;
     else if (tyobj == &PyComplex_Type)
         return tc_complex128;
+    else if (tyobj == &PyBool_Type)
+        return tc_boolean;
+    else if (val == Py_None)
+        return tc_none;
     /* Array scalar handling */
     else if (PyArray_CheckScalar(val)) {
         return typecode_arrayscalar(dispatcher, val);
@@ -451,6 +798,23 @@ int typecode(DispatcherObject *dispatcher, PyObject *val) {
     else if (PyType_IsSubtype(tyobj, &PyArray_Type)) {
         return typecode_ndarray(dispatcher, (PyArrayObject*)val);
     }
+    else if (PyTuple_Check(val)) {
+        return typecode_tuple(dispatcher, val);
+    }
+    else if (PyType_IsSubtype(tyobj, ctypes_funcptr_type)) {
+        return typecode_ctypes_funcptr(dispatcher, val);
+    }
+#if PY_VERSION_HEX >= 0x02070000
+    /* Objects supporting the buffer protocol (str on Python 2 is typed
+       as a string) */
+    else if (PyObject_CheckBuffer(val) &&
+             (PY_MAJOR_VERSION >= 3 || !PyBytes_Check(val))) {
+        return typecode_buffer(dispatcher, val);
+    }
+#endif
+    else if (is_user_object(val)) {
+        return typecode_user_object(dispatcher, val);
+    }
 
     return typecode_fallback(dispatcher, val);
 }
@@ -499,6 +863,24 @@ call_cfunc(PyObject *cfunc, PyObject *args, PyObject *kws)
     return fn(PyCFunction_GET_SELF(cfunc), args, kws);
 }
 
+/* The signature of the fast entry points generated alongside the CPython
+   wrappers of compiled functions (see PyCallWrapper.build_fast()).  They
+   take the closure and a C array of borrowed references to the positional
+   arguments. */
+typedef PyObject *(*fastentry_t)(PyObject *closure, PyObject **args);
+
+/* Call a definition through its fast *entry* point if it has one and no
+   keyword arguments are given, otherwise through its *cfunc* */
+static PyObject *
+call_definition(PyObject *cfunc, fastentry_t entry, PyObject *args,
+                PyObject *kws)
+{
+    if (entry != NULL && (kws == NULL || PyDict_Size(kws) == 0))
+        return entry(PyCFunction_GET_SELF(cfunc),
+                     PySequence_Fast_ITEMS(args));
+    return call_cfunc(cfunc, args, kws);
+}
+
 static
 PyObject*
 compile_and_invoke(DispatcherObject *self, PyObject *args, PyObject *kws)
@@ -614,7 +996,9 @@ Dispatcher_call(DispatcherObject *self, PyObject *args, PyObject *kws)
     int i;
     int prealloc[24];
     int matches;
+    int selected;
     PyObject *cfunc;
+    fastentry_t entry;
 
     if (self->fold_args) {
         if (find_named_args(self, &args, &kws))
@@ -641,11 +1025,24 @@ Dispatcher_call(DispatcherObject *self, PyObject *args, PyObject *kws)
     /* We only allow unsafe conversions if compilation of new specializations
        has been disabled. */
     cfunc = dispatcher_resolve(self->dispatcher, tys, &matches,
-                               !self->can_compile);
+                               !self->can_compile, &selected);
 
     if (matches == 1) {
-        /* Definition is found */
-        retval = call_cfunc(cfunc, args, kws);
+        /* Definition is found.  Fetch its fast entry point now, as
+           _tier_up() may replace the definition. */
+        entry = (fastentry_t) dispatcher_get_entry(self->dispatcher,
+                                                   selected);
+        if (self->tier_threshold > 0 &&
+            dispatcher_count_call(self->dispatcher, selected)
+                == self->tier_threshold) {
+            /* The definition became hot: let the Python class know */
+            PyObject *res = PyObject_CallMethod((PyObject *) self,
+                                                "_tier_up", "i", selected);
+            if (res == NULL)
+                goto CLEANUP;
+            Py_DECREF(res);
+        }
+        retval = call_definition(cfunc, entry, args, kws);
     } else if (matches == 0) {
         /* No matching definition */
         if (self->can_compile) {
@@ -679,11 +1076,14 @@ static PyMethodDef Dispatcher_methods[] = {
     { "_clear", (PyCFunction)Dispatcher_clear, METH_NOARGS, NULL },
     { "_insert", (PyCFunction)Dispatcher_Insert, METH_VARARGS,
       "insert new definition"},
+    { "_replace", (PyCFunction)Dispatcher_Replace, METH_VARARGS,
+      "replace the callable of an existing definition"},
     { NULL },
 };
 
 static PyMemberDef Dispatcher_members[] = {
     {"_can_compile", T_BOOL, offsetof(DispatcherObject, can_compile), 0},
+    {"_tier_threshold", T_INT, offsetof(DispatcherObject, tier_threshold), 0},
     {NULL}  /* Sentinel */
 };
 
@@ -755,9 +1155,17 @@ MOD_INIT(_dispatcher) {
     memset(cached_arycode, 0xFF, sizeof(cached_arycode));
 
     str_typeof_pyval = PyString_InternFromString("typeof_pyval");
-    if (str_typeof_pyval == NULL)
+    str_argtypes = PyString_InternFromString("argtypes");
+    str_restype = PyString_InternFromString("restype");
+    str_numba_type = PyString_InternFromString("_numba_type_");
+    str_code = PyString_InternFromString("_code");
+    if (str_typeof_pyval == NULL || str_argtypes == NULL ||
+        str_restype == NULL || str_numba_type == NULL || str_code == NULL)
         return MOD_ERROR_VAL;
 
+    /* initialize the tuple typecode cache to empty slots */
+    memset(tuple_typecache, 0xFF, sizeof(tuple_typecache));
+
     DispatcherType.tp_new = PyType_GenericNew;
     if (PyType_Ready(&DispatcherType) < 0) {
         return MOD_ERROR_VAL;
@@ -16,12 +16,29 @@ dispatcher_clear(dispatcher_t *obj);
 void
 dispatcher_del(dispatcher_t *obj);
 
+/* *entry* is the definition's fast entry point, or NULL */
 void
-dispatcher_add_defn(dispatcher_t *obj, int tys[], void* callable);
+dispatcher_add_defn(dispatcher_t *obj, int tys[], void* callable,
+                    void* entry);
 
+/* Replace the callable and fast entry point of the *index*-th definition,
+   returning the old callable */
+void*
+dispatcher_replace_defn(dispatcher_t *obj, int index, void* callable,
+                        void* entry);
+
+/* Return the fast entry point of the *index*-th definition, or NULL */
+void*
+dispatcher_get_entry(dispatcher_t *obj, int index);
+
+/* On a single match, *selected* receives the index of the definition */
 void*
 dispatcher_resolve(dispatcher_t *obj, int sig[], int *matches,
-                   int allow_unsafe);
+                   int allow_unsafe, int *selected);
+
+/* Count a call to the *index*-th definition, returning the new count */
+int
+dispatcher_count_call(dispatcher_t *obj, int index);
 
 int
 dispatcher_count(dispatcher_t *obj);
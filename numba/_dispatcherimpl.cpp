@@ -1,34 +1,78 @@
 #include "typeconv/typeconv.hpp"
+#include <algorithm>
 #include <cassert>
+#include <climits>
 #include <vector>
 
 typedef std::vector<Type> TypeTable;
 typedef std::vector<void*> Functions;
 
+/* A cached overload resolution for a given signature */
+struct ResolveRecord {
+    TypeTable sig;
+    bool allow_unsafe;
+    int matches;
+    int selected;
+};
+
+typedef std::vector<ResolveRecord> ResolveBin;
+
+enum {
+    /* Number of bins in the resolution cache */
+    RESOLVE_CACHE_SIZE = 61,
+    /* Flush the resolution cache when it holds that many records */
+    RESOLVE_CACHE_MAX = 1024
+};
+
 struct _opaque_dispatcher {};
 
 class Dispatcher: public _opaque_dispatcher {
 public:
-    Dispatcher(TypeManager *tm, int argct): argct(argct), tm(tm) { }
+    Dispatcher(TypeManager *tm, int argct)
+        :argct(argct), tm(tm), cached(0), generation(tm->getGeneration()) { }
 
-    void addDefinition(Type args[], void *callable) {
+    void addDefinition(Type args[], void *callable, void *entry) {
+        clearCache();
         overloads.reserve(argct + overloads.size());
         for (int i=0; i<argct; ++i) {
             overloads.push_back(args[i]);
         }
         functions.push_back(callable);
+        entries.push_back(entry);
+        callcounts.push_back(0);
     }
 
-    void* resolve(Type sig[], int &matches, bool allow_unsafe) {
+    void* replaceDefinition(int index, void *callable, void *entry) {
+        void *old = functions[index];
+        functions[index] = callable;
+        entries[index] = entry;
+        return old;
+    }
+
+    void* getEntry(int index) const {
+        return entries[index];
+    }
+
+    int countCall(int index) {
+        int &count = callcounts[index];
+        if (count < INT_MAX)
+            ++count;
+        return count;
+    }
+
+    void* resolve(Type sig[], int &matches, bool allow_unsafe,
+                  int &selected) {
         const int ovct = functions.size();
-        int selected;
         matches = 0;
         if (0 == ovct) {
             return NULL;
         }
         if (overloads.size() > 0) {
-            matches = tm->selectOverload(sig, &overloads[0], selected, argct,
-                                         ovct, allow_unsafe);
+            if (!lookupCache(sig, allow_unsafe, matches, selected)) {
+                matches = tm->selectOverload(sig, &overloads[0], selected,
+                                             argct, ovct, allow_unsafe);
+                storeCache(sig, allow_unsafe, matches, selected);
+            }
         } else if (argct == 0){
             matches = 1;
             selected = 0;
@@ -43,14 +87,88 @@ public:
 
     void clear() {
         functions.clear();
+        entries.clear();
         overloads.clear();
+        callcounts.clear();
+        clearCache();
     }
 
 private:
+    unsigned int hashSignature(Type sig[], bool allow_unsafe) const {
+        unsigned int h = allow_unsafe ? 1 : 0;
+        for (int i = 0; i < argct; ++i) {
+            h = (h * 1000003) ^ (unsigned int) sig[i].get();
+        }
+        return h;
+    }
+
+    /* Fetch the cached resolution of *sig*, if any.  All results are
+       cached, including ambiguous or failed resolutions, since the cache
+       is flushed whenever a definition is added. */
+    bool lookupCache(Type sig[], bool allow_unsafe, int &matches,
+                     int &selected) {
+        if (generation != tm->getGeneration()) {
+            /* Conversion rules changed under our feet */
+            clearCache();
+            generation = tm->getGeneration();
+            return false;
+        }
+        if (cached == 0) {
+            return false;
+        }
+        const ResolveBin &bin =
+            cache[hashSignature(sig, allow_unsafe) % RESOLVE_CACHE_SIZE];
+        for (unsigned int i = 0; i < bin.size(); ++i) {
+            const ResolveRecord &rec = bin[i];
+            if (rec.allow_unsafe == allow_unsafe &&
+                std::equal(rec.sig.begin(), rec.sig.end(), sig)) {
+                matches = rec.matches;
+                if (matches == 1) {
+                    selected = rec.selected;
+                }
+                return true;
+            }
+        }
+        return false;
+    }
+
+    void storeCache(Type sig[], bool allow_unsafe, int matches,
+                    int selected) {
+        if (cached >= RESOLVE_CACHE_MAX) {
+            clearCache();
+        }
+        if (cache.empty()) {
+            cache.resize(RESOLVE_CACHE_SIZE);
+        }
+        ResolveRecord rec;
+        rec.sig.assign(sig, sig + argct);
+        rec.allow_unsafe = allow_unsafe;
+        rec.matches = matches;
+        rec.selected = (matches == 1) ? selected : -1;
+        cache[hashSignature(sig, allow_unsafe) % RESOLVE_CACHE_SIZE]
+            .push_back(rec);
+        ++cached;
+    }
+
+    void clearCache() {
+        cache.clear();
+        cached = 0;
+    }
+
     const int argct;
     TypeManager *tm;
     TypeTable overloads;
     Functions functions;
+    /* Fast entry points of the functions (NULL if unavailable) */
+    Functions entries;
+    /* Number of calls resolved to each function */
+    std::vector<int> callcounts;
+    /* Overload resolutions, keyed on the argument types; allocated
+       on first use */
+    std::vector<ResolveBin> cache;
+    int cached;
+    /* Type manager generation the cache is valid for */
+    unsigned int generation;
 };
 
 
@@ -74,23 +192,45 @@ dispatcher_del(dispatcher_t *obj) {
 }
 
 void
-dispatcher_add_defn(dispatcher_t *obj, int tys[], void* callable) {
+dispatcher_add_defn(dispatcher_t *obj, int tys[], void* callable,
+                    void* entry) {
     assert(sizeof(int) == sizeof(Type) &&
             "Type should be representable by an int");
 
     Dispatcher *disp = static_cast<Dispatcher*>(obj);
     Type *args = reinterpret_cast<Type*>(tys);
-    disp->addDefinition(args, callable);
+    disp->addDefinition(args, callable, entry);
+}
+
+void*
+dispatcher_replace_defn(dispatcher_t *obj, int index, void* callable,
+                        void* entry) {
+    Dispatcher *disp = static_cast<Dispatcher*>(obj);
+    return disp->replaceDefinition(index, callable, entry);
+}
+
+void*
+dispatcher_get_entry(dispatcher_t *obj, int index) {
+    Dispatcher *disp = static_cast<Dispatcher*>(obj);
+    return disp->getEntry(index);
 }
 
 void*
-dispatcher_resolve(dispatcher_t *obj, int sig[], int *count, int allow_unsafe) {
+dispatcher_resolve(dispatcher_t *obj, int sig[], int *count, int allow_unsafe,
+                   int *selected) {
     Dispatcher *disp = static_cast<Dispatcher*>(obj);
     Type *args = reinterpret_cast<Type*>(sig);
-    void *callable = disp->resolve(args, *count, (bool) allow_unsafe);
+    void *callable = disp->resolve(args, *count, (bool) allow_unsafe,
+                                   *selected);
     return callable;
 }
 
+int
+dispatcher_count_call(dispatcher_t *obj, int index) {
+    Dispatcher *disp = static_cast<Dispatcher*>(obj);
+    return disp->countCall(index);
+}
+
 int
 dispatcher_count(dispatcher_t *obj) {
     Dispatcher *disp = static_cast<Dispatcher*>(obj);
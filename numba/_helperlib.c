@@ -1120,11 +1120,12 @@ CLEANUP:
 
 /*
  * Fill in the *arystruct* with information from the Numpy array *obj*.
- * *arystruct*'s layout is defined in numba.targets.arrayobj (look
- * for the ArrayTemplate class).
+ * *arystruct*'s layout is defined in numba.datamodel.models.ArrayModel
+ * (and must be kept in sync with numba/runtime/_nrt_python.c).
  */
 
 typedef struct {
+    void     *meminfo;  /* NRT MemInfo, NULL for arrays owned by Python */
     PyObject *parent;
     npy_intp nitems;
     npy_intp itemsize;
@@ -1132,6 +1133,10 @@ typedef struct {
     npy_intp shape_and_strides[];
 } arystruct_t;
 
+/* The ndarray type object, for exact type checks in generated code.
+   This is set when the module is initialized. */
+static PyTypeObject *ndarray_type;
+
 static
 int Numba_adapt_ndarray(PyObject *obj, arystruct_t* arystruct) {
     PyArrayObject *ndary;
@@ -1149,6 +1154,7 @@ int Numba_adapt_ndarray(PyObject *obj, arystruct_t* arystruct) {
     arystruct->nitems = PyArray_SIZE(ndary);
     arystruct->itemsize = PyArray_ITEMSIZE(ndary);
     arystruct->parent = obj;
+    arystruct->meminfo = NULL;
     p = arystruct->shape_and_strides;
     for (i = 0; i < ndim; i++, p++) {
         *p = PyArray_DIM(ndary, i);
@@ -1176,6 +1182,7 @@ Numba_adapt_buffer(Py_buffer *buf, arystruct_t *arystruct)
     arystruct->data = buf->buf;
     arystruct->itemsize = buf->itemsize;
     arystruct->parent = buf->obj;
+    arystruct->meminfo = NULL;
     arystruct->nitems = 1;
     p = arystruct->shape_and_strides;
     for (i = 0; i < buf->ndim; i++, p++) {
@@ -1390,6 +1397,54 @@ Numba_unpickle(const char *data, Py_ssize_t n)
     return obj;
 }
 
+/*
+ * Chunking of prange() loops.  The parallel loop launcher tells each
+ * thread which chunk of the iteration space it is responsible for; the
+ * first prange() call made by the thread then restricts itself to that
+ * chunk (and resets it, so that nested prange() calls are serial).
+ */
+
+#ifdef _MSC_VER
+    #define NUMBA_THREAD_LOCAL __declspec(thread)
+#else
+    #define NUMBA_THREAD_LOCAL __thread
+#endif
+
+static NUMBA_THREAD_LOCAL Py_ssize_t prange_chunk_id = 0;
+static NUMBA_THREAD_LOCAL Py_ssize_t prange_nchunks = 1;
+
+static void
+Numba_set_prange_chunk(Py_ssize_t chunk_id, Py_ssize_t nchunks)
+{
+    prange_chunk_id = chunk_id;
+    prange_nchunks = nchunks;
+}
+
+static void
+Numba_prange_bounds(int64_t *start, int64_t *stop, int64_t step)
+{
+    int64_t count, lo, hi, rem;
+    Py_ssize_t chunk_id = prange_chunk_id;
+    Py_ssize_t nchunks = prange_nchunks;
+
+    prange_chunk_id = 0;
+    prange_nchunks = 1;
+    if (nchunks <= 1 || step == 0)
+        return;
+
+    /* Number of iterations, as computed by the range iterator */
+    if (step > 0)
+        count = (*stop > *start) ? (*stop - *start + step - 1) / step : 0;
+    else
+        count = (*stop < *start) ? (*start - *stop - step - 1) / -step : 0;
+
+    rem = count % nchunks;
+    lo = (count / nchunks) * chunk_id + (chunk_id < rem ? chunk_id : rem);
+    hi = lo + count / nchunks + (chunk_id < rem ? 1 : 0);
+    *stop = *start + hi * step;
+    *start = *start + lo * step;
+}
+
 
 /*
 Define bridge for all math functions
@@ -1464,9 +1519,12 @@ build_c_helpers_dict(void)
     declmethod(rnd_shuffle);
     declmethod(rnd_init);
     declmethod(poisson_ptrs);
+    declmethod(set_prange_chunk);
+    declmethod(prange_bounds);
 
     declpointer(py_random_state);
     declpointer(np_random_state);
+    declpointer(ndarray_type);
 
 #define MATH_UNARY(F, R, A) declmethod(F);
 #define MATH_BINARY(F, R, A, B) declmethod(F);
@@ -1504,6 +1562,19 @@ MOD_INIT(_helperlib) {
     PyModule_AddIntConstant(m, "py_buffer_size", sizeof(Py_buffer));
     PyModule_AddIntConstant(m, "py_gil_state_size", sizeof(PyGILState_STATE));
 
+    /* Layout of Numpy arrays, for unboxing them in generated code */
+    ndarray_type = &PyArray_Type;
+    PyModule_AddIntConstant(m, "pyobject_type_offset",
+                            offsetof(PyObject, ob_type));
+    PyModule_AddIntConstant(m, "ndarray_data_offset",
+                            offsetof(PyArrayObject_fields, data));
+    PyModule_AddIntConstant(m, "ndarray_ndim_offset",
+                            offsetof(PyArrayObject_fields, nd));
+    PyModule_AddIntConstant(m, "ndarray_shape_offset",
+                            offsetof(PyArrayObject_fields, dimensions));
+    PyModule_AddIntConstant(m, "ndarray_strides_offset",
+                            offsetof(PyArrayObject_fields, strides));
+
     if (_rnd_random_seed(&py_random_state) ||
         _rnd_random_seed(&np_random_state))
         return MOD_ERROR_VAL;
@@ -8,8 +8,3 @@ Each assumption is defined as a global variable.  Its value is the
 description of the assumption.  Code that makes the assumption should
 `assert the_assumption`
 """
-
-return_argument_array_only = '''Only array passed into the function as
-argument can be returned'''
-
-
@@ -92,6 +92,7 @@ def _make_bytecode_table():
                     ('CALL_FUNCTION', 2),
                     ('COMPARE_OP', 2),
                     ('DELETE_ATTR', 2),
+                    ('DELETE_SUBSCR', 0),
                     ('DUP_TOP', 0),
                     ('FOR_ITER', 2),
                     ('GET_ITER', 0),
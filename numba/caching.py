@@ -0,0 +1,308 @@
+"""
+Caching mechanism for compiled functions.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import contextlib
+import errno
+import hashlib
+import inspect
+import marshal
+import os
+import sys
+import tempfile
+import warnings
+
+from .six.moves import cPickle as pickle
+
+from . import compiler, config, types
+from .utils import PYVERSION
+
+
+class _Cache(object):
+
+    @property
+    def cache_path(self):
+        """
+        The base filesystem path of this cache (for example its root folder).
+        """
+
+    def load_overload(self, sig, target_context):
+        """
+        Load an overload for the given signature using the target context.
+        The saved object must be returned if successful, None if not found
+        in the cache.
+        """
+
+    def save_overload(self, sig, cres):
+        """
+        Save the overload for the given signature.
+        """
+
+    def flush(self):
+        """
+        Flush the cache: remove all overloads saved so far.
+        """
+
+
+class NullCache(_Cache):
+    """
+    A cache which never saves nor loads anything; it is used by
+    dispatchers which don't have caching enabled.
+    """
+
+    @property
+    def cache_path(self):
+        return None
+
+    def load_overload(self, sig, target_context):
+        pass
+
+    def save_overload(self, sig, cres):
+        pass
+
+    def flush(self):
+        pass
+
+
+class FunctionCache(_Cache):
+    """
+    A per-function compilation cache.  The cached data is stored in a
+    "__pycache__" directory next to the function's source file (or under
+    NUMBA_CACHE_DIR if that directory isn't writable) and consists of:
+
+    - an index file, mapping each cached signature (together with the
+      compile flags and the codegen's target description) to a data
+      file; the index also records the source file's timestamp and
+      size, the function's bytecode hash and the Numba version, so as
+      to invalidate all entries automatically when any of them changes;
+    - one data file per overload, holding the serialized native object
+      code and the metadata needed to rebuild the compiled function.
+    """
+
+    _source_stamp = None
+
+    def __init__(self, py_func, flags):
+        self._py_func = py_func
+        # Overloads compiled with different flags (e.g. fastmath)
+        # mustn't share their cache entries.
+        self._flags_key = flags.enabled_options()
+        self._lineno = py_func.__code__.co_firstlineno
+        try:
+            qualname = py_func.__qualname__
+        except AttributeError:
+            qualname = py_func.__name__
+        source_path = inspect.getfile(py_func)
+        if not os.path.exists(source_path):
+            raise RuntimeError("cannot cache function %r: no source file "
+                               "available (got %r)" % (qualname, source_path))
+        self._source_path = source_path
+        self._cache_path = self._find_cache_path(source_path)
+        # Note the "<locals>" part of nested functions' qualnames
+        # isn't a valid filename component on all platforms.
+        filename_base = '%s-%s.py%d%d' % (
+            qualname.replace('<locals>', '').replace('..', '.'),
+            self._lineno, PYVERSION[0], PYVERSION[1])
+        self._index_name = '%s.nbi' % (filename_base,)
+        self._index_path = os.path.join(self._cache_path, self._index_name)
+        self._data_name_pattern = '%s.{number:d}.nbc' % (filename_base,)
+
+    def __repr__(self):
+        return "<%s py_func=%r>" % (self.__class__.__name__, self._py_func)
+
+    @property
+    def cache_path(self):
+        return self._cache_path
+
+    def _find_cache_path(self, source_path):
+        """
+        Return a writable directory for storing the cache files of
+        functions defined in *source_path*.
+        """
+        dirname, basename = os.path.split(os.path.abspath(source_path))
+        candidates = [os.path.join(dirname, '__pycache__')]
+        if config.CACHE_DIR:
+            # Mirror the source tree inside the user-specified directory
+            drive, tail = os.path.splitdrive(dirname)
+            candidates.append(os.path.join(config.CACHE_DIR,
+                                           tail.lstrip(os.sep)))
+        for path in candidates:
+            try:
+                _ensure_dir(path)
+            except (IOError, OSError):
+                continue
+            if os.access(path, os.W_OK):
+                return path
+        raise RuntimeError("cannot cache functions defined in %r: no "
+                           "writable cache directory found (set the "
+                           "NUMBA_CACHE_DIR environment variable to "
+                           "choose one)" % (source_path,))
+
+    def _index_key(self, sig, codegen):
+        """
+        Compute the key of an overload inside the index.  The key includes
+        the compile flags and the codegen's magic tuple so that native code
+        is never reused for different compile options, or for a different
+        CPU or set of target features.
+        """
+        return (tuple(sig), self._flags_key, codegen.magic_tuple())
+
+    def _index_header(self):
+        """
+        Compute the header identifying a valid index: any change to the
+        source file, the function's bytecode or the Numba version makes
+        all previously cached overloads stale.
+        """
+        import numba
+        st = os.stat(self._source_path)
+        stamp = st.st_mtime, st.st_size
+        bytecode_hash = hashlib.sha256(
+            marshal.dumps(self._py_func.__code__)).hexdigest()
+        return numba.__version__, stamp, bytecode_hash
+
+    def _cachable(self, cres):
+        """
+        Whether the compile result *cres* can be saved to the cache.
+        A warning is emitted if it can't.
+        """
+        cannot_cache = None
+        if cres.objectmode or cres.interpmode:
+            cannot_cache = "as it was compiled in object mode"
+        elif cres.lifted:
+            cannot_cache = "as it uses lifted loops"
+        elif self._py_func.__closure__:
+            cannot_cache = "as it refers to closure variables"
+        elif any(isinstance(ty, types.ExternalFunctionPointer)
+                 for ty in cres.fndesc.typemap.values()):
+            cannot_cache = "as it calls native function pointers"
+        if cannot_cache:
+            msg = ('Cannot cache compiled function "%s" %s'
+                   % (cres.fndesc.qualname.split('.')[-1], cannot_cache))
+            warnings.warn_explicit(msg, config.NumbaWarning,
+                                   self._source_path, self._lineno)
+            return False
+        return True
+
+    def load_overload(self, sig, target_context):
+        """
+        Load and return the compile result for the given signature,
+        or None if it isn't in the cache (or stale).
+        """
+        overloads = self._load_index()
+        key = self._index_key(sig, target_context.jit_codegen())
+        data_name = overloads.get(key)
+        if data_name is None:
+            return None
+        try:
+            data = self._load_data(data_name)
+        except (IOError, OSError, EOFError, pickle.UnpicklingError):
+            # The data file vanished or is corrupted
+            return None
+        return compiler.CompileResult._rebuild(target_context, *data)
+
+    def save_overload(self, sig, cres):
+        """
+        Save the compile result *cres* for the given signature.
+        """
+        if not self._cachable(cres):
+            return
+        codegen = cres.target_context.jit_codegen()
+        key = self._index_key(sig, codegen)
+        data = cres._reduce()
+        overloads = self._load_index()
+        try:
+            data_name = overloads[key]
+        except KeyError:
+            # Find an unused name for the data file
+            existing = set(overloads.values())
+            for i in range(len(existing) + 1):
+                data_name = self._data_name(i)
+                if data_name not in existing:
+                    break
+            overloads[key] = data_name
+            self._save_index(overloads)
+        self._save_data(data_name, data)
+
+    def flush(self):
+        self._save_index({})
+
+    def _data_name(self, number):
+        return self._data_name_pattern.format(number=number)
+
+    def _data_path(self, name):
+        return os.path.join(self._cache_path, name)
+
+    def _load_index(self):
+        """
+        Load the cache index and return the mapping of overload keys
+        to data file names.  An empty mapping is returned if the index
+        doesn't exist or is stale.
+        """
+        try:
+            with open(self._index_path, "rb") as f:
+                header, overloads = pickle.load(f)
+        except (IOError, OSError, EOFError, ValueError,
+                pickle.UnpicklingError):
+            return {}
+        if header != self._index_header():
+            # This is another version.  Avoid trying to unpickling the
+            # rest of the stream, as that may fail.
+            return {}
+        return overloads
+
+    def _save_index(self, overloads):
+        data = (self._index_header(), overloads)
+        with self._open_for_write(self._index_path) as f:
+            pickle.dump(data, f, protocol=-1)
+
+    def _load_data(self, name):
+        path = self._data_path(name)
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    def _save_data(self, name, data):
+        path = self._data_path(name)
+        with self._open_for_write(path) as f:
+            pickle.dump(data, f, protocol=-1)
+
+    @contextlib.contextmanager
+    def _open_for_write(self, filepath):
+        """
+        Open *filepath* for writing in a race condition-free way
+        (hopefully).
+        """
+        fd, tmpname = tempfile.mkstemp(dir=self._cache_path,
+                                       prefix=os.path.basename(filepath),
+                                       suffix='.tmp')
+        try:
+            with os.fdopen(fd, "wb") as f:
+                yield f
+            _replace_file(tmpname, filepath)
+        except Exception:
+            try:
+                os.unlink(tmpname)
+            except OSError:
+                pass
+            raise
+
+
+def _ensure_dir(path):
+    try:
+        os.makedirs(path)
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            raise
+
+
+def _replace_file(src, dst):
+    """
+    Atomically (if possible) move the file *src* over *dst*.
+    """
+    if sys.platform.startswith('win32'):
+        # os.rename() fails under Windows if the destination exists
+        try:
+            os.unlink(dst)
+        except OSError:
+            pass
+    os.rename(src, dst)
@@ -105,6 +105,32 @@ class PyCallWrapper(object):
 
         return wrapper, api
 
+    def build_fast(self):
+        """
+        Build the fast entry point, which the dispatcher calls directly
+        once it has resolved an overload.  It takes the closure and a C
+        array of borrowed references to the positional arguments, saving
+        the argument tuple parsing done by the regular wrapper.
+        """
+        wrapname = "fastwrapper.%s" % self.func.name
+
+        pyobj = self.context.get_argument_type(types.pyobject)
+        wrapty = Type.function(pyobj, [pyobj, Type.pointer(pyobj)])
+        wrapper = self.module.add_function(wrapty, name=wrapname)
+
+        builder = Builder.new(wrapper.append_basic_block('entry'))
+
+        closure, args = wrapper.args
+        closure.name = 'py_closure'
+        args.name = 'py_args'
+
+        api = self.context.get_python_api(builder)
+        objs = [cgutils.inbound_gep(builder, args, i)
+                for i in range(len(self.fndesc.args))]
+        self.build_call(api, builder, closure, objs)
+
+        return wrapper, api
+
     def build_wrapper(self, api, builder, closure, args, kws):
         nargs = len(self.fndesc.args)
         keywords = self.make_keywords(self.fndesc.args)
@@ -117,6 +143,15 @@ class PyCallWrapper(object):
         with cgutils.if_unlikely(builder, pred):
             builder.ret(api.get_null_object())
 
+        self.build_call(api, builder, closure, objs)
+
+    def build_call(self, api, builder, closure, objs):
+        """
+        Unbox the arguments pointed to by *objs*, call the wrapped function
+        and return its boxed result.
+        """
+        nargs = len(self.fndesc.args)
+
         # Block that returns after erroneous argument unboxing/cleanup
         endblk = cgutils.append_basic_block(builder, "arg.end")
         with cgutils.goto_block(builder, endblk):
@@ -149,6 +184,9 @@ class PyCallWrapper(object):
                 api.return_none()
 
             retval = api.from_native_return(res, self.fndesc.restype)
+            # The boxed value holds its own references (if any), release
+            # the native return value
+            self.context.nrt_decref(builder, self.fndesc.restype, res)
             builder.ret(retval)
 
         with cgutils.ifthen(builder, builder.not_(status.is_python_exc)):
@@ -92,8 +92,11 @@ class StructProxy(object):
             self._value = ref
         else:
             self._value = alloca_once(self._builder, self._be_type)
-            if value is not None:
-                self._builder.store(value, self._value)
+            if value is None:
+                # Zero-initialize, so that fields left unset (e.g. a NRT
+                # meminfo pointer) hold a well-defined value.
+                value = Constant.null(self._be_type)
+            self._builder.store(value, self._value)
 
     def _get_ptr_by_index(self, index):
         geped = self._builder.gep(self._value,
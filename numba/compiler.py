@@ -1,15 +1,17 @@
 from __future__ import print_function, division, absolute_import
 
+import copy
 import inspect
 from contextlib import contextmanager
 from collections import namedtuple, defaultdict
 from pprint import pprint
 import sys
+import threading
 import warnings
 
 from numba import (bytecode, interpreter, funcdesc, typing, typeinfer,
-                   lowering, objmode, irpasses, utils, config,
-                   types, ir, assume, looplifting, macro, types)
+                   lowering, objmode, irpasses, utils, config, _dynfunc,
+                   types, looplifting, macro, types, profiling)
 from numba.targets import cpu
 from numba.annotations import type_annotations
 
@@ -33,11 +35,22 @@ class Flags(utils.ConfigOptions):
         'boundcheck',
         'forceinline',
         'no_cpython_wrapper',
+        # Run prange() loops and array expressions on several threads
+        'auto_parallel',
+        # Optimize with config.TIERED_OPT instead of config.OPT
+        'quick_compile',
+        # Allow unsafe floating-point optimizations (e.g. reassociation)
+        'fastmath',
     ])
 
 
 DEFAULT_FLAGS = Flags()
 
+# Serializes the use of LLVM by the compiler, which may be entered from
+# several threads (e.g. when tiered functions are recompiled in the
+# background).  It must be acquired before any dispatcher's own lock.
+global_compiler_lock = threading.RLock()
+
 
 CR_FIELDS = ["typing_context",
              "target_context",
@@ -51,10 +64,51 @@ CR_FIELDS = ["typing_context",
              "interpmode",
              "library",
              "call_helper",
-             "environment"]
+             "environment",
+             "profile"]
+
 
+class CompileResult(namedtuple("_CompileResult", CR_FIELDS)):
+    __slots__ = ()
+
+    def _reduce(self):
+        """
+        Reduce a CompileResult to picklable components.
+        """
+        libdata = self.library.serialize_using_object_code()
+        # Make it (un)picklable efficiently
+        typeann = str(self.type_annotation)
+        # The typing information isn't needed anymore and may fail pickling
+        fndesc = copy.copy(self.fndesc)
+        fndesc.typemap = fndesc.calltypes = None
+
+        return (libdata, fndesc, self.signature, self.objectmode,
+                self.interpmode, self.lifted, typeann)
+
+    @classmethod
+    def _rebuild(cls, target_context, libdata, fndesc, signature,
+                 objectmode, interpmode, lifted, typeann):
+        with global_compiler_lock:
+            library = target_context.jit_codegen().unserialize_library(libdata)
+            env = _dynfunc.Environment(globals=fndesc.lookup_module().__dict__)
+            cfunc = target_context.get_executable(library, fndesc, env)
+        cr = cls(target_context=target_context,
+                 typing_context=target_context.typing_context,
+                 library=library,
+                 environment=None,
+                 entry_point=cfunc,
+                 fndesc=fndesc,
+                 type_annotation=typeann,
+                 signature=signature,
+                 objectmode=objectmode,
+                 interpmode=interpmode,
+                 lifted=lifted,
+                 typing_error=None,
+                 call_helper=None,
+                 profile=None,
+                 )
+        return cr
 
-CompileResult = namedtuple("CompileResult", CR_FIELDS)
 FunctionAttributes = namedtuple("FunctionAttributes",
                                 ['name', 'filename', 'lineno'])
 DEFAULT_FUNCTION_ATTRIBUTES = FunctionAttributes('<anonymous>', '<unknown>', 0)
@@ -188,7 +242,8 @@ class _PipelineManager(object):
             is_final_pipeline = pipeline_name == self.pipeline_order[-1]
             for stage, stage_name in self.pipeline_stages[pipeline_name]:
                 try:
-                    res = stage()
+                    with profiling.record_stage(pipeline_name, stage_name):
+                        res = stage()
                 except _EarlyPipelineCompletion as e:
                     return e.result
                 except BaseException as e:
@@ -219,6 +274,10 @@ class Pipeline(object):
     def __init__(self, typingctx, targetctx, library, args, return_type, flags,
                  locals):
         self.typingctx = typingctx
+        if flags.auto_parallel:
+            targetctx = targetctx.subtarget(auto_parallel=True)
+        if flags.fastmath:
+            targetctx = targetctx.subtarget(fastmath=True)
         self.targetctx = targetctx
         self.library = library
         self.args = args
@@ -347,6 +406,8 @@ class Pipeline(object):
         loop_flags.unset('enable_looplift')
         if not self.flags.enable_pyobject_looplift:
             loop_flags.unset('enable_pyobject')
+        # Lifted loops are the hot parts: optimize them fully
+        loop_flags.unset('quick_compile')
 
         def dispatcher_factory(loopbc):
             from . import dispatcher
@@ -367,6 +428,24 @@ class Pipeline(object):
                                     func_attr=self.func_attr)
             return cres
 
+    def stage_parallel_lift(self):
+        """
+        Lift prange() loops out of the function for parallel execution
+        """
+        # Object mode fallback will start again from the serial version
+        self.serial_bc = self.bc, self.lifted
+        from . import parfor
+        self.bc, loops = parfor.lift_prange_loops(self.bc, self.typingctx,
+                                                  self.targetctx,
+                                                  self.locals, self.flags)
+        self.lifted = tuple(self.lifted) + tuple(loops)
+
+    def stage_serial_fallback(self):
+        """
+        Undo the effects of stage_parallel_lift()
+        """
+        self.bc, self.lifted = self.serial_bc
+
     def stage_objectmode_frontend(self):
         """
         Front-end: Analyze bytecode, generate Numba IR, infer types
@@ -402,6 +481,16 @@ class Pipeline(object):
             legalize_return_type(self.return_type, self.interp,
                                  self.targetctx)
 
+    def stage_fuse_ufuncs(self):
+        """
+        Fuse chains of explicit-output ufunc calls into single loops
+        """
+        irpasses.FuseUfuncLoops(self.interp, self.typemap,
+                                self.calltypes).run()
+        if config.DEBUG:
+            print("fuse ufuncs".center(80, '-'))
+            self.interp.dump()
+
     def stage_annotate_type(self):
         """
         Create type annotation after type inference
@@ -460,6 +549,11 @@ class Pipeline(object):
         if self.library is None:
             codegen = self.targetctx.jit_codegen()
             self.library = codegen.create_library(self.bc.func_qualname)
+            # Enable object caching upfront, so that the library can
+            # be later serialized.
+            self.library.enable_object_caching()
+            if self.flags.quick_compile:
+                self.library.set_opt_level(config.TIERED_OPT)
         lowered = lowerfn()
         signature = typing.signature(self.return_type, *self.args)
         cr = compile_result(typing_context=self.typingctx,
@@ -530,13 +624,22 @@ class Pipeline(object):
 
         if not self.flags.force_pyobject:
             pm.create_pipeline("nopython")
+            if self.flags.auto_parallel:
+                pm.add_stage(self.stage_parallel_lift,
+                             "lifting parallel loops")
             pm.add_stage(self.stage_analyze_bytecode, "analyzing bytecode")
             pm.add_stage(self.stage_nopython_frontend, "nopython frontend")
+            if not self.flags.auto_parallel:
+                # Parallel array expressions are computed one by one
+                pm.add_stage(self.stage_fuse_ufuncs, "fusing ufunc loops")
             pm.add_stage(self.stage_annotate_type, "annotate type")
             pm.add_stage(self.stage_nopython_backend, "nopython mode backend")
 
         if self.status.can_fallback or self.flags.force_pyobject:
             pm.create_pipeline("object")
+            if self.flags.auto_parallel and not self.flags.force_pyobject:
+                pm.add_stage(self.stage_serial_fallback,
+                             "restoring serial loops")
             pm.add_stage(self.stage_analyze_bytecode, "analyzing bytecode")
             pm.add_stage(self.stage_objectmode_frontend, "object mode frontend")
             pm.add_stage(self.stage_annotate_type, "annotate type")
@@ -547,7 +650,11 @@ class Pipeline(object):
             pm.add_stage(self.stage_compile_interp_mode, "compiling with interpreter mode")
 
         pm.finalize()
-        return pm.run(self.status)
+        with global_compiler_lock:
+            with profiling.profile_compilation(self.bc.func_qualname,
+                                               self.args) as profile:
+                res = pm.run(self.status)
+        return res._replace(profile=profile)
 
 
 def compile_extra(typingctx, targetctx, func, args, return_type, flags,
@@ -599,42 +706,9 @@ def legalize_given_types(args, return_type):
 
 def legalize_return_type(return_type, interp, targetctx):
     """
-    Only accept array return type iff it is passed into the function.
     Reject function object return types if in nopython mode.
     """
-    assert assume.return_argument_array_only
-
-    if isinstance(return_type, types.Array):
-        # Walk IR to discover all arguments and all return statements
-        retstmts = []
-        caststmts = {}
-        argvars = set()
-        for bid, blk in interp.blocks.items():
-            for inst in blk.body:
-                if isinstance(inst, ir.Return):
-                    retstmts.append(inst.value.name)
-                elif isinstance(inst, ir.Assign):
-                    if (isinstance(inst.value, ir.Expr)
-                        and inst.value.op == 'cast'):
-                        caststmts[inst.target.name] = inst.value
-                    elif isinstance(inst.value, ir.Arg):
-                        argvars.add(inst.target.name)
-
-        assert retstmts, "No return statements?"
-
-        # FIXME: In the future, we can return an array that is either a dynamically
-        #        allocated array or an array that is passed as argument.  This
-        #        must be statically resolvable.
-
-        # The return value must be the first modification of the value.
-
-        for var in retstmts:
-            cast = caststmts.get(var)
-            if cast is None or cast.value.name not in argvars:
-                raise TypeError("Only accept returning of array passed into the "
-                                "function as argument")
-
-    elif (isinstance(return_type, types.Function) or
+    if (isinstance(return_type, types.Function) or
             isinstance(return_type, types.Phantom)):
         raise TypeError("Can't return function object in nopython mode")
 
@@ -1,5 +1,6 @@
 from __future__ import print_function, division, absolute_import
 
+import multiprocessing
 import struct
 import sys
 import os
@@ -72,6 +73,13 @@ DUMP_FUNC_OPT = _readenv("NUMBA_DUMP_FUNC_OPT", int, DEBUG)
 # Force dump of Optimized LLVM IR
 DUMP_OPTIMIZED = _readenv("NUMBA_DUMP_OPTIMIZED", int, DEBUG)
 
+# Optimization level for the first compilation of tiered functions
+TIERED_OPT = _readenv("NUMBA_TIERED_OPT", int, 1)
+
+# Number of calls after which an overload of a tiered function is
+# recompiled at full optimization
+TIERED_THRESHOLD = _readenv("NUMBA_TIERED_THRESHOLD", int, 1000)
+
 # Force disable loop vectorize
 # Loop vectorizer is disabled on 32-bit win32 due to a bug (#649)
 LOOP_VECTORIZE = _readenv("NUMBA_LOOP_VECTORIZE", int,
@@ -86,6 +94,17 @@ ANNOTATE = _readenv("NUMBA_DUMP_ANNOTATION", int, 0)
 # Dump type annotation in html format
 HTML = _readenv("NUMBA_DUMP_HTML", str, None)
 
+# Fallback directory for the on-disk cache of compiled functions, used
+# when the source file's directory isn't writable
+CACHE_DIR = _readenv("NUMBA_CACHE_DIR", str, "")
+
+# File to write a JSON trace of the compilation times to, at exit
+COMPILE_TRACE = _readenv("NUMBA_COMPILE_TRACE", str, "")
+
+# Number of threads used by the parallel ufunc target (the calling
+# thread included)
+NUM_THREADS = _readenv("NUMBA_NUM_THREADS", int, multiprocessing.cpu_count())
+
 # Python version in (major, minor) tuple
 PYVERSION = sys.version_info[:2]
 
@@ -117,3 +136,8 @@ FORCE_CUDA_CC = _readenv("NUMBA_FORCE_CUDA_CC", _force_cc, None)
 # Enable AVX on supported platforms where it won't degrade performance.
 ENABLE_AVX = _readenv("NUMBA_ENABLE_AVX", int,
                       _cpu_name not in ('corei7-avx', 'core-avx-i'))
+
+# The CPU name and LLVM feature string (e.g. "+avx2,+fma") JIT-compiled
+# code targets, instead of the host CPU
+CPU_NAME = _readenv("NUMBA_CPU_NAME", str, None)
+CPU_FEATURES = _readenv("NUMBA_CPU_FEATURES", str, None)
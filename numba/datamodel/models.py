@@ -84,6 +84,27 @@ class DataModel(object):
         """
         return self.from_data(builder, builder.load(ptr))
 
+    def traverse(self, builder, value):
+        """
+        Traverse contained values.
+        Return a list of (frontend type, LLVM value) pairs for the members
+        which may hold references to memory managed by the Numba runtime.
+        """
+        return []
+
+    def has_nrt_meminfo(self):
+        """
+        Whether the value holds a reference to a NRT MemInfo.
+        """
+        return False
+
+    def get_nrt_meminfo(self, builder, value):
+        """
+        Return the NRT MemInfo pointer held by *value* (which may be NULL).
+        Only defined if has_nrt_meminfo() is true.
+        """
+        raise NotImplementedError
+
     def _compared_fields(self):
         return (type(self), self._fe_type)
 
@@ -295,6 +316,10 @@ class UniTupleModel(DataModel):
     def from_return(self, builder, value):
         return value
 
+    def traverse(self, builder, value):
+        return [(self._fe_type.dtype, builder.extract_value(value, [i]))
+                for i in range(self._count)]
+
 
 class CompositeModel(DataModel):
     """Any model that is composed of multiple other models should subclass from
@@ -452,6 +477,10 @@ class StructModel(CompositeModel):
     def get_field_position(self, field):
         return self._fields.index(field)
 
+    def traverse(self, builder, value):
+        return [(self.get_type(i), self.get(builder, value, i))
+                for i in range(len(self._fields))]
+
     @property
     def field_count(self):
         return len(self._fields)
@@ -508,6 +537,7 @@ class ArrayModel(StructModel):
     def __init__(self, dmm, fe_type):
         ndim = fe_type.ndim
         members = [
+            ('meminfo', types.voidptr),
             ('parent', types.pyobject),
             ('nitems', types.intp),
             ('itemsize', types.intp),
@@ -517,6 +547,16 @@ class ArrayModel(StructModel):
         ]
         super(ArrayModel, self).__init__(dmm, fe_type, members)
 
+    def traverse(self, builder, value):
+        # The only reference held by an array is its meminfo
+        return []
+
+    def has_nrt_meminfo(self):
+        return True
+
+    def get_nrt_meminfo(self, builder, value):
+        return self.get(builder, value, 'meminfo')
+
 
 @register_default(types.NestedArray)
 class NestedArrayModel(ArrayModel):
@@ -637,7 +677,7 @@ class CContiguousFlatIter(StructModel):
         assert fe_type.array_type.layout == 'C'
         array_type = fe_type.array_type
         dtype = array_type.dtype
-        members = [('array', types.CPointer(array_type)),
+        members = [('array', array_type),
                    ('stride', types.intp),
                    ('pointer', types.EphemeralPointer(types.CPointer(dtype))),
                    ('index', types.EphemeralPointer(types.intp)),
@@ -655,7 +695,7 @@ class FlatIter(StructModel):
     def __init__(self, dmm, fe_type):
         array_type = fe_type.array_type
         dtype = array_type.dtype
-        members = [('array', types.CPointer(array_type)),
+        members = [('array', array_type),
                    # NOTE: pointers and indices are arrays
                    ('pointers', types.EphemeralPointer(types.CPointer(dtype))),
                    ('indices', types.EphemeralPointer(types.intp)),
@@ -702,6 +742,60 @@ class ArrayIterator(StructModel):
         super(ArrayIterator, self).__init__(dmm, fe_type, members)
 
 
+@register_default(types.List)
+class ListModel(StructModel):
+    def __init__(self, dmm, fe_type):
+        # The list's size, allocation and items live in the MemInfo's
+        # (resizable) data payload
+        members = [('meminfo', types.voidptr)]
+        super(ListModel, self).__init__(dmm, fe_type, members)
+
+    def traverse(self, builder, value):
+        # The only reference held by a list is its meminfo
+        return []
+
+    def has_nrt_meminfo(self):
+        return True
+
+    def get_nrt_meminfo(self, builder, value):
+        return self.get(builder, value, 'meminfo')
+
+
+@register_default(types.ListIter)
+class ListIterModel(StructModel):
+    def __init__(self, dmm, fe_type):
+        members = [('index', types.EphemeralPointer(types.intp)),
+                   ('list', fe_type.list_type)]
+        super(ListIterModel, self).__init__(dmm, fe_type, members)
+
+
+@register_default(types.Dict)
+class DictModel(StructModel):
+    def __init__(self, dmm, fe_type):
+        # The dict's counters and hash table entries live in the MemInfo's
+        # (resizable) data payload
+        members = [('meminfo', types.voidptr)]
+        super(DictModel, self).__init__(dmm, fe_type, members)
+
+    def traverse(self, builder, value):
+        # The only reference held by a dict is its meminfo
+        return []
+
+    def has_nrt_meminfo(self):
+        return True
+
+    def get_nrt_meminfo(self, builder, value):
+        return self.get(builder, value, 'meminfo')
+
+
+@register_default(types.DictIter)
+class DictIterModel(StructModel):
+    def __init__(self, dmm, fe_type):
+        members = [('index', types.EphemeralPointer(types.intp)),
+                   ('dict', fe_type.dict_type)]
+        super(DictIterModel, self).__init__(dmm, fe_type, members)
+
+
 @register_default(types.EnumerateType)
 class EnumerateType(StructModel):
     def __init__(self, dmm, fe_type):
@@ -778,6 +872,7 @@ class GeneratorModel(CompositeModel):
 
 
 @register_default(types.NumpyFlatType)
+@register_default(types.NumpyNdEnumerateType)
 def handle_numpy_flat_type(dmm, ty):
     if ty.array_type.layout == 'C':
         return CContiguousFlatIter(dmm, ty)
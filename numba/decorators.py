@@ -28,7 +28,8 @@ _msg_deprecated_signature_arg = ("Deprecated keyword argument `{0}`. "
                                  "Signatures should be passed as the first "
                                  "positional argument.")
 
-def jit(signature_or_function=None, locals={}, target='cpu', **options):
+def jit(signature_or_function=None, locals={}, target='cpu', cache=False,
+        background=False, tiered=False, **options):
     """
     This decorator is used to compile a Python function into native code.
     
@@ -49,6 +50,26 @@ def jit(signature_or_function=None, locals={}, target='cpu', **options):
         Specifies the target platform to compile for. Valid targets are cpu,
         gpu, npyufunc, and cuda. Defaults to cpu.
 
+    cache: bool
+        If true, compiled overloads are saved to an on-disk cache and
+        reused by later processes instead of being compiled again.
+        Defaults to False.
+
+    background: bool
+        If true, the signatures passed are compiled in parallel by worker
+        processes, and the decorator returns without waiting for them.
+        Each overload is waited for the first time it is needed.  Errors
+        are then reported at that time, rather than by the decorator.
+        Only applies to the cpu target, when signatures are given.
+        Defaults to False.
+
+    tiered: bool
+        If true, overloads are first compiled with cheap optimizations,
+        and recompiled with full optimizations in a background thread
+        once they have been called NUMBA_TIERED_THRESHOLD times.  This
+        lowers the latency of the first call.  Only applies to the cpu
+        target.  Defaults to False.
+
     targetoptions: 
         For a cpu target, valid options are:
             nopython: bool
@@ -73,6 +94,27 @@ def jit(signature_or_function=None, locals={}, target='cpu', **options):
                 indices, for a small performance penalty. Default value
                 is True.
 
+            parallel: bool
+                Set to True to run loops over ``numba.prange()`` and array
+                expressions on several threads.  Only applies to code
+                compiled in nopython mode.  Default value is False.
+
+            fastmath: bool
+                Set to True to let LLVM reassociate floating-point
+                operations and assume they don't produce NaNs or
+                infinities.  This allows vectorizing reductions such as
+                ``arr.sum()``, but may change the rounding of results.
+                Default value is False.
+
+            target_cpu: str
+                The LLVM CPU name to generate code for (e.g. "generic").
+                Default value is the host CPU.
+
+            target_features: str
+                The LLVM CPU features string to generate code with
+                (e.g. "+avx2,+fma").  Default value is the features
+                implied by the target CPU.
+
     Returns
     --------
     A callable usable as a compiled function.  Actual compiling will be
@@ -127,15 +169,18 @@ def jit(signature_or_function=None, locals={}, target='cpu', **options):
     if signature_or_function is None:
         # No signature, no function
         def configured_jit(func):
-            return jit(func, locals=locals, target=target, **options)
+            return jit(func, locals=locals, target=target, cache=cache,
+                       background=background, tiered=tiered, **options)
         return configured_jit
     elif isinstance(signature_or_function, list):
         # A list of signatures is passed
         return _jit(signature_or_function, locals=locals, target=target,
+                    cache=cache, background=background, tiered=tiered,
                     targetoptions=options)
     elif sigutils.is_signature(signature_or_function):
         # A single signature is passed
         return _jit([signature_or_function], locals=locals, target=target,
+                    cache=cache, background=background, tiered=tiered,
                     targetoptions=options)
     else:
         # A function is passed
@@ -143,17 +188,28 @@ def jit(signature_or_function=None, locals={}, target='cpu', **options):
         dispatcher = registry.target_registry[target]
         dispatcher = dispatcher(py_func=pyfunc, locals=locals,
                                 targetoptions=options)
+        if cache:
+            dispatcher.enable_caching()
+        if tiered:
+            dispatcher.enable_tiered_compilation()
         return dispatcher
 
 
-def _jit(sigs, locals, target, targetoptions):
+def _jit(sigs, locals, target, cache, background, tiered, targetoptions):
     dispatcher = registry.target_registry[target]
 
     def wrapper(func):
         disp = dispatcher(py_func=func, locals=locals,
                           targetoptions=targetoptions)
-        for sig in sigs:
-            disp.compile(sig)
+        if cache:
+            disp.enable_caching()
+        if tiered:
+            disp.enable_tiered_compilation()
+        if background:
+            disp.compile_in_background(sigs)
+        else:
+            for sig in sigs:
+                disp.compile(sig)
         disp.disable_compile()
         return disp
 
@@ -1,15 +1,28 @@
 from __future__ import print_function, division, absolute_import
 
+import atexit
+import collections
+import ctypes
 import functools
 import inspect
+import multiprocessing
 import sys
+import threading
+import traceback
+import warnings
 
-from numba import _dispatcher, compiler, utils
+from numba import _dispatcher, compiler, config, utils
 from numba.typeconv.rules import default_type_manager
 from numba import sigutils, serialize, types, typing
 from numba.typing.templates import resolve_overload
 from numba.bytecode import get_code_object
+from numba.caching import NullCache, FunctionCache
 from numba.six import create_bound_method, next
+from numba.six.moves import cPickle as pickle
+
+
+_CompileStats = collections.namedtuple(
+    '_CompileStats', ('cache_path', 'cache_hits', 'cache_misses', 'profiles'))
 
 
 class _OverloadedBase(_dispatcher.Dispatcher):
@@ -29,6 +42,20 @@ class _OverloadedBase(_dispatcher.Dispatcher):
         self._compileinfos = {}
         # A list of nopython signatures
         self._npsigs = []
+        # A mapping of signatures to (sig, async result) for the overloads
+        # being compiled in the background (see Overloaded)
+        self._pending = {}
+        # The signatures of the definitions inserted in the native
+        # dispatcher, in insertion order
+        self._inserted_sigs = []
+        # The signatures compiled at low optimization, waiting to become
+        # hot (see Overloaded.enable_tiered_compilation())
+        self._quick_sigs = set()
+        # Compile results replaced by their optimized version, which
+        # must be kept alive as they may still be running
+        self._retired = []
+        # The threads recompiling hot overloads
+        self._tiering_threads = []
 
         self.py_func = py_func
         # other parts of Numba assume the old Python 2 name for code object
@@ -53,6 +80,8 @@ class _OverloadedBase(_dispatcher.Dispatcher):
         self.overloads.clear()
         self._compileinfos.clear()
         self._npsigs[:] = []
+        self._inserted_sigs[:] = []
+        self._quick_sigs.clear()
 
     def _make_finalizer(self):
         """
@@ -60,6 +89,7 @@ class _OverloadedBase(_dispatcher.Dispatcher):
         related compiled functions.
         """
         overloads = self.overloads
+        retired = self._retired
         targetctx = self.targetctx
 
         # Early-bind utils.shutting_down() into the function's local namespace
@@ -71,7 +101,9 @@ class _OverloadedBase(_dispatcher.Dispatcher):
                 return
             # This function must *not* hold any reference to self:
             # we take care to bind the necessary objects in the closure.
-            for func in overloads.values():
+            funcs = list(overloads.values())
+            funcs += [cres.entry_point for cres in retired]
+            for func in funcs:
                 try:
                     targetctx.remove_user_function(func)
                 except KeyError:
@@ -99,8 +131,12 @@ class _OverloadedBase(_dispatcher.Dispatcher):
 
     def add_overload(self, cres):
         args = tuple(cres.signature.args)
-        sig = [a._code for a in args]
-        self._insert(sig, cres.entry_point, cres.objectmode, cres.interpmode)
+        # While background compilations are pending, overloads aren't
+        # made visible to the native dispatcher, as it could otherwise
+        # pick one of them through a conversion instead of waiting for
+        # an exact match.
+        if not self._pending:
+            self._insert_overload(cres)
         self.overloads[args] = cres.entry_point
         self._compileinfos[args] = cres
 
@@ -108,6 +144,23 @@ class _OverloadedBase(_dispatcher.Dispatcher):
         if not cres.objectmode and not cres.interpmode:
             self._npsigs.append(cres.signature)
 
+    def _insert_overload(self, cres):
+        sig = [a._code for a in cres.signature.args]
+        self._insert(sig, cres.entry_point, cres.objectmode, cres.interpmode,
+                     self._get_fast_entry(cres))
+        if not cres.interpmode:
+            # Interpreter mode functions aren't native definitions
+            self._inserted_sigs.append(tuple(cres.signature.args))
+
+    def _get_fast_entry(self, cres):
+        """
+        Return the address of the fast entry point the native dispatcher
+        can call instead of *cres*' entry point, or 0 if there is none.
+        """
+        if cres.interpmode or cres.library is None:
+            return 0
+        return self.targetctx.get_fast_entry(cres.library, cres.fndesc)
+
     def get_call_template(self, args, kws):
         """
         Get a typing.ConcreteTemplate for this dispatcher and the given
@@ -245,7 +298,15 @@ class Overloaded(_OverloadedBase):
         functools.update_wrapper(self, py_func)
 
         self.targetoptions = targetoptions
+        if ('target_cpu' in targetoptions
+                or 'target_features' in targetoptions):
+            self.targetctx = self.targetctx.target_cpu(
+                targetoptions.get('target_cpu'),
+                targetoptions.get('target_features'))
         self.locals = locals
+        self._cache = NullCache()
+        self._cache_hits = collections.Counter()
+        self._cache_misses = collections.Counter()
 
         self.typingctx.insert_overloaded(self)
 
@@ -262,6 +323,7 @@ class Overloaded(_OverloadedBase):
         the original function as well the compilation options and
         compiled signatures, but not the compiled code itself.
         """
+        self._wait_background()
         if self._can_compile:
             sigs = []
         else:
@@ -282,39 +344,294 @@ class Overloaded(_OverloadedBase):
         self._can_compile = can_compile
         return self
 
+    def enable_caching(self):
+        """
+        Enable the on-disk caching of compiled overloads.
+        """
+        self._cache = FunctionCache(self.py_func, self._get_compile_flags())
+
+    @property
+    def stats(self):
+        """
+        Compilation statistics: the cache path (None if caching is
+        disabled), the per-signature cache hit and miss counters, and
+        the per-signature compile profiles (see numba.profiling) of the
+        overloads compiled in this process.
+        """
+        profiles = dict((sig, cres.profile)
+                        for sig, cres in self._compileinfos.items()
+                        if cres.profile is not None)
+        return _CompileStats(cache_path=self._cache.cache_path,
+                             cache_hits=self._cache_hits,
+                             cache_misses=self._cache_misses,
+                             profiles=profiles)
+
+    def enable_tiered_compilation(self, threshold=None):
+        """
+        Enable tiered compilation: new signatures are first compiled
+        with a cheap LLVM optimization pipeline (config.TIERED_OPT), and
+        recompiled at full optimization in a background thread once
+        called *threshold* times (config.TIERED_THRESHOLD by default).
+        """
+        if threshold is None:
+            threshold = config.TIERED_THRESHOLD
+        if threshold <= 0:
+            raise ValueError("tiering threshold must be positive")
+        self._tier_threshold = threshold
+
     def compile(self, sig):
-        with self._compile_lock:
-            args, return_type = sigutils.normalize_signature(sig)
+        args, return_type = sigutils.normalize_signature(sig)
+        # Wait for a background compilation without holding the compiler
+        # lock, so as not to stall other compilations meanwhile.
+        pending = self._pending.get(tuple(args))
+        if pending is not None:
+            pending[1].wait()
+        with compiler.global_compiler_lock, self._compile_lock:
             # Don't recompile if signature already exists
             # (e.g. if another thread compiled it before we got the lock)
             existing = self.overloads.get(tuple(args))
             if existing is not None:
                 return existing
 
-            flags = compiler.Flags()
-            self.targetdescr.options.parse_as_flags(flags, self.targetoptions)
+            # Collect the result of a background compilation
+            cres = self._collect_background(tuple(args))
+            if cres is not None:
+                self._add_rebuilt_overload(cres)
+                return cres.entry_point
 
-            cres = compiler.compile_extra(self.typingctx, self.targetctx,
-                                          self.py_func,
-                                          args=args, return_type=return_type,
-                                          flags=flags, locals=self.locals)
+            # Try to load from disk cache
+            entry_point = self._load_cached_overload(args)
+            if entry_point is not None:
+                return entry_point
 
-            # Check typing error if object mode is used
-            if cres.typing_error is not None and not flags.enable_pyobject:
-                raise cres.typing_error
+            self._cache_misses[tuple(args)] += 1
+            quick = self._tier_threshold > 0
+            cres = self._compile_overload(args, return_type, quick)
 
             self.add_overload(cres)
+            if quick and not (cres.objectmode or cres.interpmode):
+                self._quick_sigs.add(tuple(args))
+            else:
+                # Only fully optimized code is worth caching
+                self._cache.save_overload(args, cres)
             return cres.entry_point
 
+    def _compile_overload(self, args, return_type, quick=False):
+        """
+        Compile the function for *args* and *return_type*, with a low
+        optimization level if *quick* is true, and return the compile
+        result.
+        """
+        flags = self._get_compile_flags()
+        if quick:
+            flags.set('quick_compile')
+
+        cres = compiler.compile_extra(self.typingctx, self.targetctx,
+                                      self.py_func,
+                                      args=args, return_type=return_type,
+                                      flags=flags, locals=self.locals)
+
+        # Check typing error if object mode is used
+        if cres.typing_error is not None and not flags.enable_pyobject:
+            raise cres.typing_error
+        return cres
+
+    def _get_compile_flags(self):
+        """
+        Return the compiler flags corresponding to the target options.
+        """
+        flags = compiler.Flags()
+        self.targetdescr.options.parse_as_flags(flags, self.targetoptions)
+        return flags
+
+    def _tier_up(self, index):
+        """
+        Called by the native dispatcher when the *index*-th definition
+        has been called as many times as the tiering threshold (see
+        enable_tiered_compilation()).  If it was compiled at low
+        optimization, start recompiling it in a background thread.
+        """
+        args = self._inserted_sigs[index]
+        if args not in self._quick_sigs:
+            return
+        self._quick_sigs.discard(args)
+        thread = threading.Thread(target=self._recompile_optimized,
+                                  args=(args, self._compileinfos[args]))
+        thread.daemon = True
+        # Forget the recompilations which have finished already
+        self._tiering_threads = [t for t in self._tiering_threads
+                                 if t.is_alive()]
+        self._tiering_threads.append(thread)
+        thread.start()
+
+    def _recompile_optimized(self, args, quick_cres):
+        """
+        Recompile the overload *quick_cres* for *args* at full
+        optimization, and swap it in place of the quick version.
+        """
+        with compiler.global_compiler_lock, self._compile_lock:
+            # The overload may have been dropped (e.g. by recompile())
+            if self._compileinfos.get(args) is not quick_cres:
+                return
+            try:
+                cres = self._compile_overload(
+                    args, quick_cres.signature.return_type)
+            except Exception:
+                # Keep running the quick version
+                return
+            index = self._inserted_sigs.index(args)
+            self._replace(index, cres.entry_point, self._get_fast_entry(cres))
+            self.overloads[args] = cres.entry_point
+            self._compileinfos[args] = cres
+            self._retired.append(quick_cres)
+            self._cache.save_overload(args, cres)
+
+    def _wait_tiering(self):
+        """
+        Wait for the background recompilations started so far.
+        """
+        for thread in self._tiering_threads:
+            thread.join()
+
+    def _add_rebuilt_overload(self, cres):
+        """
+        Add the overload *cres* rebuilt from its serialized form.
+        """
+        # Insert native function for use by other jitted-functions
+        # (this is normally done by the compiler pipeline).
+        self.targetctx.insert_user_function(cres.entry_point, cres.fndesc,
+                                            [cres.library])
+        self.add_overload(cres)
+
+    def _load_cached_overload(self, args):
+        """
+        Try to load the overload for *args* from the disk cache and
+        return its entry point, or None if it isn't cached.
+        """
+        cres = self._cache.load_overload(args, self.targetctx)
+        if cres is None:
+            return None
+        self._cache_hits[tuple(args)] += 1
+        self._add_rebuilt_overload(cres)
+        return cres.entry_point
+
+    def compile_in_background(self, sigs):
+        """
+        Start compiling the given signatures in worker processes.  Each
+        overload is collected the first time it is needed, e.g. when the
+        dispatcher is called with matching argument types.
+
+        The workers belong to a process pool shared by all dispatchers,
+        which is closed once idle, and receive the dispatcher pickled;
+        where fork() isn't available or the dispatcher can't be pickled,
+        the signatures are compiled immediately instead.
+        """
+        sigs = [sig for sig in sigs
+                if self._load_cached_overload(
+                    sigutils.normalize_signature(sig)[0]) is None]
+        payload = None
+        if sigs and not self._pending and _get_fork_context() is not None:
+            try:
+                payload = pickle.dumps(
+                    (self, isinstance(self._cache, FunctionCache)),
+                    protocol=-1)
+            except Exception:
+                pass
+        if payload is None:
+            for sig in sigs:
+                self.compile(sig)
+            return
+
+        for sig, result in _submit_background(payload, sigs):
+            args, return_type = sigutils.normalize_signature(sig)
+            self._pending[tuple(args)] = sig, result
+        self._can_compile_after_background = self._can_compile
+
+    def _collect_background(self, args):
+        """
+        Wait for the background compilation of *args*, if any, and
+        return the rebuilt compile result.  None is returned if there
+        is no such compilation or it failed, in which case the caller
+        should compile the signature itself.
+        """
+        try:
+            sig, result = self._pending.pop(args)
+        except KeyError:
+            return None
+        try:
+            data, error = result.get()
+        finally:
+            if not self._pending:
+                self._finish_background()
+        if error is not None:
+            warnings.warn("background compilation of %s for %s failed, "
+                          "compiling it again in this process:\n%s"
+                          % (self.py_func.__name__, sig, error),
+                          config.NumbaWarning)
+        if data is None:
+            return None
+        return compiler.CompileResult._rebuild(self.targetctx,
+                                               *pickle.loads(data))
+
+    def _finish_background(self):
+        """
+        Called once all background compilations have been collected.
+        """
+        for args, cres in self._compileinfos.items():
+            # Overloads loaded from the cache before the background
+            # compilations started were inserted already.
+            if args not in self._inserted_sigs:
+                self._insert_overload(cres)
+        self._can_compile = self._can_compile_after_background
+
+    def _wait_background(self):
+        """
+        Wait for all pending background compilations.
+        """
+        for sig, result in list(self._pending.values()):
+            self.compile(sig)
+
+    def disable_compile(self, val=True):
+        if self._pending:
+            # Keep the native dispatcher calling _compile_for_args() until
+            # all background compilations are collected.
+            self._can_compile_after_background = not val
+        else:
+            _OverloadedBase.disable_compile(self, val)
+
+    def _compile_for_args(self, *args, **kws):
+        if not self._pending:
+            return _OverloadedBase._compile_for_args(self, *args, **kws)
+        assert not kws
+        sig = tuple([self.typeof_pyval(a) for a in args])
+        # Collect any background compilation which has finished
+        for pending_sig, result in list(self._pending.values()):
+            if result.ready():
+                self.compile(pending_sig)
+        if sig in self.overloads or sig in self._pending:
+            return self.compile(sig)
+        # Choosing another overload needs all of them to be available:
+        # wait and let the native dispatcher resolve the call again.
+        self._wait_background()
+        return self
+
+    def get_call_template(self, args, kws):
+        # Typing needs all overloads, but avoid compiler re-entrance
+        if not self.is_compiling:
+            self._wait_background()
+        return _OverloadedBase.get_call_template(self, args, kws)
+
     def recompile(self):
         """
         Recompile all signatures afresh.
         """
+        self._wait_background()
         sigs = [cr.signature for cr in self._compileinfos.values()]
         old_can_compile = self._can_compile
         # Ensure the old overloads are disposed of, including compiled functions.
         self._make_finalizer()()
         self._reset_overloads()
+        self._cache.flush()
         self._can_compile = True
         try:
             for sig in sigs:
@@ -323,6 +640,122 @@ class Overloaded(_OverloadedBase):
             self._can_compile = old_can_compile
 
 
+_background_lock = threading.Lock()
+# The process pool shared by all background compilations, while it
+# has work to do
+_background_pool = None
+# The number of tasks submitted to _background_pool and not finished yet
+_background_tasks = 0
+# Pools closed once idle, whose worker processes are still to be joined
+_closed_pools = []
+
+
+def _submit_background(payload, sigs):
+    """
+    Submit the compilation of *sigs* for the dispatcher pickled in
+    *payload* to the background process pool, creating the pool if
+    necessary, and return a list of (sig, async result) pairs.
+    """
+    global _background_pool, _background_tasks
+    with _background_lock:
+        _join_closed_pools()
+        if _background_pool is None:
+            # Forking while another thread (e.g. a tiering recompilation)
+            # holds the compiler lock would leave it locked forever in
+            # the workers.
+            with compiler.global_compiler_lock:
+                _background_pool = _get_fork_context().Pool(
+                    min(config.NUM_THREADS, len(sigs)))
+        _background_tasks += len(sigs)
+        return [(sig, _background_pool.apply_async(
+                     _compile_in_worker, (payload, sig),
+                     callback=_background_task_done))
+                for sig in sigs]
+
+
+def _background_task_done(result):
+    """
+    Called by the pool when a background compilation has finished:
+    close the pool once it has nothing left to do, so that idle worker
+    processes don't linger.
+    """
+    global _background_pool, _background_tasks
+    with _background_lock:
+        _background_tasks -= 1
+        if _background_tasks == 0 and _background_pool is not None:
+            # This runs in one of the pool's threads: it can be closed,
+            # but not joined from here.
+            _background_pool.close()
+            _closed_pools.append(_background_pool)
+            _background_pool = None
+
+
+def _join_closed_pools():
+    """
+    Join the worker processes of the pools closed so far.
+    """
+    while _closed_pools:
+        _closed_pools.pop().join()
+
+
+@atexit.register
+def _shutdown_background_pool():
+    global _background_pool
+    with _background_lock:
+        pool = _background_pool
+        _background_pool = None
+    # Terminating joins the pool's threads, which may be waiting for
+    # the lock in _background_task_done().
+    if pool is not None:
+        pool.terminate()
+    with _background_lock:
+        _join_closed_pools()
+
+
+def _get_fork_context():
+    """
+    Return a multiprocessing context creating processes with fork(),
+    or None if fork() isn't available.
+    """
+    if sys.platform.startswith('win32'):
+        return None
+    get_context = getattr(multiprocessing, 'get_context', None)
+    if get_context is None:
+        # Python 2 always forks on POSIX
+        return multiprocessing
+    try:
+        return get_context('fork')
+    except ValueError:
+        return None
+
+
+def _compile_in_worker(payload, sig):
+    """
+    Compile *sig* in a worker process for the dispatcher pickled in
+    *payload*.  Return a (data, error) pair: *data* is the pickled
+    reduction of the compile result, or None if it can't be sent back
+    to the parent process; *error* is the formatted traceback if
+    compiling failed (the parent process will then compile the
+    signature itself and report the error), otherwise None.
+    """
+    try:
+        disp, caching = pickle.loads(payload)
+        if caching:
+            # The workers save their compile results themselves
+            disp.enable_caching()
+        # Compiling in the background is off the critical path already:
+        # optimize fully rather than tiering.
+        disp._tier_threshold = 0
+        disp.compile(sig)
+        args, return_type = sigutils.normalize_signature(sig)
+        cres = disp._compileinfos[tuple(args)]
+        if cres.objectmode or cres.interpmode or cres.lifted:
+            return None, None
+        return pickle.dumps(cres._reduce(), protocol=-1), None
+    except Exception:
+        return None, traceback.format_exc()
+
+
 class LiftedLoop(_OverloadedBase):
     """
     Implementation of the hidden dispatcher objects used for lifted loop
@@ -350,7 +783,7 @@ class LiftedLoop(_OverloadedBase):
         return next(iter(self.bytecode)).lineno
 
     def compile(self, sig):
-        with self._compile_lock:
+        with compiler.global_compiler_lock, self._compile_lock:
             # FIXME this is mostly duplicated from Overloaded
             flags = self.flags
             args, return_type = sigutils.normalize_signature(sig)
@@ -380,4 +813,8 @@ class LiftedLoop(_OverloadedBase):
 
 
 # Initialize dispatcher
-_dispatcher.init_types(dict((str(t), t._code) for t in types.number_domain))
+_dispatcher.init_types(dict((str(t), t._code)
+                            for t in list(types.number_domain) +
+                                     [types.boolean, types.none,
+                                      types.pyobject]),
+                       ctypes._CFuncPtr)
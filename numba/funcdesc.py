@@ -97,6 +97,14 @@ class FunctionDescriptor(object):
         """
         return 'wrapper.' + self.mangled_name
 
+    @property
+    def llvm_cpython_fastwrapper_name(self):
+        """
+        The LLVM-registered name for the fast entry point of the CPython
+        wrapper, taking a C array of the positional arguments.
+        """
+        return 'fastwrapper.' + self.mangled_name
+
     def __repr__(self):
         return "<function descriptor %r>" % (self.unique_name)
 
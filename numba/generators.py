@@ -85,6 +85,9 @@ class BaseGeneratorLower(object):
         resume_index = self.context.get_constant(types.int32, 0)
         # Structure index #1: the function arguments
         argsty = retty.elements[1]
+        # The generator keeps references to its arguments
+        for argty, argval in zip(self.fndesc.argtypes, lower.fnargs):
+            self.context.nrt_incref(builder, argty, argval)
         argsval = cgutils.make_anonymous_struct(builder, lower.fnargs,
                                                 argsty)
         gen_struct = cgutils.make_anonymous_struct(builder,
@@ -271,7 +274,8 @@ class LowerYield(object):
                                  for v in live_vars]
 
     def lower_yield_suspend(self):
-        # Save live vars in state
+        # Save live vars in state (the references they hold are transferred
+        # to the generator state)
         for state_index, name in zip(self.live_var_indices, self.live_vars):
             state_slot = cgutils.gep(self.builder, self.gen_state_ptr,
                                      0, state_index)
@@ -286,7 +290,7 @@ class LowerYield(object):
     def lower_yield_resume(self):
         # Emit resumption point
         self.genlower.create_resumption_block(self.lower, self.inst.index)
-        # Reload live vars from state
+        # Reload live vars from state (transferring the references back)
         for state_index, name in zip(self.live_var_indices, self.live_vars):
             state_slot = cgutils.gep(self.builder, self.gen_state_ptr,
                                      0, state_index)
@@ -266,6 +266,16 @@ class SetItem(Stmt):
         return '%s[%s] = %s' % (self.target, self.index, self.value)
 
 
+class DelItem(Stmt):
+    def __init__(self, target, index, loc):
+        self.target = target
+        self.index = index
+        self.loc = loc
+
+    def __repr__(self):
+        return 'del %s[%s]' % (self.target, self.index)
+
+
 class SetAttr(Stmt):
     def __init__(self, target, attr, value, loc):
         self.target = target
@@ -365,6 +375,22 @@ class Assign(Stmt):
         return '%s = %s' % (self.target, self.value)
 
 
+class FusedUfuncs(Stmt):
+    """
+    A chain of explicit-output ufunc calls (the *calls* Assign statements,
+    whose results are unused) to be computed in a single loop.
+    *dead* is the set of names of the temporary arrays which are only
+    used inside the chain, and therefore needn't be written to.
+    """
+    def __init__(self, calls, dead, loc):
+        self.calls = calls
+        self.dead = dead
+        self.loc = loc
+
+    def __str__(self):
+        return 'fused_ufuncs(%s)' % '; '.join(str(c) for c in self.calls)
+
+
 class Yield(Inst):
     def __init__(self, value, loc, index):
         self.value = value
@@ -2,7 +2,11 @@
 Contains optimization passes for the IR.
 """
 from __future__ import print_function, division, absolute_import
-from numba import ir, utils
+import collections
+
+import numpy
+
+from numba import ir, types, utils
 
 
 class RemoveRedundantAssign(object):
@@ -51,3 +55,199 @@ class RemoveRedundantAssign(object):
                     # Only apply to use once temp variable
                     del tempassign[inst.value.name]
 
+
+
+class FuseUfuncLoops(object):
+    """
+    Fuse consecutive explicit-output ufunc calls (e.g.
+    ``np.multiply(a, b, tmp); np.add(tmp, c, out)``) over arrays of the
+    same dimensionality into ir.FusedUfuncs statements, so that they are
+    computed in a single loop.  This needs the typing information.
+    """
+
+    # Functions returning freshly allocated arrays
+    allocators = (numpy.empty, numpy.zeros, numpy.ones,
+                  numpy.empty_like, numpy.zeros_like, numpy.ones_like)
+
+    def __init__(self, interp, typemap, calltypes):
+        self.interp = interp
+        self.typemap = typemap
+        self.calltypes = calltypes
+
+    def run(self):
+        self.uses = self.count_uses()
+        for blkid, blk in utils.iteritems(self.interp.blocks):
+            self.run_block(blk)
+
+    def count_uses(self):
+        """
+        Count the number of statements reading each variable.
+        """
+        uses = collections.defaultdict(int)
+        for blk in utils.itervalues(self.interp.blocks):
+            for inst in blk.body:
+                if isinstance(inst, ir.Assign):
+                    if isinstance(inst.value, ir.Var):
+                        read = [inst.value]
+                    elif isinstance(inst.value, ir.Inst):
+                        read = inst.value.list_vars()
+                    else:
+                        read = []
+                else:
+                    read = inst.list_vars()
+                for var in read:
+                    uses[var.name] += 1
+        return uses
+
+    def run_block(self, blk):
+        body = []
+        i = 0
+        while i < len(blk.body):
+            inst = blk.body[i]
+            if self.get_layouts(inst) is None:
+                body.append(inst)
+                i += 1
+                continue
+            calls, hoisted, dels, i = self.collect_chain(blk.body, i)
+            if len(calls) == 1:
+                body.append(inst)
+                continue
+            # Statements in-between the calls are either variable deletions,
+            # which can be done later, or pure definitions, which can be
+            # done earlier.
+            body.extend(hoisted)
+            body.append(ir.FusedUfuncs(calls, self.get_dead_arrays(calls),
+                                       loc=inst.loc))
+            body.extend(dels)
+        blk.body = body
+
+    def collect_chain(self, insts, start):
+        """
+        Collect the chain of fusable ufunc calls starting at index
+        *start* in *insts*.  Return a (calls, hoisted statements,
+        deletions, end index) tuple.
+        """
+        first = insts[start]
+        ndim = self.typemap[first.value.args[-1].name].ndim
+        layouts = self.get_layouts(first)
+        calls = [first]
+        hoisted = []
+        dels = []
+        pending_hoisted = []
+        pending_dels = []
+        mentioned = set(var.name for var in first.list_vars())
+        end = start + 1
+        for i in range(start + 1, len(insts)):
+            inst = insts[i]
+            if isinstance(inst, ir.Del):
+                pending_dels.append(inst)
+                mentioned.add(inst.value)
+                continue
+            if self.is_hoistable(inst, mentioned):
+                pending_hoisted.append(inst)
+                mentioned.add(inst.target.name)
+                continue
+            inst_layouts = self.get_layouts(inst)
+            if inst_layouts is None:
+                break
+            inst_layouts = layouts & inst_layouts
+            if (self.typemap[inst.value.args[-1].name].ndim != ndim or
+                    not inst_layouts):
+                break
+            layouts = inst_layouts
+            calls.append(inst)
+            hoisted.extend(pending_hoisted)
+            dels.extend(pending_dels)
+            pending_hoisted = []
+            pending_dels = []
+            mentioned.update(var.name for var in inst.list_vars())
+            end = i + 1
+        return calls, hoisted, dels, end
+
+    def get_layouts(self, inst):
+        """
+        If *inst* is a fusable ufunc call, return the set of flat layouts
+        its array operands can be iterated in, otherwise None.
+        """
+        if not (isinstance(inst, ir.Assign) and
+                isinstance(inst.value, ir.Expr) and inst.value.op == 'call'):
+            return None
+        expr = inst.value
+        if expr.kws or not isinstance(expr.func, ir.Var):
+            return None
+        ufunc = self.get_function_key(expr.func)
+        if (not isinstance(ufunc, numpy.ufunc) or ufunc.nout != 1 or
+                len(expr.args) != ufunc.nargs):
+            return None
+        # The call's result (the output array) must be unused
+        if self.uses[inst.target.name]:
+            return None
+        sig = self.calltypes[expr]
+        ndim = sig.args[-1].ndim
+        if ndim == 0:
+            return None
+        layouts = set(['C']) if ndim == 1 else set(['C', 'F'])
+        for arg, ty in zip(expr.args, sig.args):
+            if not isinstance(ty, types.Array):
+                continue
+            if ty.ndim != ndim or self.typemap[arg.name] != ty:
+                return None
+            if ndim > 1 and ty.layout != 'A':
+                layouts &= set([ty.layout])
+        return layouts or None
+
+    def get_function_key(self, var):
+        fnty = self.typemap[var.name]
+        if isinstance(fnty, types.Function):
+            return getattr(fnty.template, 'key', None)
+
+    def is_hoistable(self, inst, mentioned):
+        """
+        Whether *inst* is a pure definition of a variable not mentioned
+        by the previous statements of the chain.
+        """
+        if not isinstance(inst, ir.Assign) or inst.target.name in mentioned:
+            return False
+        value = inst.value
+        if isinstance(value, (ir.Const, ir.Global, ir.FreeVar)):
+            return True
+        return (isinstance(value, ir.Expr) and value.op == 'getattr' and
+                isinstance(self.typemap[value.value.name], types.Module))
+
+    def get_dead_arrays(self, calls):
+        """
+        Return the names of the temporary arrays only used inside the
+        chain of *calls*, and written to before being read.
+        """
+        uses = collections.defaultdict(int)
+        written_first = {}
+        for inst in calls:
+            args = inst.value.args
+            for arg in args[:-1]:
+                uses[arg.name] += 1
+                written_first.setdefault(arg.name, False)
+            uses[args[-1].name] += 1
+            written_first.setdefault(args[-1].name, True)
+        return set(name for name in uses
+                   if written_first[name] and uses[name] == self.uses[name]
+                   and self.is_fresh_array(name))
+
+    def is_fresh_array(self, name):
+        """
+        Whether variable *name* is only defined as a newly allocated
+        array (and not aliased by another variable).
+        """
+        while True:
+            defs = self.interp.definitions[name]
+            if len(defs) != 1:
+                return False
+            value = defs[0]
+            if not isinstance(value, ir.Var):
+                break
+            # A copy from a temporary, which must only be used here
+            name = value.name
+            if self.uses[name] != 1:
+                return False
+        return (isinstance(value, ir.Expr) and value.op == 'call' and
+                isinstance(value.func, ir.Var) and
+                self.get_function_key(value.func) in self.allocators)
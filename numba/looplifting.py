@@ -5,9 +5,13 @@ from numba.bytecode import ByteCodeInst, CustomByteCode
 from collections import defaultdict
 
 
-def lift_loop(bytecode, dispatcher_factory):
+def lift_loop(bytecode, dispatcher_factory, loop_filter=None):
     """Lift the top-level loops.
 
+    If given, *loop_filter(bytecode, loop, args, returns)* is called for
+    each candidate loop; loops for which it returns False are left in the
+    outer function.
+
     Returns (outer, loops)
     ------------------------
     * outer: ByteCode of a copy of the loop-less function.
@@ -29,9 +33,19 @@ def lift_loop(bytecode, dispatcher_factory):
     outernames = list(bytecode.co_names)
 
     for loop in loops:
-        args, rets = discover_args_and_returns(bytecode, loop, outer_rds,
-                                               outer_wrs)
-
+        # Work on copies, so that a rejected loop leaves no trace
+        rds, wrs = outer_rds.copy(), outer_wrs.copy()
+        args, rets = discover_args_and_returns(bytecode, loop, rds, wrs)
+        # Use a deterministic ordering
+        args = sorted(args)
+        rets = sorted(rets)
+
+        if loop_filter is not None and not loop_filter(bytecode, loop,
+                                                       args, rets):
+            outer[:] = stitch_instructions(outer, loop)
+            continue
+
+        outer_rds, outer_wrs = rds, wrs
         disp = insert_loop_call(bytecode, loop, args,
                                 outer, outerlabels, rets,
                                 dispatcher_factory)
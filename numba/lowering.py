@@ -163,7 +163,8 @@ class BaseLower(object):
                                                 release_gil=release_gil)
         self.context.create_cpython_wrapper(self.library, self.fndesc,
                                             self.call_helper,
-                                            release_gil=release_gil)
+                                            release_gil=release_gil,
+                                            fast_entry=True)
 
     def setup_function(self, fndesc):
         # Setup function
@@ -220,34 +221,36 @@ class Lower(BaseLower):
             self.call_conv.return_value(self.builder, retval)
 
         elif isinstance(inst, ir.SetItem):
+            signature = self.fndesc.calltypes[inst]
+            assert signature is not None
+            return self.lower_setitem(inst.target, inst.index, inst.value,
+                                      signature)
+
+        elif isinstance(inst, ir.StoreMap):
+            signature = self.fndesc.calltypes[inst]
+            assert signature is not None
+            return self.lower_setitem(inst.dct, inst.key, inst.value,
+                                      signature)
+
+        elif isinstance(inst, ir.DelItem):
             target = self.loadvar(inst.target.name)
-            value = self.loadvar(inst.value.name)
             index = self.loadvar(inst.index.name)
 
             targetty = self.typeof(inst.target.name)
-            valuety = self.typeof(inst.value.name)
             indexty = self.typeof(inst.index.name)
 
             signature = self.fndesc.calltypes[inst]
             assert signature is not None
-            impl = self.context.get_function('setitem', signature)
-
-            # Convert argument to match
-            if isinstance(targetty, types.Optional):
-                target = self.context.cast(self.builder, target, targetty,
-                                           targetty.type)
-            else:
-                assert targetty == signature.args[0]
+            assert targetty == signature.args[0]
+            impl = self.context.get_function('delitem', signature)
 
             index = self.context.cast(self.builder, index, indexty,
                                       signature.args[1])
-            value = self.context.cast(self.builder, value, valuety,
-                                      signature.args[2])
 
-            return impl(self.builder, (target, index, value))
+            return impl(self.builder, (target, index))
 
         elif isinstance(inst, ir.Del):
-            pass
+            self.delvar(inst.value)
 
         elif isinstance(inst, ir.SetAttr):
             target = self.loadvar(inst.target.name)
@@ -269,6 +272,9 @@ class Lower(BaseLower):
         elif isinstance(inst, ir.Raise):
             self.lower_raise(inst)
 
+        elif isinstance(inst, ir.FusedUfuncs):
+            self.lower_fused_ufuncs(inst)
+
         else:
             raise NotImplementedError(type(inst))
 
@@ -294,6 +300,31 @@ class Lower(BaseLower):
                                           % (exctype,))
             self.return_exception(exctype.exc_class, args)
 
+    def lower_fused_ufuncs(self, inst):
+        """
+        Compute a chain of explicit-output ufunc calls in a single loop
+        if the arrays allow it at runtime, otherwise one call after
+        the other.
+        """
+        from .targets import npyimpl
+
+        calls = []
+        for stmt in inst.calls:
+            expr = stmt.value
+            signature = self.fndesc.calltypes[expr]
+            fnty = self.typeof(expr.func.name)
+            argvals = [self.context.cast(self.builder, self.loadvar(a.name),
+                                         self.typeof(a.name), ty)
+                       for a, ty in zip(expr.args, signature.args)]
+            calls.append((fnty.template.key, signature,
+                          [a.name for a in expr.args], argvals))
+
+        fused = npyimpl.numpy_fused_ufunc_kernel(self.context, self.builder,
+                                                 calls, inst.dead)
+        with cgutils.ifnot(self.builder, fused):
+            for stmt in inst.calls:
+                self.lower_inst(stmt)
+
     def lower_assign(self, ty, inst):
         value = inst.value
         # In nopython mode, closure vars are frozen like globals
@@ -322,10 +353,14 @@ class Lower(BaseLower):
         elif isinstance(value, ir.Var):
             val = self.loadvar(value.name)
             oty = self.typeof(value.name)
-            return self.context.cast(self.builder, val, oty, ty)
+            res = self.context.cast(self.builder, val, oty, ty)
+            self.incref(ty, res)
+            return res
 
         elif isinstance(value, ir.Arg):
-            return self.fnargs[value.index]
+            res = self.fnargs[value.index]
+            self.incref(ty, res)
+            return res
 
         elif isinstance(value, ir.Yield):
             return self.lower_yield(ty, value)
@@ -342,6 +377,8 @@ class Lower(BaseLower):
         val = self.loadvar(inst.value.name)
         typ = self.typeof(inst.value.name)
         val = self.context.cast(self.builder, val, typ, self.gentype.yield_type)
+        # The yielded value is returned as a new reference
+        self.incref(self.gentype.yield_type, val)
         self.call_conv.return_value(self.builder, val)
 
         # Resumption point
@@ -349,6 +386,31 @@ class Lower(BaseLower):
         # None is returned by the yield expression
         return self.context.get_constant_generic(self.builder, retty, None)
 
+    def lower_setitem(self, target_var, index_var, value_var, signature):
+        target = self.loadvar(target_var.name)
+        value = self.loadvar(value_var.name)
+        index = self.loadvar(index_var.name)
+
+        targetty = self.typeof(target_var.name)
+        valuety = self.typeof(value_var.name)
+        indexty = self.typeof(index_var.name)
+
+        impl = self.context.get_function('setitem', signature)
+
+        # Convert argument to match
+        if isinstance(targetty, types.Optional):
+            target = self.context.cast(self.builder, target, targetty,
+                                       targetty.type)
+        else:
+            assert targetty == signature.args[0]
+
+        index = self.context.cast(self.builder, index, indexty,
+                                  signature.args[1])
+        value = self.context.cast(self.builder, value, valuety,
+                                  signature.args[2])
+
+        return impl(self.builder, (target, index, value))
+
     def lower_binop(self, resty, expr):
         lhs = expr.lhs
         rhs = expr.rhs
@@ -389,6 +451,10 @@ class Lower(BaseLower):
             else:
                 ba = pysig.bind(*expr.args, **dict(expr.kws))
                 for i, param in enumerate(pysig.parameters.values()):
+                    if i >= len(signature.args):
+                        # Typing templates may leave out omitted
+                        # trailing arguments from the signature
+                        break
                     name = param.name
                     default = param.default
                     if (default is not param.empty and
@@ -476,12 +542,16 @@ class Lower(BaseLower):
         elif expr.op == 'pair_first':
             val = self.loadvar(expr.value.name)
             ty = self.typeof(expr.value.name)
-            return self.context.pair_first(self.builder, val, ty)
+            res = self.context.pair_first(self.builder, val, ty)
+            self.incref(resty, res)
+            return res
 
         elif expr.op == 'pair_second':
             val = self.loadvar(expr.value.name)
             ty = self.typeof(expr.value.name)
-            return self.context.pair_second(self.builder, val, ty)
+            res = self.context.pair_second(self.builder, val, ty)
+            self.incref(resty, res)
+            return res
 
         elif expr.op in ('getiter', 'iternext'):
             val = self.loadvar(expr.value.name)
@@ -500,6 +570,7 @@ class Lower(BaseLower):
             # If we have a heterogenous tuple, we needn't do anything,
             # and we can't iterate over it anyway.
             if isinstance(ty, types.Tuple):
+                self.incref(resty, val)
                 return val
 
             itemty = ty.iterator_type.yield_type
@@ -532,6 +603,8 @@ class Lower(BaseLower):
             with cgutils.if_unlikely(self.builder, is_valid):
                 self.return_exception(ValueError)
 
+            # The items' references were transferred to the tuple
+            self.decref(ty.iterator_type, iterobj)
             return tup
 
         elif expr.op == "getattr":
@@ -558,7 +631,9 @@ class Lower(BaseLower):
             if cgutils.is_struct(baseval.type):
                 # Statically extract the given element from the structure
                 # (structures aren't dynamically indexable).
-                return self.builder.extract_value(baseval, expr.index)
+                res = self.builder.extract_value(baseval, expr.index)
+                self.incref(resty, res)
+                return res
             else:
                 # Fall back on the generic getitem() implementation
                 # for this type.
@@ -594,12 +669,26 @@ class Lower(BaseLower):
             tup = self.context.get_constant_undef(resty)
             for i in range(len(castvals)):
                 tup = self.builder.insert_value(tup, castvals[i], i)
+            # The tuple holds new references to its items
+            self.incref(resty, tup)
             return tup
 
+        elif expr.op == "build_list":
+            itemvals = [self.loadvar(i.name) for i in expr.items]
+            itemtys = [self.typeof(i.name) for i in expr.items]
+            castvals = [self.context.cast(self.builder, val, fromty,
+                                          resty.dtype)
+                        for val, fromty in zip(itemvals, itemtys)]
+            return self.context.build_list(self.builder, resty, castvals)
+
+        elif expr.op == "build_map":
+            return self.context.build_map(self.builder, resty, expr.size)
+
         elif expr.op == "cast":
             val = self.loadvar(expr.value.name)
             ty = self.typeof(expr.value.name)
             castval = self.context.cast(self.builder, val, ty, resty)
+            self.incref(resty, castval)
             return castval
 
         raise NotImplementedError(expr)
@@ -612,16 +701,52 @@ class Lower(BaseLower):
         return self.builder.load(ptr)
 
     def storevar(self, value, name):
+        """
+        Store *value* (a new reference) into the variable *name*,
+        releasing the variable's previous value.
+        """
         if name not in self.varmap:
-            self.varmap[name] = self.alloca_lltype(name, value.type)
+            self.varmap[name] = self._alloca_var(name, value.type)
         ptr = self.getvar(name)
         assert value.type == ptr.type.pointee,\
             "store %s to ptr of %s" % (value.type, ptr.type.pointee)
+        self.decref(self.typeof(name), self.builder.load(ptr))
         self.builder.store(value, ptr)
 
+    def delvar(self, name):
+        """
+        Release the value of the variable *name* and reset the variable.
+        """
+        ty = self.typeof(name)
+        if name not in self.varmap:
+            # The variable was never assigned in the blocks lowered so far
+            lltype = self.context.get_value_type(ty)
+            self.varmap[name] = self._alloca_var(name, lltype)
+        ptr = self.getvar(name)
+        self.decref(ty, self.builder.load(ptr))
+        # Zero-fill the variable, so that a later storevar() or delvar()
+        # doesn't release the value again.
+        self.builder.store(Constant.null(ptr.type.pointee), ptr)
+
+    def _alloca_var(self, name, lltype):
+        """
+        Allocate a stack slot for variable *name* and zero-initialize it
+        in the entry block.
+        """
+        ptr = self.alloca_lltype(name, lltype)
+        with cgutils.goto_entry_block(self.builder):
+            self.builder.store(Constant.null(lltype), ptr)
+        return ptr
+
     def alloca(self, name, type):
         lltype = self.context.get_value_type(type)
         return self.alloca_lltype(name, lltype)
 
     def alloca_lltype(self, name, lltype):
         return cgutils.alloca_once(self.builder, lltype, name=name)
+
+    def incref(self, typ, val):
+        self.context.nrt_incref(self.builder, typ, val)
+
+    def decref(self, typ, val):
+        self.context.nrt_decref(self.builder, typ, val)
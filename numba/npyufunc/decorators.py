@@ -3,6 +3,7 @@ import inspect
 
 from . import _internal, dufunc
 from .ufuncbuilder import UFuncBuilder, GUFuncBuilder
+from .parallel import ParallelUFuncBuilder, ParallelGUFuncBuilder
 
 from numba.targets.registry import TargetRegistry
 
@@ -23,7 +24,8 @@ class _BaseVectorize(object):
 
 
 class Vectorize(_BaseVectorize):
-    target_registry = TargetRegistry({'cpu': UFuncBuilder})
+    target_registry = TargetRegistry({'cpu': UFuncBuilder,
+                                      'parallel': ParallelUFuncBuilder})
 
     def __new__(cls, func, **kws):
         identity = cls.get_identity(kws)
@@ -32,7 +34,8 @@ class Vectorize(_BaseVectorize):
 
 
 class GUVectorize(_BaseVectorize):
-    target_registry = TargetRegistry({'cpu': GUFuncBuilder})
+    target_registry = TargetRegistry({'cpu': GUFuncBuilder,
+                                      'parallel': ParallelGUFuncBuilder})
 
     def __new__(cls, func, signature, **kws):
         identity = cls.get_identity(kws)
@@ -40,6 +43,14 @@ class GUVectorize(_BaseVectorize):
         return imp(func, signature, identity, kws)
 
 
+def _make_dufunc(func, kws):
+    target = kws.pop('target', 'cpu')
+    if target != 'cpu':
+        raise TypeError("the %r target requires explicit signatures"
+                        % (target,))
+    return dufunc.DUFunc(func, **kws)
+
+
 def vectorize(ftylist_or_function=(), **kws):
     """vectorize(ftylist_or_function=(), target='cpu', identity=None, **kws)
 
@@ -65,6 +76,8 @@ def vectorize(ftylist_or_function=(), **kws):
 
     target: str
             A string for code generation target.  Default to "cpu".
+            The "parallel" target spreads the loop over several threads
+            (see NUMBA_NUM_THREADS); it requires explicit signatures.
 
     identity: int, str, or None
         The identity (or unit) value for the element-wise function
@@ -96,7 +109,7 @@ def vectorize(ftylist_or_function=(), **kws):
         # Common user mistake
         ftylist = [ftylist_or_function]
     elif inspect.isfunction(ftylist_or_function):
-        return dufunc.DUFunc(ftylist_or_function, **kws)
+        return _make_dufunc(ftylist_or_function, kws)
     elif ftylist_or_function is not None:
         ftylist = ftylist_or_function
 
@@ -106,7 +119,7 @@ def vectorize(ftylist_or_function=(), **kws):
             for fty in ftylist:
                 vec.add(fty)
             return vec.build_ufunc()
-        return dufunc.DUFunc(func, **kws)
+        return _make_dufunc(func, kws)
 
     return wrap
 
@@ -135,6 +148,8 @@ def guvectorize(ftylist, signature, **kws):
 
     target: str
             A string for code generation target.  Defaults to "cpu".
+            The "parallel" target spreads the loop over several threads
+            (see NUMBA_NUM_THREADS).
 
     Returns
     --------
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+The "parallel" ufunc target.
+
+The element-wise (or core) functions are compiled exactly as for the
+"cpu" target, but the resulting ufunc loops are registered behind a
+generic native loop (see workqueue.c) which splits the outer dimension
+across a pool of worker threads.  Numpy releases the GIL around the
+loops, so the threads run truly concurrently.
+"""
+from __future__ import print_function, division, absolute_import
+
+import threading
+
+from llvmlite.llvmpy.core import Type, Constant
+
+from numba import cgutils, config, types, utils
+from . import workqueue
+from .ufuncbuilder import UFuncBuilder, GUFuncBuilder
+
+
+# Minimum number of elements handed to each thread by element-wise
+# ufunc loops; smaller arrays aren't worth the synchronization cost.
+UFUNC_MIN_CHUNK = 4096
+
+_launch_lock = threading.Lock()
+_is_launched = False
+
+
+def _launch_threads():
+    """
+    Start the worker threads, if not already done.
+    """
+    global _is_launched
+    with _launch_lock:
+        if not _is_launched:
+            workqueue.launch_threads(config.NUM_THREADS)
+            _is_launched = True
+
+
+def get_thread_count():
+    """
+    Return the number of threads taking part in parallel ufunc loops.
+    """
+    _launch_threads()
+    return workqueue.get_thread_count()
+
+
+def build_loop_data(context, builder, func, itemsizes, nin, nout,
+                    min_chunk=1):
+    """
+    Emit code building, on the stack, the description of the compiled
+    element-wise loop *func* expected by workqueue.parallel_loop(), i.e.
+    what make_loop_data() returns for a ufunc loop.  *itemsizes* gives
+    the item size of each of the *nin* + *nout* operands.  Return the
+    structure's address as a i8*.
+    """
+    byte_ptr_t = Type.pointer(Type.int(8))
+    int_t = Type.int(32)
+    intp_t = context.get_value_type(types.intp)
+    nargs = nin + nout
+    assert len(itemsizes) == nargs
+
+    itemsizes_ptr = cgutils.alloca_once(builder, Type.array(intp_t, nargs))
+    for i, itemsize in enumerate(itemsizes):
+        builder.store(Constant.int(intp_t, itemsize),
+                      cgutils.gep(builder, itemsizes_ptr, 0, i))
+    # No core dimensions: all offsets are zero
+    core_offsets_ptr = cgutils.alloca_once_value(
+        builder, Constant.null(Type.array(int_t, nargs + 1)))
+
+    # The fields of loop_data_t, in order (see workqueue.c)
+    fields = [builder.bitcast(func, byte_ptr_t),        # func
+              Constant.null(byte_ptr_t),                # data
+              Constant.int(int_t, nin),                 # nin
+              Constant.int(int_t, nout),                # nout
+              Constant.int(int_t, 1),                   # ndims
+              Constant.int(intp_t, min_chunk),          # min_chunk
+              builder.bitcast(itemsizes_ptr,
+                              Type.pointer(intp_t)),    # itemsizes
+              builder.bitcast(core_offsets_ptr,
+                              Type.pointer(int_t)),     # core_offsets
+              Constant.null(Type.pointer(int_t)),       # core_dims
+              ]
+    loop_data_t = Type.struct([f.type for f in fields])
+    assert context.get_abi_sizeof(loop_data_t) == workqueue.loop_data_size
+    loop_data = Constant.undef(loop_data_t)
+    for i, field in enumerate(fields):
+        loop_data = builder.insert_value(loop_data, field, i)
+    loop_data_ptr = cgutils.alloca_once_value(builder, loop_data)
+    return builder.bitcast(loop_data_ptr, byte_ptr_t)
+
+
+def _parallel_targetoptions(targetoptions):
+    # Worker threads can't hold the GIL, so object mode is not an option
+    if targetoptions.get('forceobj'):
+        raise ValueError("the parallel target doesn't support object mode")
+    targetoptions = dict(targetoptions)
+    targetoptions['nopython'] = True
+    return targetoptions
+
+
+class ParallelUFuncBuilder(UFuncBuilder):
+
+    def __init__(self, py_func, identity=None, targetoptions={}):
+        super(ParallelUFuncBuilder, self).__init__(
+            py_func, identity, _parallel_targetoptions(targetoptions))
+
+    def _make_loop(self, ptr, nin, nout, ndims, itemsizes, core_dims):
+        _launch_threads()
+        keep, data = workqueue.make_loop_data(utils.longint(ptr), None,
+                                              nin, nout, ndims,
+                                              UFUNC_MIN_CHUNK,
+                                              itemsizes, core_dims)
+        return workqueue.parallel_loop, data, keep
+
+
+class ParallelGUFuncBuilder(GUFuncBuilder):
+
+    def __init__(self, py_func, signature, identity=None, targetoptions={}):
+        super(ParallelGUFuncBuilder, self).__init__(
+            py_func, signature, identity,
+            _parallel_targetoptions(targetoptions))
+
+    def _make_loop(self, ptr, nin, nout, ndims, itemsizes, core_dims):
+        _launch_threads()
+        # Each gufunc iteration can be arbitrarily expensive, so split
+        # down to a single iteration per thread
+        keep, data = workqueue.make_loop_data(utils.longint(ptr), None,
+                                              nin, nout, ndims, 1,
+                                              itemsizes, core_dims)
+        return workqueue.parallel_loop, data, keep
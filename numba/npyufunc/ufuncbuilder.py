@@ -163,6 +163,17 @@ class _BaseUFuncBuilder(object):
         self._cres[sig] = cres
         return cres
 
+    def _make_loop(self, ptr, nin, nout, ndims, itemsizes, core_dims):
+        """
+        Return a (loop pointer, loop data pointer, keepalive object) tuple
+        for registering the compiled loop at address *ptr* in the ufunc.
+        *ndims* is the number of entries in the loop's dimensions array.
+        *itemsizes* gives the item size of each operand, and *core_dims*
+        the indices in the dimensions array of each operand's core
+        dimensions.  By default, the compiled loop is registered as-is.
+        """
+        return ptr, None, None
+
 class UFuncBuilder(_BaseUFuncBuilder):
 
     def __init__(self, py_func, identity=None, targetoptions={}):
@@ -186,15 +197,20 @@ class UFuncBuilder(_BaseUFuncBuilder):
 
         # Get signature in the order they are added
         keepalive = []
+        datlist = []
         cres = None
         for sig in self._sigs:
             cres = self._cres[sig]
             dtypenums, ptr, env = self.build(cres, sig)
+            itemsizes = [as_dtype(a).itemsize for a in sig.args]
+            itemsizes.append(as_dtype(sig.return_type).itemsize)
+            ptr, data, keep = self._make_loop(ptr, len(sig.args), 1, 1,
+                                              itemsizes,
+                                              [()] * len(itemsizes))
             dtypelist.append(dtypenums)
             ptrlist.append(utils.longint(ptr))
-            keepalive.append((cres.library, env))
-
-        datlist = [None] * len(ptrlist)
+            datlist.append(data)
+            keepalive.append((cres.library, env, keep))
 
         if cres is None:
             argspec = inspect.getargspec(self.py_func)
@@ -250,18 +266,36 @@ class GUFuncBuilder(_BaseUFuncBuilder):
             raise TypeError("No definition")
 
         # Get signature in the order they are added
+        inct = len(self.sin)
+        outct = len(self.sout)
+        # The loop dimensions are the outer loop count followed by
+        # the size of each distinct core dimension, in order of
+        # appearance in the signature
+        dim_indices = {}
+        for syms in self.sin + self.sout:
+            for sym in syms:
+                if sym not in dim_indices:
+                    dim_indices[sym] = len(dim_indices) + 1
+        core_dims = [tuple(dim_indices[sym] for sym in syms)
+                     for syms in self.sin + self.sout]
+
         keepalive = []
+        datlist = []
         for sig in self._sigs:
             cres = self._cres[sig]
             dtypenums, ptr, env = self.build(cres)
+            itemsizes = []
+            for a in sig.args:
+                if isinstance(a, types.Array):
+                    a = a.dtype
+                itemsizes.append(as_dtype(a).itemsize)
+            ptr, data, keep = self._make_loop(ptr, inct, outct,
+                                              1 + len(dim_indices),
+                                              itemsizes, core_dims)
             dtypelist.append(dtypenums)
             ptrlist.append(utils.longint(ptr))
-            keepalive.append((cres.library, env))
-
-        datlist = [None] * len(ptrlist)
-
-        inct = len(self.sin)
-        outct = len(self.sout)
+            datlist.append(data)
+            keepalive.append((cres.library, env, keep))
 
         # Pass envs to fromfuncsig to bind to the lifetime of the ufunc object
         ufunc = _internal.fromfunc(self.py_func.__name__, self.py_func.__doc__,
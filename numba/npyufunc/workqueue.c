@@ -0,0 +1,612 @@
+/*
+ * A minimal pool of native worker threads used by the "parallel" ufunc
+ * target.
+ *
+ * Parallel ufuncs register `parallel_loop` as their loop function.  The
+ * loop's `data` pointer refers to a `loop_data_t` describing the real
+ * (serial) loop compiled by Numba.  `parallel_loop` splits the outer
+ * dimension in contiguous chunks, runs the first chunk in the calling
+ * thread and hands the other chunks to the worker threads.
+ *
+ * Numpy releases the GIL around inner loops that don't involve object
+ * arrays, so the workers never need to touch Python state (the parallel
+ * target only accepts nopython kernels).
+ */
+
+#include "../_pymodule.h"
+#include <stdlib.h>
+#include <string.h>
+
+#ifdef _WIN32
+    #include <windows.h>
+#else
+    #include <pthread.h>
+#endif
+
+
+/*
+ * Portable synchronization primitives.
+ */
+
+#ifdef _WIN32
+
+typedef CRITICAL_SECTION    lock_t;
+typedef CONDITION_VARIABLE  cond_t;
+
+#define lock_init(l)        InitializeCriticalSection(l)
+#define lock_acquire(l)     EnterCriticalSection(l)
+#define lock_release(l)     LeaveCriticalSection(l)
+#define cond_init(c)        InitializeConditionVariable(c)
+#define cond_wait(c, l)     SleepConditionVariableCS(c, l, INFINITE)
+#define cond_signal(c)      WakeConditionVariable(c)
+
+typedef DWORD (WINAPI *thread_func_t)(void *);
+
+static int
+start_thread(thread_func_t func, void *arg)
+{
+    HANDLE th = CreateThread(NULL, 0, func, arg, 0, NULL);
+    if (th == NULL)
+        return -1;
+    CloseHandle(th);
+    return 0;
+}
+
+#define THREAD_FUNC(name, arg)  static DWORD WINAPI name(void *arg)
+#define THREAD_RETURN           return 0
+
+#else
+
+typedef pthread_mutex_t     lock_t;
+typedef pthread_cond_t      cond_t;
+
+#define lock_init(l)        pthread_mutex_init(l, NULL)
+#define lock_acquire(l)     pthread_mutex_lock(l)
+#define lock_release(l)     pthread_mutex_unlock(l)
+#define cond_init(c)        pthread_cond_init(c, NULL)
+#define cond_wait(c, l)     pthread_cond_wait(c, l)
+#define cond_signal(c)      pthread_cond_signal(c)
+
+typedef void *(*thread_func_t)(void *);
+
+static int
+start_thread(thread_func_t func, void *arg)
+{
+    pthread_t th;
+    pthread_attr_t attr;
+    int err;
+    pthread_attr_init(&attr);
+    pthread_attr_setdetachstate(&attr, PTHREAD_CREATE_DETACHED);
+    err = pthread_create(&th, &attr, func, arg);
+    pthread_attr_destroy(&attr);
+    return err ? -1 : 0;
+}
+
+#define THREAD_FUNC(name, arg)  static void *name(void *arg)
+#define THREAD_RETURN           return NULL
+
+#endif
+
+
+typedef Py_intptr_t intp;
+
+typedef void (*ufunc_loop_t)(char **args, intp *dims, intp *steps,
+                             void *data);
+
+/* Description of the serial loop wrapped by parallel_loop().  Keep in
+   sync with parallel.build_loop_data(). */
+typedef struct {
+    ufunc_loop_t func;
+    void *data;
+    int nin;
+    int nout;
+    /* Number of entries in the loop's `dims` array (1 for a ufunc,
+       1 + the number of core dimensions for a gufunc) */
+    int ndims;
+    /* Minimum number of outer iterations handed to a thread */
+    intp min_chunk;
+    /* Item size of each operand */
+    intp *itemsizes;
+    /* Indices in the loop's `dims` array of the core dimensions of each
+       operand: those of operand i are core_dims[core_offsets[i]] to
+       core_dims[core_offsets[i + 1] - 1] (none for a ufunc) */
+    int *core_offsets;
+    int *core_dims;
+} loop_data_t;
+
+
+/*
+ * Worker threads.
+ */
+
+enum { IDLE = 0, READY, RUNNING, DONE, EXIT, EXITED };
+
+typedef struct {
+    lock_t lock;
+    cond_t cond;
+    volatile int state;
+    ufunc_loop_t func;
+    char **args;
+    intp *dims;
+    intp *steps;
+    void *data;
+} worker_t;
+
+#ifdef _MSC_VER
+    #define THREAD_LOCAL __declspec(thread)
+#else
+    #define THREAD_LOCAL __thread
+#endif
+
+/* Whether the current thread is executing a chunk of a parallel loop.
+   Parallel loops nested inside another one run serially. */
+static THREAD_LOCAL int in_parallel_region = 0;
+
+static worker_t *workers = NULL;
+static int nworkers = 0;
+/* Serializes calls to parallel_loop() made concurrently from several
+   Python threads, as they would share the workers. */
+static lock_t dispatch_lock;
+/* Protects the creation of the workers */
+static lock_t launch_lock;
+/* The thread count passed to launch_threads(), and whether the workers
+   must be launched again since the process was forked */
+static int launched_count = 0;
+static volatile int need_relaunch = 0;
+
+
+THREAD_FUNC(worker_main, arg)
+{
+    worker_t *w = (worker_t *) arg;
+    in_parallel_region = 1;
+    for (;;) {
+        lock_acquire(&w->lock);
+        while (w->state != READY && w->state != EXIT)
+            cond_wait(&w->cond, &w->lock);
+        if (w->state == EXIT) {
+            w->state = EXITED;
+            cond_signal(&w->cond);
+            lock_release(&w->lock);
+            break;
+        }
+        w->state = RUNNING;
+        lock_release(&w->lock);
+
+        w->func(w->args, w->dims, w->steps, w->data);
+
+        lock_acquire(&w->lock);
+        w->state = DONE;
+        cond_signal(&w->cond);
+        lock_release(&w->lock);
+    }
+    THREAD_RETURN;
+}
+
+static void
+worker_submit(worker_t *w, ufunc_loop_t func, char **args, intp *dims,
+              intp *steps, void *data)
+{
+    lock_acquire(&w->lock);
+    w->func = func;
+    w->args = args;
+    w->dims = dims;
+    w->steps = steps;
+    w->data = data;
+    w->state = READY;
+    cond_signal(&w->cond);
+    lock_release(&w->lock);
+}
+
+static void
+worker_wait(worker_t *w)
+{
+    lock_acquire(&w->lock);
+    while (w->state != DONE)
+        cond_wait(&w->cond, &w->lock);
+    w->state = IDLE;
+    lock_release(&w->lock);
+}
+
+
+/*
+ * Make the *n* first workers in *ws* exit, and wait for them to do so.
+ */
+static void
+stop_workers(worker_t *ws, int n)
+{
+    int i;
+    for (i = 0; i < n; i++) {
+        lock_acquire(&ws[i].lock);
+        ws[i].state = EXIT;
+        cond_signal(&ws[i].cond);
+        lock_release(&ws[i].lock);
+    }
+    for (i = 0; i < n; i++) {
+        lock_acquire(&ws[i].lock);
+        while (ws[i].state != EXITED)
+            cond_wait(&ws[i].cond, &ws[i].lock);
+        lock_release(&ws[i].lock);
+    }
+}
+
+/*
+ * Start *count* - 1 worker threads (the calling thread always takes part
+ * in the work).  Must be called with the launch lock held.  On failure,
+ * the threads already started are stopped and -1 is returned, leaving
+ * no workers.
+ */
+static int
+start_workers(int count)
+{
+    worker_t *ws;
+    int i;
+    ws = (worker_t *) calloc(count - 1, sizeof(worker_t));
+    if (ws == NULL)
+        return -1;
+    for (i = 0; i < count - 1; i++) {
+        lock_init(&ws[i].lock);
+        cond_init(&ws[i].cond);
+        if (start_thread(worker_main, &ws[i])) {
+            stop_workers(ws, i);
+            free(ws);
+            return -1;
+        }
+    }
+    workers = ws;
+    nworkers = count - 1;
+    return 0;
+}
+
+#ifndef _WIN32
+/*
+ * In a forked child, only the forking thread survives: the workers are
+ * gone and the locks may have been held by other threads.  Forget the
+ * workers (their memory is leaked, as their locks can't be destroyed
+ * safely), reinitialize the locks, and launch the workers again on the
+ * next parallel loop.
+ */
+static void
+after_fork_child(void)
+{
+    workers = NULL;
+    nworkers = 0;
+    lock_init(&dispatch_lock);
+    lock_init(&launch_lock);
+    need_relaunch = launched_count > 1;
+}
+#endif
+
+/*
+ * Launch the workers again after a fork, if needed.  If that fails,
+ * parallel loops run serially.
+ */
+static void
+relaunch_workers(void)
+{
+    lock_acquire(&launch_lock);
+    if (need_relaunch) {
+        need_relaunch = 0;
+        start_workers(launched_count);
+    }
+    lock_release(&launch_lock);
+}
+
+
+/*
+ * Compute the memory spanned by a single element of operand *i*, as
+ * [*lo, *hi) offsets from the element's pointer.  For gufuncs, this
+ * covers all of the operand's core dimensions.  Return 0 if the element
+ * is empty (a core dimension has zero length).
+ */
+static int
+element_extent(loop_data_t *ld, int i, intp *dims, intp *steps,
+               intp *lo, intp *hi)
+{
+    /* The core steps follow the outer steps of all operands */
+    intp *core_steps = steps + ld->nin + ld->nout;
+    int k;
+    *lo = 0;
+    *hi = 0;
+    for (k = ld->core_offsets[i]; k < ld->core_offsets[i + 1]; k++) {
+        intp n = dims[ld->core_dims[k]];
+        intp span;
+        if (n == 0)
+            return 0;
+        span = core_steps[k] * (n - 1);
+        if (span < 0)
+            *lo += span;
+        else
+            *hi += span;
+    }
+    *hi += ld->itemsizes[i];
+    return 1;
+}
+
+/*
+ * Compute the memory spanned by operand *i* over the whole outer loop,
+ * as a [*lo, *hi) pointer range.  Return 0 if the operand is empty.
+ */
+static int
+operand_extent(loop_data_t *ld, int i, char **args, intp *dims,
+               intp *steps, char **lo, char **hi)
+{
+    intp elo, ehi, span;
+    if (!element_extent(ld, i, dims, steps, &elo, &ehi))
+        return 0;
+    span = steps[i] * (dims[0] - 1);
+    *lo = args[i] + elo + (span < 0 ? span : 0);
+    *hi = args[i] + ehi + (span > 0 ? span : 0);
+    return 1;
+}
+
+/*
+ * Return whether splitting the outer loop could change the result, i.e.
+ * the elements of an output overlap each other (e.g. a zero stride, as
+ * in reductions) or the memory spanned by an output overlaps another
+ * operand (as in accumulations).  This is conservative: for example,
+ * interleaved operands are considered overlapping.
+ */
+static int
+has_loop_dependency(loop_data_t *ld, char **args, intp *dims, intp *steps)
+{
+    int nargs = ld->nin + ld->nout;
+    int i, j;
+    for (j = ld->nin; j < nargs; j++) {
+        intp oelo, oehi;
+        char *olo, *ohi;
+        if (!element_extent(ld, j, dims, steps, &oelo, &oehi))
+            continue;
+        if ((steps[j] < 0 ? -steps[j] : steps[j]) < oehi - oelo)
+            return 1;
+        operand_extent(ld, j, args, dims, steps, &olo, &ohi);
+        for (i = 0; i < nargs; i++) {
+            intp ielo, iehi;
+            char *ilo, *ihi;
+            if (i == j)
+                continue;
+            if (!element_extent(ld, i, dims, steps, &ielo, &iehi))
+                continue;
+            /* Exact aliasing (in-place operation) is harmless */
+            if (args[i] == args[j] && steps[i] == steps[j] &&
+                ielo == oelo && iehi == oehi)
+                continue;
+            operand_extent(ld, i, args, dims, steps, &ilo, &ihi);
+            if (ilo < ohi && olo < ihi)
+                return 1;
+        }
+    }
+    return 0;
+}
+
+static void
+parallel_loop(char **args, intp *dims, intp *steps, void *data)
+{
+    loop_data_t *ld = (loop_data_t *) data;
+    int nargs = ld->nin + ld->nout;
+    intp count = dims[0];
+    intp nchunks, chunk, start;
+    char **chunk_args;
+    intp *chunk_dims;
+    int i, k;
+
+    if (need_relaunch)
+        relaunch_workers();
+    nchunks = nworkers + 1;
+    if (ld->min_chunk > 0 && count / ld->min_chunk < nchunks)
+        nchunks = count / ld->min_chunk;
+    if (nchunks <= 1 || in_parallel_region ||
+        has_loop_dependency(ld, args, dims, steps)) {
+        ld->func(args, dims, steps, ld->data);
+        return;
+    }
+
+    chunk_args = (char **) malloc(nchunks * nargs * sizeof(char *));
+    chunk_dims = (intp *) malloc(nchunks * ld->ndims * sizeof(intp));
+    if (chunk_args == NULL || chunk_dims == NULL) {
+        /* Can't raise from here: degrade gracefully */
+        free(chunk_args);
+        free(chunk_dims);
+        ld->func(args, dims, steps, ld->data);
+        return;
+    }
+
+    /* Split [0, count) into nchunks contiguous ranges */
+    start = 0;
+    for (k = 0; k < nchunks; k++) {
+        char **a = chunk_args + k * nargs;
+        intp *d = chunk_dims + k * ld->ndims;
+        chunk = count / nchunks + (k < count % nchunks ? 1 : 0);
+        for (i = 0; i < nargs; i++)
+            a[i] = args[i] + start * steps[i];
+        memcpy(d, dims, ld->ndims * sizeof(intp));
+        d[0] = chunk;
+        start += chunk;
+    }
+
+    lock_acquire(&dispatch_lock);
+    for (k = 1; k < nchunks; k++)
+        worker_submit(&workers[k - 1], ld->func, chunk_args + k * nargs,
+                      chunk_dims + k * ld->ndims, steps, ld->data);
+    in_parallel_region = 1;
+    ld->func(chunk_args, chunk_dims, steps, ld->data);
+    in_parallel_region = 0;
+    for (k = 1; k < nchunks; k++)
+        worker_wait(&workers[k - 1]);
+    lock_release(&dispatch_lock);
+
+    free(chunk_args);
+    free(chunk_dims);
+}
+
+
+/*
+ * Python API.
+ */
+
+static PyObject *
+launch_threads(PyObject *self, PyObject *args)
+{
+    int count, err = 0;
+    if (!PyArg_ParseTuple(args, "i", &count))
+        return NULL;
+    lock_acquire(&launch_lock);
+    /* If already launched, or with a single thread, there is nothing to
+       do: the calling thread always takes part in the work. */
+    if (workers == NULL && count > 1) {
+        err = start_workers(count);
+        if (!err)
+            launched_count = count;
+    }
+    lock_release(&launch_lock);
+    if (err) {
+        PyErr_SetString(PyExc_RuntimeError, "failed to start worker threads");
+        return NULL;
+    }
+    Py_RETURN_NONE;
+}
+
+static PyObject *
+get_thread_count(PyObject *self, PyObject *args)
+{
+    if (need_relaunch)
+        relaunch_workers();
+    return PyLong_FromLong(nworkers + 1);
+}
+
+static void
+loop_data_destructor(PyObject *capsule)
+{
+    free(PyCapsule_GetPointer(capsule, "numba.loop_data"));
+}
+
+static PyObject *
+make_loop_data(PyObject *self, PyObject *args)
+{
+    PyObject *func_obj, *data_obj, *itemsizes_obj, *core_dims_obj, *capsule;
+    PyObject *itemsizes = NULL, *core_dims = NULL;
+    loop_data_t *ld = NULL;
+    int nin, nout, ndims, nargs, ncore, i, k;
+    Py_ssize_t min_chunk;
+
+    if (!PyArg_ParseTuple(args, "O!OiiinOO", &PyLong_Type, &func_obj,
+                          &data_obj, &nin, &nout, &ndims, &min_chunk,
+                          &itemsizes_obj, &core_dims_obj))
+        return NULL;
+    nargs = nin + nout;
+    itemsizes = PySequence_Fast(itemsizes_obj, "itemsizes must be a sequence");
+    if (itemsizes == NULL)
+        goto error;
+    core_dims = PySequence_Fast(core_dims_obj, "core_dims must be a sequence");
+    if (core_dims == NULL)
+        goto error;
+    if (PySequence_Fast_GET_SIZE(itemsizes) != nargs ||
+        PySequence_Fast_GET_SIZE(core_dims) != nargs) {
+        PyErr_SetString(PyExc_ValueError,
+                        "expected one item size and one tuple of core "
+                        "dimensions per operand");
+        goto error;
+    }
+    ncore = 0;
+    for (i = 0; i < nargs; i++) {
+        Py_ssize_t n = PySequence_Size(
+            PySequence_Fast_GET_ITEM(core_dims, i));
+        if (n < 0)
+            goto error;
+        ncore += (int) n;
+    }
+
+    /* The operand arrays are allocated along with the structure */
+    ld = (loop_data_t *) malloc(sizeof(loop_data_t)
+                                + nargs * sizeof(intp)
+                                + (nargs + 1 + ncore) * sizeof(int));
+    if (ld == NULL) {
+        PyErr_NoMemory();
+        goto error;
+    }
+    ld->itemsizes = (intp *) (ld + 1);
+    ld->core_offsets = (int *) (ld->itemsizes + nargs);
+    ld->core_dims = ld->core_offsets + nargs + 1;
+
+    ld->func = (ufunc_loop_t) PyLong_AsVoidPtr(func_obj);
+    ld->data = (data_obj == Py_None) ? NULL : PyLong_AsVoidPtr(data_obj);
+    ld->nin = nin;
+    ld->nout = nout;
+    ld->ndims = ndims;
+    ld->min_chunk = min_chunk;
+    ncore = 0;
+    for (i = 0; i < nargs; i++) {
+        PyObject *dims_obj = PySequence_Fast_GET_ITEM(core_dims, i);
+        Py_ssize_t n = PySequence_Size(dims_obj);
+        ld->itemsizes[i] = PyNumber_AsSsize_t(
+            PySequence_Fast_GET_ITEM(itemsizes, i), PyExc_OverflowError);
+        ld->core_offsets[i] = ncore;
+        for (k = 0; k < n; k++) {
+            PyObject *dim_obj = PySequence_GetItem(dims_obj, k);
+            long dim;
+            if (dim_obj == NULL)
+                goto error;
+            dim = PyLong_AsLong(dim_obj);
+            Py_DECREF(dim_obj);
+            if (dim == -1 && PyErr_Occurred())
+                goto error;
+            if (dim < 1 || dim >= ndims) {
+                PyErr_SetString(PyExc_ValueError,
+                                "invalid core dimension index");
+                goto error;
+            }
+            ld->core_dims[ncore++] = (int) dim;
+        }
+    }
+    ld->core_offsets[nargs] = ncore;
+    if (PyErr_Occurred())
+        goto error;
+    Py_DECREF(itemsizes);
+    Py_DECREF(core_dims);
+
+    capsule = PyCapsule_New(ld, "numba.loop_data", loop_data_destructor);
+    if (capsule == NULL) {
+        free(ld);
+        return NULL;
+    }
+    return Py_BuildValue("(NN)", capsule, PyLong_FromVoidPtr(ld));
+
+error:
+    free(ld);
+    Py_XDECREF(itemsizes);
+    Py_XDECREF(core_dims);
+    return NULL;
+}
+
+static PyMethodDef ext_methods[] = {
+    { "launch_threads", (PyCFunction) launch_threads, METH_VARARGS,
+      "launch_threads(count): start the worker threads (once)" },
+    { "get_thread_count", (PyCFunction) get_thread_count, METH_NOARGS,
+      "get_thread_count(): number of threads taking part in parallel loops" },
+    { "make_loop_data", (PyCFunction) make_loop_data, METH_VARARGS,
+      "make_loop_data(func, data, nin, nout, ndims, min_chunk, itemsizes, "
+      "core_dims) -> (keepalive, address)" },
+    { NULL },
+};
+
+
+MOD_INIT(workqueue) {
+    PyObject *m;
+    MOD_DEF(m, "workqueue", "No docs", ext_methods)
+    if (m == NULL)
+        return MOD_ERROR_VAL;
+
+    lock_init(&dispatch_lock);
+    lock_init(&launch_lock);
+#ifndef _WIN32
+    pthread_atfork(NULL, NULL, after_fork_child);
+#endif
+
+    PyModule_AddObject(m, "parallel_loop",
+                       PyLong_FromVoidPtr((void *) &parallel_loop));
+    /* For code generating loop_data_t structures itself (see
+       parallel.build_loop_data()) */
+    PyModule_AddObject(m, "loop_data_size",
+                       PyLong_FromSize_t(sizeof(loop_data_t)));
+
+    return MOD_SUCCESS_VAL(m);
+}
@@ -1,4 +1,6 @@
 from __future__ import print_function, division, absolute_import
+import itertools
+
 import numpy as np
 from llvmlite.llvmpy.core import (Type, Builder, LINKAGE_INTERNAL,
                                   ICMP_EQ, Constant)
@@ -99,18 +101,45 @@ def build_obj_loop_body(context, func, builder, arrays, out, offsets,
                                           signature, env)
 
 
-def build_fast_loop_body(context, func, builder, arrays, out, offsets,
-                         store_offset, signature, ind):
-    def load():
-        elems = [ary.load_aligned(ind)
-                 for ary in arrays]
-        return elems
+def build_specialized_loop_body(context, func, builder, arrays, out,
+                                scalars, signature, ind):
+    """
+    Loop body for contiguous operands mixed with broadcast operands (whose
+    step is 0).  *scalars* holds the values of the broadcast operands,
+    loaded once outside of the loop, and None for the contiguous ones.
+    """
+    elems = [ary.load_aligned(ind) if scalar is None else scalar
+             for ary, scalar in zip(arrays, scalars)]
 
-    def store(retval):
-        out.store_aligned(retval, ind)
+    # Compute
+    status, retval = context.call_conv.call_function(builder, func,
+                                                     signature.return_type,
+                                                     signature.args, elems)
 
-    return _build_ufunc_loop_body(load, store, context, func, builder, arrays,
-                                  out, offsets, store_offset, signature)
+    # Ignoring error status and store result
+    out.store_aligned(retval, ind)
+
+    return status.code
+
+
+# Beyond that number of inputs, only the all-contiguous loop is specialized,
+# to bound the number of generated loops.
+MAX_SPECIALIZED_INPUTS = 3
+
+
+def _specialized_layouts(nin):
+    """
+    Return the combinations of input layouts (as tuples of booleans, true
+    for a broadcast operand) for which a specialized loop is generated.
+    The all-contiguous combination comes first.
+    """
+    if nin > MAX_SPECIALIZED_INPUTS:
+        return [(False,) * nin]
+    layouts = list(itertools.product((False, True), repeat=nin))
+    if nin > 0:
+        # All inputs broadcast is a degenerate case
+        layouts.remove((True,) * nin)
+    return layouts
 
 
 def build_ufunc_wrapper(library, context, func, signature, objmode, env):
@@ -169,10 +198,6 @@ def build_ufunc_wrapper(library, context, func, signature, objmode, env):
     store_offset = cgutils.alloca_once(builder, intp_t)
     builder.store(zero, store_offset)
 
-    unit_strided = cgutils.true_bit
-    for ary in arrays:
-        unit_strided = builder.and_(unit_strided, ary.is_unit_strided)
-
     if objmode:
         # General loop
         pyapi = context.get_python_api(builder)
@@ -186,26 +211,27 @@ def build_ufunc_wrapper(library, context, func, signature, objmode, env):
         builder.ret_void()
 
     else:
-
-        with cgutils.ifelse(builder, unit_strided) as (is_unit_strided,
-                                                       is_strided):
-
-            with is_unit_strided:
+        # Specialized loops for contiguous and broadcast operands
+        for layout in _specialized_layouts(len(arrays)):
+            pred = out.is_unit_strided
+            for ary, is_broadcast in zip(arrays, layout):
+                pred = builder.and_(pred, ary.is_broadcast if is_broadcast
+                                          else ary.is_unit_strided)
+            with cgutils.ifthen(builder, pred):
+                # Hoist the loads of broadcast operands out of the loop
+                scalars = [ary.load_direct(zero) if is_broadcast else None
+                           for ary, is_broadcast in zip(arrays, layout)]
                 with cgutils.for_range(builder, loopcount, intp=intp_t) as ind:
-                    fastloop = build_fast_loop_body(context, func, builder,
-                                                    arrays, out, offsets,
-                                                    store_offset, signature,
-                                                    ind)
+                    build_specialized_loop_body(context, func, builder,
+                                                arrays, out, scalars,
+                                                signature, ind)
                 builder.ret_void()
 
-            with is_strided:
-                # General loop
-                with cgutils.for_range(builder, loopcount, intp=intp_t):
-                    slowloop = build_slow_loop_body(context, func, builder,
-                                                    arrays, out, offsets,
-                                                    store_offset, signature)
-
-                builder.ret_void()
+        # General loop
+        with cgutils.for_range(builder, loopcount, intp=intp_t):
+            slowloop = build_slow_loop_body(context, func, builder,
+                                            arrays, out, offsets,
+                                            store_offset, signature)
 
         builder.ret_void()
     del builder
@@ -227,11 +253,14 @@ class UArrayArg(object):
         offseted_args = self.builder.load(builder.gep(args, [offset]))
         self.data_type = context.get_data_type(fe_type).as_pointer()
         self.dataptr = self.builder.bitcast(offseted_args, self.data_type)
-        sizeof = self.context.get_abi_sizeof(self.data_type)
+        sizeof = self.context.get_abi_sizeof(context.get_data_type(fe_type))
         self.abisize = self.context.get_constant(types.intp, sizeof)
         offseted_step = self.builder.gep(steps, [offset])
         self.step = self.builder.load(offseted_step)
         self.is_unit_strided = builder.icmp(ICMP_EQ, self.abisize, self.step)
+        self.is_broadcast = builder.icmp(ICMP_EQ, self.step,
+                                         self.context.get_constant(types.intp,
+                                                                   0))
         self.builder = builder
 
     def load(self, ind):
@@ -243,8 +272,8 @@ class UArrayArg(object):
         return self.context.unpack_value(self.builder, self.fe_type, ptr)
 
     def load_aligned(self, ind):
-        byteoffset = self.builder.mul(self.step, ind)
-        return self.load_direct(byteoffset)
+        ptr = self.builder.gep(self.dataptr, [ind])
+        return self.context.unpack_value(self.builder, self.fe_type, ptr)
 
     def store(self, value, ind):
         offset = self.builder.mul(self.step, ind)
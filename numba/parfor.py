@@ -0,0 +1,340 @@
+"""
+Support for multithreaded execution of nopython code (``parallel=True``).
+
+Loops over ``prange()`` are lifted out of the function bytecode, much like
+object mode loop-lifting does, and compiled as separate nopython kernels.
+The caller then runs one instance of the kernel per thread of the parallel
+ufunc thread pool (see npyufunc/workqueue.c); the first prange() call made
+by each instance only iterates over the chunk assigned to its thread.
+
+Variables defined before the loop and updated inside it with ``+=``,
+``-=`` or ``*=`` are treated as reductions: each thread accumulates its
+own partial result, and the partial results are combined once all threads
+have finished.
+"""
+from __future__ import print_function, division, absolute_import
+
+import itertools
+
+import llvmlite.binding as ll
+from llvmlite.llvmpy.core import Type, Builder, Constant
+
+from numba import (cgutils, dispatcher, looplifting, sigutils, types, typing,
+                   utils)
+from numba.special import prange
+from numba.targets.imputils import user_function
+from numba.targets.callconv import errcode_t, excinfo_ptr_t
+from numba.npyufunc import parallel, workqueue
+
+
+ll.add_symbol("numba_parallel_loop", workqueue.parallel_loop)
+
+# In-place operators accepted for reductions, and for each of them the
+# operator combining the partial results and the identity value each
+# thread (but the first) starts from.
+_REDUCTION_OPS = {
+    'INPLACE_ADD': ('+', 0),
+    'INPLACE_SUBTRACT': ('+', 0),
+    'INPLACE_MULTIPLY': ('*', 1),
+}
+
+
+def _is_prange_loop(bytecode, loop):
+    """
+    Whether the *loop* instructions iterate over a prange() call.
+    """
+    insts = iter(loop[1:])
+    inst = next(insts)
+    if inst.opname != 'LOAD_GLOBAL':
+        return False
+    func_globals = utils.get_function_globals(bytecode.func)
+    obj = func_globals.get(bytecode.co_names[inst.arg])
+    # Allow qualified accesses such as numba.prange
+    for inst in insts:
+        if inst.opname != 'LOAD_ATTR':
+            break
+        obj = getattr(obj, bytecode.co_names[inst.arg], None)
+    return obj is prange
+
+
+def _find_reductions(bytecode, loop, args, rets):
+    """
+    Return a list of (variable name, in-place opname) for the variables
+    output by the *loop*, or None if some of them aren't reductions.
+    """
+    reductions = []
+    for name in rets:
+        if name not in args:
+            return None
+        ops = set()
+        nloads = nstores = 0
+        for prev, inst in zip(loop, loop[1:]):
+            if inst.opname not in ('LOAD_FAST', 'STORE_FAST'):
+                continue
+            if bytecode.co_varnames[inst.arg] != name:
+                continue
+            if inst.opname == 'STORE_FAST':
+                nstores += 1
+                ops.add(prev.opname)
+            else:
+                nloads += 1
+        # The variable must only be read for the sake of updating it
+        if nloads != nstores or len(ops) != 1:
+            return None
+        op = ops.pop()
+        if op not in _REDUCTION_OPS:
+            return None
+        reductions.append((name, op))
+    return reductions
+
+
+def lift_prange_loops(bytecode, typingctx, targetctx, locals, flags):
+    """
+    Lift the top-level prange() loops which can be run in parallel.
+
+    Returns (outer, loops), as looplifting.lift_loop().
+    """
+    loop_flags = flags.copy()
+    loop_flags.unset('enable_looplift')
+    loop_flags.unset('enable_pyobject')
+    loop_flags.unset('auto_parallel')
+    # The loop kernels are the hot parts: optimize them fully
+    loop_flags.unset('quick_compile')
+
+    accepted = []
+
+    def loop_filter(bytecode, loop, args, rets):
+        if not _is_prange_loop(bytecode, loop):
+            return False
+        reductions = _find_reductions(bytecode, loop, args, rets)
+        if reductions is None:
+            return False
+        accepted.append(reductions)
+        return True
+
+    # The loop kernels themselves don't spawn threads
+    loop_targetctx = targetctx.subtarget(auto_parallel=False)
+
+    def dispatcher_factory(loopbc):
+        return ParallelLoop(loopbc, accepted.pop(), typingctx,
+                            loop_targetctx, locals, loop_flags)
+
+    return looplifting.lift_loop(bytecode, dispatcher_factory, loop_filter)
+
+
+class ParallelLoop(dispatcher.LiftedLoop):
+    """
+    The hidden dispatcher object for a lifted prange() loop.  Calls from
+    nopython code launch the loop on all threads, while calls from object
+    mode (if the outer function fell back to it) run it serially.
+    """
+
+    def __init__(self, bytecode, reductions, typingctx, targetctx, locals,
+                 flags):
+        dispatcher.LiftedLoop.__init__(self, bytecode, typingctx, targetctx,
+                                       locals, flags)
+        # The loop takes its own arguments, not the original function's
+        kind = utils.pyParameter.POSITIONAL_OR_KEYWORD
+        self._pysig = utils.pySignature(
+            [utils.pyParameter(name, kind)
+             for name in bytecode.argspec.args])
+        argnames = list(bytecode.argspec.args)
+        # A list of (argument index, in-place opname)
+        self.reductions = [(argnames.index(name), op)
+                           for name, op in reductions]
+        self._launchers = {}
+        typingctx.insert_overloaded(self)
+
+    def compile(self, sig):
+        entry_point = dispatcher.LiftedLoop.compile(self, sig)
+        args, return_type = sigutils.normalize_signature(sig)
+        args = tuple(args)
+        if args not in self._launchers:
+            cres = self._compileinfos[args]
+            launcher = make_launcher(cres.fndesc, [cres.library],
+                                     self.reductions)
+            self.targetctx.insert_func_defn(
+                [(launcher, [(launcher, cres.signature)])])
+            self._launchers[args] = launcher
+        return entry_point
+
+    def get_overload(self, sig):
+        args, return_type = sigutils.normalize_signature(sig)
+        return self._launchers[tuple(args)]
+
+
+def make_launcher(fndesc, libs, reductions):
+    """
+    Return an implementation calling the prange() loop kernel described
+    by *fndesc* on all threads and combining the *reductions*.
+    """
+    nthreads = parallel.get_thread_count()
+    if nthreads <= 1 or not all(isinstance(fndesc.argtypes[i], types.Number)
+                                for i, op in reductions):
+        # Nothing to gain or unsupported: run the loop serially
+        return user_function(fndesc, libs)
+
+    restype = fndesc.restype
+
+    def imp(context, builder, sig, args):
+        func = context.declare_function(cgutils.get_module(builder), fndesc)
+        results = call_parallel(context, builder, func, restype,
+                                fndesc.argtypes, args, reductions)
+        if not reductions:
+            return context.get_dummy_value()
+        # Combine the partial results
+        tup = context.get_constant_undef(restype)
+        for j, (i, op) in enumerate(reductions):
+            ty = restype[j]
+            combine = context.get_function(_REDUCTION_OPS[op][0],
+                                           typing.signature(ty, ty, ty))
+            acc = builder.extract_value(results[0], j)
+            for res in results[1:]:
+                acc = combine(builder, (acc, builder.extract_value(res, j)))
+            tup = builder.insert_value(tup, acc, j)
+        return tup
+
+    imp.signature = typing.signature(restype, *fndesc.argtypes)
+    imp.libs = tuple(libs)
+    return imp
+
+
+_trampoline_ids = itertools.count()
+
+
+def _get_trampoline(context, module, func, restype, argtypes, arg_struct,
+                    result_struct, reductions, nthreads):
+    """
+    Build a function with the signature of a ufunc loop, calling *func*
+    for each chunk id in its first argument.  The arguments to *func*
+    are read from the structure passed as second argument, and the
+    status and return value are written to the third argument.
+    """
+    byte_ptr_t = Type.pointer(Type.int(8))
+    intp_t = context.get_value_type(types.intp)
+    fnty = Type.function(Type.void(), [Type.pointer(byte_ptr_t),
+                                       Type.pointer(intp_t),
+                                       Type.pointer(intp_t), byte_ptr_t])
+    tramp = module.add_function(fnty, "__numba_parfor_trampoline_%d"
+                                      % next(_trampoline_ids))
+    tramp.linkage = 'internal'
+    arg_args, arg_dims, arg_steps, arg_data = tramp.args
+
+    builder = Builder.new(tramp.append_basic_block("entry"))
+    setchunk = module.get_or_insert_function(
+        Type.function(Type.void(), [intp_t, intp_t]),
+        name="numba_set_prange_chunk")
+
+    ids = builder.load(cgutils.gep(builder, arg_args, 0))
+    argsptr = builder.bitcast(builder.load(cgutils.gep(builder, arg_args, 1)),
+                              Type.pointer(arg_struct))
+    resptrs = builder.load(cgutils.gep(builder, arg_args, 2))
+    idstep = builder.load(cgutils.gep(builder, arg_steps, 0))
+    resstep = builder.load(cgutils.gep(builder, arg_steps, 2))
+    funcargs = [builder.load(cgutils.gep(builder, argsptr, 0, i))
+                for i in range(len(argtypes))]
+    zero = context.get_constant(types.intp, 0)
+
+    with cgutils.for_range(builder, builder.load(arg_dims), intp_t) as ind:
+        idptr = builder.gep(ids, [builder.mul(ind, idstep)])
+        chunk_id = builder.load(builder.bitcast(idptr, Type.pointer(intp_t)))
+        builder.call(setchunk, [chunk_id,
+                                context.get_constant(types.intp, nthreads)])
+
+        # Only the first chunk accumulates into the initial values
+        callargs = list(funcargs)
+        is_first = builder.icmp_signed('==', chunk_id, zero)
+        for i, op in reductions:
+            identity = context.get_constant_generic(builder, argtypes[i],
+                                                    _REDUCTION_OPS[op][1])
+            callargs[i] = builder.select(is_first, callargs[i], identity)
+
+        status, retval = context.call_conv.call_function(
+            builder, func, restype, argtypes, callargs)
+        # In case the chunk wasn't consumed (e.g. an error occurred early)
+        builder.call(setchunk, [zero, context.get_constant(types.intp, 1)])
+
+        resptr = builder.gep(resptrs, [builder.mul(ind, resstep)])
+        resptr = builder.bitcast(resptr, Type.pointer(result_struct))
+        builder.store(status.code, cgutils.gep(builder, resptr, 0, 0))
+        builder.store(status.excinfoptr, cgutils.gep(builder, resptr, 0, 1))
+        builder.store(retval, cgutils.gep(builder, resptr, 0, 2))
+
+    builder.ret_void()
+    return tramp
+
+
+def call_parallel(context, builder, func, restype, argtypes, args,
+                  reductions=()):
+    """
+    Call the Numba-compiled *func* once per thread, in parallel.  Each
+    call's first prange() iterates over a different chunk of its range.
+    The arguments listed in *reductions* (a sequence of (argument index,
+    in-place opname) pairs) are replaced with their identity value in all
+    calls but the first.
+
+    Errors are propagated to the caller; otherwise the list of the return
+    values of all calls is returned.
+    """
+    module = cgutils.get_module(builder)
+    nthreads = parallel.get_thread_count()
+    byte_ptr_t = Type.pointer(Type.int(8))
+    intp_t = context.get_value_type(types.intp)
+
+    arg_struct = Type.struct([context.get_value_type(ty) for ty in argtypes])
+    result_struct = Type.struct([errcode_t, excinfo_ptr_t,
+                                 context.get_value_type(restype)])
+    tramp = _get_trampoline(context, module, func, restype, argtypes,
+                            arg_struct, result_struct, reductions, nthreads)
+
+    # Arguments shared by all calls
+    argsval = Constant.undef(arg_struct)
+    for i, val in enumerate(args):
+        argsval = builder.insert_value(argsval, val, i)
+    argsptr = cgutils.alloca_once_value(builder, argsval)
+
+    ids = cgutils.alloca_once(builder, Type.array(intp_t, nthreads))
+    for i in range(nthreads):
+        builder.store(context.get_constant(types.intp, i),
+                      cgutils.gep(builder, ids, 0, i))
+    results = cgutils.alloca_once(builder,
+                                  Type.array(result_struct, nthreads))
+
+    # Call the parallel ufunc loop, with the chunk ids and results as
+    # its input and output arrays
+    loop_args = cgutils.alloca_once(builder, Type.array(byte_ptr_t, 3))
+    for i, ptr in enumerate([ids, argsptr, results]):
+        builder.store(builder.bitcast(ptr, byte_ptr_t),
+                      cgutils.gep(builder, loop_args, 0, i))
+    dims = cgutils.alloca_once_value(
+        builder, context.get_constant(types.intp, nthreads))
+    steps = cgutils.alloca_once(builder, Type.array(intp_t, 3))
+    for i, step in enumerate([context.get_abi_sizeof(intp_t), 0,
+                              context.get_abi_sizeof(result_struct)]):
+        builder.store(context.get_constant(types.intp, step),
+                      cgutils.gep(builder, steps, 0, i))
+
+    loop_data = parallel.build_loop_data(
+        context, builder, tramp,
+        [context.get_abi_sizeof(intp_t), context.get_abi_sizeof(arg_struct),
+         context.get_abi_sizeof(result_struct)], nin=2, nout=1)
+
+    fnty = Type.function(Type.void(), [Type.pointer(byte_ptr_t),
+                                       Type.pointer(intp_t),
+                                       Type.pointer(intp_t), byte_ptr_t])
+    launch = module.get_or_insert_function(fnty, name="numba_parallel_loop")
+    builder.call(launch, [cgutils.gep(builder, loop_args, 0, 0), dims,
+                          cgutils.gep(builder, steps, 0, 0),
+                          loop_data])
+
+    retvals = []
+    for i in range(nthreads):
+        resptr = cgutils.gep(builder, results, 0, i)
+        code = builder.load(cgutils.gep(builder, resptr, 0, 0))
+        excinfoptr = builder.load(cgutils.gep(builder, resptr, 0, 1))
+        status = context.call_conv._get_return_status(builder, code,
+                                                      excinfoptr)
+        with cgutils.if_unlikely(builder, status.is_error):
+            context.call_conv.return_status_propagate(builder, status)
+        retvals.append(builder.load(cgutils.gep(builder, resptr, 0, 2)))
+    return retvals
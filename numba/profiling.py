@@ -0,0 +1,223 @@
+"""
+Compile-time profiling.
+
+The compiler records the wall time of each pipeline stage, and of the
+finalization of each LLVM library, for every function and signature it
+compiles.  The resulting CompileProfile objects are passed to the
+listeners registered with add_listener(), and attached to the compile
+results (see Overloaded.stats).
+
+Setting the NUMBA_COMPILE_TRACE environment variable to a file name
+writes out all profiles at exit, in the JSON trace event format
+understood e.g. by Chrome's about://tracing page.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import atexit
+from collections import namedtuple
+from contextlib import contextmanager
+import json
+import os
+import threading
+import timeit
+
+from numba import config
+
+
+_timer = timeit.default_timer
+
+StageTiming = namedtuple("StageTiming",
+                         ("pipeline", "stage", "start", "duration"))
+
+LLVMTiming = namedtuple("LLVMTiming",
+                        ("library", "start", "duration",
+                         "ir_size_before", "ir_size_after"))
+
+
+class CompileProfile(object):
+    """
+    Statistics of the compilation of a function for one signature.
+    Times are in seconds.
+    """
+
+    def __init__(self, func_name, args):
+        self.func_name = func_name
+        self.args = tuple(args)
+        self.thread_id = threading.current_thread().ident
+        self.start = None
+        self.duration = None
+        # A list of StageTiming, in execution order
+        self.stages = []
+        # A list of LLVMTiming, one per finalized library.  The IR sizes
+        # (in bytes of LLVM assembler, before and after the module-level
+        # optimizations) are None unless listeners are registered.
+        self.llvm = []
+
+    def __repr__(self):
+        return "<CompileProfile %s%s: %.3f s>" % (
+            self.func_name, self.args, self.duration or 0.0)
+
+    def get_stage_times(self):
+        """
+        Return a dict of the total time spent in each stage.
+        """
+        times = {}
+        for timing in self.stages:
+            times[timing.stage] = (times.get(timing.stage, 0.0)
+                                   + timing.duration)
+        return times
+
+    def as_dict(self):
+        """
+        Return a JSON-compatible representation of this profile.
+        """
+        return dict(func_name=self.func_name,
+                    args=[str(a) for a in self.args],
+                    start=self.start,
+                    duration=self.duration,
+                    stages=[t._asdict() for t in self.stages],
+                    llvm=[t._asdict() for t in self.llvm])
+
+
+_listeners = []
+_state = threading.local()
+
+
+def add_listener(listener):
+    """
+    Register *listener*, a callable taking a CompileProfile argument,
+    to be called each time a function has been compiled.
+    """
+    _listeners.append(listener)
+
+
+def remove_listener(listener):
+    """
+    Unregister *listener*.  ValueError is raised if it isn't registered.
+    """
+    _listeners.remove(listener)
+
+
+def _get_stack():
+    try:
+        return _state.stack
+    except AttributeError:
+        stack = _state.stack = []
+        return stack
+
+
+def current_profile():
+    """
+    Return the CompileProfile of the compilation running in the current
+    thread (the innermost one, for nested compilations), or None.
+    """
+    stack = _get_stack()
+    return stack[-1] if stack else None
+
+
+def measure_ir_sizes():
+    """
+    Whether LLVM IR sizes should be measured.  This is only done when
+    someone listens, since it requires printing out the IR.
+    """
+    return bool(_listeners)
+
+
+@contextmanager
+def profile_compilation(func_name, args):
+    """
+    Record a CompileProfile for the compilation of *func_name* for
+    argument types *args* executed in the context.  The profile is
+    passed to the listeners if the compilation succeeds.
+    """
+    profile = CompileProfile(func_name, args)
+    stack = _get_stack()
+    stack.append(profile)
+    profile.start = _timer()
+    try:
+        yield profile
+    finally:
+        profile.duration = _timer() - profile.start
+        stack.pop()
+    for listener in list(_listeners):
+        listener(profile)
+
+
+@contextmanager
+def record_stage(pipeline, stage):
+    """
+    Record the time spent in the context as *stage* of *pipeline* in
+    the current profile, if any.
+    """
+    profile = current_profile()
+    start = _timer()
+    try:
+        yield
+    finally:
+        if profile is not None:
+            profile.stages.append(
+                StageTiming(pipeline, stage, start, _timer() - start))
+
+
+class TraceRecorder(object):
+    """
+    A listener collecting profiles for writing them out as a JSON trace.
+    """
+
+    def __init__(self):
+        self.profiles = []
+
+    def __call__(self, profile):
+        self.profiles.append(profile)
+
+    def get_trace_events(self):
+        """
+        Return the list of recorded events in the trace event format.
+        """
+        pid = os.getpid()
+        events = []
+
+        def add_event(name, cat, tid, start, duration, args):
+            events.append(dict(name=name, cat=cat, ph="X", pid=pid, tid=tid,
+                               ts=start * 1e6, dur=duration * 1e6,
+                               args=args))
+
+        for profile in self.profiles:
+            tid = profile.thread_id
+            name = "%s(%s)" % (profile.func_name,
+                               ", ".join(str(a) for a in profile.args))
+            add_event(name, "compile", tid, profile.start, profile.duration,
+                      {})
+            for timing in profile.stages:
+                add_event(timing.stage, timing.pipeline, tid, timing.start,
+                          timing.duration, {})
+            for timing in profile.llvm:
+                add_event("LLVM finalize", "llvm", tid, timing.start,
+                          timing.duration,
+                          dict(library=timing.library,
+                               ir_size_before=timing.ir_size_before,
+                               ir_size_after=timing.ir_size_after))
+        return events
+
+    def write(self, path):
+        """
+        Write out the recorded profiles to the file *path*.
+        """
+        with open(path, "w") as f:
+            json.dump(dict(traceEvents=self.get_trace_events()), f)
+
+
+def enable_trace(path):
+    """
+    Record all compilations from now on, and write them out as a JSON
+    trace to the file *path* at exit.  The recorder is returned.
+    """
+    recorder = TraceRecorder()
+    add_listener(recorder)
+    atexit.register(recorder.write, path)
+    return recorder
+
+
+if config.COMPILE_TRACE:
+    enable_trace(config.COMPILE_TRACE)
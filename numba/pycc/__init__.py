@@ -10,6 +10,7 @@ import tempfile
 import sys
 
 from .compiler import Compiler, find_shared_ending, find_args, find_linker
+from . import multiversion
 
 
 def get_ending(args):
@@ -41,6 +42,17 @@ def main(args=None):
     parser.add_argument('--python', action='store_true',
                         help='Emit additionally generated Python wrapper and '
                         'extension module code in output')
+    parser.add_argument('--target-cpu',
+                        help="LLVM name of the CPU to compile for (default "
+                        "is a generic CPU, 'host' means this machine's)")
+    parser.add_argument('--target-features',
+                        help="LLVM CPU features to compile with "
+                        "(e.g. '+avx2,+fma')")
+    parser.add_argument('--cpu-variants',
+                        help="Comma-separated CPU variants to additionally "
+                        "compile exported functions for; the best one "
+                        "is chosen at load time (one or several of %s)"
+                        % ", ".join(v.name for v in multiversion.variants))
     parser.add_argument('-d', '--debug', action='store_true',
                         help='Print extra debug information')
 
@@ -64,8 +76,17 @@ def main(args=None):
         print('ERROR: pycc --header has been disabled in this release due to a known issue')
         sys.exit(1)
 
+    cpu_variants = ()
+    if args.cpu_variants:
+        if args.llvm:
+            print('ERROR: --cpu-variants cannot be used with --llvm')
+            sys.exit(1)
+        cpu_variants = [name.strip() for name in args.cpu_variants.split(',')]
+
     logger.debug('inputs --> %s', args.inputs)
-    with Compiler(args.inputs, module_name=module_name) as compiler:
+    with Compiler(args.inputs, module_name=module_name,
+                  cpu_name=args.target_cpu, features=args.target_features,
+                  cpu_variants=cpu_variants) as compiler:
         if args.llvm:
             logger.debug('emit llvm')
             compiler.write_llvm_bitcode(args.output, wrap=args.python)
@@ -3,20 +3,24 @@ from __future__ import print_function, division, absolute_import
 
 import logging
 import os
+import shutil
+import subprocess
 import sys
 import functools
+import tempfile
 
 import llvmlite.llvmpy.core as lc
 import llvmlite.llvmpy.ee as le
 import llvmlite.llvmpy.passes as lp
 import llvmlite.binding as ll
 
-from numba import cgutils
+from numba import cgutils, types
 from numba.utils import IS_PY3
 from . import llvm_types as lt
 from .decorators import registry as export_registry
 from numba.compiler import compile_extra, Flags
 from numba.targets.registry import CPUTarget
+from . import multiversion
 
 
 logger = logging.getLogger(__name__)
@@ -103,6 +107,13 @@ class _Compiler(object):
     :param inputs: input file(s).
     :type inputs: iterable
     :param module_name: the name of the exported module.
+    :param cpu_name: the LLVM name of the CPU to compile for (default is
+                     a generic CPU, "host" means the compiling machine's).
+    :param features: the LLVM CPU features string to compile with.
+    :param cpu_variants: names of CPU variants (see
+                         :mod:`numba.pycc.multiversion`) each exported
+                         function is additionally compiled for.  The best
+                         variant is selected at load time.
     """
 
     #: Structure used to describe a method of an extension type.
@@ -120,10 +131,18 @@ class _Compiler(object):
 
     method_def_ptr = lc.Type.pointer(method_def_ty)
 
-    def __init__(self, inputs, module_name='numba_exported'):
+    def __init__(self, inputs, module_name='numba_exported', cpu_name=None,
+                 features=None, cpu_variants=()):
         self.inputs = inputs
         self.module_name = module_name
         self.export_python_wrap = False
+        self.cpu_name = cpu_name
+        self.features = features
+        self.cpu_variants = multiversion.get_variants(cpu_variants)
+        triple = ll.get_default_triple()
+        if self.cpu_variants and not multiversion.is_supported_triple(triple):
+            raise NotImplementedError("CPU variants are not supported "
+                                      "for target %r" % (triple,))
 
     def __enter__(self):
         return self
@@ -138,22 +157,61 @@ class _Compiler(object):
 
     def _cull_exports(self):
         """Read all the exported functions/modules in the translator
-        environment, and join them into a single LLVM module.
+        environment, and join them into LLVM libraries: a single one,
+        or one per CPU variant plus a dispatching library if
+        multiversioning is enabled.
 
         Resets the export environment afterwards.
         """
         self.exported_signatures = export_registry
         self.exported_function_types = {}
 
+        target_ctx = CPUTarget.target_context
+        codegen = target_ctx.aot_codegen(self.module_name, self.cpu_name,
+                                         self.features)
+        if not self.cpu_variants:
+            library = self._compile_exports(codegen)
+            if self.export_python_wrap:
+                wrapper_module = library.create_ir_module("wrapper")
+                self._emit_python_wrapper(wrapper_module)
+                library.add_ir_module(wrapper_module)
+            return [library]
+
+        baseline = 'generic'
+        libraries = [self._compile_exports(codegen, baseline)]
+        for variant in self.cpu_variants:
+            variant_codegen = target_ctx.aot_codegen(
+                "%s.%s" % (self.module_name, variant.name),
+                variant.cpu, variant.features)
+            libraries.append(self._compile_exports(variant_codegen,
+                                                   variant.name))
+
+        library = codegen.create_library(self.module_name + ".dispatch")
+        dispatch_module = library.create_ir_module("dispatch")
+        exports = [(entry.symbol, self.exported_function_types[entry])
+                   for entry in self.exported_signatures]
+        multiversion.emit_dispatcher(dispatch_module, exports, baseline,
+                                     self.cpu_variants)
+        if self.export_python_wrap:
+            self._emit_python_wrapper(dispatch_module)
+        library.add_ir_module(dispatch_module)
+        libraries.append(library)
+        return libraries
+
+    def _compile_exports(self, codegen, variant_name=None):
+        """Compile all the exported functions into a new library of
+        *codegen*.  If *variant_name* is given, the exported symbols are
+        suffixed with it and all other symbols are made internal.
+        """
         typing_ctx = CPUTarget.typing_context
         target_ctx = CPUTarget.target_context
 
-        codegen = target_ctx.aot_codegen(self.module_name)
         library = codegen.create_library(self.module_name)
 
         # Generate IR for all exported functions
         flags = Flags()
         flags.set("no_compile")
+        symbols = []
 
         for entry in self.exported_signatures:
             cres = compile_extra(typing_ctx, target_ctx, entry.function,
@@ -168,20 +226,25 @@ class _Compiler(object):
                 # XXX: unsupported (necessary?)
                 llvm_func.linkage = lc.LINKAGE_INTERNAL
                 wrappername = cres.fndesc.llvm_cpython_wrapper_name
-                wrapper = cres.library.get_function(wrappername)
-                wrapper.name = entry.symbol
-                wrapper.linkage = lc.LINKAGE_EXTERNAL
+                exported_func = cres.library.get_function(wrappername)
+                pyobj = target_ctx.get_argument_type(types.pyobject)
+                fnty = lc.Type.function(pyobj, [pyobj] * 3)
+            else:
+                exported_func = llvm_func
                 fnty = cres.target_context.call_conv.get_function_type(
                     cres.fndesc.restype, cres.fndesc.argtypes)
-                self.exported_function_types[entry] = fnty
+            if variant_name is None:
+                exported_func.name = entry.symbol
             else:
-                llvm_func.linkage = lc.LINKAGE_EXTERNAL
-                llvm_func.name = entry.symbol
+                exported_func.name = multiversion.variant_symbol(
+                    entry.symbol, variant_name)
+            exported_func.linkage = lc.LINKAGE_EXTERNAL
+            symbols.append(exported_func.name)
+            self.exported_function_types[entry] = fnty
 
-        if self.export_python_wrap:
-            wrapper_module = library.create_ir_module("wrapper")
-            self._emit_python_wrapper(wrapper_module)
-            library.add_ir_module(wrapper_module)
+        if variant_name is not None:
+            # Avoid clashes between the helpers of the different variants
+            library.internalize(symbols)
 
         return library
 
@@ -193,16 +256,34 @@ class _Compiler(object):
         self.export_python_wrap = wrap
 
     def write_llvm_bitcode(self, output, **kws):
+        if self.cpu_variants:
+            raise ValueError("cannot emit LLVM bitcode for several "
+                             "CPU variants")
         self._process_inputs(**kws)
-        library = self._cull_exports()
+        [library] = self._cull_exports()
         with open(output, 'wb') as fout:
             fout.write(library.emit_bitcode())
 
     def write_native_object(self, output, **kws):
         self._process_inputs(**kws)
-        library = self._cull_exports()
-        with open(output, 'wb') as fout:
-            fout.write(library.emit_native_object())
+        libraries = self._cull_exports()
+        if len(libraries) == 1:
+            with open(output, 'wb') as fout:
+                fout.write(libraries[0].emit_native_object())
+            return
+        # Several libraries: combine their objects using a relocatable link
+        tempdir = tempfile.mkdtemp(prefix='pycc-')
+        try:
+            objects = []
+            for i, library in enumerate(libraries):
+                path = os.path.join(tempdir, '%d.o' % i)
+                with open(path, 'wb') as fout:
+                    fout.write(library.emit_native_object())
+                objects.append(path)
+            cmdargs = ('ld', '-r', '-o', output) + tuple(objects)
+            subprocess.check_call(cmdargs)
+        finally:
+            shutil.rmtree(tempdir)
 
     def emit_type(self, tyobj):
         ret_val = str(tyobj)
@@ -232,7 +313,7 @@ class _Compiler(object):
         for entry in self.exported_signatures:
             name = entry.symbol
             fnty = self.exported_function_types[entry]
-            lfunc = llvm_module.add_function(fnty, name=name)
+            lfunc = llvm_module.get_or_insert_function(fnty, name=name)
 
             method_name_init = lc.Constant.stringz(name)
             method_name = llvm_module.add_global_variable(
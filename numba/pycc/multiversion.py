@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""
+Function multiversioning for exported functions.
+
+Each exported function is compiled once for a baseline CPU and once for
+each requested CPU variant.  A dispatch module then defines the exported
+symbols as small stubs forwarding to the best variant supported by the
+running CPU, as detected with the CPUID instruction when the module is
+loaded.
+"""
+from __future__ import print_function, division, absolute_import
+
+from collections import namedtuple
+
+import llvmlite.llvmpy.core as lc
+
+from numba import cgutils
+
+
+CPUVariant = namedtuple("CPUVariant",
+                        ("name", "cpu", "features", "cpuid_bits", "xcr0_mask"))
+
+# Location of x86 feature flags in the CPUID output:
+# (leaf, register index in (eax, ebx, ecx, edx), bit)
+_cpuid_bits = {
+    'sse4.2': (1, 2, 20),
+    'popcnt': (1, 2, 23),
+    'fma': (1, 2, 12),
+    'osxsave': (1, 2, 27),
+    'avx': (1, 2, 28),
+    'f16c': (1, 2, 29),
+    'bmi': (7, 1, 3),
+    'avx2': (7, 1, 5),
+    'bmi2': (7, 1, 8),
+    'avx512f': (7, 1, 16),
+    'avx512dq': (7, 1, 17),
+    'avx512cd': (7, 1, 28),
+    'avx512bw': (7, 1, 30),
+    'avx512vl': (7, 1, 31),
+    }
+
+# Register state the OS must save for AVX (XMM | YMM) and AVX-512
+# (XMM | YMM | opmask | ZMM_Hi256 | Hi16_ZMM), as reported by XGETBV.
+_XCR0_AVX = 0x6
+_XCR0_AVX512 = 0xe6
+
+
+def _make_variant(name, cpu, features, xcr0_mask):
+    bits = [f.lstrip('+') for f in features]
+    if xcr0_mask:
+        bits.append('osxsave')
+    return CPUVariant(name, cpu, ','.join(features), tuple(bits), xcr0_mask)
+
+
+_sse42_features = ['+sse4.2', '+popcnt']
+_avx_features = _sse42_features + ['+avx']
+_avx2_features = _avx_features + ['+avx2', '+fma', '+bmi', '+bmi2', '+f16c']
+_avx512_features = _avx2_features + ['+avx512f', '+avx512dq', '+avx512cd',
+                                     '+avx512bw', '+avx512vl']
+
+# The predefined variants, in increasing order of preference.  The
+# feature strings are explicit so that the variants stay meaningful
+# with LLVM versions not knowing about the CPU names.
+variants = [
+    _make_variant('sse42', 'nehalem', _sse42_features, 0),
+    _make_variant('avx', 'sandybridge', _avx_features, _XCR0_AVX),
+    _make_variant('avx2', 'haswell', _avx2_features, _XCR0_AVX),
+    _make_variant('avx512', 'skx', _avx512_features, _XCR0_AVX512),
+    ]
+
+_variants_by_name = dict((v.name, v) for v in variants)
+
+
+def is_supported_triple(triple):
+    """
+    Whether multiversioning is supported for the target *triple*.
+    """
+    arch, _, rest = triple.partition('-')
+    if 'windows' in rest or 'win32' in rest:
+        return False
+    return arch in ('x86_64', 'amd64') or (len(arch) == 4 and
+                                           arch.startswith('i') and
+                                           arch.endswith('86'))
+
+
+def get_variants(names):
+    """
+    Return the CPUVariant objects for the given variant *names*, in
+    increasing order of preference.  ValueError is raised for unknown
+    names.
+    """
+    for name in names:
+        if name not in _variants_by_name:
+            raise ValueError("unknown CPU variant %r (expected one of %s)"
+                             % (name, ", ".join(v.name for v in variants)))
+    return [v for v in variants if v.name in names]
+
+
+def variant_symbol(symbol, variant_name):
+    """
+    The symbol name of the *variant_name* version of exported *symbol*.
+    """
+    return "%s.%s" % (symbol, variant_name)
+
+
+_int32 = lc.Type.int(32)
+
+
+def _int32_const(value):
+    return lc.Constant.int(_int32, value)
+
+
+def _emit_cpuid(builder, leaf, subleaf=0):
+    """
+    Emit a CPUID instruction, returning the (eax, ebx, ecx, edx) values.
+    """
+    fnty = lc.Type.function(lc.Type.struct([_int32] * 4), [_int32, _int32])
+    asm = lc.InlineAsm.get(fnty, "cpuid",
+                           "={ax},={bx},={cx},={dx},{ax},{cx}",
+                           side_effect=True)
+    res = builder.call(asm, [_int32_const(leaf), _int32_const(subleaf)])
+    return [builder.extract_value(res, i) for i in range(4)]
+
+
+def _emit_xgetbv(builder):
+    """
+    Emit a XGETBV instruction, returning the low word of XCR0.
+    """
+    fnty = lc.Type.function(lc.Type.struct([_int32] * 2), [_int32])
+    asm = lc.InlineAsm.get(fnty, "xgetbv", "={ax},={dx},{cx}",
+                           side_effect=True)
+    res = builder.call(asm, [_int32_const(0)])
+    return builder.extract_value(res, 0)
+
+
+def _has_bits(builder, value, mask):
+    if mask >= 1 << 31:
+        # Bit 31 must be given as a signed constant
+        mask -= 1 << 32
+    mask = _int32_const(mask)
+    return builder.icmp(lc.ICMP_EQ, builder.and_(value, mask), mask)
+
+
+def _emit_detection(builder, variant_list):
+    """
+    Emit code detecting the CPU features.  A list of booleans telling
+    whether each variant of *variant_list* is supported is returned.
+    """
+    zero = _int32_const(0)
+    max_leaf = _emit_cpuid(builder, 0)[0]
+    leaf1 = _emit_cpuid(builder, 1)
+
+    # Leaf 7 is only defined if the CPU reports it
+    leaf7_ptrs = [cgutils.alloca_once_value(builder, zero)
+                  for i in range(4)]
+    has_leaf7 = builder.icmp(lc.ICMP_UGE, max_leaf, _int32_const(7))
+    with cgutils.ifthen(builder, has_leaf7):
+        for ptr, val in zip(leaf7_ptrs, _emit_cpuid(builder, 7)):
+            builder.store(val, ptr)
+    leaf7 = [builder.load(ptr) for ptr in leaf7_ptrs]
+
+    # XGETBV is only available if the OS enabled it
+    xcr0_ptr = cgutils.alloca_once_value(builder, zero)
+    leaf, reg, bit = _cpuid_bits['osxsave']
+    with cgutils.ifthen(builder, _has_bits(builder, leaf1[reg], 1 << bit)):
+        builder.store(_emit_xgetbv(builder), xcr0_ptr)
+    xcr0 = builder.load(xcr0_ptr)
+
+    regs = {1: leaf1, 7: leaf7}
+    supported = []
+    for variant in variant_list:
+        pred = cgutils.true_bit
+        for name in variant.cpuid_bits:
+            leaf, reg, bit = _cpuid_bits[name]
+            pred = builder.and_(pred,
+                                _has_bits(builder, regs[leaf][reg], 1 << bit))
+        if variant.xcr0_mask:
+            pred = builder.and_(pred,
+                                _has_bits(builder, xcr0, variant.xcr0_mask))
+        supported.append(pred)
+    return supported
+
+
+def emit_dispatcher(llvm_module, exports, baseline, variant_list):
+    """
+    Emit into *llvm_module* the dispatching stubs for *exports*, a list
+    of (symbol, function type) pairs.  The versions of each function
+    for the *baseline* name and the *variant_list* CPUVariants must be
+    defined under the names given by variant_symbol().
+    """
+    voidptr = lc.Type.pointer(lc.Type.int(8))
+    init_fnty = lc.Type.function(lc.Type.void(), ())
+    init_fn = llvm_module.add_function(init_fnty, name=".cpu_dispatch_init")
+    init_fn.linkage = lc.LINKAGE_INTERNAL
+
+    # One function pointer per export, filled by the init function
+    fnptrs = []
+    for symbol, fnty in exports:
+        fnptr = llvm_module.add_global_variable(lc.Type.pointer(fnty),
+                                                ".dispatch.%s" % symbol)
+        fnptr.initializer = lc.Constant.null(fnptr.type.pointee)
+        fnptr.linkage = lc.LINKAGE_INTERNAL
+        fnptrs.append(fnptr)
+
+    builder = lc.Builder.new(init_fn.append_basic_block('entry'))
+    supported = _emit_detection(builder, variant_list)
+    for (symbol, fnty), fnptr in zip(exports, fnptrs):
+        impl = llvm_module.get_or_insert_function(
+            fnty, name=variant_symbol(symbol, baseline))
+        # Later variants are preferred
+        for variant, pred in zip(variant_list, supported):
+            variant_impl = llvm_module.get_or_insert_function(
+                fnty, name=variant_symbol(symbol, variant.name))
+            impl = builder.select(pred, variant_impl, impl)
+        builder.store(impl, fnptr)
+    builder.ret_void()
+
+    # Run the init function when the module is loaded
+    ctor_ty = lc.Type.struct([_int32, lc.Type.pointer(init_fnty), voidptr])
+    ctor = lc.Constant.struct([_int32_const(65535), init_fn,
+                               lc.Constant.null(voidptr)])
+    ctors_init = lc.Constant.array(ctor_ty, [ctor])
+    ctors = llvm_module.add_global_variable(ctors_init.type,
+                                            "llvm.global_ctors")
+    ctors.initializer = ctors_init
+    ctors.linkage = 'appending'
+
+    # The exported stubs, forwarding to the selected implementation.
+    # They also call the init function themselves, in case they are
+    # called before the constructors ran.
+    for (symbol, fnty), fnptr in zip(exports, fnptrs):
+        stub = llvm_module.add_function(fnty, name=symbol)
+        stub.linkage = lc.LINKAGE_EXTERNAL
+        builder = lc.Builder.new(stub.append_basic_block('entry'))
+        with cgutils.ifthen(builder,
+                            cgutils.is_null(builder, builder.load(fnptr))):
+            builder.call(init_fn, ())
+        res = builder.call(builder.load(fnptr), stub.args)
+        if fnty.return_type == lc.Type.void():
+            builder.ret_void()
+        else:
+            builder.ret(res)
@@ -10,7 +10,7 @@ import llvmlite.llvmpy.core as lc
 
 from numba.config import PYVERSION
 import numba.ctypes_support as ctypes
-from numba import types, utils, cgutils, _helperlib, assume
+from numba import types, utils, cgutils, _helperlib, numpy_support
 
 
 class NativeValue(object):
@@ -681,6 +681,11 @@ class PythonAPI(object):
         fn = self._get_function(fnty, name="PyObject_SetItem")
         return self.builder.call(fn, (obj, key, val))
 
+    def object_delitem(self, obj, key):
+        fnty = Type.function(Type.int(), [self.pyobj, self.pyobj])
+        fn = self._get_function(fnty, name="PyObject_DelItem")
+        return self.builder.call(fn, (obj, key))
+
     def string_as_string(self, strobj):
         fnty = Type.function(self.cstring, [self.pyobj])
         if PYVERSION >= (3, 0):
@@ -1015,6 +1020,12 @@ class PythonAPI(object):
         elif isinstance(typ, (types.Tuple, types.UniTuple)):
             return self.from_native_tuple(val, typ)
 
+        elif isinstance(typ, types.List):
+            return self.from_native_list(val, typ)
+
+        elif isinstance(typ, types.Dict):
+            return self.from_native_dict(val, typ)
+
         elif isinstance(typ, types.Generator):
             return self.from_native_generator(val, typ)
 
@@ -1059,21 +1070,179 @@ class PythonAPI(object):
         # TODO check matching dtype.
         #      currently, mismatching dtype will still work and causes
         #      potential memory corruption
+        builder = self.builder
         nativearycls = self.context.make_array(typ)
-        nativeary = nativearycls(self.context, self.builder)
+        nativeary = nativearycls(self.context, builder)
         aryptr = nativeary._getpointer()
-        ptr = self.builder.bitcast(aryptr, self.voidptr)
-        errcode = self.numba_array_adaptor(ary, ptr)
-        failed = cgutils.is_not_null(self.builder, errcode)
-        return self.builder.load(aryptr), failed
+        failed = cgutils.alloca_once_value(builder, cgutils.false_bit)
+
+        # Exact ndarray instances with the right number of dimensions
+        # (i.e. what the dispatcher lets through after checking the
+        # argument's typecode) are unboxed inline.  Anything else goes
+        # through the checked numba_adapt_ndarray() helper.
+        is_fast = cgutils.alloca_once_value(builder, cgutils.false_bit)
+        if typ.ndim > 0:
+            with cgutils.ifthen(builder, self._is_exact_ndarray(ary)):
+                ndim = builder.load(self._get_ndarray_field(
+                    ary, _helperlib.ndarray_ndim_offset, Type.int()))
+                builder.store(
+                    builder.icmp(lc.ICMP_EQ, ndim,
+                                 Constant.int(Type.int(), typ.ndim)),
+                    is_fast)
+
+        with cgutils.ifelse(builder, builder.load(is_fast),
+                            expect=True) as (then, otherwise):
+            with then:
+                self._unbox_ndarray_fields(ary, typ, nativeary)
+            with otherwise:
+                ptr = builder.bitcast(aryptr, self.voidptr)
+                errcode = self.numba_array_adaptor(ary, ptr)
+                builder.store(cgutils.is_not_null(builder, errcode), failed)
+
+        return builder.load(aryptr), builder.load(failed)
+
+    def _get_ndarray_field(self, ary, offset, ty):
+        """
+        Get a pointer of type *ty* to the field at *offset* of Numpy
+        array object *ary*.
+        """
+        return cgutils.pointer_add(self.builder, ary, offset,
+                                   return_type=Type.pointer(ty))
+
+    def _is_exact_ndarray(self, obj):
+        """
+        Whether *obj*'s type is exactly numpy.ndarray.
+        """
+        ndarray_type = self.builder.load(
+            self.context.get_c_value(self.builder, self.voidptr,
+                                     "numba_ndarray_type"))
+        obtype = self.builder.load(self._get_ndarray_field(
+            obj, _helperlib.pyobject_type_offset, self.voidptr))
+        return self.builder.icmp(lc.ICMP_EQ, obtype, ndarray_type)
+
+    def _unbox_ndarray_fields(self, ary, typ, nativeary):
+        """
+        Fill the native array *nativeary* of type *typ* from the fields
+        of Numpy array object *ary*, whose type must have been checked.
+        """
+        builder = self.builder
+        intp_t = self.context.get_value_type(types.intp)
+
+        data = builder.load(self._get_ndarray_field(
+            ary, _helperlib.ndarray_data_offset, self.voidptr))
+        shape_ptr = builder.load(self._get_ndarray_field(
+            ary, _helperlib.ndarray_shape_offset, Type.pointer(intp_t)))
+        strides_ptr = builder.load(self._get_ndarray_field(
+            ary, _helperlib.ndarray_strides_offset, Type.pointer(intp_t)))
+        shape = [builder.load(cgutils.gep(builder, shape_ptr, i))
+                 for i in range(typ.ndim)]
+        strides = [builder.load(cgutils.gep(builder, strides_ptr, i))
+                   for i in range(typ.ndim)]
+
+        datamodel = nativeary._datamodel
+        data_t = self.context.get_value_type(datamodel.get_type('data'))
+        itemsize = self.context.get_abi_sizeof(
+            self.context.get_data_type(typ.dtype))
+        self.context.populate_array(
+            nativeary,
+            data=builder.bitcast(data, data_t),
+            shape=cgutils.pack_array(builder, shape),
+            strides=cgutils.pack_array(builder, strides),
+            itemsize=self.context.get_constant(types.intp, itemsize),
+            parent=ary)
 
     def from_native_array(self, ary, typ):
-        assert assume.return_argument_array_only
+        """
+        Box the native array *ary* of type *typ* into a Numpy array.
+        The array's data is shared, not copied, if it is owned by the
+        Numba runtime or by a Python object.
+        """
         nativearycls = self.context.make_array(typ)
         nativeary = nativearycls(self.context, self.builder, value=ary)
-        parent = nativeary.parent
-        self.incref(parent)
-        return parent
+        aryptr = self.builder.bitcast(nativeary._getpointer(), self.voidptr)
+
+        dtype = numpy_support.as_dtype(typ.dtype)
+        ndim = Constant.int(Type.int(), typ.ndim)
+        if dtype.fields is None and dtype.kind not in 'mM':
+            # Builtin dtype: pass its type number
+            typenum = Constant.int(Type.int(), dtype.num)
+            return self.nrt_adapt_ndarray_to_python(
+                aryptr, ndim, typenum, self.get_null_object())
+        else:
+            # Parametric dtype (record, datetime...): pass the dtype object
+            descr = self.unserialize(self.serialize_object(dtype))
+            res = cgutils.alloca_once_value(self.builder,
+                                            self.get_null_object())
+            with self.if_object_ok(descr):
+                typenum = Constant.int(Type.int(), -1)
+                self.builder.store(
+                    self.nrt_adapt_ndarray_to_python(aryptr, ndim, typenum,
+                                                     descr),
+                    res)
+                self.decref(descr)
+            return self.builder.load(res)
+
+    def from_native_list(self, val, typ):
+        """
+        Box the native list *val* of type *typ* into a new Python list.
+        The items are boxed individually.
+        """
+        builder = self.builder
+        inst = self.context.make_list(builder, typ, val)
+        size = inst.size
+        seq = self.list_new(size)
+        res = cgutils.alloca_once_value(builder, seq)
+        with self.if_object_ok(seq):
+            failed = cgutils.alloca_once_value(builder, cgutils.false_bit)
+            with cgutils.for_range(builder, size, size.type) as idx:
+                obj = self.from_native_value(inst.getitem(idx), typ.dtype)
+                with cgutils.ifthen(builder, cgutils.is_null(builder, obj)):
+                    builder.store(cgutils.true_bit, failed)
+                # Steals the reference (a NULL item is allowed)
+                self.list_setitem(seq, idx, obj)
+            with cgutils.ifthen(builder, builder.load(failed)):
+                self.decref(seq)
+                builder.store(self.get_null_object(), res)
+        return builder.load(res)
+
+    def from_native_dict(self, val, typ):
+        """
+        Box the native dict *val* of type *typ* into a new Python dict.
+        The keys and values are boxed individually.
+        """
+        builder = self.builder
+        inst = self.context.make_dict(builder, typ, val)
+        dct = self.dict_new()
+        res = cgutils.alloca_once_value(builder, dct)
+        with self.if_object_ok(dct):
+            failed = cgutils.alloca_once_value(builder, cgutils.false_bit)
+            with inst.iterate() as (key, value):
+                keyobj = self.from_native_value(key, typ.key_type)
+                valobj = self.from_native_value(value, typ.value_type)
+                ok = builder.and_(cgutils.is_not_null(builder, keyobj),
+                                  cgutils.is_not_null(builder, valobj))
+                with cgutils.ifelse(builder, ok) as (then, otherwise):
+                    with then:
+                        err = self.dict_setitem(dct, keyobj, valobj)
+                        with cgutils.ifthen(builder,
+                                            cgutils.is_not_null(builder,
+                                                                err)):
+                            builder.store(cgutils.true_bit, failed)
+                    with otherwise:
+                        builder.store(cgutils.true_bit, failed)
+                # PyDict_SetItem() doesn't steal the references
+                self.decref(keyobj)
+                self.decref(valobj)
+            with cgutils.ifthen(builder, builder.load(failed)):
+                self.decref(dct)
+                builder.store(self.get_null_object(), res)
+        return builder.load(res)
+
+    def nrt_adapt_ndarray_to_python(self, aryptr, ndim, typenum, descr):
+        fnty = Type.function(self.pyobj, [self.voidptr, Type.int(),
+                                          Type.int(), self.pyobj])
+        fn = self._get_function(fnty, name="NRT_adapt_ndarray_to_python")
+        return self.builder.call(fn, (aryptr, ndim, typenum, descr))
 
     def to_native_optional(self, obj, typ):
         """
@@ -0,0 +1,8 @@
+"""
+The Numba runtime (NRT): reference-counted memory management allowing
+nopython code to allocate memory (e.g. new arrays) and hand it over
+to Python.
+"""
+from __future__ import print_function, absolute_import, division
+
+from .nrt import get_allocation_stats
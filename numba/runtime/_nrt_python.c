@@ -0,0 +1,301 @@
+/*
+ * Python-facing part of the Numba runtime: boxing of NRT-managed arrays
+ * into Numpy arrays, and introspection helpers.
+ */
+
+#include "../_pymodule.h"
+#define NPY_NO_DEPRECATED_API NPY_1_7_API_VERSION
+#include <numpy/ndarrayobject.h>
+
+#include "nrt.h"
+
+
+/*
+ * MemInfoObject owns a reference to a NRT MemInfo.  It is used as the
+ * base object of Numpy arrays whose data is managed by the runtime, so
+ * that the data is kept alive as long as the arrays are.
+ */
+
+typedef struct {
+    PyObject_HEAD
+    NRT_MemInfo *meminfo;
+} MemInfoObject;
+
+static void
+MemInfo_dealloc(MemInfoObject *self)
+{
+    NRT_MemInfo_release(self->meminfo);
+    Py_TYPE(self)->tp_free((PyObject *) self);
+}
+
+static PyObject *
+MemInfo_get_refcount(MemInfoObject *self, void *closure)
+{
+    return PyLong_FromSize_t(NRT_MemInfo_refcount(self->meminfo));
+}
+
+static PyObject *
+MemInfo_get_data(MemInfoObject *self, void *closure)
+{
+    return PyLong_FromVoidPtr(NRT_MemInfo_data(self->meminfo));
+}
+
+static PyObject *
+MemInfo_get_size(MemInfoObject *self, void *closure)
+{
+    return PyLong_FromSize_t(NRT_MemInfo_size(self->meminfo));
+}
+
+static PyGetSetDef MemInfo_getsets[] = {
+    {"refcount", (getter) MemInfo_get_refcount, NULL, NULL, NULL},
+    {"data", (getter) MemInfo_get_data, NULL, NULL, NULL},
+    {"size", (getter) MemInfo_get_size, NULL, NULL, NULL},
+    {NULL}  /* Sentinel */
+};
+
+static PyTypeObject MemInfoType = {
+#if (PY_MAJOR_VERSION < 3)
+    PyObject_HEAD_INIT(NULL)
+    0,                                  /* ob_size */
+#else
+    PyVarObject_HEAD_INIT(NULL, 0)
+#endif
+    "_nrt_python._MemInfo",             /* tp_name */
+    sizeof(MemInfoObject),              /* tp_basicsize */
+    0,                                  /* tp_itemsize */
+    (destructor) MemInfo_dealloc,       /* tp_dealloc */
+    0,                                  /* tp_print */
+    0,                                  /* tp_getattr */
+    0,                                  /* tp_setattr */
+    0,                                  /* tp_compare */
+    0,                                  /* tp_repr */
+    0,                                  /* tp_as_number */
+    0,                                  /* tp_as_sequence */
+    0,                                  /* tp_as_mapping */
+    0,                                  /* tp_hash */
+    0,                                  /* tp_call */
+    0,                                  /* tp_str */
+    0,                                  /* tp_getattro */
+    0,                                  /* tp_setattro */
+    0,                                  /* tp_as_buffer */
+    Py_TPFLAGS_DEFAULT,                 /* tp_flags */
+    0,                                  /* tp_doc */
+    0,                                  /* tp_traverse */
+    0,                                  /* tp_clear */
+    0,                                  /* tp_richcompare */
+    0,                                  /* tp_weaklistoffset */
+    0,                                  /* tp_iter */
+    0,                                  /* tp_iternext */
+    0,                                  /* tp_methods */
+    0,                                  /* tp_members */
+    MemInfo_getsets,                    /* tp_getset */
+};
+
+/* Create a MemInfoObject acquiring a new reference to *meminfo*. */
+static PyObject *
+MemInfo_wrap(NRT_MemInfo *meminfo)
+{
+    MemInfoObject *obj = PyObject_New(MemInfoObject, &MemInfoType);
+    if (obj == NULL)
+        return NULL;
+    NRT_MemInfo_acquire(meminfo);
+    obj->meminfo = meminfo;
+    return (PyObject *) obj;
+}
+
+
+/*
+ * Array structure as laid out by the native code; see
+ * numba.datamodel.models.ArrayModel.  Must be kept in sync with
+ * the definition in numba/_helperlib.c.
+ */
+typedef struct {
+    NRT_MemInfo *meminfo;
+    PyObject *parent;
+    npy_intp nitems;
+    npy_intp itemsize;
+    void *data;
+    npy_intp shape_and_strides[];
+} arystruct_t;
+
+/*
+ * Return a new reference to the array's parent if the native array
+ * describes exactly the same memory, NULL otherwise.
+ */
+static PyObject *
+try_to_return_parent(arystruct_t *arystruct, int ndim, PyArray_Descr *descr)
+{
+    int i;
+    PyArrayObject *array = (PyArrayObject *) arystruct->parent;
+
+    if (!PyArray_Check(arystruct->parent))
+        return NULL;
+    if (PyArray_DATA(array) != arystruct->data)
+        return NULL;
+    if (PyArray_NDIM(array) != ndim)
+        return NULL;
+    if (!PyArray_EquivTypes(PyArray_DESCR(array), descr))
+        return NULL;
+    for (i = 0; i < ndim; i++) {
+        if (PyArray_DIMS(array)[i] != arystruct->shape_and_strides[i])
+            return NULL;
+        if (PyArray_STRIDES(array)[i] !=
+            arystruct->shape_and_strides[ndim + i])
+            return NULL;
+    }
+    Py_INCREF(arystruct->parent);
+    return arystruct->parent;
+}
+
+/*
+ * Box the native array *arystruct* into a Numpy array.  The dtype is
+ * either given by *type_num* (for builtin types) or *descr* (if not NULL).
+ *
+ * No data is copied if the array has an owner: either a MemInfo (the
+ * array was allocated by native code) or a parent (the array was given
+ * by Python code).  A reference to the owner is kept by the new array.
+ */
+static PyObject *
+NRT_adapt_ndarray_to_python(arystruct_t *arystruct, int ndim, int type_num,
+                            PyObject *descrobj)
+{
+    PyArray_Descr *descr;
+    PyObject *array, *base;
+    npy_intp *shape, *strides;
+    int flags = NPY_ARRAY_WRITEABLE;
+
+    if (descrobj != NULL) {
+        if (!PyArray_DescrCheck(descrobj)) {
+            PyErr_SetString(PyExc_TypeError, "expected a dtype object");
+            return NULL;
+        }
+        descr = (PyArray_Descr *) descrobj;
+        Py_INCREF(descr);
+    }
+    else {
+        descr = PyArray_DescrFromType(type_num);
+        if (descr == NULL)
+            return NULL;
+    }
+
+    if (arystruct->parent != NULL) {
+        array = try_to_return_parent(arystruct, ndim, descr);
+        if (array != NULL) {
+            Py_DECREF(descr);
+            return array;
+        }
+    }
+
+    if (arystruct->meminfo != NULL) {
+        base = MemInfo_wrap(arystruct->meminfo);
+        if (base == NULL) {
+            Py_DECREF(descr);
+            return NULL;
+        }
+    }
+    else if (arystruct->parent != NULL) {
+        base = arystruct->parent;
+        Py_INCREF(base);
+        if (PyArray_Check(base) &&
+            !PyArray_ISWRITEABLE((PyArrayObject *) base))
+            flags = 0;
+    }
+    else {
+        /* No owner (e.g. a constant array): the data will be copied */
+        base = NULL;
+    }
+
+    shape = arystruct->shape_and_strides;
+    strides = shape + ndim;
+    /* This steals a reference to descr */
+    array = PyArray_NewFromDescr(&PyArray_Type, descr, ndim, shape, strides,
+                                 arystruct->data, flags, NULL);
+    if (array == NULL) {
+        Py_XDECREF(base);
+        return NULL;
+    }
+    if (base == NULL) {
+        PyObject *copy = PyArray_NewCopy((PyArrayObject *) array,
+                                         NPY_ANYORDER);
+        Py_DECREF(array);
+        return copy;
+    }
+    /* This steals a reference to base, even on failure */
+    if (PyArray_SetBaseObject((PyArrayObject *) array, base)) {
+        Py_DECREF(array);
+        return NULL;
+    }
+    return array;
+}
+
+
+static PyObject *
+get_stats(PyObject *self, PyObject *args)
+{
+    return Py_BuildValue("nn", (Py_ssize_t) NRT_get_stats_alloc(),
+                               (Py_ssize_t) NRT_get_stats_free());
+}
+
+
+static PyObject *
+build_c_helpers_dict(void)
+{
+    PyObject *dct = PyDict_New();
+    if (dct == NULL)
+        goto error;
+
+#define _declpointer(name, value) do {                 \
+    PyObject *o = PyLong_FromVoidPtr(value);           \
+    if (o == NULL) goto error;                         \
+    if (PyDict_SetItemString(dct, name, o)) {          \
+        Py_DECREF(o);                                  \
+        goto error;                                    \
+    }                                                  \
+    Py_DECREF(o);                                      \
+} while (0)
+
+#define declmethod(func) _declpointer(#func, &NRT_##func)
+
+    declmethod(MemInfo_new);
+    declmethod(MemInfo_alloc_aligned);
+    declmethod(MemInfo_new_varsize);
+    declmethod(MemInfo_varsize_realloc);
+    declmethod(MemInfo_acquire);
+    declmethod(MemInfo_release);
+    declmethod(MemInfo_data);
+    declmethod(MemInfo_size);
+    declmethod(incref);
+    declmethod(decref);
+    declmethod(adapt_ndarray_to_python);
+
+#undef declmethod
+#undef _declpointer
+    return dct;
+error:
+    Py_XDECREF(dct);
+    return NULL;
+}
+
+static PyMethodDef ext_methods[] = {
+    { "get_stats", (PyCFunction) get_stats, METH_NOARGS, NULL },
+    { NULL },
+};
+
+
+MOD_INIT(_nrt_python) {
+    PyObject *m;
+    MOD_DEF(m, "_nrt_python", "No docs", ext_methods)
+    if (m == NULL)
+        return MOD_ERROR_VAL;
+
+    import_array();
+
+    if (PyType_Ready(&MemInfoType))
+        return MOD_ERROR_VAL;
+
+    Py_INCREF(&MemInfoType);
+    PyModule_AddObject(m, "_MemInfo", (PyObject *) &MemInfoType);
+    PyModule_AddObject(m, "c_helpers", build_c_helpers_dict());
+
+    return MOD_SUCCESS_VAL(m);
+}
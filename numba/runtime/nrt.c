@@ -0,0 +1,165 @@
+#include <stdlib.h>
+#include <string.h>
+
+#include "nrt.h"
+
+/*
+ * Atomic operations on the refcount and the statistics counters.
+ */
+#ifdef _MSC_VER
+    #include <windows.h>
+    typedef LONG volatile nrt_atomic_t;
+    #define NRT_ATOMIC_INC(ptr) InterlockedIncrement(ptr)
+    #define NRT_ATOMIC_DEC(ptr) InterlockedDecrement(ptr)
+#else
+    typedef size_t volatile nrt_atomic_t;
+    #define NRT_ATOMIC_INC(ptr) __sync_add_and_fetch(ptr, 1)
+    #define NRT_ATOMIC_DEC(ptr) __sync_sub_and_fetch(ptr, 1)
+#endif
+
+struct MemInfo {
+    nrt_atomic_t      refct;
+    NRT_dtor_function dtor;
+    void              *dtor_info;
+    void              *data;
+    size_t            size;
+};
+
+static nrt_atomic_t stats_alloc = 0;
+static nrt_atomic_t stats_free = 0;
+
+
+static void
+meminfo_init(NRT_MemInfo *mi, void *data, size_t size,
+             NRT_dtor_function dtor, void *dtor_info)
+{
+    mi->refct = 1;
+    mi->dtor = dtor;
+    mi->dtor_info = dtor_info;
+    mi->data = data;
+    mi->size = size;
+    NRT_ATOMIC_INC(&stats_alloc);
+}
+
+NRT_MemInfo *
+NRT_MemInfo_new(void *data, size_t size,
+                NRT_dtor_function dtor, void *dtor_info)
+{
+    NRT_MemInfo *mi = (NRT_MemInfo *) malloc(sizeof(NRT_MemInfo));
+    if (mi == NULL)
+        return NULL;
+    meminfo_init(mi, data, size, dtor, dtor_info);
+    return mi;
+}
+
+NRT_MemInfo *
+NRT_MemInfo_alloc_aligned(size_t size, unsigned align)
+{
+    NRT_MemInfo *mi;
+    size_t base, offset;
+    /* The data follows the MemInfo header in the same memory block;
+       over-allocate so that it can be aligned as requested. */
+    mi = (NRT_MemInfo *) malloc(sizeof(NRT_MemInfo) + size + align);
+    if (mi == NULL)
+        return NULL;
+    base = (size_t) (mi + 1);
+    offset = align ? (align - base % align) % align : 0;
+    meminfo_init(mi, (void *) (base + offset), size, NULL, NULL);
+    return mi;
+}
+
+/* The destructor of variable-size MemInfos: *info* is the user-supplied
+   destructor, if any. */
+static void
+nrt_varsize_dtor(void *ptr, void *info)
+{
+    NRT_dtor_function dtor = (NRT_dtor_function) info;
+    if (dtor)
+        dtor(ptr, NULL);
+    free(ptr);
+}
+
+NRT_MemInfo *
+NRT_MemInfo_new_varsize(size_t size, NRT_dtor_function dtor)
+{
+    NRT_MemInfo *mi;
+    void *data = malloc(size);
+    if (data == NULL)
+        return NULL;
+    mi = NRT_MemInfo_new(data, size, nrt_varsize_dtor, (void *) dtor);
+    if (mi == NULL)
+        free(data);
+    return mi;
+}
+
+void *
+NRT_MemInfo_varsize_realloc(NRT_MemInfo *mi, size_t size)
+{
+    void *data = realloc(mi->data, size);
+    if (data == NULL)
+        return NULL;
+    mi->data = data;
+    mi->size = size;
+    return data;
+}
+
+void
+NRT_MemInfo_acquire(NRT_MemInfo *mi)
+{
+    NRT_ATOMIC_INC(&mi->refct);
+}
+
+void
+NRT_MemInfo_release(NRT_MemInfo *mi)
+{
+    if (NRT_ATOMIC_DEC(&mi->refct) == 0) {
+        if (mi->dtor)
+            mi->dtor(mi->data, mi->dtor_info);
+        NRT_ATOMIC_INC(&stats_free);
+        free(mi);
+    }
+}
+
+void
+NRT_incref(NRT_MemInfo *mi)
+{
+    if (mi != NULL)
+        NRT_MemInfo_acquire(mi);
+}
+
+void
+NRT_decref(NRT_MemInfo *mi)
+{
+    if (mi != NULL)
+        NRT_MemInfo_release(mi);
+}
+
+void *
+NRT_MemInfo_data(NRT_MemInfo *mi)
+{
+    return mi->data;
+}
+
+size_t
+NRT_MemInfo_size(NRT_MemInfo *mi)
+{
+    return mi->size;
+}
+
+size_t
+NRT_MemInfo_refcount(NRT_MemInfo *mi)
+{
+    return (size_t) mi->refct;
+}
+
+size_t
+NRT_get_stats_alloc(void)
+{
+    return (size_t) stats_alloc;
+}
+
+size_t
+NRT_get_stats_free(void)
+{
+    return (size_t) stats_free;
+}
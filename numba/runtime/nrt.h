@@ -0,0 +1,71 @@
+/*
+ * Numba runtime (NRT): a minimal reference-counted memory manager
+ * used by nopython code to allocate and share memory (e.g. array data)
+ * without holding the GIL.
+ *
+ * All functions in this file are GIL-agnostic and thread-safe.
+ */
+
+#ifndef NUMBA_NRT_H_
+#define NUMBA_NRT_H_
+
+#include <stddef.h>
+
+typedef struct MemInfo NRT_MemInfo;
+
+/* Destructor for externally-owned data, called with the data pointer and
+   the user-supplied info pointer when the refcount drops to zero. */
+typedef void (*NRT_dtor_function)(void *ptr, void *info);
+
+/*
+ * Allocate a new MemInfo wrapping externally-owned *data*.  The refcount
+ * is initialized to 1.  *dtor* (if not NULL) is called on release.
+ * Returns NULL if out of memory.
+ */
+NRT_MemInfo *NRT_MemInfo_new(void *data, size_t size,
+                             NRT_dtor_function dtor, void *dtor_info);
+
+/*
+ * Allocate a new MemInfo together with *size* bytes of data aligned
+ * on *align* bytes (a power of two).  The data is freed along with
+ * the MemInfo.  Returns NULL if out of memory.
+ */
+NRT_MemInfo *NRT_MemInfo_alloc_aligned(size_t size, unsigned align);
+
+/*
+ * Allocate a new MemInfo with a data payload of *size* bytes which can
+ * later be resized with NRT_MemInfo_varsize_realloc().  *dtor* (if not
+ * NULL) is called with the data pointer before the data is freed.
+ * Returns NULL if out of memory.
+ */
+NRT_MemInfo *NRT_MemInfo_new_varsize(size_t size, NRT_dtor_function dtor);
+
+/*
+ * Resize the data payload of a MemInfo created by NRT_MemInfo_new_varsize()
+ * to *size* bytes, preserving its contents.  The new data pointer is
+ * returned; on failure, NULL is returned and the MemInfo is left unchanged.
+ */
+void *NRT_MemInfo_varsize_realloc(NRT_MemInfo *mi, size_t size);
+
+/*
+ * Increment / decrement the refcount.  The MemInfo and its data are
+ * deallocated when the refcount drops to zero.
+ */
+void NRT_MemInfo_acquire(NRT_MemInfo *mi);
+void NRT_MemInfo_release(NRT_MemInfo *mi);
+
+/* Same as above, but accept a NULL pointer (which is a no-op). */
+void NRT_incref(NRT_MemInfo *mi);
+void NRT_decref(NRT_MemInfo *mi);
+
+void *NRT_MemInfo_data(NRT_MemInfo *mi);
+size_t NRT_MemInfo_size(NRT_MemInfo *mi);
+size_t NRT_MemInfo_refcount(NRT_MemInfo *mi);
+
+/*
+ * Allocation statistics, for debugging and leak testing.
+ */
+size_t NRT_get_stats_alloc(void);
+size_t NRT_get_stats_free(void);
+
+#endif /* NUMBA_NRT_H_ */
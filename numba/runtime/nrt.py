@@ -0,0 +1,21 @@
+from __future__ import print_function, absolute_import, division
+
+from collections import namedtuple
+
+from . import _nrt_python as _nrt
+
+
+# Addresses of the runtime's C functions, to be installed in LLVM's
+# symbol table (see numba.targets.base).
+c_helpers = _nrt.c_helpers
+
+_nrt_stats = namedtuple("nrt_stats", ("alloc", "free"))
+
+
+def get_allocation_stats():
+    """
+    Return the number of memory blocks allocated and freed by the runtime
+    so far, as a (alloc, free) named tuple.  This is mostly useful to
+    check for leaks.
+    """
+    return _nrt_stats(*_nrt.get_stats())
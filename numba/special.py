@@ -1,6 +1,6 @@
 from __future__ import print_function, division, absolute_import
 
-__all__ = [ 'typeof' ]
+__all__ = [ 'typeof', 'prange' ]
 
 def typeof(val):
     """
@@ -11,3 +11,14 @@ def typeof(val):
     from .targets.registry import CPUTarget
     return CPUTarget.typing_context.resolve_data_type(val)
 
+
+def prange(*args):
+    """
+    Provides a 1D parallel iterator that generates a sequence of integers.
+
+    Inside a function compiled with ``parallel=True``, the iterations of
+    a loop over ``prange()`` are distributed across several threads.
+    In all other situations, ``prange()`` behaves like ``range()``.
+    """
+    return range(*args)
+
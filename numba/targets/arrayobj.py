@@ -13,11 +13,12 @@ import llvmlite.llvmpy.core as lc
 import numba.ctypes_support as ctypes
 import numpy
 from llvmlite.llvmpy.core import Constant
-from numba import types, cgutils
+from numba import types, cgutils, typing
 from numba.targets.imputils import (builtin, builtin_attr, implement,
                                     impl_attribute, impl_attribute_generic,
                                     iterator_impl, iternext_impl,
-                                    struct_factory)
+                                    struct_factory, impl_ret_borrowed,
+                                    impl_ret_new_ref)
 from .builtins import Slice
 
 
@@ -29,10 +30,15 @@ def make_array(array_type):
     return cgutils.create_struct_proxy(array_type)
 
 
-def populate_array(array, data, shape, strides, itemsize, parent=None):
+def populate_array(array, data, shape, strides, itemsize, meminfo=None,
+                   parent=None):
     """
     Helper function for populating array structures.
     This avoids forgetting to set fields.
+
+    *meminfo* is the NRT MemInfo owning the data (or None if the array
+    is not managed by the runtime); views of an array must pass the
+    meminfo of the original array.
     """
     context = array._context
     builder = array._builder
@@ -44,6 +50,13 @@ def populate_array(array, data, shape, strides, itemsize, parent=None):
                  data=data,
                  itemsize=itemsize)
 
+    # Set `meminfo` attribute
+    if meminfo is None:
+        attrs['meminfo'] = Constant.null(context.get_value_type(
+            datamodel.get_type('meminfo')))
+    else:
+        attrs['meminfo'] = meminfo
+
     # Set `parent` attribute
     if parent is None:
         attrs['parent'] = Constant.null(context.get_value_type(
@@ -90,7 +103,8 @@ def make_array_ctype(ndim):
     c_intp = ctypes.c_ssize_t
 
     class c_array(ctypes.Structure):
-        _fields_ = [('parent', ctypes.c_void_p),
+        _fields_ = [('meminfo', ctypes.c_void_p),
+                    ('parent', ctypes.c_void_p),
                     ('nitems', c_intp),
                     ('itemsize', c_intp),
                     ('data', ctypes.c_void_p),
@@ -122,7 +136,8 @@ def getiter_array(context, builder, sig, args):
     iterobj.index = indexptr
     iterobj.array = array
 
-    return iterobj._getvalue()
+    res = iterobj._getvalue()
+    return impl_ret_borrowed(context, builder, sig.return_type, res)
 
 
 def _getitem_array1d(context, builder, arrayty, array, idx, wraparound):
@@ -183,11 +198,12 @@ def getitem_arraynd_intp(context, builder, sig, args):
                        shape=cgutils.pack_array(builder, in_shapes[1:]),
                        strides=cgutils.pack_array(builder, in_strides[1:]),
                        itemsize=adapted_ary.itemsize,
+                       meminfo=adapted_ary.meminfo,
                        parent=adapted_ary.parent,)
         result = out_ary._getvalue()
     else:
         raise NotImplementedError("1D indexing into %dD array" % aryty.ndim)
-    return result
+    return impl_ret_borrowed(context, builder, sig.return_type, result)
 
 @builtin
 @implement('getitem', types.Kind(types.Buffer), types.slice3_type)
@@ -223,9 +239,11 @@ def getitem_array1d_slice(context, builder, sig, args):
                    shape=cgutils.pack_array(builder, [shape]),
                    strides=cgutils.pack_array(builder, [stride]),
                    itemsize=ary.itemsize,
+                   meminfo=ary.meminfo,
                    parent=ary.parent)
 
-    return retary._getvalue()
+    res = retary._getvalue()
+    return impl_ret_borrowed(context, builder, sig.return_type, res)
 
 
 @builtin
@@ -262,8 +280,10 @@ def getitem_array_unituple(context, builder, sig, args):
                        shape=cgutils.pack_array(builder, shapes),
                        strides=cgutils.pack_array(builder, strides),
                        itemsize=ary.itemsize,
+                       meminfo=ary.meminfo,
                        parent=ary.parent)
-        return retary._getvalue()
+        res = retary._getvalue()
+        return impl_ret_borrowed(context, builder, sig.return_type, res)
     else:
         # Indexing
         assert isinstance(idxty.dtype, types.Integer)
@@ -318,8 +338,10 @@ def getitem_array_tuple(context, builder, sig, args):
                        shape=cgutils.pack_array(builder, shapes),
                        strides=cgutils.pack_array(builder, strides),
                        itemsize=ary.itemsize,
+                       meminfo=ary.meminfo,
                        parent=ary.parent)
-        return retary._getvalue()
+        res = retary._getvalue()
+        return impl_ret_borrowed(context, builder, sig.return_type, res)
     else:
         # Indexing
         indices = cgutils.unpack_tuple(builder, idx, count=len(idxty))
@@ -475,80 +497,327 @@ def array_len(context, builder, sig, args):
     return builder.extract_value(shapeary, 0)
 
 
-@builtin
-@implement(numpy.sum, types.Kind(types.Array))
-@implement("array.sum", types.Kind(types.Array))
-def array_sum(context, builder, sig, args):
-    [arrty] = sig.args
-
-    def array_sum_impl(arr):
-        c = 0
-        for v in arr.flat:
-            c += v
-        return c
-
-    return context.compile_internal(builder, array_sum_impl, sig, args,
-                                    locals=dict(c=sig.return_type))
-
-
-@builtin
-@implement(numpy.prod, types.Kind(types.Array))
-@implement("array.prod", types.Kind(types.Array))
-def array_prod(context, builder, sig, args):
-    [arrty] = sig.args
+#------------------------------------------------------------------------------
+# Sum, product, mean, variance
+
+def _sum_1d_impl(a):
+    # Blocked summation: elements are summed by blocks of 128 using 8
+    # interleaved accumulators (allowing pipelining and vectorization),
+    # block sums are summed by groups of 128 blocks, and so on.  The
+    # rounding error is then that of a 4-level summation tree instead
+    # of growing linearly with the array size.
+    n = a.shape[0]
+    total = 0
+    i = 0
+    while i < n:
+        # Groups of 128 ** 3 elements
+        big = 0
+        big_end = min(i + 2097152, n)
+        while i < big_end:
+            # Groups of 128 ** 2 elements
+            group = 0
+            group_end = min(i + 16384, n)
+            while i < group_end:
+                # Blocks of 128 elements, summed like Numpy does
+                block_end = min(i + 128, n)
+                unrolled_end = block_end - (block_end - i) % 8
+                c0 = 0
+                c1 = 0
+                c2 = 0
+                c3 = 0
+                c4 = 0
+                c5 = 0
+                c6 = 0
+                c7 = 0
+                for j in range(i, unrolled_end, 8):
+                    c0 += a[j]
+                    c1 += a[j + 1]
+                    c2 += a[j + 2]
+                    c3 += a[j + 3]
+                    c4 += a[j + 4]
+                    c5 += a[j + 5]
+                    c6 += a[j + 6]
+                    c7 += a[j + 7]
+                block = ((c0 + c1) + (c2 + c3)) + ((c4 + c5) + (c6 + c7))
+                for j in range(unrolled_end, block_end):
+                    block += a[j]
+                group += block
+                i = block_end
+            big += group
+        total += big
+    return total
+
+def _sum_flat_impl(arr):
+    # Same blocking as _sum_1d_impl(), for arrays which can only be
+    # iterated over with .flat
+    total = 0
+    big = 0
+    group = 0
+    block = 0
+    k = 0
+    for v in arr.flat:
+        block += v
+        k += 1
+        if (k & 127) == 0:
+            group += block
+            block = 0
+            if (k & 16383) == 0:
+                big += group
+                group = 0
+                if (k & 2097151) == 0:
+                    total += big
+                    big = 0
+    return total + (big + (group + block))
+
+_sum_accumulators = ('total', 'big', 'group', 'block',
+                     'c0', 'c1', 'c2', 'c3', 'c4', 'c5', 'c6', 'c7')
+
+def _prod_impl(arr):
+    c = 1
+    for v in arr.flat:
+        c *= v
+    return c
+
+# Like Numpy, empty reductions (e.g. empty lanes along an axis) give NaN
+
+def _mean_impl(total, size):
+    if size == 0:
+        return numpy.nan
+    return total / size
+
+def _var_1d_impl(a):
+    # Each block of 128 elements gets its mean and sum of squared
+    # deviations computed in two passes while it is in cache, and
+    # blocks are merged with the pairwise update of Chan et al.
+    # The array is thus read from memory only once.
+    n = a.shape[0]
+    if n == 0:
+        return numpy.nan
+    count = 0
+    mean = 0
+    m2 = 0
+    i = 0
+    while i < n:
+        block_end = min(i + 128, n)
+        block_size = block_end - i
+        s = 0
+        for j in range(i, block_end):
+            s += a[j]
+        block_mean = s / block_size
+        block_m2 = 0
+        for j in range(i, block_end):
+            d = a[j] - block_mean
+            block_m2 += d * d
+        new_count = count + block_size
+        delta = block_mean - mean
+        mean += delta * block_size / new_count
+        m2 += block_m2 + delta * delta * count * block_size / new_count
+        count = new_count
+        i = block_end
+    return m2 / n
+
+def _var_flat_impl(arr):
+    # Welford's online algorithm
+    n = 0
+    mean = 0
+    m2 = 0
+    for v in arr.flat:
+        n += 1
+        delta = v - mean
+        mean += delta / n
+        m2 += delta * (v - mean)
+    if n == 0:
+        return numpy.nan
+    return m2 / n
+
+_var_accumulators = ('mean', 'm2', 's', 'block_mean', 'block_m2', 'd',
+                     'delta')
+
+def _var_generic_impl(arry):
+    if arry.size == 0:
+        return numpy.nan
+    # Compute the mean
+    m = arry.mean()
+
+    # Compute the sum of square diffs
+    ssd = 0
+    for v in arry.flat:
+        ssd += (v - m) ** 2
+    return ssd / arry.size
+
+def _std_impl(var):
+    return var ** 0.5
+
+
+def _get_flat_view(context, builder, arrty, arr):
+    """
+    Return a (type, value) pair for a 1-d view over all elements of
+    the array *arr*, in memory order, or None if the array isn't 1-d
+    or contiguous.
+    """
+    if arrty.ndim == 1:
+        return arrty, arr
+    if arrty.ndim == 0 or arrty.layout not in ('C', 'F'):
+        return None
+    ary = make_array(arrty)(context, builder, arr)
+    viewty = arrty.copy(ndim=1, layout='C')
+    view = make_array(viewty)(context, builder)
+    populate_array(view,
+                   data=ary.data,
+                   shape=cgutils.pack_array(builder, [ary.nitems]),
+                   strides=cgutils.pack_array(builder, [ary.itemsize]),
+                   itemsize=ary.itemsize,
+                   meminfo=ary.meminfo,
+                   parent=ary.parent)
+    return viewty, view._getvalue()
 
-    def array_prod_impl(arr):
-        c = 1
-        for v in arr.flat:
-            c *= v
-        return c
 
-    return context.compile_internal(builder, array_prod_impl, sig, args,
-                                    locals=dict(c=sig.return_type))
+def _reduce_with(context, builder, retty, arrty, arr, impl_1d, impl_flat,
+                 accumulators):
+    """
+    Reduce all elements of the array *arr* to a *retty* value, using
+    *impl_1d* on a 1-d view of the array if possible, otherwise
+    *impl_flat*.  The *accumulators* variables are typed as *retty*.
+    """
+    locals = dict((name, retty) for name in accumulators)
+    view = _get_flat_view(context, builder, arrty, arr)
+    if view is not None:
+        arrty, arr = view
+        impl = impl_1d
+    else:
+        impl = impl_flat
+    return context.compile_internal(builder, impl,
+                                    typing.signature(retty, arrty), [arr],
+                                    locals=locals)
+
+
+def _reduce_sum(context, builder, retty, arrty, arr):
+    return _reduce_with(context, builder, retty, arrty, arr,
+                        _sum_1d_impl, _sum_flat_impl, _sum_accumulators)
+
+def _reduce_prod(context, builder, retty, arrty, arr):
+    return context.compile_internal(builder, _prod_impl,
+                                    typing.signature(retty, arrty), [arr],
+                                    locals=dict(c=retty))
+
+def _reduce_mean(context, builder, retty, arrty, arr):
+    # Can't use the naive `arr.sum() / arr.size`, as it would return
+    # a wrong result on integer sum overflow: sum in the result type.
+    total = _reduce_sum(context, builder, retty, arrty, arr)
+    nitems = make_array(arrty)(context, builder, arr).nitems
+    return context.compile_internal(builder, _mean_impl,
+                                    typing.signature(retty, retty, types.intp),
+                                    [total, nitems])
+
+def _reduce_var(context, builder, retty, arrty, arr):
+    if not isinstance(arrty.dtype, (types.Integer, types.Float)):
+        return context.compile_internal(builder, _var_generic_impl,
+                                        typing.signature(retty, arrty), [arr])
+    return _reduce_with(context, builder, retty, arrty, arr,
+                        _var_1d_impl, _var_flat_impl, _var_accumulators)
+
+def _reduce_std(context, builder, retty, arrty, arr):
+    var = _reduce_var(context, builder, retty, arrty, arr)
+    return context.compile_internal(builder, _std_impl,
+                                    typing.signature(retty, retty), [var])
+
+
+def _reduce_along_axis(context, builder, sig, args, reduce_lane):
+    """
+    Implement the reduction *sig* of an array along a runtime axis,
+    by calling reduce_lane(context, builder, retty, lanety, lane) on
+    1-d views of the array along the axis.
+    """
+    arrty, axisty = sig.args
+    retty = sig.return_type
+    ary = make_array(arrty)(context, builder, args[0])
+    axis = context.cast(builder, args[1], axisty, types.intp)
+    ndim = arrty.ndim
+    intp_t = context.get_value_type(types.intp)
+    zero = context.get_constant(types.intp, 0)
+    const_ndim = context.get_constant(types.intp, ndim)
+
+    # Normalize and check the axis
+    axis = builder.select(cgutils.is_neg_int(builder, axis),
+                          builder.add(axis, const_ndim), axis)
+    out_of_bounds = builder.or_(cgutils.is_neg_int(builder, axis),
+                                builder.icmp(lc.ICMP_SGE, axis, const_ndim))
+    with cgutils.if_unlikely(builder, out_of_bounds):
+        context.call_conv.return_user_exc(builder, ValueError,
+                                          ("axis is out of bounds",))
 
+    if ndim == 1:
+        return reduce_lane(context, builder, retty, arrty, args[0])
+
+    # Split the dimensions between the reduced axis and the others
+    shapes = cgutils.unpack_tuple(builder, ary.shape, ndim)
+    strides = cgutils.unpack_tuple(builder, ary.strides, ndim)
+    lane_len = zero
+    lane_stride = zero
+    for i in range(ndim):
+        is_axis = builder.icmp(lc.ICMP_EQ, axis,
+                               context.get_constant(types.intp, i))
+        lane_len = builder.select(is_axis, shapes[i], lane_len)
+        lane_stride = builder.select(is_axis, strides[i], lane_stride)
+    outer_shapes = []
+    outer_strides = []
+    for i in range(ndim - 1):
+        before = builder.icmp(lc.ICMP_SLT,
+                              context.get_constant(types.intp, i), axis)
+        outer_shapes.append(builder.select(before, shapes[i], shapes[i + 1]))
+        outer_strides.append(builder.select(before, strides[i],
+                                            strides[i + 1]))
+
+    out = _empty_nd_impl(context, builder, retty, outer_shapes)
+    lanety = arrty.copy(ndim=1, layout='A')
+    data = builder.bitcast(ary.data, lc.Type.pointer(lc.Type.int(8)))
+    with cgutils.loop_nest(builder, outer_shapes, intp_t) as indices:
+        offset = zero
+        for index, stride in zip(indices, outer_strides):
+            offset = builder.add(offset, builder.mul(index, stride))
+        lane = make_array(lanety)(context, builder)
+        populate_array(lane,
+                       data=builder.bitcast(builder.gep(data, [offset]),
+                                            ary.data.type),
+                       shape=cgutils.pack_array(builder, [lane_len]),
+                       strides=cgutils.pack_array(builder, [lane_stride]),
+                       itemsize=ary.itemsize,
+                       meminfo=ary.meminfo,
+                       parent=ary.parent)
+        res = reduce_lane(context, builder, retty.dtype, lanety,
+                          lane._getvalue())
+        ptr = cgutils.get_item_pointer(builder, retty, out, indices)
+        context.pack_value(builder, retty.dtype, res, ptr)
 
-@builtin
-@implement(numpy.mean, types.Kind(types.Array))
-@implement("array.mean", types.Kind(types.Array))
-def array_mean(context, builder, sig, args):
-    [arrty] = sig.args
+    return impl_ret_new_ref(context, builder, retty, out._getvalue())
 
-    def array_mean_impl(arr):
-        # Can't use the naive `arr.sum() / arr.size`, as it would return
-        # a wrong result on integer sum overflow.
-        c = 0
-        for v in arr.flat:
-            c += v
-        return c / arr.size
 
-    return context.compile_internal(builder, array_mean_impl, sig, args,
-                                    locals=dict(c=sig.return_type))
+def _make_reduction(reduce_all):
+    def array_reduce(context, builder, sig, args):
+        [arrty] = sig.args
+        [arr] = args
+        return reduce_all(context, builder, sig.return_type, arrty, arr)
 
+    def array_reduce_axis(context, builder, sig, args):
+        return _reduce_along_axis(context, builder, sig, args, reduce_all)
 
-@builtin
-@implement(numpy.var, types.Kind(types.Array))
-@implement("array.var", types.Kind(types.Array))
-def array_var(context, builder, sig, args):
-    def array_var_impl(arry):
-        # Compute the mean
-        m = arry.mean()
-
-        # Compute the sum of square diffs
-        ssd = 0
-        for v in arry.flat:
-            ssd += (v - m) ** 2
-        return ssd / arry.size
+    return array_reduce, array_reduce_axis
 
-    return context.compile_internal(builder, array_var_impl, sig, args)
 
+for _func, _name, _reduce in ((numpy.sum, "sum", _reduce_sum),
+                              (numpy.prod, "prod", _reduce_prod),
+                              (numpy.mean, "mean", _reduce_mean),
+                              (numpy.var, "var", _reduce_var),
+                              (numpy.std, "std", _reduce_std)):
+    _imp, _imp_axis = _make_reduction(_reduce)
+    _imp = implement(_func, types.Kind(types.Array))(_imp)
+    builtin(implement("array." + _name, types.Kind(types.Array))(_imp))
+    _imp_axis = implement(_func, types.Kind(types.Array),
+                          types.Kind(types.Integer))(_imp_axis)
+    builtin(implement("array." + _name, types.Kind(types.Array),
+                      types.Kind(types.Integer))(_imp_axis))
 
-@builtin
-@implement(numpy.std, types.Kind(types.Array))
-@implement("array.std", types.Kind(types.Array))
-def array_std(context, builder, sig, args):
-    def array_std_impl(arry):
-        return arry.var() ** 0.5
-    return context.compile_internal(builder, array_std_impl, sig, args)
+del _func, _name, _reduce, _imp, _imp_axis
 
 
 @builtin
@@ -706,7 +975,8 @@ def array_round(context, builder, sig, args):
             out[index] = numpy.round(val, decimals)
         return out
 
-    return context.compile_internal(builder, array_round_impl, sig, args)
+    res = context.compile_internal(builder, array_round_impl, sig, args)
+    return impl_ret_new_ref(context, builder, sig.return_type, res)
 
 
 #-------------------------------------------------------------------------------
@@ -817,8 +1087,10 @@ def array_record_getattr(context, builder, typ, value, attr):
                    shape=array.shape,
                    strides=array.strides,
                    itemsize=context.get_constant(types.intp, datasize),
+                   meminfo=array.meminfo,
                    parent=array.parent)
-    return rary._getvalue()
+    res = rary._getvalue()
+    return impl_ret_borrowed(context, builder, resty, res)
 
 
 
@@ -950,7 +1222,7 @@ def _make_flattening_iter_cls(flatiterty, kind):
             """
             .flat() / .ndenumerate() implementation for C-contiguous arrays.
             """
-            _fields = [('array', types.CPointer(array_type)),
+            _fields = [('array', array_type),
                        ('stride', types.intp),
                        ('pointer', types.CPointer(types.CPointer(dtype))),
                        ('index', types.CPointer(types.intp)),
@@ -1019,7 +1291,7 @@ def _make_flattening_iter_cls(flatiterty, kind):
             It keeps track of pointers along each dimension in order to
             minimize computations.
             """
-            _fields = [('array', types.CPointer(array_type)),
+            _fields = [('array', array_type),
                        ('pointers', types.CPointer(types.CPointer(dtype))),
                        ('indices', types.CPointer(types.intp)),
                        ('exhausted', types.CPointer(types.boolean)),
@@ -1132,15 +1404,15 @@ def make_array_flatiter(context, builder, arrty, arr):
     flatitercls = make_array_flat_cls(types.NumpyFlatType(arrty))
     flatiter = flatitercls(context, builder)
 
-    arrayptr = cgutils.alloca_once_value(builder, arr)
-    flatiter.array = arrayptr
+    flatiter.array = arr
 
     arrcls = context.make_array(arrty)
-    arr = arrcls(context, builder, ref=arrayptr)
+    arr = arrcls(context, builder, value=arr)
 
     flatiter.init_specific(context, builder, arrty, arr)
 
-    return flatiter._getvalue()
+    res = flatiter._getvalue()
+    return impl_ret_borrowed(context, builder, types.NumpyFlatType(arrty), res)
 
 
 @builtin
@@ -1155,7 +1427,7 @@ def iternext_numpy_flatiter(context, builder, sig, args, result):
 
     arrty = flatiterty.array_type
     arrcls = context.make_array(arrty)
-    arr = arrcls(context, builder, value=builder.load(flatiter.array))
+    arr = arrcls(context, builder, value=flatiter.array)
 
     flatiter.iternext_specific(context, builder, arrty, arr, result)
 
@@ -1168,15 +1440,15 @@ def make_array_ndenumerate(context, builder, sig, args):
     nditercls = make_array_ndenumerate_cls(types.NumpyNdEnumerateType(arrty))
     nditer = nditercls(context, builder)
 
-    arrayptr = cgutils.alloca_once_value(builder, arr)
-    nditer.array = arrayptr
+    nditer.array = arr
 
     arrcls = context.make_array(arrty)
-    arr = arrcls(context, builder, ref=arrayptr)
+    arr = arrcls(context, builder, value=arr)
 
     nditer.init_specific(context, builder, arrty, arr)
 
-    return nditer._getvalue()
+    res = nditer._getvalue()
+    return impl_ret_borrowed(context, builder, sig.return_type, res)
 
 
 @builtin
@@ -1191,7 +1463,7 @@ def iternext_numpy_nditer(context, builder, sig, args, result):
 
     arrty = nditerty.array_type
     arrcls = context.make_array(arrty)
-    arr = arrcls(context, builder, value=builder.load(nditer.array))
+    arr = arrcls(context, builder, value=nditer.array)
 
     nditer.iternext_specific(context, builder, arrty, arr, result)
 
@@ -1238,3 +1510,155 @@ def iternext_numpy_ndindex(context, builder, sig, args, result):
     nditer = nditercls(context, builder, value=nditer)
 
     nditer.iternext_specific(context, builder, result)
+
+
+#------------------------------------------------------------------------------
+# Array creation
+
+def _empty_nd_impl(context, builder, arrtype, shapes):
+    """
+    Allocate a new array of type *arrtype* and dimensions *shapes*
+    (a list of LLVM intp values), using the Numba runtime.
+    The array's data is left uninitialized.  The array structure is
+    returned.
+    """
+    arycls = make_array(arrtype)
+    ary = arycls(context, builder)
+
+    datatype = context.get_data_type(arrtype.dtype)
+    itemsize = context.get_constant(types.intp,
+                                    context.get_abi_sizeof(datatype))
+
+    # Check the dimensions and compute the total number of items
+    zero = context.get_constant(types.intp, 0)
+    arrlen = context.get_constant(types.intp, 1)
+    for s in shapes:
+        is_neg = builder.icmp_signed('<', s, zero)
+        with cgutils.if_unlikely(builder, is_neg):
+            context.call_conv.return_user_exc(
+                builder, ValueError, ("negative dimensions not allowed",))
+        arrlen = builder.mul(arrlen, s)
+
+    # Compute contiguous strides
+    if arrtype.layout == 'F':
+        strides = [itemsize]
+        for s in shapes[:-1]:
+            strides.append(builder.mul(strides[-1], s))
+    else:
+        strides = [itemsize]
+        for s in reversed(shapes[1:]):
+            strides.append(builder.mul(strides[-1], s))
+        strides.reverse()
+
+    allocsize = builder.mul(itemsize, arrlen)
+    meminfo = context.nrt_meminfo_alloc(builder, allocsize)
+    with cgutils.if_unlikely(builder, cgutils.is_null(builder, meminfo)):
+        context.call_conv.return_user_exc(builder, MemoryError,
+                                          ("array allocation failed",))
+    data = context.nrt_meminfo_data(builder, meminfo)
+
+    populate_array(ary,
+                   data=builder.bitcast(data, ary.data.type),
+                   shape=cgutils.pack_array(builder, shapes),
+                   strides=cgutils.pack_array(builder, strides),
+                   itemsize=itemsize,
+                   meminfo=meminfo)
+    return ary
+
+
+def _fill_array(context, builder, arrtype, ary, value):
+    """
+    Fill the contiguous array *ary* with the constant *value*.
+    """
+    val = context.get_constant(arrtype.dtype, value)
+    data = context.get_value_as_data(builder, arrtype.dtype, val)
+    intp_t = context.get_value_type(types.intp)
+    with cgutils.for_range(builder, ary.nitems, intp_t) as index:
+        ptr = builder.gep(ary.data, [index])
+        builder.store(data, ptr)
+
+
+def _parse_empty_args(context, builder, sig, args):
+    """
+    Parse the arguments of a np.empty(), np.zeros() or np.ones() call.
+    """
+    arrshapetype = sig.args[0]
+    arrshape = args[0]
+    if isinstance(arrshapetype, types.Integer):
+        shapes = [context.cast(builder, arrshape, arrshapetype, types.intp)]
+    else:
+        shapes = cgutils.unpack_tuple(builder, arrshape,
+                                      count=len(arrshapetype))
+        shapes = [context.cast(builder, s, arrshapetype.dtype, types.intp)
+                  for s in shapes]
+    return sig.return_type, shapes
+
+
+def _parse_empty_like_args(context, builder, sig, args):
+    """
+    Parse the arguments of a np.empty_like(), np.zeros_like() or
+    np.ones_like() call.
+    """
+    arytype = sig.args[0]
+    ary = make_array(arytype)(context, builder, value=args[0])
+    shapes = cgutils.unpack_tuple(builder, ary.shape, count=arytype.ndim)
+    return sig.return_type, shapes
+
+
+def _make_array_constructor(parse_args, fill_value):
+    def imp(context, builder, sig, args):
+        arrtype, shapes = parse_args(context, builder, sig, args)
+        ary = _empty_nd_impl(context, builder, arrtype, shapes)
+        if fill_value is not None:
+            _fill_array(context, builder, arrtype, ary, fill_value)
+        return impl_ret_new_ref(context, builder, sig.return_type,
+                                ary._getvalue())
+    return imp
+
+
+for _func, _fill_value in ((numpy.empty, None),
+                           (numpy.zeros, 0),
+                           (numpy.ones, 1)):
+    _imp = _make_array_constructor(_parse_empty_args, _fill_value)
+    _imp = implement(_func, types.Any)(_imp)
+    builtin(implement(_func, types.Any, types.Any)(_imp))
+
+for _func, _fill_value in ((numpy.empty_like, None),
+                           (numpy.zeros_like, 0),
+                           (numpy.ones_like, 1)):
+    _imp = _make_array_constructor(_parse_empty_like_args, _fill_value)
+    _imp = implement(_func, types.Kind(types.Array))(_imp)
+    builtin(implement(_func, types.Kind(types.Array), types.Any)(_imp))
+
+del _func, _fill_value, _imp
+
+
+@builtin
+@implement("array.copy", types.Kind(types.Array))
+def array_copy(context, builder, sig, args):
+    arytype = sig.args[0]
+    ary = make_array(arytype)(context, builder, value=args[0])
+    shapes = cgutils.unpack_tuple(builder, ary.shape, count=arytype.ndim)
+
+    rettype = sig.return_type
+    ret = _empty_nd_impl(context, builder, rettype, shapes)
+
+    src_data = ary.data
+    dest_data = ret.data
+    src_strides = cgutils.unpack_tuple(builder, ary.strides,
+                                       count=arytype.ndim)
+    dest_strides = cgutils.unpack_tuple(builder, ret.strides,
+                                        count=rettype.ndim)
+    intp_t = context.get_value_type(types.intp)
+
+    with cgutils.loop_nest(builder, shapes, intp_t) as indices:
+        src_ptr = cgutils.get_item_pointer2(builder, src_data,
+                                            shapes, src_strides,
+                                            arytype.layout, indices)
+        dest_ptr = cgutils.get_item_pointer2(builder, dest_data,
+                                             shapes, dest_strides,
+                                             rettype.layout, indices)
+        builder.store(builder.load(src_ptr), dest_ptr)
+
+    return impl_ret_new_ref(context, builder, sig.return_type,
+                            ret._getvalue())
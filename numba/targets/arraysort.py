@@ -0,0 +1,654 @@
+"""
+Implementation of sorting and searching for 1D arrays: ndarray.sort(),
+np.sort(), ndarray.argsort(), np.argsort() and np.searchsorted().
+
+The general algorithm is an introsort: a quicksort with median-of-three
+pivots, falling back on heapsort for partitions which recurse too deep,
+and finished by an insertion sort of the small partitions.  Large integer
+arrays are instead sorted with a LSD radix sort, which skips the byte
+positions shared by all keys (such as the high bytes of timestamps).
+
+Like Numpy, NaNs are sorted at the end, and NaTs wherever the installed
+Numpy version sorts them.  The kernels are written in Python and compiled
+in nopython mode.
+"""
+
+from __future__ import print_function, absolute_import, division
+
+import numpy
+
+from numba import types, cgutils
+from numba.typing import signature
+from numba.targets.imputils import builtin, implement, impl_ret_new_ref
+from .arrayobj import make_array, array_copy
+
+
+# Partitions smaller than this are left for the final insertion sort
+SMALL_SORT = 16
+
+# The maximum number of pending partitions.  At most log2(n) of them
+# are pending at any time, since the smaller partition is handled first.
+MAX_STACK = 100
+
+# Integer arrays at least this large are sorted with a radix sort
+RADIX_THRESHOLD = 1024
+
+# The int64 value of NaT, which is the smallest one
+_NAT = int(numpy.iinfo(numpy.int64).min)
+
+
+def _nat_sorts_last():
+    """
+    Whether the installed Numpy sorts NaTs last (Numpy 1.18 and later)
+    rather than first, as the smallest int64.
+    """
+    a = numpy.array(['NaT', '2000-01-01'], dtype='M8[D]')
+    return int(numpy.sort(a).view(numpy.int64)[0]) != _NAT
+
+NAT_SORTS_LAST = _nat_sorts_last()
+
+
+# In the kernels below, `x < y or (y != y and x == x)` is a less-than
+# comparison ordering NaNs last.  It folds to `x < y` for integers.
+
+def _introsort(a):
+    n = len(a)
+    if n < 2:
+        return
+    # Depth limit before switching to heapsort: 2 * floor(log2(n))
+    depth = 0
+    m = n
+    while m > 1:
+        m >>= 1
+        depth += 2
+    # Pending (lo, hi, depth) partitions, with inclusive bounds
+    stack = numpy.empty(MAX_STACK * 3, numpy.intp)
+    stack[0] = 0
+    stack[1] = n - 1
+    stack[2] = depth
+    sp = 1
+    while sp > 0:
+        sp -= 1
+        lo = stack[sp * 3]
+        hi = stack[sp * 3 + 1]
+        depth = stack[sp * 3 + 2]
+        while hi - lo >= SMALL_SORT:
+            if depth == 0:
+                # Heapsort a[lo:hi + 1]
+                size = hi - lo + 1
+                i = size >> 1
+                end = size
+                while True:
+                    if i > 0:
+                        # Building the heap
+                        i -= 1
+                    else:
+                        # Moving the heap's maximum to its final place
+                        end -= 1
+                        if end == 0:
+                            break
+                        x = a[lo]
+                        a[lo] = a[lo + end]
+                        a[lo + end] = x
+                    root = i
+                    while True:
+                        child = root * 2 + 1
+                        if child >= end:
+                            break
+                        if child + 1 < end:
+                            x = a[lo + child]
+                            y = a[lo + child + 1]
+                            if x < y or (y != y and x == x):
+                                child += 1
+                        x = a[lo + root]
+                        y = a[lo + child]
+                        if x < y or (y != y and x == x):
+                            a[lo + root] = y
+                            a[lo + child] = x
+                            root = child
+                        else:
+                            break
+                break
+            depth -= 1
+
+            # Median-of-three pivot selection, which also leaves
+            # sentinels at both ends of the partition
+            mid = lo + ((hi - lo) >> 1)
+            x = a[mid]
+            y = a[lo]
+            if x < y or (y != y and x == x):
+                a[mid] = y
+                a[lo] = x
+            x = a[hi]
+            y = a[mid]
+            if x < y or (y != y and x == x):
+                a[hi] = y
+                a[mid] = x
+                x = a[mid]
+                y = a[lo]
+                if x < y or (y != y and x == x):
+                    a[mid] = y
+                    a[lo] = x
+            pivot = a[mid]
+            a[mid] = a[hi - 1]
+            a[hi - 1] = pivot
+
+            i = lo
+            j = hi - 1
+            while True:
+                i += 1
+                x = a[i]
+                while x < pivot or (pivot != pivot and x == x):
+                    i += 1
+                    x = a[i]
+                j -= 1
+                y = a[j]
+                while pivot < y or (y != y and pivot == pivot):
+                    j -= 1
+                    y = a[j]
+                if i >= j:
+                    break
+                a[i] = y
+                a[j] = x
+            a[hi - 1] = a[i]
+            a[i] = pivot
+
+            # Push the larger partition and go on with the smaller one
+            if i - lo > hi - i:
+                stack[sp * 3] = lo
+                stack[sp * 3 + 1] = i - 1
+                lo = i + 1
+            else:
+                stack[sp * 3] = i + 1
+                stack[sp * 3 + 1] = hi
+                hi = i - 1
+            stack[sp * 3 + 2] = depth
+            sp += 1
+
+    # Insertion sort of the remaining small partitions
+    for i in range(1, n):
+        x = a[i]
+        j = i
+        while j > 0:
+            y = a[j - 1]
+            if x < y or (y != y and x == x):
+                a[j] = y
+                j -= 1
+            else:
+                break
+        a[j] = x
+
+
+def _arg_introsort(a):
+    # Same as _introsort(), but sorting an array of indices into *a*
+    n = len(a)
+    idx = numpy.empty(n, numpy.intp)
+    for i in range(n):
+        idx[i] = i
+    if n < 2:
+        return idx
+    depth = 0
+    m = n
+    while m > 1:
+        m >>= 1
+        depth += 2
+    stack = numpy.empty(MAX_STACK * 3, numpy.intp)
+    stack[0] = 0
+    stack[1] = n - 1
+    stack[2] = depth
+    sp = 1
+    while sp > 0:
+        sp -= 1
+        lo = stack[sp * 3]
+        hi = stack[sp * 3 + 1]
+        depth = stack[sp * 3 + 2]
+        while hi - lo >= SMALL_SORT:
+            if depth == 0:
+                size = hi - lo + 1
+                i = size >> 1
+                end = size
+                while True:
+                    if i > 0:
+                        i -= 1
+                    else:
+                        end -= 1
+                        if end == 0:
+                            break
+                        k = idx[lo]
+                        idx[lo] = idx[lo + end]
+                        idx[lo + end] = k
+                    root = i
+                    while True:
+                        child = root * 2 + 1
+                        if child >= end:
+                            break
+                        if child + 1 < end:
+                            x = a[idx[lo + child]]
+                            y = a[idx[lo + child + 1]]
+                            if x < y or (y != y and x == x):
+                                child += 1
+                        x = a[idx[lo + root]]
+                        y = a[idx[lo + child]]
+                        if x < y or (y != y and x == x):
+                            k = idx[lo + root]
+                            idx[lo + root] = idx[lo + child]
+                            idx[lo + child] = k
+                            root = child
+                        else:
+                            break
+                break
+            depth -= 1
+
+            mid = lo + ((hi - lo) >> 1)
+            x = a[idx[mid]]
+            y = a[idx[lo]]
+            if x < y or (y != y and x == x):
+                k = idx[mid]
+                idx[mid] = idx[lo]
+                idx[lo] = k
+            x = a[idx[hi]]
+            y = a[idx[mid]]
+            if x < y or (y != y and x == x):
+                k = idx[hi]
+                idx[hi] = idx[mid]
+                idx[mid] = k
+                x = a[idx[mid]]
+                y = a[idx[lo]]
+                if x < y or (y != y and x == x):
+                    k = idx[mid]
+                    idx[mid] = idx[lo]
+                    idx[lo] = k
+            pivot_idx = idx[mid]
+            pivot = a[pivot_idx]
+            idx[mid] = idx[hi - 1]
+            idx[hi - 1] = pivot_idx
+
+            i = lo
+            j = hi - 1
+            while True:
+                i += 1
+                x = a[idx[i]]
+                while x < pivot or (pivot != pivot and x == x):
+                    i += 1
+                    x = a[idx[i]]
+                j -= 1
+                y = a[idx[j]]
+                while pivot < y or (y != y and pivot == pivot):
+                    j -= 1
+                    y = a[idx[j]]
+                if i >= j:
+                    break
+                k = idx[i]
+                idx[i] = idx[j]
+                idx[j] = k
+            idx[hi - 1] = idx[i]
+            idx[i] = pivot_idx
+
+            if i - lo > hi - i:
+                stack[sp * 3] = lo
+                stack[sp * 3 + 1] = i - 1
+                lo = i + 1
+            else:
+                stack[sp * 3] = i + 1
+                stack[sp * 3 + 1] = hi
+                hi = i - 1
+            stack[sp * 3 + 2] = depth
+            sp += 1
+
+    for i in range(1, n):
+        k = idx[i]
+        x = a[k]
+        j = i
+        while j > 0:
+            y = a[idx[j - 1]]
+            if x < y or (y != y and x == x):
+                idx[j] = idx[j - 1]
+                j -= 1
+            else:
+                break
+        idx[j] = k
+    return idx
+
+
+def _make_radix_sorts(nbytes, signed):
+    """
+    Return (sort, argsort) radix sort kernels for integers of *nbytes*
+    bytes and the given signedness.  The keys are mapped to unsigned
+    integers with the same ordering by flipping their sign bit, then
+    sorted one byte at a time, starting with the least significant.
+    """
+    flip_shift = nbytes * 8 - 1
+    signed = int(signed)
+
+    def radix_sort(a):
+        n = len(a)
+        if n < 2:
+            return
+        flip = numpy.uint64(signed) << numpy.uint32(flip_shift)
+        mask = numpy.uint64(255)
+        keys = numpy.empty(n, numpy.uint64)
+        for i in range(n):
+            keys[i] = numpy.uint64(a[i]) ^ flip
+        tmp = numpy.empty(n, numpy.uint64)
+        counts = numpy.empty(256, numpy.intp)
+        for p in range(nbytes):
+            shift = numpy.uint32(p * 8)
+            for d in range(256):
+                counts[d] = 0
+            for i in range(n):
+                counts[(keys[i] >> shift) & mask] += 1
+            if counts[(keys[0] >> shift) & mask] == n:
+                # All keys have the same byte here
+                continue
+            total = 0
+            for d in range(256):
+                c = counts[d]
+                counts[d] = total
+                total += c
+            for i in range(n):
+                key = keys[i]
+                d = (key >> shift) & mask
+                tmp[counts[d]] = key
+                counts[d] += 1
+            keys, tmp = tmp, keys
+        for i in range(n):
+            a[i] = keys[i] ^ flip
+
+    def radix_argsort(a):
+        n = len(a)
+        idx = numpy.empty(n, numpy.intp)
+        for i in range(n):
+            idx[i] = i
+        if n < 2:
+            return idx
+        flip = numpy.uint64(signed) << numpy.uint32(flip_shift)
+        mask = numpy.uint64(255)
+        keys = numpy.empty(n, numpy.uint64)
+        for i in range(n):
+            keys[i] = numpy.uint64(a[i]) ^ flip
+        tmp = numpy.empty(n, numpy.uint64)
+        idx_tmp = numpy.empty(n, numpy.intp)
+        counts = numpy.empty(256, numpy.intp)
+        for p in range(nbytes):
+            shift = numpy.uint32(p * 8)
+            for d in range(256):
+                counts[d] = 0
+            for i in range(n):
+                counts[(keys[i] >> shift) & mask] += 1
+            if counts[(keys[0] >> shift) & mask] == n:
+                continue
+            total = 0
+            for d in range(256):
+                c = counts[d]
+                counts[d] = total
+                total += c
+            for i in range(n):
+                key = keys[i]
+                d = (key >> shift) & mask
+                pos = counts[d]
+                tmp[pos] = key
+                idx_tmp[pos] = idx[i]
+                counts[d] = pos + 1
+            keys, tmp = tmp, keys
+            idx, idx_tmp = idx_tmp, idx
+        return idx
+
+    return radix_sort, radix_argsort
+
+
+def _searchsorted_scalar(a, v):
+    # Leftmost insertion point, by binary search
+    lo = 0
+    hi = len(a)
+    while lo < hi:
+        mid = (lo + hi) >> 1
+        x = a[mid]
+        if x < v or (v != v and x == x):
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def _searchsorted_array(a, values):
+    n = len(a)
+    nvalues = len(values)
+    out = numpy.empty(nvalues, numpy.intp)
+    if nvalues == 0:
+        return out
+    lo = 0
+    hi = n
+    last = values[0]
+    for i in range(nvalues):
+        v = values[i]
+        # Like Numpy, reuse the previous bounds when the values are
+        # increasing, which is the common case
+        if last < v or (v != v and last == last):
+            hi = n
+        else:
+            lo = 0
+            if hi < n:
+                hi += 1
+            else:
+                hi = n
+        last = v
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            x = a[mid]
+            if x < v or (v != v and x == x):
+                lo = mid + 1
+            else:
+                hi = mid
+        out[i] = lo
+    return out
+
+
+# When NAT_SORTS_LAST is true, datetime and timedelta arrays are first
+# sorted as their int64 values, then these kernels move the NaTs (now at
+# the start) to the end.  Searching skips the trailing NaTs of *a*.
+
+def _move_nats_last(a):
+    n = len(a)
+    k = 0
+    while k < n and a[k] == _NAT:
+        k += 1
+    if k == 0 or k == n:
+        return
+    for i in range(n - k):
+        a[i] = a[i + k]
+    for i in range(n - k, n):
+        a[i] = _NAT
+
+
+def _move_nat_indices_last(a, idx):
+    n = len(idx)
+    k = 0
+    while k < n and a[idx[k]] == _NAT:
+        k += 1
+    if k == 0 or k == n:
+        return
+    nat_idx = numpy.empty(k, numpy.intp)
+    for i in range(k):
+        nat_idx[i] = idx[i]
+    for i in range(n - k):
+        idx[i] = idx[i + k]
+    for i in range(k):
+        idx[n - k + i] = nat_idx[i]
+
+
+def _searchsorted_scalar_nats_last(a, v):
+    # Number of non-NaT values, followed by the NaTs
+    lo = 0
+    hi = len(a)
+    while lo < hi:
+        mid = (lo + hi) >> 1
+        if a[mid] != _NAT:
+            lo = mid + 1
+        else:
+            hi = mid
+    if v == _NAT:
+        return lo
+    hi = lo
+    lo = 0
+    while lo < hi:
+        mid = (lo + hi) >> 1
+        if a[mid] < v:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def _searchsorted_array_nats_last(a, values):
+    nvalues = len(values)
+    out = numpy.empty(nvalues, numpy.intp)
+    lo = 0
+    hi = len(a)
+    while lo < hi:
+        mid = (lo + hi) >> 1
+        if a[mid] != _NAT:
+            lo = mid + 1
+        else:
+            hi = mid
+    n = lo
+    for i in range(nvalues):
+        v = values[i]
+        if v == _NAT:
+            out[i] = n
+            continue
+        lo = 0
+        hi = n
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            if a[mid] < v:
+                lo = mid + 1
+            else:
+                hi = mid
+        out[i] = lo
+    return out
+
+
+def _sorts_nats_last(typ):
+    if isinstance(typ, types.Array):
+        typ = typ.dtype
+    return NAT_SORTS_LAST and isinstance(typ, (types.NPDatetime,
+                                               types.NPTimedelta))
+
+
+def _as_sortable_type(typ):
+    """
+    Datetimes and timedeltas are sorted as their underlying int64 values,
+    which have the same representation.
+    """
+    if isinstance(typ, types.Array):
+        return typ.copy(dtype=_as_sortable_type(typ.dtype))
+    elif isinstance(typ, (types.NPDatetime, types.NPTimedelta)):
+        return types.int64
+    else:
+        return typ
+
+
+def _dispatch_on_size(context, builder, arytype, ary, restype,
+                      large_impl, small_impl):
+    """
+    Call *large_impl* on *ary* if it has at least RADIX_THRESHOLD
+    elements, *small_impl* otherwise.
+    """
+    sig = signature(restype, arytype)
+    size = make_array(arytype)(context, builder, ary).shape
+    size = cgutils.unpack_tuple(builder, size, count=1)[0]
+    is_large = builder.icmp_signed('>=', size,
+                                   context.get_constant(types.intp,
+                                                        RADIX_THRESHOLD))
+    res = cgutils.alloca_once(builder, context.get_value_type(restype))
+    with cgutils.ifelse(builder, is_large) as (then, otherwise):
+        with then:
+            builder.store(context.compile_internal(builder, large_impl,
+                                                   sig, [ary]), res)
+        with otherwise:
+            builder.store(context.compile_internal(builder, small_impl,
+                                                   sig, [ary]), res)
+    return builder.load(res)
+
+
+def _sort_inplace(context, builder, arytype, ary):
+    nats_last = _sorts_nats_last(arytype)
+    arytype = _as_sortable_type(arytype)
+    dtype = arytype.dtype
+    if isinstance(dtype, types.Integer):
+        radix_sort, _ = _make_radix_sorts(dtype.bitwidth // 8, dtype.signed)
+        _dispatch_on_size(context, builder, arytype, ary, types.none,
+                          radix_sort, _introsort)
+    else:
+        context.compile_internal(builder, _introsort,
+                                 signature(types.none, arytype), [ary])
+    if nats_last:
+        context.compile_internal(builder, _move_nats_last,
+                                 signature(types.none, arytype), [ary])
+
+
+def _argsort(context, builder, arytype, ary, restype):
+    nats_last = _sorts_nats_last(arytype)
+    arytype = _as_sortable_type(arytype)
+    dtype = arytype.dtype
+    if isinstance(dtype, types.Integer):
+        _, radix_argsort = _make_radix_sorts(dtype.bitwidth // 8,
+                                             dtype.signed)
+        res = _dispatch_on_size(context, builder, arytype, ary, restype,
+                                radix_argsort, _arg_introsort)
+    else:
+        res = context.compile_internal(builder, _arg_introsort,
+                                       signature(restype, arytype), [ary])
+    if nats_last:
+        context.compile_internal(builder, _move_nat_indices_last,
+                                 signature(types.none, arytype, restype),
+                                 [ary, res])
+    return res
+
+
+@builtin
+@implement("array.sort", types.Kind(types.Array))
+def array_sort(context, builder, sig, args):
+    _sort_inplace(context, builder, sig.args[0], args[0])
+    return context.get_dummy_value()
+
+
+@builtin
+@implement(numpy.sort, types.Kind(types.Array))
+def np_sort(context, builder, sig, args):
+    res = array_copy(context, builder, signature(sig.return_type, *sig.args),
+                     args)
+    _sort_inplace(context, builder, sig.return_type, res)
+    return impl_ret_new_ref(context, builder, sig.return_type, res)
+
+
+@builtin
+@implement("array.argsort", types.Kind(types.Array))
+@implement(numpy.argsort, types.Kind(types.Array))
+def array_argsort(context, builder, sig, args):
+    res = _argsort(context, builder, sig.args[0], args[0], sig.return_type)
+    return impl_ret_new_ref(context, builder, sig.return_type, res)
+
+
+@builtin
+@implement(numpy.searchsorted, types.Kind(types.Array), types.Any)
+def np_searchsorted(context, builder, sig, args):
+    arytype, valtype = sig.args
+    nats_last = _sorts_nats_last(arytype)
+    if isinstance(valtype, types.Array):
+        if nats_last:
+            impl = _searchsorted_array_nats_last
+        else:
+            impl = _searchsorted_array
+    else:
+        if nats_last:
+            impl = _searchsorted_scalar_nats_last
+        else:
+            impl = _searchsorted_scalar
+    sortable_sig = signature(sig.return_type, _as_sortable_type(arytype),
+                             _as_sortable_type(valtype))
+    res = context.compile_internal(builder, impl, sortable_sig, args)
+    if isinstance(valtype, types.Array):
+        return impl_ret_new_ref(context, builder, sig.return_type, res)
+    else:
+        return res
@@ -13,12 +13,14 @@ import llvmlite.binding as ll
 import numba
 from numba import types, utils, cgutils, typing, numpy_support
 from numba import _dynfunc, _helperlib
+from numba.runtime import nrt
 from numba.pythonapi import PythonAPI
 from numba.targets.imputils import (user_function, user_generator,
                                     python_attr_impl,
                                     builtin_registry, impl_attribute,
                                     struct_registry, type_registry)
-from . import arrayobj, builtins, iterators, rangeobj, optional
+from . import (arrayobj, arraysort, builtins, dictobj, iterators, listobj,
+               rangeobj, optional)
 from numba import datamodel
 
 try:
@@ -57,12 +59,46 @@ STRUCT_TYPES = {
 
 
 class Overloads(object):
+    """
+    The implementations of a function (or attribute) for various
+    signatures.  find() returns the first registered version matching
+    a signature, as a linear scan over the versions would; the versions
+    are indexed on their exact signature and on their first formal
+    argument so that only plausible candidates get matched.
+    """
+
     def __init__(self):
         # A list of (signature, implementation)
         self.versions = []
+        # Exact signature -> index of its first version
+        self._exact = {}
+        # First formal argument type -> indices of versions
+        self._by_type = defaultdict(list)
+        # Type class (from a first formal argument types.Kind(cls))
+        # -> indices of versions
+        self._by_kind = defaultdict(list)
+        # Indices of versions matching any first argument (no arguments,
+        # types.Any or types.VarArg as first formal argument)
+        self._generic = []
+        # Memoized results of find(): signature -> implementation
+        # (None if no version matches)
+        self._cache = {}
 
     def find(self, sig):
-        for ver_sig, impl in self.versions:
+        try:
+            impl = self._cache[sig]
+        except KeyError:
+            impl = self._cache[sig] = self._find(sig)
+        if impl is None:
+            raise NotImplementedError(self, sig)
+        return impl
+
+    def _find(self, sig):
+        exact = self._exact.get(sig)
+        for i in self._candidates(sig.args):
+            if exact is not None and i >= exact:
+                break
+            ver_sig, impl = self.versions[i]
             if ver_sig == sig:
                 return impl
 
@@ -70,7 +106,23 @@ class Overloads(object):
             if self._match_arglist(ver_sig.args, sig.args):
                 return impl
 
-        raise NotImplementedError(self, sig)
+        if exact is not None:
+            return self.versions[exact][1]
+        return None
+
+    def _candidates(self, actual_args):
+        """
+        Return the sorted indices of the versions which can match
+        *actual_args*, judging by the first argument.
+        """
+        if not actual_args:
+            return self._generic
+        first = actual_args[0]
+        indices = set(self._generic)
+        indices.update(self._by_type.get(first, ()))
+        for cls in type(first).__mro__:
+            indices.update(self._by_kind.get(cls, ()))
+        return sorted(indices)
 
     def _match_arglist(self, formal_args, actual_args):
         if formal_args and isinstance(formal_args[-1], types.VarArg):
@@ -101,7 +153,21 @@ class Overloads(object):
             return True
 
     def append(self, impl, sig):
+        index = len(self.versions)
         self.versions.append((sig, impl))
+        self._exact.setdefault(sig, index)
+
+        first = sig.args[0] if sig.args else None
+        if (first is None or types.Any == first or
+                isinstance(first, types.VarArg)):
+            # A VarArg's dtype could be a Kind or Any as well; such
+            # signatures are rare enough to always be tried.
+            self._generic.append(index)
+        else:
+            self._by_type[first].append(index)
+            if isinstance(first, types.Kind):
+                self._by_kind[first.of].append(index)
+        self._cache.clear()
 
 
 @utils.runonce
@@ -118,6 +184,10 @@ def _load_global_helpers():
             c_address = c_helpers[py_name]
             ll.add_symbol(c_name, c_address)
 
+    # Add Numba runtime functions
+    for py_name, c_address in nrt.c_helpers.items():
+        ll.add_symbol("NRT_" + py_name, c_address)
+
     # Add all built-in exception classes
     for obj in utils.builtins.__dict__.values():
         if isinstance(obj, type) and issubclass(obj, BaseException):
@@ -146,6 +216,17 @@ class BaseContext(object):
     implement_powi_as_math_call = False
     implement_pow_as_math_call = False
 
+    # Whether the Numba runtime (NRT) is available for memory management
+    # (e.g. allocating arrays); if False, refcounting operations are no-ops.
+    enable_nrt = False
+
+    # Whether array expressions are run on several threads (see parfor.py)
+    auto_parallel = False
+
+    # Whether floating-point operations may be reassociated and assume
+    # finite, non-NaN values (the target may ignore it)
+    fastmath = False
+
     def __init__(self, typing_context):
         _load_global_helpers()
         self.address_size = utils.MACHINE_BITS
@@ -170,6 +251,19 @@ class BaseContext(object):
         """
         pass
 
+    def subtarget(self, **kws):
+        """
+        Return a copy of this context with the given attributes (e.g.
+        auto_parallel) overridden.  Registered functions and other
+        compiler state are shared with the original context.
+        """
+        obj = copy.copy(self)
+        for k, v in kws.items():
+            if not hasattr(obj, k):
+                raise NameError("unknown option %r" % (k,))
+            setattr(obj, k, v)
+        return obj
+
     def get_arg_packer(self, fe_args):
         return datamodel.ArgPacker(self.data_model_manager, fe_args)
 
@@ -483,7 +577,8 @@ class BaseContext(object):
                         shape=cgutils.pack_array(builder, newshape),
                         strides=cgutils.pack_array(builder, newstrides),
                         itemsize=context.get_constant(types.intp, elemty.size),
-                        parent=ary.parent
+                        meminfo=None,
+                        parent=None,
                     )
 
                     return ary._getvalue()
@@ -818,7 +913,7 @@ class BaseContext(object):
     def compile_internal(self, builder, impl, sig, args, locals={}):
         """Invoke compiler to implement a function for a nopython function
         """
-        cache_key = (impl.__code__, sig)
+        cache_key = (impl.__code__, sig, self.fastmath)
         if impl.__closure__:
             # XXX This obviously won't work if a cell's value is
             # unhashable.
@@ -883,6 +978,34 @@ class BaseContext(object):
         """
         return arrayobj.populate_array(arr, **kwargs)
 
+    def make_list(self, builder, typ, value):
+        """
+        Return a helper object for accessing the native list *value*
+        of type *typ*.
+        """
+        return listobj.ListInstance(self, builder, typ, value)
+
+    def build_list(self, builder, typ, items):
+        """
+        Build a new list of type *typ* holding the LLVM values *items*.
+        A new reference is returned.
+        """
+        return listobj.build_list(self, builder, typ, items)
+
+    def make_dict(self, builder, typ, value):
+        """
+        Return a helper object for accessing the native dict *value*
+        of type *typ*.
+        """
+        return dictobj.DictInstance(self, builder, typ, value)
+
+    def build_map(self, builder, typ, size):
+        """
+        Build a new empty dict of type *typ*, presized for *size* items
+        (a Python int).  A new reference is returned.
+        """
+        return dictobj.build_map(self, builder, typ, size)
+
     def make_complex(self, typ):
         cls, _ = builtins.get_complex_info(typ)
         return cls
@@ -922,11 +1045,72 @@ class BaseContext(object):
 
         # Create array structure
         cary = self.make_array(typ)(self, builder)
-        cary.data = builder.bitcast(data, cary.data.type)
-        cary.shape = cshape
-        cary.strides = cstrides
+        itemsize = self.get_constant(types.intp, ary.itemsize)
+        self.populate_array(cary,
+                            data=builder.bitcast(data, cary.data.type),
+                            shape=cshape,
+                            strides=cstrides,
+                            itemsize=itemsize)
         return cary._getvalue()
 
+    def nrt_meminfo_alloc(self, builder, size, align=32):
+        """
+        Allocate a new MemInfo with a data payload of *size* bytes
+        (a LLVM intp value), aligned on *align* bytes.
+        A pointer to the MemInfo is returned; it is NULL on failure.
+        """
+        if not self.enable_nrt:
+            raise NotImplementedError("NRT required but not enabled")
+        mod = cgutils.get_module(builder)
+        fnty = Type.function(GENERIC_POINTER,
+                             [self.get_value_type(types.intp), Type.int(32)])
+        fn = mod.get_or_insert_function(fnty,
+                                        name="NRT_MemInfo_alloc_aligned")
+        return builder.call(fn, [size, Constant.int(Type.int(32), align)])
+
+    def nrt_meminfo_data(self, builder, meminfo):
+        """
+        Get the data pointer of the given MemInfo.
+        """
+        mod = cgutils.get_module(builder)
+        fnty = Type.function(GENERIC_POINTER, [GENERIC_POINTER])
+        fn = mod.get_or_insert_function(fnty, name="NRT_MemInfo_data")
+        return builder.call(fn, [meminfo])
+
+    def _call_nrt_incref_decref(self, builder, typ, value, funcname):
+        try:
+            datamodel = self.data_model_manager[typ]
+        except KeyError:
+            # No data model => no NRT-managed memory
+            return
+        members = datamodel.traverse(builder, value)
+        for mtyp, mval in members:
+            self._call_nrt_incref_decref(builder, mtyp, mval, funcname)
+        if datamodel.has_nrt_meminfo():
+            meminfo = datamodel.get_nrt_meminfo(builder, value)
+            mod = cgutils.get_module(builder)
+            fnty = Type.function(Type.void(), [GENERIC_POINTER])
+            fn = mod.get_or_insert_function(fnty, name=funcname)
+            with cgutils.ifthen(builder,
+                                cgutils.is_not_null(builder, meminfo)):
+                builder.call(fn, [meminfo])
+
+    def nrt_incref(self, builder, typ, value):
+        """
+        Acquire a new reference to the NRT-managed memory referenced
+        by *value* of type *typ*, if any.
+        """
+        if self.enable_nrt:
+            self._call_nrt_incref_decref(builder, typ, value, "NRT_incref")
+
+    def nrt_decref(self, builder, typ, value):
+        """
+        Release a reference to the NRT-managed memory referenced
+        by *value* of type *typ*, if any.
+        """
+        if self.enable_nrt:
+            self._call_nrt_incref_decref(builder, typ, value, "NRT_decref")
+
     def get_abi_sizeof(self, ty):
         """
         Get the ABI size of LLVM type *ty*.
@@ -7,7 +7,7 @@ from llvmlite.llvmpy.core import Type, Constant
 import llvmlite.llvmpy.core as lc
 
 from .imputils import (builtin, builtin_attr, implement, impl_attribute,
-                       iternext_impl, struct_factory)
+                       iternext_impl, struct_factory, impl_ret_borrowed)
 from . import optional
 from .. import typing, types, cgutils, utils, intrinsics
 
@@ -1151,7 +1151,8 @@ def getiter_unituple(context, builder, sig, args):
     iterval.index = indexptr
     iterval.tuple = tup
 
-    return iterval._getvalue()
+    res = iterval._getvalue()
+    return impl_ret_borrowed(context, builder, sig.return_type, res)
 
 
 # Unfortunately, we can't make decorate UniTupleIter with iterator_impl
@@ -1176,8 +1177,10 @@ def iternext_unituple(context, builder, sig, args, result):
     result.set_valid(is_valid)
 
     with cgutils.ifthen(builder, is_valid):
-        getitem_sig = typing.signature(sig.return_type, tupiterty.unituple,
-                                       types.intp)
+        getitem_sig = typing.signature(tupiterty.unituple.dtype,
+                                       tupiterty.unituple, types.intp)
+        # getitem_unituple() returns a new reference, which is transferred
+        # to the iternext() result.
         result.yield_(getitem_unituple(context, builder, getitem_sig, [tup, idx]))
         nidx = builder.add(idx, context.get_constant(types.intp, 1))
         builder.store(nidx, iterval.index)
@@ -1211,7 +1214,7 @@ def getitem_unituple(context, builder, sig, args):
             phinode.add_incoming(value, bbi)
 
     builder.position_at_end(bbend)
-    return phinode
+    return impl_ret_borrowed(context, builder, tupty.dtype, phinode)
 
 #-------------------------------------------------------------------------------
 
@@ -1436,9 +1439,11 @@ def array_ravel_impl(context, builder, sig, args):
                            shape=cgutils.pack_array(builder, [size]),
                            strides=cgutils.pack_array(builder, [unit_stride]),
                            itemsize=arr.itemsize,
+                           meminfo=arr.meminfo,
                            parent=arr.parent)
 
-    return flatarr._getvalue()
+    res = flatarr._getvalue()
+    return impl_ret_borrowed(context, builder, sig.return_type, res)
 
 
 # -----------------------------------------------------------------------------
@@ -1,14 +1,16 @@
 from __future__ import print_function, division, absolute_import
 
 import functools
+import itertools
 import sys
+import weakref
 
 import llvmlite.llvmpy.core as lc
 import llvmlite.llvmpy.passes as lp
 import llvmlite.binding as ll
 import llvmlite.ir as llvmir
 
-from numba import config, utils
+from numba import config, profiling, utils
 
 
 _x86arch = frozenset(['x86', 'i386', 'i486', 'i586', 'i686', 'i786',
@@ -19,6 +21,14 @@ def _is_x86(triple):
     return arch in _x86arch
 
 
+def _global_values(llvm_module):
+    """
+    Iterate over the functions and global variables of *llvm_module*.
+    """
+    return itertools.chain(llvm_module.functions,
+                           llvm_module.global_variables)
+
+
 def dump(header, body):
     print(header.center(80, '-'))
     print(body)
@@ -33,6 +43,9 @@ class CodeLibrary(object):
     """
 
     _finalized = False
+    _object_caching_enabled = False
+    # The LLVM optimization level (None for config.OPT)
+    _opt_level = None
 
     def __init__(self, codegen, name):
         self._codegen = codegen
@@ -40,6 +53,8 @@ class CodeLibrary(object):
         self._linking_libraries = set()
         self._final_module = ll.parse_assembly(
             str(self._codegen._create_empty_module(self._name)))
+        # Remember this on the module, for the object cache hooks
+        self._final_module.__library = weakref.proxy(self)
         self._shared_module = None
 
     @property
@@ -61,15 +76,25 @@ class CodeLibrary(object):
         if not self._finalized:
             self.finalize()
 
+    def set_opt_level(self, level):
+        """
+        Set the LLVM optimization level for the code added to this
+        library, instead of the default config.OPT.  A lower level
+        makes compiling faster, at the expense of the generated code.
+        """
+        self._raise_if_finalized()
+        self._opt_level = level
+
     def _optimize_functions(self, ll_module):
         """
         Internal: run function-level optimizations inside *ll_module*.
         """
         # Enforce data layout to enable layout-specific optimizations
         ll_module.data_layout = self._codegen._data_layout
-        with self._codegen._function_pass_manager(ll_module) as fpm:
-            # Run function-level optimizations to reduce memory usage and improve
-            # module-level optimization.
+        with self._codegen._function_pass_manager(ll_module,
+                                                  self._opt_level) as fpm:
+            # Run function-level optimizations to reduce memory usage and
+            # improve module-level optimization.
             for func in ll_module.functions:
                 fpm.initialize()
                 fpm.run(func)
@@ -79,7 +104,8 @@ class CodeLibrary(object):
         """
         Internal: optimize this library's final module.
         """
-        self._codegen._mpm.run(self._final_module)
+        mpm = self._codegen._get_module_pass_manager(self._opt_level)
+        mpm.run(self._final_module)
 
     def _get_module_for_linking(self):
         """
@@ -140,32 +166,33 @@ class CodeLibrary(object):
         linking.
         """
         self._raise_if_finalized()
+        profile = profiling.current_profile()
+        measure_ir = profile is not None and profiling.measure_ir_sizes()
+        start = profiling._timer()
 
         if config.DUMP_FUNC_OPT:
-            dump("FUNCTION OPTIMIZED DUMP %s" % self._name, self.get_llvm_str())
+            dump("FUNCTION OPTIMIZED DUMP %s" % self._name,
+                 self.get_llvm_str())
 
         # Link libraries for shared code
         for library in self._linking_libraries:
             self._final_module.link_in(
                 library._get_module_for_linking(), preserve=True)
-        for library in self._codegen._libraries:
-            self._final_module.link_in(
-                library._get_module_for_linking(), preserve=True)
+        self._link_codegen_libraries()
 
+        ir_size_before = len(self.get_llvm_str()) if measure_ir else None
         # Optimize the module after all dependences are linked in above,
         # to allow for inlining.
         self._optimize_final_module()
+        ir_size_after = len(self.get_llvm_str()) if measure_ir else None
 
         self._final_module.verify()
-        # It seems add_module() must be done only here and not before
-        # linking in other modules, otherwise get_pointer_to_function()
-        # could fail.
-        cleanup = self._codegen._add_module(self._final_module)
-        if cleanup:
-            utils.finalize(self, cleanup)
-        self._finalize_specific()
+        self._finalize_final_module()
 
-        self._finalized = True
+        if profile is not None:
+            profile.llvm.append(profiling.LLVMTiming(
+                self._name, start, profiling._timer() - start,
+                ir_size_before, ir_size_after))
 
         if config.DUMP_OPTIMIZED:
             dump("OPTIMIZED DUMP %s" % self._name, self.get_llvm_str())
@@ -177,6 +204,43 @@ class CodeLibrary(object):
             if asm:
                 dump("ASSEMBLY %s" % self._name, self.get_asm_str())
 
+    def _link_codegen_libraries(self):
+        """
+        Internal: link in the codegen-wide libraries which define
+        functions or global variables referenced by the final module.
+        Only those are linked (and, transitively, the ones they depend
+        on), so that the cost of finalizing doesn't grow with the amount
+        of code compiled so far.
+        """
+        linked = set()
+        while True:
+            to_link = set()
+            for gv in _global_values(self._final_module):
+                if gv.is_declaration:
+                    library = self._codegen._find_defining_library(gv.name)
+                    if library is not None and library not in linked:
+                        to_link.add(library)
+            if not to_link:
+                break
+            for library in to_link:
+                self._final_module.link_in(
+                    library._get_module_for_linking(), preserve=True)
+            linked |= to_link
+
+    def _finalize_final_module(self):
+        """
+        Make the underlying LLVM module ready to use.
+        """
+        # It seems add_module() must be done only here and not before
+        # linking in other modules, otherwise get_pointer_to_function()
+        # could fail.
+        cleanup = self._codegen._add_module(self._final_module)
+        if cleanup:
+            utils.finalize(self, cleanup)
+        self._finalize_specific()
+
+        self._finalized = True
+
     def get_function(self, name):
         return self._final_module.get_function(name)
 
@@ -192,6 +256,90 @@ class CodeLibrary(object):
         """
         return str(self._codegen._tm.emit_assembly(self._final_module))
 
+    #
+    # Object cache hooks and serialization
+    #
+
+    def enable_object_caching(self):
+        """
+        Keep the native object code generated for this library, so that
+        it can be serialized later using serialize_using_object_code().
+        Must be called before the library is finalized.
+        """
+        self._raise_if_finalized()
+        self._object_caching_enabled = True
+        self._compiled_object = None
+        self._compiled = False
+
+    def _get_compiled_object(self):
+        if not self._object_caching_enabled:
+            raise ValueError("object caching not enabled in %s" % (self,))
+        if self._compiled_object is None:
+            raise RuntimeError("no compiled object yet for %s" % (self,))
+        return self._compiled_object
+
+    def _set_compiled_object(self, value):
+        if not self._object_caching_enabled:
+            raise ValueError("object caching not enabled in %s" % (self,))
+        if self._compiled:
+            raise ValueError("library already compiled: %s" % (self,))
+        self._compiled_object = value
+
+    @classmethod
+    def _object_compiled_hook(cls, ll_module, buf):
+        """
+        `ll_module` was compiled into object code `buf`.
+        """
+        try:
+            self = ll_module.__library
+        except AttributeError:
+            return
+        if self._object_caching_enabled:
+            self._compiled = True
+            self._compiled_object = buf
+
+    @classmethod
+    def _object_getbuffer_hook(cls, ll_module):
+        """
+        Return a cached object code for `ll_module`, if any.
+        """
+        try:
+            self = ll_module.__library
+        except AttributeError:
+            return
+        if self._object_caching_enabled and self._compiled_object:
+            buf = self._compiled_object
+            self._compiled_object = None
+            return buf
+
+    def serialize_using_object_code(self):
+        """
+        Serialize this library using its object code as the cached
+        representation.  The module for linking into other libraries
+        is serialized as LLVM bitcode, to allow for further inlining.
+        """
+        self._ensure_finalized()
+        data = (self._get_compiled_object(),
+                self._get_module_for_linking().as_bitcode())
+        return (self._name, 'object', data)
+
+    @classmethod
+    def _unserialize(cls, codegen, state):
+        name, kind, data = state
+        self = codegen.create_library(name)
+        assert isinstance(self, cls)
+        if kind == 'object':
+            object_code, shared_bitcode = data
+            self.enable_object_caching()
+            self._set_compiled_object(object_code)
+            self._shared_module = ll.parse_bitcode(shared_bitcode)
+            # The final module is left empty: the execution engine
+            # will pick the cached object code instead of compiling it.
+            self._finalize_final_module()
+            return self
+        else:
+            raise ValueError("unsupported serialization kind %r" % (kind,))
+
 
 class AOTCodeLibrary(CodeLibrary):
 
@@ -217,6 +365,26 @@ class AOTCodeLibrary(CodeLibrary):
     def _finalize_specific(self):
         pass
 
+    def internalize(self, exports):
+        """
+        Give internal linkage to all functions and global variables this
+        library defines, except those named in *exports*.  This allows
+        linking several object files emitted from similar libraries
+        (e.g. for different CPUs) without symbol clashes.
+
+        This function implicitly calls .finalize().
+        """
+        self._ensure_finalized()
+        exports = set(exports)
+        for value in itertools.chain(self._final_module.functions,
+                                     self._final_module.global_variables):
+            if value.is_declaration or value.name in exports:
+                continue
+            if value.name.startswith('llvm.'):
+                # Special globals (such as llvm.global_ctors)
+                continue
+            value.linkage = 'internal'
+
 
 class JITCodeLibrary(CodeLibrary):
 
@@ -228,8 +396,7 @@ class JITCodeLibrary(CodeLibrary):
         This function implicitly calls .finalize().
         """
         self._ensure_finalized()
-        func = self.get_function(name)
-        return self._codegen._engine.get_pointer_to_function(func)
+        return self._codegen._engine.get_function_address(name)
 
     def _finalize_specific(self):
         self._codegen._engine.finalize_object()
@@ -239,6 +406,9 @@ class BaseCPUCodegen(object):
 
     def __init__(self, module_name):
         self._libraries = set()
+        # A mapping of function and global variable names to the
+        # library defining them, for the libraries in self._libraries
+        self._defining_libraries = {}
         self._data_layout = None
         self._llvm_module = ll.parse_assembly(
             str(self._create_empty_module(module_name)))
@@ -251,6 +421,8 @@ class BaseCPUCodegen(object):
         tm_options = dict(cpu='', features='', opt=config.OPT)
         self._customize_tm_options(tm_options)
         tm = target.create_target_machine(**tm_options)
+        self._tm_cpu = tm_options['cpu']
+        self._tm_features = tm_options['features']
 
         # MCJIT is still defective under Windows
         if sys.platform.startswith('win32'):
@@ -266,6 +438,8 @@ class BaseCPUCodegen(object):
         self._target_data = engine.target_data
         self._data_layout = str(self._target_data)
         self._mpm = self._module_pass_manager()
+        # Module pass managers for non-default optimization levels
+        self._level_mpms = {}
 
     def _create_empty_module(self, name):
         ir_module = lc.Module.new(name)
@@ -288,6 +462,25 @@ class BaseCPUCodegen(object):
         """
         library._ensure_finalized()
         self._libraries.add(library)
+        for gv in _global_values(library._get_module_for_linking()):
+            if not gv.is_declaration:
+                self._defining_libraries.setdefault(gv.name, library)
+
+    def share_linking_libraries(self, codegen):
+        """
+        Share the libraries added with add_linking_library() with
+        another *codegen* object, so that libraries created by either
+        can link against them.
+        """
+        self._libraries = codegen._libraries
+        self._defining_libraries = codegen._defining_libraries
+
+    def _find_defining_library(self, name):
+        """
+        Return the library added with add_linking_library() which
+        defines the function or global variable *name*, or None.
+        """
+        return self._defining_libraries.get(name)
 
     def create_library(self, name):
         """
@@ -296,36 +489,68 @@ class BaseCPUCodegen(object):
         """
         return self._library_class(self, name)
 
-    def _module_pass_manager(self):
+    def unserialize_library(self, serialized):
+        """
+        Recreate a :class:`CodeLibrary` object from the result of
+        its serialize_using_object_code() method.
+        """
+        return self._library_class._unserialize(self, serialized)
+
+    def magic_tuple(self):
+        """
+        Return a tuple unambiguously describing the codegen behaviour,
+        i.e. the target triple, CPU name and feature string.  Native code
+        compiled with a given magic tuple can only be reused by a codegen
+        with an identical magic tuple.
+        """
+        return (self._llvm_module.triple, self._tm_cpu, self._tm_features)
+
+    def _module_pass_manager(self, opt=None):
         pm = ll.create_module_pass_manager()
         dl = ll.create_target_data(self._data_layout)
         dl.add_pass(pm)
         self._tli.add_pass(pm)
         self._tm.add_analysis_passes(pm)
-        with self._pass_manager_builder() as pmb:
+        with self._pass_manager_builder(opt) as pmb:
             pmb.populate(pm)
         return pm
 
-    def _function_pass_manager(self, llvm_module):
+    def _get_module_pass_manager(self, opt=None):
+        """
+        Return the (shared) module pass manager for optimization level
+        *opt* (None for config.OPT).
+        """
+        if opt is None or opt == config.OPT:
+            return self._mpm
+        try:
+            return self._level_mpms[opt]
+        except KeyError:
+            pm = self._level_mpms[opt] = self._module_pass_manager(opt)
+            return pm
+
+    def _function_pass_manager(self, llvm_module, opt=None):
         pm = ll.create_function_pass_manager(llvm_module)
         self._target_data.add_pass(pm)
         self._tli.add_pass(pm)
         self._tm.add_analysis_passes(pm)
-        with self._pass_manager_builder() as pmb:
+        with self._pass_manager_builder(opt) as pmb:
             pmb.populate(pm)
         return pm
 
-    def _pass_manager_builder(self):
+    def _pass_manager_builder(self, opt=None):
         """
-        Create a PassManagerBuilder.
+        Create a PassManagerBuilder for optimization level *opt*
+        (None for config.OPT).
 
         Note: a PassManagerBuilder seems good only for one use, so you
         should call this method each time you want to populate a module
         or function pass manager.  Otherwise some optimizations will be
         missed...
         """
+        if opt is None:
+            opt = config.OPT
         pmb = lp.create_pass_manager_builder(
-            opt=config.OPT, loop_vectorize=config.LOOP_VECTORIZE)
+            opt=opt, loop_vectorize=config.LOOP_VECTORIZE)
         return pmb
 
 
@@ -337,7 +562,18 @@ class AOTCPUCodegen(BaseCPUCodegen):
 
     _library_class = AOTCodeLibrary
 
+    def __init__(self, module_name, cpu_name=None, features=None):
+        # By default, produce code for a generic CPU of the target
+        # architecture.  "host" designates the compiling machine's CPU.
+        if cpu_name == 'host':
+            cpu_name = ll.get_host_cpu_name()
+        self._cpu_name = cpu_name or ''
+        self._features = features or ''
+        BaseCPUCodegen.__init__(self, module_name)
+
     def _customize_tm_options(self, options):
+        options['cpu'] = self._cpu_name
+        options['features'] = self._features
         options['reloc'] = 'pic'
         options['codemodel'] = 'default'
 
@@ -352,20 +588,43 @@ class JITCPUCodegen(BaseCPUCodegen):
 
     _library_class = JITCodeLibrary
 
+    def __init__(self, module_name, cpu_name=None, features=None):
+        # By default, specialize for the host CPU (or the CPU given
+        # by NUMBA_CPU_NAME and NUMBA_CPU_FEATURES).
+        self._cpu_name = cpu_name
+        self._features = features
+        BaseCPUCodegen.__init__(self, module_name)
+
+    def _init(self, llvm_module):
+        super(JITCPUCodegen, self)._init(llvm_module)
+        # Allow the native code of libraries to be captured after
+        # compilation and injected back when loading them from a cache.
+        library_class = self._library_class
+        self._engine.set_object_cache(library_class._object_compiled_hook,
+                                      library_class._object_getbuffer_hook)
+
     def _customize_tm_options(self, options):
         features = []
 
         # As long as we don't want to ship the code to another machine,
         # we can specialize for this CPU.
-        options['cpu'] = ll.get_host_cpu_name()
+        # "host" designates this CPU explicitly, as for AOTCPUCodegen.
+        cpu_name = self._cpu_name or config.CPU_NAME
+        if not cpu_name or cpu_name == 'host':
+            cpu_name = ll.get_host_cpu_name()
+        options['cpu'] = cpu_name
 
         options['reloc'] = 'default'
         options['codemodel'] = 'jitdefault'
 
-        # There are various performance issues with AVX and LLVM 3.5
-        # (list at http://llvm.org/bugs/buglist.cgi?quicksearch=avx).
-        # For now we'd rather disable it, since it can pessimize the code.
-        if not config.ENABLE_AVX:
+        if self._features is not None:
+            features.append(self._features)
+        elif config.CPU_FEATURES is not None:
+            features.append(config.CPU_FEATURES)
+        elif not config.ENABLE_AVX:
+            # There are various performance issues with AVX and LLVM 3.5
+            # (list at http://llvm.org/bugs/buglist.cgi?quicksearch=avx).
+            # For now we'd rather disable it, since it can pessimize the code.
             features.append('-avx')
 
         # Set feature attributes
@@ -12,8 +12,8 @@ from .base import BaseContext, PYOBJECT
 from numba import utils, cgutils, types
 from numba.utils import cached_property
 from numba.targets import (
-    callconv, codegen, externals, intrinsics, cmathimpl, mathimpl,
-    npyimpl, operatorimpl, printimpl, randomimpl)
+    callconv, codegen, externals, fastmathpass, intrinsics, cmathimpl,
+    mathimpl, npyimpl, operatorimpl, printimpl, randomimpl)
 from .options import TargetOptions
 
 
@@ -34,6 +34,8 @@ class CPUContext(BaseContext):
     """
     Changes BaseContext calling convention
     """
+    enable_nrt = True
+
     # Overrides
     def create_module(self, name):
         return self._internal_codegen._create_empty_module(name)
@@ -54,17 +56,38 @@ class CPUContext(BaseContext):
         self.install_registry(randomimpl.registry)
 
         self._internal_codegen = codegen.JITCPUCodegen("numba.exec")
+        # Codegens for explicit target CPUs, keyed by (cpu name, features)
+        self._target_codegens = {}
 
     @property
     def target_data(self):
         return self._internal_codegen.target_data
 
-    def aot_codegen(self, name):
-        return codegen.AOTCPUCodegen(name)
+    def aot_codegen(self, name, cpu_name=None, features=None):
+        return codegen.AOTCPUCodegen(name, cpu_name, features)
 
     def jit_codegen(self):
         return self._internal_codegen
 
+    def target_cpu(self, cpu_name=None, features=None):
+        """
+        Return a copy of this context generating JIT code for the given
+        CPU name and features string (None for the defaults).
+        """
+        if cpu_name is None and features is None:
+            return self
+        key = cpu_name, features
+        try:
+            jit_codegen = self._target_codegens[key]
+        except KeyError:
+            jit_codegen = codegen.JITCPUCodegen("numba.exec", cpu_name,
+                                                features)
+            # Internal functions are compiled only once, with whichever
+            # codegen comes first, so they must be visible to all.
+            jit_codegen.share_linking_libraries(self._internal_codegen)
+            self._target_codegens[key] = jit_codegen
+        return self.subtarget(_internal_codegen=jit_codegen)
+
     @cached_property
     def call_conv(self):
         return callconv.CPUCallConv(self)
@@ -109,8 +132,11 @@ class CPUContext(BaseContext):
             # calls to compiler-rt
             intrinsics.fix_divmod(mod)
 
+        if self.fastmath:
+            fastmathpass.rewrite_module(mod)
+
     def create_cpython_wrapper(self, library, fndesc, call_helper,
-                               release_gil=False):
+                               release_gil=False, fast_entry=False):
         wrapper_module = self.create_module("wrapper")
         fnty = self.call_conv.get_function_type(fndesc.restype, fndesc.argtypes)
         wrapper_callee = wrapper_module.add_function(fnty, fndesc.llvm_func_name)
@@ -118,6 +144,8 @@ class CPUContext(BaseContext):
                                 fndesc, call_helper=call_helper,
                                 release_gil=release_gil)
         builder.build()
+        if fast_entry:
+            builder.build_fast()
         library.add_ir_module(wrapper_module)
 
     def get_executable(self, library, fndesc, env):
@@ -146,6 +174,14 @@ class CPUContext(BaseContext):
 
         return cfunc
 
+    def get_fast_entry(self, library, fndesc):
+        """
+        Returns the address of the fast entry point of the CPython wrapper
+        for *fndesc*, or 0 if it wasn't generated.
+        """
+        return library.get_pointer_to_function(
+            fndesc.llvm_cpython_fastwrapper_name)
+
     def calc_array_sizeof(self, ndim):
         '''
         Calculate the size of an array struct on the CPU target
@@ -165,6 +201,10 @@ class CPUTargetOptions(TargetOptions):
         "looplift": bool,
         "wraparound": bool,
         "boundcheck": bool,
+        "parallel": bool,
+        "fastmath": bool,
+        "target_cpu": str,
+        "target_features": str,
     }
 
 
@@ -0,0 +1,696 @@
+"""
+Implementation of typed dicts in nopython mode.
+
+A dict value holds a pointer to a NRT MemInfo, whose resizable data
+payload contains the dict's counters, followed by an open-addressing
+hash table of (hash, key, value) entries.  The probing scheme is the
+same as CPython's.  Only scalar keys and values are supported, so the
+entries don't hold any references.
+"""
+
+from __future__ import print_function, absolute_import, division
+
+from contextlib import contextmanager
+
+from llvmlite.llvmpy.core import Constant, Type
+
+from numba import types, cgutils
+from numba.typing import signature
+from numba.targets.imputils import (builtin, implement, iternext_impl,
+                                    struct_factory, impl_ret_borrowed,
+                                    impl_ret_new_ref)
+
+
+GENERIC_POINTER = Type.pointer(Type.int(8))
+
+# Hash values marking unused slots (real hashes are non-negative)
+EMPTY = -1
+DELETED = -2
+
+# The minimum number of slots of a hash table
+MINSIZE = 8
+
+# The perturbation shift of the probing scheme
+PERTURB_SHIFT = 5
+
+
+def make_dict_cls(dict_type):
+    """
+    Return the Structure representation of the given *dict_type*
+    (an instance of types.Dict).
+    """
+    return cgutils.create_struct_proxy(dict_type)
+
+
+@struct_factory(types.DictIter)
+def make_dictiter_cls(iterator_type):
+    """
+    Return the Structure representation of the given *iterator_type* (an
+    instance of types.DictIter).
+    """
+    return cgutils.create_struct_proxy(iterator_type)
+
+
+class _DictPayload(cgutils.Structure):
+    # The hash table entries follow this header in the same memory block.
+    # *used* is the number of live entries, *fill* the number of live
+    # and deleted entries.
+    _fields = [('used', types.intp),
+               ('fill', types.intp),
+               ('mask', types.intp)]
+
+
+def make_entry_cls(dict_type):
+    """
+    Return the Structure class of hash table entries for *dict_type*.
+    """
+    class _DictEntry(cgutils.Structure):
+        _fields = [('hash', types.intp),
+                   ('key', dict_type.key_type),
+                   ('value', dict_type.value_type)]
+
+    return _DictEntry
+
+
+def _fold_to_intp(builder, val, intp_t, signed):
+    """
+    Convert the integer *val* to *intp_t*, folding the high bits into
+    the low bits if it is wider.
+    """
+    width = val.type.width
+    if width < intp_t.width:
+        if signed:
+            return builder.sext(val, intp_t)
+        else:
+            return builder.zext(val, intp_t)
+    elif width > intp_t.width:
+        shift = Constant.int(val.type, intp_t.width)
+        val = builder.xor(val, builder.lshr(val, shift))
+        return builder.trunc(val, intp_t)
+    else:
+        return val
+
+
+def _get_raw_hash(context, builder, key_type, key):
+    intp_t = context.get_value_type(types.intp)
+    if isinstance(key_type, types.Complex):
+        cplx = context.make_complex(key_type)(context, builder, value=key)
+        real = _get_raw_hash(context, builder, key_type.underlying_float,
+                             cplx.real)
+        imag = _get_raw_hash(context, builder, key_type.underlying_float,
+                             cplx.imag)
+        return builder.xor(real,
+                           builder.mul(imag, Constant.int(intp_t, 1000003)))
+    elif isinstance(key_type, types.Float):
+        # Adding zero normalizes -0.0 to 0.0, so that equal keys hash equal
+        key = builder.fadd(key, Constant.real(key.type, 0.0))
+        bits = builder.bitcast(key, Type.int(key_type.bitwidth))
+        # Fold the exponent into the low bits, which are often all zero
+        shift = Constant.int(bits.type, key_type.bitwidth // 2)
+        bits = builder.xor(bits, builder.lshr(bits, shift))
+        return _fold_to_intp(builder, bits, intp_t, signed=False)
+    elif isinstance(key_type, types.Boolean):
+        return _fold_to_intp(builder, key, intp_t, signed=False)
+    elif isinstance(key_type, types.Integer):
+        return _fold_to_intp(builder, key, intp_t, signed=key_type.signed)
+    else:
+        # Datetimes and timedeltas are stored as int64
+        return _fold_to_intp(builder, key, intp_t, signed=True)
+
+
+def get_hash(context, builder, key_type, key):
+    """
+    Return the hash of *key* (of *key_type*), as a non-negative intp
+    LLVM value.
+    """
+    h = _get_raw_hash(context, builder, key_type, key)
+    sign_mask = (1 << (h.type.width - 1)) - 1
+    return builder.and_(h, Constant.int(h.type, sign_mask))
+
+
+class DictInstance(object):
+    """
+    A helper for generating code operating on a native dict.
+    """
+
+    def __init__(self, context, builder, dict_type, dict_val=None):
+        self._context = context
+        self._builder = builder
+        self._ty = dict_type
+        self._dict = make_dict_cls(dict_type)(context, builder, dict_val)
+        self._entrycls = make_entry_cls(dict_type)
+        self._intp_t = context.get_value_type(types.intp)
+
+    @property
+    def key_type(self):
+        return self._ty.key_type
+
+    @property
+    def value_type(self):
+        return self._ty.value_type
+
+    @property
+    def value(self):
+        """
+        The LLVM value of the dict.
+        """
+        return self._dict._getvalue()
+
+    @property
+    def meminfo(self):
+        return self._dict.meminfo
+
+    @property
+    def _payload(self):
+        # The data pointer must be reloaded, since it changes on resizing
+        data = self._context.nrt_meminfo_data(self._builder, self.meminfo)
+        return _DictPayload(self._context, self._builder, ref=data,
+                            cast_ref=True)
+
+    @property
+    def size(self):
+        return self._payload.used
+
+    @property
+    def capacity(self):
+        """
+        The number of slots of the hash table.
+        """
+        return self._builder.add(self._payload.mask,
+                                 Constant.int(self._intp_t, 1))
+
+    def _get_entries(self, payload):
+        """
+        Return a pointer to the first entry of the hash table in *payload*.
+        """
+        ptr = self._builder.gep(payload._getpointer(),
+                                [self._context.get_constant(types.int32, 1)])
+        entrytype = self._context.get_struct_type(self._entrycls)
+        return self._builder.bitcast(ptr, Type.pointer(entrytype))
+
+    def _get_entry(self, entries, idx):
+        return self._entrycls(self._context, self._builder,
+                              ref=self._builder.gep(entries, [idx]))
+
+    def _is_live(self, h):
+        return self._builder.icmp_signed('>=', h, Constant.int(h.type, 0))
+
+    def _keys_equal(self, a, b):
+        sig = signature(types.boolean, self.key_type, self.key_type)
+        eq = self._context.get_function('==', sig)
+        return eq(self._builder, (a, b))
+
+    def get_hash(self, key):
+        return get_hash(self._context, self._builder, self.key_type, key)
+
+    def _probe(self, h, mask, body):
+        """
+        Generate a loop over the slot indices of the probing sequence
+        for hash *h*.  *body* is called with the current index and the
+        loop exit block; it must either branch to the exit block or
+        fall through to continue probing.
+        """
+        builder = self._builder
+        intp_t = self._intp_t
+
+        index = cgutils.alloca_once_value(builder, builder.and_(h, mask))
+        perturb = cgutils.alloca_once_value(builder, h)
+
+        bb_body = cgutils.append_basic_block(builder, "probe.body")
+        bb_end = cgutils.append_basic_block(builder, "probe.end")
+
+        builder.branch(bb_body)
+        builder.position_at_end(bb_body)
+        i = builder.load(index)
+        body(i, bb_end)
+        # i = (i * 5 + perturb + 1) & mask; perturb >>= PERTURB_SHIFT
+        p = builder.load(perturb)
+        i = builder.add(builder.mul(i, Constant.int(intp_t, 5)), p)
+        i = builder.add(i, Constant.int(intp_t, 1))
+        builder.store(builder.and_(i, mask), index)
+        builder.store(builder.lshr(p, Constant.int(intp_t, PERTURB_SHIFT)),
+                      perturb)
+        builder.branch(bb_body)
+
+        builder.position_at_end(bb_end)
+
+    def _lookup(self, key, h):
+        """
+        Look up *key*, whose hash is *h*.  Return a (found, index) tuple
+        of LLVM values: if *found* is false, *index* is the slot where
+        the key should be inserted.
+        """
+        builder = self._builder
+        intp_t = self._intp_t
+        payload = self._payload
+        entries = self._get_entries(payload)
+
+        found = cgutils.alloca_once_value(builder, cgutils.false_bit)
+        # The first deleted slot seen, where a new key would be inserted
+        free = cgutils.alloca_once_value(builder, Constant.int(intp_t, -1))
+        res = cgutils.alloca_once(builder, intp_t)
+
+        def body(i, bb_end):
+            entry = self._get_entry(entries, i)
+            entry_hash = entry.hash
+            is_empty = builder.icmp_signed('==', entry_hash,
+                                           Constant.int(intp_t, EMPTY))
+            with cgutils.ifthen(builder, is_empty):
+                # End of the chain: the key isn't there
+                f = builder.load(free)
+                has_free = builder.icmp_signed('>=', f,
+                                               Constant.int(intp_t, 0))
+                builder.store(builder.select(has_free, f, i), res)
+                builder.branch(bb_end)
+            with cgutils.ifthen(builder,
+                                builder.icmp_signed('==', entry_hash, h)):
+                with cgutils.ifthen(builder,
+                                    self._keys_equal(entry.key, key)):
+                    builder.store(cgutils.true_bit, found)
+                    builder.store(i, res)
+                    builder.branch(bb_end)
+            is_deleted = builder.icmp_signed('==', entry_hash,
+                                             Constant.int(intp_t, DELETED))
+            with cgutils.ifthen(builder, is_deleted):
+                f = builder.load(free)
+                no_free = builder.icmp_signed('<', f, Constant.int(intp_t, 0))
+                builder.store(builder.select(no_free, i, f), free)
+
+        self._probe(h, payload.mask, body)
+        return builder.load(found), builder.load(res)
+
+    def _find_empty_slot(self, entries, mask, h):
+        """
+        Return the index of the first empty slot in the probing sequence
+        for hash *h*, in a table without any deleted entries.
+        """
+        builder = self._builder
+        intp_t = self._intp_t
+        res = cgutils.alloca_once(builder, intp_t)
+
+        def body(i, bb_end):
+            entry = self._get_entry(entries, i)
+            is_empty = builder.icmp_signed('==', entry.hash,
+                                           Constant.int(intp_t, EMPTY))
+            with cgutils.ifthen(builder, is_empty):
+                builder.store(i, res)
+                builder.branch(bb_end)
+
+        self._probe(h, mask, body)
+        return builder.load(res)
+
+    def _get_allocation_size(self, nslots):
+        context = self._context
+        entrysize = context.get_abi_sizeof(
+            context.get_struct_type(self._entrycls))
+        headersize = context.get_abi_sizeof(
+            context.get_struct_type(_DictPayload))
+        return self._builder.add(
+            Constant.int(self._intp_t, headersize),
+            self._builder.mul(nslots, Constant.int(self._intp_t, entrysize)))
+
+    def _clear_entries(self, payload, nslots):
+        entries = self._get_entries(payload)
+        empty = Constant.int(self._intp_t, EMPTY)
+        with cgutils.for_range(self._builder, nslots, self._intp_t) as idx:
+            self._get_entry(entries, idx).hash = empty
+
+    @classmethod
+    def allocate(cls, context, builder, dict_type, nslots):
+        """
+        Allocate a new empty dict of *dict_type* with *nslots* slots
+        (a Python int, which must be a power of two).
+        """
+        if not context.enable_nrt:
+            raise NotImplementedError("NRT required but not enabled")
+        assert nslots >= MINSIZE and (nslots & (nslots - 1)) == 0
+        self = cls(context, builder, dict_type)
+        nslots = Constant.int(self._intp_t, nslots)
+        allocsize = self._get_allocation_size(nslots)
+        mod = cgutils.get_module(builder)
+        fnty = Type.function(GENERIC_POINTER,
+                             [self._intp_t, GENERIC_POINTER])
+        fn = mod.get_or_insert_function(fnty, name="NRT_MemInfo_new_varsize")
+        # The entries don't hold any references, so no destructor is needed
+        meminfo = builder.call(fn, [allocsize, Constant.null(GENERIC_POINTER)])
+        with cgutils.if_unlikely(builder, cgutils.is_null(builder, meminfo)):
+            context.call_conv.return_user_exc(builder, MemoryError,
+                                              ("cannot allocate dict",))
+        self._dict.meminfo = meminfo
+        payload = self._payload
+        payload.used = Constant.int(self._intp_t, 0)
+        payload.fill = Constant.int(self._intp_t, 0)
+        payload.mask = builder.sub(nslots, Constant.int(self._intp_t, 1))
+        self._clear_entries(payload, nslots)
+        return self
+
+    def _resize(self):
+        """
+        Rebuild the hash table with a number of slots suited to the
+        number of live entries, dropping the deleted entries.
+        """
+        context = self._context
+        builder = self._builder
+        intp_t = self._intp_t
+        entrytype = context.get_struct_type(self._entrycls)
+        mod = cgutils.get_module(builder)
+
+        # The new size is the smallest power of two (not less than
+        # MINSIZE) above used * 3, so that the table is at most
+        # one-third full afterwards.
+        used = self.size
+        minused = builder.mul(used, Constant.int(intp_t, 3))
+        new_size = cgutils.alloca_once_value(builder,
+                                             Constant.int(intp_t, MINSIZE))
+        bb_cond = cgutils.append_basic_block(builder, "resize.size.cond")
+        bb_body = cgutils.append_basic_block(builder, "resize.size.body")
+        bb_end = cgutils.append_basic_block(builder, "resize.size.end")
+        builder.branch(bb_cond)
+        with cgutils.goto_block(builder, bb_cond):
+            too_small = builder.icmp_signed('<=', builder.load(new_size),
+                                            minused)
+            builder.cbranch(too_small, bb_body, bb_end)
+        with cgutils.goto_block(builder, bb_body):
+            builder.store(builder.shl(builder.load(new_size),
+                                      Constant.int(intp_t, 1)),
+                          new_size)
+            builder.branch(bb_cond)
+        builder.position_at_end(bb_end)
+        new_size = builder.load(new_size)
+
+        # Save the live entries in a temporary allocation
+        old_size = self.capacity
+        tmp = context.nrt_meminfo_alloc(
+            builder, builder.mul(used, Constant.int(intp_t,
+                                                    context.get_abi_sizeof(
+                                                        entrytype))))
+        with cgutils.if_unlikely(builder, cgutils.is_null(builder, tmp)):
+            context.call_conv.return_user_exc(builder, MemoryError,
+                                              ("cannot resize dict",))
+        saved = builder.bitcast(context.nrt_meminfo_data(builder, tmp),
+                                Type.pointer(entrytype))
+        nsaved = cgutils.alloca_once_value(builder, Constant.int(intp_t, 0))
+        entries = self._get_entries(self._payload)
+        with cgutils.for_range(builder, old_size, intp_t) as idx:
+            src = builder.gep(entries, [idx])
+            entry = self._get_entry(entries, idx)
+            with cgutils.ifthen(builder, self._is_live(entry.hash)):
+                n = builder.load(nsaved)
+                builder.store(builder.load(src), builder.gep(saved, [n]))
+                builder.store(builder.add(n, Constant.int(intp_t, 1)), nsaved)
+
+        # Resize the table and re-insert the saved entries
+        fnty = Type.function(GENERIC_POINTER, [GENERIC_POINTER, intp_t])
+        fn = mod.get_or_insert_function(fnty,
+                                        name="NRT_MemInfo_varsize_realloc")
+        release_fnty = Type.function(Type.void(), [GENERIC_POINTER])
+        release_fn = mod.get_or_insert_function(release_fnty,
+                                                name="NRT_MemInfo_release")
+        data = builder.call(fn, [self.meminfo,
+                                 self._get_allocation_size(new_size)])
+        with cgutils.if_unlikely(builder, cgutils.is_null(builder, data)):
+            builder.call(release_fn, [tmp])
+            context.call_conv.return_user_exc(builder, MemoryError,
+                                              ("cannot resize dict",))
+
+        payload = self._payload
+        mask = builder.sub(new_size, Constant.int(intp_t, 1))
+        payload.mask = mask
+        payload.fill = used
+        self._clear_entries(payload, new_size)
+        entries = self._get_entries(payload)
+        with cgutils.for_range(builder, used, intp_t) as idx:
+            src = builder.gep(saved, [idx])
+            entry = self._entrycls(context, builder, ref=src)
+            slot = self._find_empty_slot(entries, mask, entry.hash)
+            builder.store(builder.load(src), builder.gep(entries, [slot]))
+
+        builder.call(release_fn, [tmp])
+
+    def lookup(self, key):
+        """
+        Look up *key*.  Return a (found, value) tuple of LLVM values; the
+        value is undefined if *found* is false.
+        """
+        found, idx = self._lookup(key, self.get_hash(key))
+        entries = self._get_entries(self._payload)
+        res = cgutils.alloca_once(self._builder,
+                                  self._context.get_value_type(
+                                      self.value_type))
+        with cgutils.ifthen(self._builder, found):
+            self._builder.store(self._get_entry(entries, idx).value, res)
+        return found, self._builder.load(res)
+
+    def contains(self, key):
+        found, _ = self._lookup(key, self.get_hash(key))
+        return found
+
+    def setitem(self, key, value):
+        """
+        Map *key* to *value*, growing the hash table if it is becoming
+        too full.
+        """
+        builder = self._builder
+        intp_t = self._intp_t
+        one = Constant.int(intp_t, 1)
+        h = self.get_hash(key)
+        found, idx = self._lookup(key, h)
+        payload = self._payload
+        entry = self._get_entry(self._get_entries(payload), idx)
+
+        with cgutils.ifelse(builder, found) as (then, otherwise):
+            with then:
+                entry.value = value
+            with otherwise:
+                was_empty = builder.icmp_signed('==', entry.hash,
+                                                Constant.int(intp_t, EMPTY))
+                entry.hash = h
+                entry.key = key
+                entry.value = value
+                payload.used = builder.add(payload.used, one)
+                # Reusing a deleted slot doesn't change the fill
+                fill = builder.add(payload.fill,
+                                   builder.zext(was_empty, intp_t))
+                payload.fill = fill
+                # Keep the table at most two-thirds full
+                nslots = builder.add(payload.mask, one)
+                too_full = builder.icmp_signed(
+                    '>=', builder.mul(fill, Constant.int(intp_t, 3)),
+                    builder.mul(nslots, Constant.int(intp_t, 2)))
+                with cgutils.if_unlikely(builder, too_full):
+                    self._resize()
+
+    def pop(self, key):
+        """
+        Remove *key*.  Return a (found, value) tuple of LLVM values; the
+        value is undefined if *found* is false.
+        """
+        builder = self._builder
+        intp_t = self._intp_t
+        found, idx = self._lookup(key, self.get_hash(key))
+        payload = self._payload
+        res = cgutils.alloca_once(builder,
+                                  self._context.get_value_type(
+                                      self.value_type))
+        with cgutils.ifthen(builder, found):
+            entry = self._get_entry(self._get_entries(payload), idx)
+            builder.store(entry.value, res)
+            # The slot must stay marked, so as not to break probing chains
+            entry.hash = Constant.int(intp_t, DELETED)
+            payload.used = builder.sub(payload.used, Constant.int(intp_t, 1))
+        return found, builder.load(res)
+
+    def get_entry(self, idx):
+        """
+        Return a (is_live, key, value) tuple of LLVM values for the entry
+        at *idx*.  The key and value are undefined if *is_live* is false.
+        """
+        entry = self._get_entry(self._get_entries(self._payload), idx)
+        return self._is_live(entry.hash), entry.key, entry.value
+
+    @contextmanager
+    def iterate(self):
+        """
+        A context manager generating a loop over the dict's live entries.
+        A (key, value) tuple of LLVM values is yielded for each of them.
+        The dict mustn't be resized in the loop body.
+        """
+        builder = self._builder
+        with cgutils.for_range(builder, self.capacity, self._intp_t) as idx:
+            is_live, key, value = self.get_entry(idx)
+            with cgutils.ifthen(builder, is_live):
+                yield key, value
+
+
+def _get_initial_size(nitems):
+    """
+    Return the number of slots of a new dict for *nitems* items.
+    """
+    nslots = MINSIZE
+    while nslots * 2 <= nitems * 3:
+        nslots <<= 1
+    return nslots
+
+
+def build_map(context, builder, dict_type, nitems):
+    """
+    Build a new empty dict of *dict_type*, presized for *nitems* items
+    (a Python int).  A new reference is returned.
+    """
+    inst = DictInstance.allocate(context, builder, dict_type,
+                                 _get_initial_size(nitems))
+    return impl_ret_new_ref(context, builder, dict_type, inst.value)
+
+
+def _raise_key_error(context, builder):
+    context.call_conv.return_user_exc(builder, KeyError,
+                                      ("dict key not found",))
+
+
+@builtin
+@implement(types.len_type, types.Kind(types.Dict))
+def dict_len(context, builder, sig, args):
+    inst = DictInstance(context, builder, sig.args[0], args[0])
+    return inst.size
+
+
+@builtin
+@implement('getitem', types.Kind(types.Dict), types.Any)
+def getitem_dict(context, builder, sig, args):
+    inst = DictInstance(context, builder, sig.args[0], args[0])
+    found, value = inst.lookup(args[1])
+    with cgutils.if_unlikely(builder, builder.not_(found)):
+        _raise_key_error(context, builder)
+    return value
+
+
+@builtin
+@implement('setitem', types.Kind(types.Dict), types.Any, types.Any)
+def setitem_dict(context, builder, sig, args):
+    inst = DictInstance(context, builder, sig.args[0], args[0])
+    inst.setitem(args[1], args[2])
+    return context.get_dummy_value()
+
+
+@builtin
+@implement('delitem', types.Kind(types.Dict), types.Any)
+def delitem_dict(context, builder, sig, args):
+    inst = DictInstance(context, builder, sig.args[0], args[0])
+    found, _ = inst.pop(args[1])
+    with cgutils.if_unlikely(builder, builder.not_(found)):
+        _raise_key_error(context, builder)
+    return context.get_dummy_value()
+
+
+@builtin
+@implement('in', types.Any, types.Kind(types.Dict))
+def in_dict(context, builder, sig, args):
+    inst = DictInstance(context, builder, sig.args[1], args[1])
+    return inst.contains(args[0])
+
+
+@builtin
+@implement('not in', types.Any, types.Kind(types.Dict))
+def not_in_dict(context, builder, sig, args):
+    inst = DictInstance(context, builder, sig.args[1], args[1])
+    return builder.not_(inst.contains(args[0]))
+
+
+@builtin
+@implement("dict.get", types.Kind(types.Dict), types.Any, types.Any)
+def dict_get(context, builder, sig, args):
+    inst = DictInstance(context, builder, sig.args[0], args[0])
+    found, value = inst.lookup(args[1])
+    value = context.cast(builder, value, inst.value_type, sig.return_type)
+    return builder.select(found, value, args[2])
+
+
+@builtin
+@implement("dict.pop", types.Kind(types.Dict), types.Any)
+def dict_pop(context, builder, sig, args):
+    inst = DictInstance(context, builder, sig.args[0], args[0])
+    found, value = inst.pop(args[1])
+    with cgutils.if_unlikely(builder, builder.not_(found)):
+        _raise_key_error(context, builder)
+    return value
+
+
+@builtin
+@implement("dict.pop", types.Kind(types.Dict), types.Any, types.Any)
+def dict_pop_default(context, builder, sig, args):
+    inst = DictInstance(context, builder, sig.args[0], args[0])
+    found, value = inst.pop(args[1])
+    value = context.cast(builder, value, inst.value_type, sig.return_type)
+    return builder.select(found, value, args[2])
+
+
+def _make_dict_iterator(context, builder, iterator_type, dict_val):
+    iterobj = make_dictiter_cls(iterator_type)(context, builder)
+    zero = context.get_constant(types.intp, 0)
+    iterobj.index = cgutils.alloca_once_value(builder, zero)
+    iterobj.dict = dict_val
+    return impl_ret_borrowed(context, builder, iterator_type,
+                             iterobj._getvalue())
+
+
+@builtin
+@implement('getiter', types.Kind(types.Dict))
+def getiter_dict(context, builder, sig, args):
+    return _make_dict_iterator(context, builder, sig.return_type, args[0])
+
+
+@builtin
+@implement("dict.keys", types.Kind(types.Dict))
+@implement("dict.values", types.Kind(types.Dict))
+@implement("dict.items", types.Kind(types.Dict))
+def dict_iterator_method(context, builder, sig, args):
+    return _make_dict_iterator(context, builder, sig.return_type, args[0])
+
+
+@builtin
+@implement('iternext', types.Kind(types.DictIter))
+@iternext_impl
+def iternext_dictiter(context, builder, sig, args, result):
+    [iterty] = sig.args
+    iterobj = make_dictiter_cls(iterty)(context, builder, value=args[0])
+    inst = DictInstance(context, builder, iterty.dict_type, iterobj.dict)
+    intp_t = context.get_value_type(types.intp)
+    one = Constant.int(intp_t, 1)
+
+    result.yield_(context.get_constant_null(iterty.yield_type))
+
+    # Skip the unused slots.  The capacity is reloaded at each step, so
+    # that resizing the dict while iterating stays memory-safe.
+    bb_cond = cgutils.append_basic_block(builder, "dictiter.cond")
+    bb_body = cgutils.append_basic_block(builder, "dictiter.body")
+    bb_end = cgutils.append_basic_block(builder, "dictiter.end")
+    builder.branch(bb_cond)
+    with cgutils.goto_block(builder, bb_cond):
+        index = builder.load(iterobj.index)
+        in_range = builder.icmp_signed('<', index, inst.capacity)
+        builder.cbranch(in_range, bb_body, bb_end)
+    with cgutils.goto_block(builder, bb_body):
+        index = builder.load(iterobj.index)
+        is_live, _, _ = inst.get_entry(index)
+        with cgutils.ifthen(builder, builder.not_(is_live)):
+            builder.store(builder.add(index, one), iterobj.index)
+            builder.branch(bb_cond)
+        builder.branch(bb_end)
+    builder.position_at_end(bb_end)
+
+    index = builder.load(iterobj.index)
+    is_valid = builder.icmp_signed('<', index, inst.capacity)
+    result.set_valid(is_valid)
+
+    with cgutils.ifthen(builder, is_valid):
+        _, key, value = inst.get_entry(index)
+        if iterty.kind == 'keys':
+            result.yield_(key)
+        elif iterty.kind == 'values':
+            result.yield_(value)
+        else:
+            tup = context.get_constant_undef(iterty.yield_type)
+            tup = builder.insert_value(tup, key, 0)
+            tup = builder.insert_value(tup, value, 1)
+            result.yield_(tup)
+        builder.store(builder.add(index, one), iterobj.index)
@@ -0,0 +1,24 @@
+"""
+LLVM pass that adds fast-math flags to floating-point arithmetic.
+"""
+from __future__ import print_function, absolute_import
+
+from llvmlite import ir
+
+
+class _FastMathVisitor(ir.Visitor):
+    """
+    Mark all floating-point binary operations as "fast", allowing LLVM
+    to reassociate them (e.g. to vectorize reduction loops).
+    """
+    float_binops = frozenset(['fadd', 'fsub', 'fmul', 'fdiv', 'frem'])
+
+    def visit_Instruction(self, instr):
+        if instr.opname in self.float_binops and 'fast' not in instr.flags:
+            instr.flags.append('fast')
+
+
+def rewrite_module(mod):
+    """Add fast-math flags to the floating-point operations of *mod*
+    """
+    _FastMathVisitor().visit(mod)
@@ -232,6 +232,23 @@ def call_iternext(context, builder, iterator_type, val):
     return _IternextResult(context, builder, paircls(context, builder, val))
 
 
+def impl_ret_new_ref(ctx, builder, retty, ret):
+    """
+    The implementation returns a new reference.
+    """
+    return ret
+
+
+def impl_ret_borrowed(ctx, builder, retty, ret):
+    """
+    The implementation returns a borrowed reference.
+    This function automatically incref so that the implementation is
+    returning a new reference.
+    """
+    ctx.nrt_incref(builder, retty, ret)
+    return ret
+
+
 class Registry(object):
     def __init__(self):
         self.functions = []
@@ -0,0 +1,391 @@
+"""
+Implementation of typed lists in nopython mode.
+
+A list value holds a pointer to a NRT MemInfo, whose resizable data
+payload contains the list's size and allocated capacity, followed by
+the items themselves.
+"""
+
+from __future__ import print_function, absolute_import, division
+
+import re
+
+import numpy
+import llvmlite.llvmpy.core as lc
+from llvmlite.llvmpy.core import Constant, Type
+
+from numba import types, cgutils
+from numba.targets.imputils import (builtin, implement, iternext_impl,
+                                    struct_factory, impl_ret_borrowed,
+                                    impl_ret_new_ref)
+from . import arrayobj
+
+
+GENERIC_POINTER = Type.pointer(Type.int(8))
+
+
+def make_list_cls(list_type):
+    """
+    Return the Structure representation of the given *list_type*
+    (an instance of types.List).
+    """
+    return cgutils.create_struct_proxy(list_type)
+
+
+@struct_factory(types.ListIter)
+def make_listiter_cls(iterator_type):
+    """
+    Return the Structure representation of the given *iterator_type* (an
+    instance of types.ListIter).
+    """
+    return cgutils.create_struct_proxy(iterator_type)
+
+
+class _ListPayload(cgutils.Structure):
+    # The items follow this header in the same memory block
+    _fields = [('size', types.intp),
+               ('allocated', types.intp)]
+
+
+def _holds_references(dtype):
+    """
+    Whether items of type *dtype* may hold references to NRT-managed
+    memory, which must be released along with the list.
+    """
+    return not isinstance(dtype, (types.Boolean, types.Integer, types.Float,
+                                  types.Complex, types.NPDatetime,
+                                  types.NPTimedelta))
+
+
+def _get_items_pointer(context, builder, list_type, payload):
+    """
+    Return a pointer to the first item of the list *payload*.
+    """
+    ptr = builder.gep(payload._getpointer(),
+                      [context.get_constant(types.int32, 1)])
+    datatype = context.get_data_type(list_type.dtype)
+    return builder.bitcast(ptr, Type.pointer(datatype))
+
+
+def _get_list_dtor(context, builder, list_type):
+    """
+    Return a pointer to a function releasing the references held by
+    the items of a list of *list_type*, or NULL if there are none.
+    """
+    dtype = list_type.dtype
+    if not _holds_references(dtype):
+        return Constant.null(GENERIC_POINTER)
+
+    module = cgutils.get_module(builder)
+    fnty = Type.function(Type.void(), [GENERIC_POINTER, GENERIC_POINTER])
+    name = ".list_dtor.%s" % re.sub(r'[^\w.]', '_', str(dtype))
+    fn = module.get_or_insert_function(fnty, name=name)
+    if fn.is_declaration:
+        fn.linkage = lc.LINKAGE_INTERNAL
+        fnbuilder = lc.Builder.new(fn.append_basic_block('entry'))
+        payload = _ListPayload(context, fnbuilder, ref=fn.args[0],
+                               cast_ref=True)
+        items = _get_items_pointer(context, fnbuilder, list_type, payload)
+        intp_t = context.get_value_type(types.intp)
+        with cgutils.for_range(fnbuilder, payload.size, intp_t) as idx:
+            item = context.unpack_value(fnbuilder, dtype,
+                                        fnbuilder.gep(items, [idx]))
+            context.nrt_decref(fnbuilder, dtype, item)
+        fnbuilder.ret_void()
+    return builder.bitcast(fn, GENERIC_POINTER)
+
+
+class ListInstance(object):
+    """
+    A helper for generating code operating on a native list.
+    """
+
+    def __init__(self, context, builder, list_type, list_val=None):
+        self._context = context
+        self._builder = builder
+        self._ty = list_type
+        self._list = make_list_cls(list_type)(context, builder, list_val)
+        self._intp_t = context.get_value_type(types.intp)
+
+    @property
+    def dtype(self):
+        return self._ty.dtype
+
+    @property
+    def value(self):
+        """
+        The LLVM value of the list.
+        """
+        return self._list._getvalue()
+
+    @property
+    def meminfo(self):
+        return self._list.meminfo
+
+    @property
+    def _payload(self):
+        # The data pointer must be reloaded, since it changes on resizing
+        data = self._context.nrt_meminfo_data(self._builder, self.meminfo)
+        return _ListPayload(self._context, self._builder, ref=data,
+                            cast_ref=True)
+
+    @property
+    def size(self):
+        return self._payload.size
+
+    def _get_item_pointer(self, idx):
+        items = _get_items_pointer(self._context, self._builder, self._ty,
+                                   self._payload)
+        return self._builder.gep(items, [idx])
+
+    def fix_index(self, idx, signed=True):
+        """
+        Wraparound the *idx* (an intp LLVM value) and check it is in
+        bounds, raising IndexError otherwise.
+        """
+        builder = self._builder
+        size = self.size
+        if signed:
+            is_negative = builder.icmp_signed('<', idx,
+                                              Constant.int(idx.type, 0))
+            idx = builder.select(is_negative, builder.add(idx, size), idx)
+        # A negative index is a large unsigned number
+        out_of_bounds = builder.icmp_unsigned('>=', idx, size)
+        with cgutils.if_unlikely(builder, out_of_bounds):
+            self._context.call_conv.return_user_exc(
+                builder, IndexError, ("list index out of range",))
+        return idx
+
+    def getitem(self, idx):
+        """
+        Return the item at *idx* (a borrowed reference).
+        """
+        return self._context.unpack_value(self._builder, self.dtype,
+                                          self._get_item_pointer(idx))
+
+    def setitem(self, idx, val):
+        """
+        Replace the item at *idx* with *val*, taking a new reference to it.
+        """
+        ptr = self._get_item_pointer(idx)
+        old = self._context.unpack_value(self._builder, self.dtype, ptr)
+        self._context.nrt_incref(self._builder, self.dtype, val)
+        self._context.nrt_decref(self._builder, self.dtype, old)
+        self._context.pack_value(self._builder, self.dtype, val, ptr)
+
+    def inititem(self, idx, val):
+        """
+        Initialize the (unset) item at *idx* with *val*, taking a new
+        reference to it.
+        """
+        self._context.nrt_incref(self._builder, self.dtype, val)
+        self._context.pack_value(self._builder, self.dtype, val,
+                                 self._get_item_pointer(idx))
+
+    def _get_allocation_size(self, nitems):
+        context = self._context
+        itemsize = context.get_abi_sizeof(context.get_data_type(self.dtype))
+        headersize = context.get_abi_sizeof(
+            context.get_struct_type(_ListPayload))
+        return self._builder.add(
+            Constant.int(self._intp_t, headersize),
+            self._builder.mul(nitems, Constant.int(self._intp_t, itemsize)))
+
+    @classmethod
+    def allocate(cls, context, builder, list_type, nitems):
+        """
+        Allocate a new list of *list_type* with *nitems* unset items
+        (*nitems* being a LLVM intp value).
+        """
+        if not context.enable_nrt:
+            raise NotImplementedError("NRT required but not enabled")
+        self = cls(context, builder, list_type)
+        allocsize = self._get_allocation_size(nitems)
+        mod = cgutils.get_module(builder)
+        fnty = Type.function(GENERIC_POINTER,
+                             [self._intp_t, GENERIC_POINTER])
+        fn = mod.get_or_insert_function(fnty, name="NRT_MemInfo_new_varsize")
+        meminfo = builder.call(fn, [allocsize,
+                                    _get_list_dtor(context, builder,
+                                                   list_type)])
+        with cgutils.if_unlikely(builder, cgutils.is_null(builder, meminfo)):
+            context.call_conv.return_user_exc(builder, MemoryError,
+                                              ("cannot allocate list",))
+        self._list.meminfo = meminfo
+        payload = self._payload
+        payload.size = nitems
+        payload.allocated = nitems
+        return self
+
+    def resize(self, new_size):
+        """
+        Change the list's size to *new_size*.  When growing, the new
+        items are left unset and the allocation is overallocated
+        geometrically so that appending is amortized O(1).
+        """
+        builder = self._builder
+        context = self._context
+        payload = self._payload
+        allocated = payload.allocated
+
+        with cgutils.if_unlikely(builder,
+                                 builder.icmp_signed('>', new_size,
+                                                     allocated)):
+            twice = builder.shl(allocated, Constant.int(self._intp_t, 1))
+            new_allocated = builder.select(
+                builder.icmp_signed('>', twice, new_size), twice, new_size)
+            minimum = Constant.int(self._intp_t, 4)
+            new_allocated = builder.select(
+                builder.icmp_signed('<', new_allocated, minimum),
+                minimum, new_allocated)
+
+            mod = cgutils.get_module(builder)
+            fnty = Type.function(GENERIC_POINTER,
+                                 [GENERIC_POINTER, self._intp_t])
+            fn = mod.get_or_insert_function(
+                fnty, name="NRT_MemInfo_varsize_realloc")
+            data = builder.call(fn, [self.meminfo,
+                                     self._get_allocation_size(new_allocated)])
+            with cgutils.if_unlikely(builder, cgutils.is_null(builder, data)):
+                context.call_conv.return_user_exc(builder, MemoryError,
+                                                  ("cannot resize list",))
+            self._payload.allocated = new_allocated
+
+        self._payload.size = new_size
+
+    def append(self, val):
+        size = self.size
+        self.resize(self._builder.add(size, Constant.int(self._intp_t, 1)))
+        self.inititem(size, val)
+
+
+def build_list(context, builder, list_type, items):
+    """
+    Build a new list of *list_type* holding the given *items* (LLVM
+    values of the list's dtype).  A new reference is returned.
+    """
+    nitems = context.get_constant(types.intp, len(items))
+    inst = ListInstance.allocate(context, builder, list_type, nitems)
+    for i, val in enumerate(items):
+        inst.inititem(context.get_constant(types.intp, i), val)
+    return impl_ret_new_ref(context, builder, list_type, inst.value)
+
+
+@builtin
+@implement(types.len_type, types.Kind(types.List))
+def list_len(context, builder, sig, args):
+    inst = ListInstance(context, builder, sig.args[0], args[0])
+    return inst.size
+
+
+@builtin
+@implement('getitem', types.Kind(types.List), types.Kind(types.Integer))
+def getitem_list(context, builder, sig, args):
+    inst = ListInstance(context, builder, sig.args[0], args[0])
+    idx = inst.fix_index(args[1], signed=sig.args[1].signed)
+    res = inst.getitem(idx)
+    return impl_ret_borrowed(context, builder, sig.return_type, res)
+
+
+@builtin
+@implement('setitem', types.Kind(types.List), types.Kind(types.Integer),
+           types.Any)
+def setitem_list(context, builder, sig, args):
+    inst = ListInstance(context, builder, sig.args[0], args[0])
+    idx = inst.fix_index(args[1], signed=sig.args[1].signed)
+    inst.setitem(idx, args[2])
+    return context.get_dummy_value()
+
+
+@builtin
+@implement("list.append", types.Kind(types.List), types.Any)
+def list_append(context, builder, sig, args):
+    inst = ListInstance(context, builder, sig.args[0], args[0])
+    inst.append(args[1])
+    return context.get_dummy_value()
+
+
+@builtin
+@implement("list.extend", types.Kind(types.List), types.Kind(types.List))
+def list_extend(context, builder, sig, args):
+    dest_type, src_type = sig.args
+    dest = ListInstance(context, builder, dest_type, args[0])
+    src = ListInstance(context, builder, src_type, args[1])
+    # Read the source size first, in case the list extends itself
+    src_size = src.size
+    dest_size = dest.size
+    dest.resize(builder.add(dest_size, src_size))
+    intp_t = context.get_value_type(types.intp)
+    with cgutils.for_range(builder, src_size, intp_t) as idx:
+        val = context.cast(builder, src.getitem(idx), src_type.dtype,
+                           dest_type.dtype)
+        dest.inititem(builder.add(dest_size, idx), val)
+    return context.get_dummy_value()
+
+
+@builtin
+@implement("list.pop", types.Kind(types.List))
+def list_pop(context, builder, sig, args):
+    inst = ListInstance(context, builder, sig.args[0], args[0])
+    size = inst.size
+    with cgutils.if_unlikely(builder, cgutils.is_scalar_zero(builder, size)):
+        context.call_conv.return_user_exc(builder, IndexError,
+                                          ("pop from empty list",))
+    new_size = builder.sub(size, context.get_constant(types.intp, 1))
+    # The list's reference to the item is passed to the caller
+    res = inst.getitem(new_size)
+    inst.resize(new_size)
+    return impl_ret_new_ref(context, builder, sig.return_type, res)
+
+
+@builtin
+@implement('getiter', types.Kind(types.List))
+def getiter_list(context, builder, sig, args):
+    iterobj = make_listiter_cls(sig.return_type)(context, builder)
+    zero = context.get_constant(types.intp, 0)
+    iterobj.index = cgutils.alloca_once_value(builder, zero)
+    iterobj.list = args[0]
+    return impl_ret_borrowed(context, builder, sig.return_type,
+                             iterobj._getvalue())
+
+
+@builtin
+@implement('iternext', types.Kind(types.ListIter))
+@iternext_impl
+def iternext_listiter(context, builder, sig, args, result):
+    [iterty] = sig.args
+    iterobj = make_listiter_cls(iterty)(context, builder, value=args[0])
+    inst = ListInstance(context, builder, iterty.list_type, iterobj.list)
+    dtype = iterty.yield_type
+
+    # The result pair holds a reference to its item, which must be
+    # valid even when the iterator is exhausted.
+    result.yield_(Constant.null(context.get_value_type(dtype)))
+
+    index = builder.load(iterobj.index)
+    is_valid = builder.icmp_signed('<', index, inst.size)
+    result.set_valid(is_valid)
+
+    with cgutils.ifthen(builder, is_valid):
+        value = inst.getitem(index)
+        context.nrt_incref(builder, dtype, value)
+        result.yield_(value)
+        builder.store(builder.add(index, context.get_constant(types.intp, 1)),
+                      iterobj.index)
+
+
+@builtin
+@implement(numpy.array, types.Kind(types.List))
+def np_array_from_list(context, builder, sig, args):
+    [list_type] = sig.args
+    arrtype = sig.return_type
+    inst = ListInstance(context, builder, list_type, args[0])
+    size = inst.size
+    ary = arrayobj._empty_nd_impl(context, builder, arrtype, [size])
+    intp_t = context.get_value_type(types.intp)
+    with cgutils.for_range(builder, size, intp_t) as idx:
+        val = context.cast(builder, inst.getitem(idx), list_type.dtype,
+                           arrtype.dtype)
+        context.pack_value(builder, arrtype.dtype, val,
+                           builder.gep(ary.data, [idx]))
+    return impl_ret_new_ref(context, builder, arrtype, ary._getvalue())
@@ -9,12 +9,14 @@ import math
 import sys
 import itertools
 from collections import namedtuple
+from contextlib import contextmanager
 
 from llvmlite.llvmpy import core as lc
 
-from . import builtins, ufunc_db
-from .imputils import implement, Registry
+from . import builtins, ufunc_db, arrayobj
+from .imputils import implement, Registry, impl_ret_new_ref, impl_ret_borrowed
 from .. import typing, types, cgutils, numpy_support
+from ..typing import npydecl
 from ..config import PYVERSION
 from ..numpy_support import ufunc_find_matching_loop
 
@@ -98,6 +100,9 @@ class _ScalarHelper(object):
     def load_data(self, indices):
         return self.val
 
+    def load_flat(self, index):
+        return self.val
+
     def store_data(self, indices, val):
         self.builder.store(val, self._ptr)
 
@@ -107,20 +112,20 @@ class _ScalarHelper(object):
 
 
 class _ArrayIndexingHelper(namedtuple('_ArrayIndexingHelper',
-                                      ('array', 'indices'))):
+                                      ('array', 'indices', 'not_broadcast'))):
     def update_indices(self, loop_indices, name):
         bld = self.array.builder
         intpty = self.array.context.get_value_type(types.intp)
-        ONE = lc.Constant.int(lc.Type.int(intpty.width), 1)
+        ZERO = lc.Constant.int(lc.Type.int(intpty.width), 0)
 
         # we are only interested in as many inner dimensions as dimensions
         # the indexed array has (the outer dimensions are broadcast, so
         # ignoring the outer indices produces the desired result.
+        # Broadcast dimensions (of length 1) are always indexed at 0; which
+        # ones are was determined once, outside of the loops.
         indices = loop_indices[len(loop_indices) - len(self.indices):]
-        for src, dst, dim in zip(indices, self.indices, self.array.shape):
-            cond = bld.icmp(lc.ICMP_UGT, dim, ONE)
-            with cgutils.ifthen(bld, cond):
-                bld.store(src, dst)
+        for src, dst, cond in zip(indices, self.indices, self.not_broadcast):
+            bld.store(bld.select(cond, src, ZERO), dst)
 
     def as_values(self):
         """
@@ -144,13 +149,16 @@ class _ArrayHelper(namedtuple('_ArrayHelper', ('context', 'builder', 'ary',
     def create_iter_indices(self):
         intpty = self.context.get_value_type(types.intp)
         ZERO = lc.Constant.int(lc.Type.int(intpty.width), 0)
+        ONE = lc.Constant.int(lc.Type.int(intpty.width), 1)
 
         indices = []
         for i in range(self.ndim):
             x = cgutils.alloca_once(self.builder, lc.Type.int(intpty.width))
             self.builder.store(ZERO, x)
             indices.append(x)
-        return _ArrayIndexingHelper(self, indices)
+        not_broadcast = [self.builder.icmp(lc.ICMP_UGT, dim, ONE)
+                         for dim in self.shape]
+        return _ArrayIndexingHelper(self, indices, not_broadcast)
 
     def _load_effective_address(self, indices):
         return cgutils.get_item_pointer2(self.builder,
@@ -163,14 +171,49 @@ class _ArrayHelper(namedtuple('_ArrayHelper', ('context', 'builder', 'ary',
     def load_data(self, indices):
         return self.builder.load(self._load_effective_address(indices))
 
+    def load_flat(self, index):
+        """
+        Load the item at the flat *index* of a contiguous array.
+        """
+        return self.builder.load(cgutils.inbound_gep(self.builder, self.data,
+                                                     index))
+
     def store_data(self, indices, value):
+        self._store(self._load_effective_address(indices), value)
+
+    def store_flat(self, index, value):
+        """
+        Store *value* at the flat *index* of a contiguous array.
+        """
+        self._store(cgutils.inbound_gep(self.builder, self.data, index),
+                    value)
+
+    def _store(self, ptr, value):
         ctx = self.context
         bld = self.builder
 
         store_value = ctx.get_value_as_data(bld, self.base_type, value)
         assert ctx.get_data_type(self.base_type) == store_value.type
 
-        bld.store(store_value, self._load_effective_address(indices))
+        bld.store(store_value, ptr)
+
+    def is_contiguous(self, layout):
+        """
+        Return an LLVM predicate telling whether the array is contiguous
+        in the given *layout* ('C' or 'F').
+        """
+        if self.layout == layout or (self.ndim == 1 and self.layout != 'A'):
+            return cgutils.true_bit
+        dims = list(zip(self.shape, self.strides))
+        if layout == 'C':
+            dims.reverse()
+        expected = self.ary.itemsize
+        pred = cgutils.true_bit
+        for dim, stride in dims:
+            pred = self.builder.and_(
+                pred, self.builder.icmp(lc.ICMP_EQ, stride, expected))
+            expected = self.builder.mul(expected, dim)
+        return pred
 
 
 def _prepare_argument(ctxt, bld, inp, tyinp, where='input operand'):
@@ -190,6 +233,35 @@ def _prepare_argument(ctxt, bld, inp, tyinp, where='input operand'):
         raise TypeError('unknown type for {0}: {1}'.format(where, str(tyinp)))
 
 
+def _broadcast_shapes(context, builder, tyargs, args, ndim):
+    """
+    Compute the shape resulting from broadcasting the array arguments
+    together, as a list of *ndim* LLVM intp values.
+    """
+    one = context.get_constant(types.intp, 1)
+    shapes = [one] * ndim
+    for ty, val in zip(tyargs, args):
+        if not isinstance(ty, types.Array):
+            continue
+        ary = context.make_array(ty)(context, builder, val)
+        arg_shapes = cgutils.unpack_tuple(builder, ary.shape, ty.ndim)
+        offset = ndim - ty.ndim
+        for i, arg_shape in enumerate(arg_shapes):
+            cur = shapes[offset + i]
+            # Dimensions must either match or one of them be 1
+            mismatch = builder.and_(
+                builder.icmp(lc.ICMP_NE, arg_shape, cur),
+                builder.and_(builder.icmp(lc.ICMP_NE, arg_shape, one),
+                             builder.icmp(lc.ICMP_NE, cur, one)))
+            with cgutils.if_unlikely(builder, mismatch):
+                context.call_conv.return_user_exc(
+                    builder, ValueError,
+                    ("operands could not be broadcast together",))
+            is_one = builder.icmp(lc.ICMP_EQ, cur, one)
+            shapes[offset + i] = builder.select(is_one, arg_shape, cur)
+    return shapes
+
+
 def numpy_ufunc_kernel(context, builder, sig, args, kernel_class,
                        explicit_output=True):
     # This is the code generator that builds all the looping needed
@@ -204,13 +276,40 @@ def numpy_ufunc_kernel(context, builder, sig, args, kernel_class,
     # explicit_output - if the output was explicit in the call
     #                   (ie: np.add(x,y,r))
     if not explicit_output:
-        if isinstance(sig.return_type, types.Array):
-            raise TypeError("array allocation is not supported, yet")
-
-        args.append(lc.Constant.null(context.get_value_type(sig.return_type)))
-        tyargs = sig.args + (sig.return_type,)
+        ret_ty = sig.return_type
+        if isinstance(ret_ty, types.Array):
+            # Allocate the output array with the broadcast shape of the inputs
+            shapes = _broadcast_shapes(context, builder, sig.args, args,
+                                       ret_ty.ndim)
+            out = arrayobj._empty_nd_impl(context, builder, ret_ty, shapes)
+            out_val = out._getvalue()
+        else:
+            out_val = lc.Constant.null(context.get_value_type(ret_ty))
+        args = list(args) + [out_val]
+        tyargs = sig.args + (ret_ty,)
     else:
         tyargs = sig.args
+    if (context.auto_parallel and isinstance(tyargs[-1], types.Array) and
+            tyargs[-1].ndim > 0):
+        _parallel_ufunc_loop(context, builder, tyargs, args, kernel_class)
+        out = args[-1]
+    else:
+        out = _ufunc_loop_nest(context, builder, tyargs, args,
+                               kernel_class).return_val
+    if explicit_output:
+        return impl_ret_borrowed(context, builder, sig.return_type, out)
+    else:
+        return impl_ret_new_ref(context, builder, sig.return_type, out)
+
+
+def _ufunc_loop_nest(context, builder, tyargs, args, kernel_class,
+                     chunked=False):
+    """
+    Generate the loops computing *kernel_class* over *args* (the last one
+    being the output).  If *chunked* is true, the outer loop only runs
+    over the chunk of the output's first dimension assigned to the current
+    thread (see parfor.py).  The output helper is returned.
+    """
     arguments = [_prepare_argument(context, builder, arg, tyarg)
                  for arg, tyarg in zip(args, tyargs)]
 
@@ -224,10 +323,44 @@ def numpy_ufunc_kernel(context, builder, sig, args, kernel_class,
     kernel = kernel_class(context, builder, outer_sig)
     intpty = context.get_value_type(types.intp)
 
+    loopshape = output.shape
+    if chunked:
+        start, stop = _prange_bounds(context, builder, loopshape[0])
+
+    # When all operands are contiguous in the same layout and have the
+    # same shape, they can be iterated over with a single flat loop
+    layouts = _flat_loop_layouts(inputs, output, chunked)
+    if layouts:
+        bbend = cgutils.append_basic_block(builder, "ufunc.end")
+        for layout in layouts:
+            pred = _can_loop_flat(builder, inputs, output, layout)
+            with cgutils.ifthen(builder, pred):
+                if chunked:
+                    # Only for C order: the chunk of the first dimension
+                    # is a contiguous range of items
+                    inner = context.get_constant(types.intp, 1)
+                    for dim in loopshape[1:]:
+                        inner = builder.mul(inner, dim)
+                    flat_start = builder.mul(start, inner)
+                    flat_stop = builder.mul(stop, inner)
+                else:
+                    flat_start = context.get_constant(types.intp, 0)
+                    flat_stop = output.ary.nitems
+                one = context.get_constant(types.intp, 1)
+                with cgutils.for_range_slice(builder, flat_start, flat_stop,
+                                             one, intpty) as index:
+                    vals_in = [inp.load_flat(index) for inp in inputs]
+                    output.store_flat(index, kernel.generate(*vals_in))
+                builder.branch(bbend)
+
+    # General case: a loop nest with broadcasting
     indices = [inp.create_iter_indices() for inp in inputs]
 
-    loopshape = output.shape
-    with cgutils.loop_nest(builder, loopshape, intp=intpty) as loop_indices:
+    if chunked:
+        loop = _chunked_loop_nest(builder, start, stop, loopshape, intpty)
+    else:
+        loop = cgutils.loop_nest(builder, loopshape, intp=intpty)
+    with loop as loop_indices:
         vals_in = []
         for i, (index, arg) in enumerate(zip(indices, inputs)):
             index.update_indices(loop_indices, i)
@@ -235,7 +368,224 @@ def numpy_ufunc_kernel(context, builder, sig, args, kernel_class,
 
         val_out = kernel.generate(*vals_in)
         output.store_data(loop_indices, val_out)
-    return arguments[-1].return_val
+
+    if layouts:
+        builder.branch(bbend)
+        builder.position_at_end(bbend)
+    return output
+
+
+def _flat_loop_layouts(inputs, output, chunked):
+    """
+    Return the layouts ('C' or 'F') for which a flat loop may be used
+    over *inputs* and *output*, as far as their types tell.
+    """
+    if not isinstance(output, _ArrayHelper) or output.ndim == 0:
+        return []
+    arrays = [output] + [inp for inp in inputs
+                         if isinstance(inp, _ArrayHelper)]
+    if any(ary.ndim != output.ndim for ary in arrays):
+        # Broadcasting over missing dimensions
+        return []
+    if output.ndim == 1:
+        # Any contiguous 1D array is C-contiguous
+        return ['C']
+    layouts = [layout for layout in ('C', 'F')
+               if all(ary.layout in (layout, 'A') for ary in arrays)]
+    if chunked:
+        # Chunks are taken over the first dimension
+        layouts = [layout for layout in layouts if layout == 'C']
+    return layouts
+
+
+def _can_loop_flat(builder, inputs, output, layout):
+    """
+    Return an LLVM predicate telling whether all array operands are
+    contiguous in *layout* and have the output's shape.
+    """
+    pred = output.is_contiguous(layout)
+    for inp in inputs:
+        if not isinstance(inp, _ArrayHelper):
+            continue
+        pred = builder.and_(pred, inp.is_contiguous(layout))
+        for dim, outdim in zip(inp.shape, output.shape):
+            pred = builder.and_(pred, builder.icmp(lc.ICMP_EQ, dim, outdim))
+    return pred
+
+
+def numpy_fused_ufunc_kernel(context, builder, calls, dead):
+    """
+    Compute a chain of explicit-output ufunc *calls* in a single flat
+    loop (see irpasses.FuseUfuncLoops).  *calls* is a list of
+    (ufunc, signature, operand names, argument values) tuples, the last
+    operand being the output; operands with the same name are the same
+    array.  The items of arrays named in *dead* are passed from one ufunc
+    to the next without being stored.
+
+    The loop only runs if all array operands have the same shape, are
+    contiguous and don't overlap (except when only read).  An LLVM
+    predicate telling whether it ran is returned: otherwise the caller
+    must compute the calls one at a time.
+    """
+    arrays = {}
+    order = []
+    written = set()
+    arguments = []
+    for ufunc, sig, names, args in calls:
+        helpers = [_prepare_argument(context, builder, arg, tyarg)
+                   for arg, tyarg in zip(args, sig.args)]
+        for name, helper in zip(names, helpers):
+            if isinstance(helper, _ArrayHelper) and name not in arrays:
+                arrays[name] = helper
+                order.append(name)
+        written.add(names[-1])
+        arguments.append(helpers)
+
+    output = arguments[0][-1]
+    layouts = _flat_loop_layouts([arrays[name] for name in order], output,
+                                 False)
+    if not layouts:
+        return cgutils.false_bit
+    layout = layouts[0]
+
+    pred = cgutils.true_bit
+    for name in order:
+        ary = arrays[name]
+        for dim, outdim in zip(ary.shape, output.shape):
+            pred = builder.and_(pred, builder.icmp(lc.ICMP_EQ, dim, outdim))
+        if name not in dead:
+            pred = builder.and_(pred, ary.is_contiguous(layout))
+    # A partial overlap would make the fused loop read items which the
+    # separate loops would already have overwritten (or not yet written)
+    live = [name for name in order if name not in dead]
+    for i, name in enumerate(live):
+        for other in live[i + 1:]:
+            if name in written or other in written:
+                pred = builder.and_(pred, _arrays_disjoint(
+                    context, builder, arrays[name], arrays[other]))
+
+    with cgutils.ifthen(builder, pred):
+        kernels = []
+        for (ufunc, sig, names, args), helpers in zip(calls, arguments):
+            outer_sig = typing.signature(helpers[-1].base_type,
+                                         *[h.base_type for h in helpers[:-1]])
+            kernels.append(_ufunc_db_function(ufunc)(context, builder,
+                                                     outer_sig))
+        intpty = context.get_value_type(types.intp)
+        with cgutils.for_range(builder, output.ary.nitems, intpty) as index:
+            # The current item of each array, once loaded or computed
+            items = {}
+            for kernel, (_, _, names, _), helpers in zip(kernels, calls,
+                                                         arguments):
+                vals_in = []
+                for name, inp in zip(names[:-1], helpers[:-1]):
+                    if not isinstance(inp, _ArrayHelper):
+                        vals_in.append(inp.load_flat(index))
+                        continue
+                    if name not in items:
+                        items[name] = inp.load_flat(index)
+                    vals_in.append(items[name])
+                out = helpers[-1]
+                val_out = kernel.generate(*vals_in)
+                if names[-1] not in dead:
+                    out.store_flat(index, val_out)
+                items[names[-1]] = context.get_value_as_data(
+                    builder, out.base_type, val_out)
+    return pred
+
+
+def _arrays_disjoint(context, builder, a, b):
+    """
+    Return an LLVM predicate telling whether the memory spans of
+    contiguous arrays *a* and *b* are disjoint.
+    """
+    intpty = context.get_value_type(types.intp)
+    bounds = []
+    for ary in (a, b):
+        start = builder.ptrtoint(ary.data, intpty)
+        size = builder.mul(ary.ary.nitems, ary.ary.itemsize)
+        bounds.append((start, builder.add(start, size)))
+    (start_a, end_a), (start_b, end_b) = bounds
+    return builder.or_(builder.icmp(lc.ICMP_ULE, end_a, start_b),
+                       builder.icmp(lc.ICMP_ULE, end_b, start_a))
+
+
+def _prange_bounds(context, builder, count):
+    """
+    Return the (start, stop) bounds of the chunk of range(*count*)
+    assigned to the current thread.
+    """
+    i64 = lc.Type.int(64)
+    fnty = lc.Type.function(lc.Type.void(),
+                            [lc.Type.pointer(i64)] * 2 + [i64])
+    fn = cgutils.get_module(builder).get_or_insert_function(
+        fnty, name="numba_prange_bounds")
+    startptr = cgutils.alloca_once_value(builder, lc.Constant.int(i64, 0))
+    stopptr = cgutils.alloca_once_value(
+        builder, context.cast(builder, count, types.intp, types.int64))
+    builder.call(fn, [startptr, stopptr, lc.Constant.int(i64, 1)])
+    return [context.cast(builder, builder.load(ptr), types.int64, types.intp)
+            for ptr in (startptr, stopptr)]
+
+
+@contextmanager
+def _chunked_loop_nest(builder, start, stop, shape, intp):
+    """
+    Like cgutils.loop_nest(), but the outer loop runs from *start*
+    to *stop*.
+    """
+    one = lc.Constant.int(intp, 1)
+    with cgutils.for_range_slice(builder, start, stop, one, intp) as ind:
+        if len(shape) > 1:
+            with cgutils.loop_nest(builder, shape[1:], intp) as indices:
+                yield (ind,) + indices
+        else:
+            yield (ind,)
+
+
+# Minimum number of output elements for an array expression to be
+# computed on several threads.
+PARALLEL_MIN_SIZE = 16384
+
+_parallel_loop_ids = itertools.count()
+
+
+def _parallel_ufunc_loop(context, builder, tyargs, args, kernel_class):
+    """
+    Compute *kernel_class* over *args* on several threads, by outlining
+    the loops into a separate function launched by parfor.call_parallel().
+    """
+    from numba import parfor
+
+    module = cgutils.get_module(builder)
+    fnty = context.call_conv.get_function_type(types.none, tyargs)
+    fn = module.add_function(fnty, "__numba_parallel_ufunc_%d"
+                                   % next(_parallel_loop_ids))
+    fn.linkage = 'internal'
+    argnames = ["arg%d" % i for i in range(len(tyargs))]
+    context.call_conv.decorate_function(fn, argnames, tyargs)
+
+    fnbuilder = lc.Builder.new(fn.append_basic_block("entry"))
+    fnargs = context.get_arg_packer(tyargs).from_arguments(
+        fnbuilder, context.call_conv.get_arguments(fn))
+    _ufunc_loop_nest(context, fnbuilder, tyargs, fnargs, kernel_class,
+                     chunked=True)
+    context.call_conv.return_native_none(fnbuilder)
+
+    # Small arrays aren't worth the synchronization cost
+    out = context.make_array(tyargs[-1])(context, builder, args[-1])
+    is_small = builder.icmp(lc.ICMP_SLT, out.nitems,
+                            context.get_constant(types.intp,
+                                                 PARALLEL_MIN_SIZE))
+    with cgutils.ifelse(builder, is_small) as (serial, parallel):
+        with serial:
+            status, _ = context.call_conv.call_function(
+                builder, fn, types.none, tyargs, args)
+            with cgutils.if_unlikely(builder, status.is_error):
+                context.call_conv.return_status_propagate(builder, status)
+        with parallel:
+            parfor.call_parallel(context, builder, fn, types.none, tyargs,
+                                 args)
 
 
 # Kernels are the code to be executed inside the multidimensional loop.
@@ -359,3 +709,31 @@ for ufunc in ufunc_db.get_ufuncs():
     else:
         raise RuntimeError("Don't know how to register ufuncs from ufunc_db with arity > 2")
 
+
+########################################################################
+# Array expressions: Python operators applied to arrays
+
+def register_array_operator_kernels():
+    known_ufuncs = ufunc_db.get_ufuncs()
+    for op_class in (npydecl.NumpyRulesArrayOperator,
+                     npydecl.NumpyRulesUnaryArrayOperator):
+        for op, ufunc_name in op_class._op_map.items():
+            ufunc = getattr(numpy, ufunc_name)
+            if ufunc not in known_ufuncs:
+                continue
+            kernel = _ufunc_db_function(ufunc)
+
+            def array_operator(context, builder, sig, args, kernel=kernel):
+                return numpy_ufunc_kernel(context, builder, sig, args, kernel,
+                                          explicit_output=False)
+
+            _any = types.Any
+            _arr_kind = types.Kind(types.Array)
+            if ufunc.nin == 1:
+                register(implement(op, _arr_kind)(array_operator))
+            else:
+                array_operator = implement(op, _arr_kind, _any)(array_operator)
+                register(implement(op, _any, _arr_kind)(array_operator))
+
+register_array_operator_kernels()
+
@@ -55,6 +55,17 @@ class TargetOptions(object):
         if kws.pop('nogil', False):
             flags.set("release_gil")
 
+        if kws.pop('parallel', False):
+            flags.set("auto_parallel")
+
+        if kws.pop('fastmath', False):
+            flags.set("fastmath")
+
+        # The target CPU isn't a compiler flag: it selects the target
+        # context itself (see Overloaded.__init__)
+        kws.pop('target_cpu', None)
+        kws.pop('target_features', None)
+
         flags.set("enable_pyobject_looplift")
 
         if kws:
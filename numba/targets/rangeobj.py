@@ -64,6 +64,44 @@ def make_range_impl(range_state_type, range_iter_type, int_type):
         state.step = step
         return state._getvalue()
 
+    def make_prange_impl(range_impl):
+        """
+        Build the implementation of prange() for the same arguments
+        as *range_impl*.
+        """
+        def prange_impl(context, builder, sig, args):
+            state = RangeState(context, builder,
+                               range_impl(context, builder, sig, args))
+            # Restrict the iteration space to the chunk assigned to the
+            # current thread, if any (see parfor.py).
+            i64 = lc.Type.int(64)
+            fnty = lc.Type.function(lc.Type.void(),
+                                    [lc.Type.pointer(i64)] * 2 + [i64])
+            fn = cgutils.get_module(builder).get_or_insert_function(
+                fnty, name="numba_prange_bounds")
+            startptr = cgutils.alloca_once_value(
+                builder, context.cast(builder, state.start, int_type,
+                                      types.int64))
+            stopptr = cgutils.alloca_once_value(
+                builder, context.cast(builder, state.stop, int_type,
+                                      types.int64))
+            step = context.cast(builder, state.step, int_type, types.int64)
+            builder.call(fn, [startptr, stopptr, step])
+            state.start = context.cast(builder, builder.load(startptr),
+                                       types.int64, int_type)
+            state.stop = context.cast(builder, builder.load(stopptr),
+                                      types.int64, int_type)
+            return state._getvalue()
+
+        return prange_impl
+
+    builtin(implement(types.prange_type, int_type)(
+        make_prange_impl(range1_impl)))
+    builtin(implement(types.prange_type, int_type, int_type)(
+        make_prange_impl(range2_impl)))
+    builtin(implement(types.prange_type, int_type, int_type, int_type)(
+        make_prange_impl(range3_impl)))
+
     @builtin
     @implement('getiter', range_state_type)
     def getiter_range32_impl(context, builder, sig, args):
@@ -0,0 +1,76 @@
+"""
+This file will be copied to a temporary directory in order to
+exercise caching compiled Numba functions.
+
+See test_dispatcher.py.
+"""
+from __future__ import division, print_function, absolute_import
+
+import numpy as np
+
+from numba import jit
+
+
+@jit(cache=True, nopython=True)
+def add_usecase(x, y):
+    return x + y + Z
+
+
+@jit(cache=True, forceobj=True)
+def add_objmode_usecase(x, y):
+    object()
+    return x + y + Z
+
+
+@jit(nopython=True)
+def add_nocache_usecase(x, y):
+    # This function is not cached
+    return x + y + Z
+
+
+@jit(cache=True, nopython=True)
+def inner(x, y):
+    return x + y + Z
+
+@jit(cache=True, nopython=True)
+def outer(x, y):
+    return inner(-y, x)
+
+
+@jit(cache=True, nopython=True)
+def ambiguous_function(x):
+    return x + 2
+
+renamed_function1 = ambiguous_function
+
+@jit(cache=True, nopython=True)
+def ambiguous_function(x):
+    return x + 6
+
+renamed_function2 = ambiguous_function
+
+
+@jit(cache=True, nopython=True)
+def array_sum_usecase(a):
+    return a.sum()
+
+
+def getitem(a, i):
+    return a[i]
+
+# The same function compiled with different options
+getitem_usecase = jit(cache=True, nopython=True)(getitem)
+getitem_boundcheck_usecase = jit(cache=True, nopython=True,
+                                 boundcheck=True)(getitem)
+
+
+Z = 1
+
+
+def self_test():
+    # Run this module's own functions, for use by a child process
+    mod = __import__(__name__)
+    from numba.tests.support import TestCase
+    TestCase().assertPreciseEqual(mod.add_usecase(2, 3), 6)
+    TestCase().assertPreciseEqual(mod.outer(3, 2), 2)
+    TestCase().assertPreciseEqual(mod.array_sum_usecase(np.arange(5.)), 10.)
@@ -4,12 +4,13 @@ Assorted utilities for use in tests.
 
 import cmath
 import contextlib
+import gc
 import math
 import sys
 
 import numpy as np
 
-from numba import config, typing, utils
+from numba import config, njit, runtime, typing, utils
 from numba.compiler import compile_extra, compile_isolated, Flags, DEFAULT_FLAGS
 from numba.lowering import LoweringError
 from numba.targets import cpu
@@ -241,8 +242,52 @@ class TestCase(unittest.TestCase):
         self.assertPreciseEqual(got, expected)
         return got, expected
 
+
+class MemoryLeakMixin(object):
+    """
+    A mixin for TestCase subclasses checking that the native runtime
+    (NRT) doesn't leak memory.  Each test starts by taking a snapshot
+    of the allocation statistics.
+    """
+
+    def setUp(self):
+        super(MemoryLeakMixin, self).setUp()
+        gc.collect()
+        self.old_stats = runtime.get_allocation_stats()
+
+    def assert_no_leak(self):
+        """
+        Check that all memory allocated since the test started was freed.
+        """
+        gc.collect()
+        new_stats = runtime.get_allocation_stats()
+        allocs = new_stats.alloc - self.old_stats.alloc
+        frees = new_stats.free - self.old_stats.free
+        self.assertEqual(allocs, frees)
+
+    def check(self, pyfunc, *args):
+        """
+        Check that the nopython version of *pyfunc* gives the same result
+        for *args*, without leaking memory.
+        """
+        cfunc = njit(pyfunc)
+        self.assertPreciseEqual(cfunc(*args), pyfunc(*args))
+        self.assert_no_leak()
+
+
 # Various helpers
 
+def linear_find(overloads, sig):
+    """
+    Reference implementation of targets.base.Overloads.find(): a linear
+    scan over all versions, without the index.
+    """
+    for ver_sig, impl in overloads.versions:
+        if ver_sig == sig or overloads._match_arglist(ver_sig.args, sig.args):
+            return impl
+    raise NotImplementedError(overloads, sig)
+
+
 @contextlib.contextmanager
 def override_config(name, value):
     """
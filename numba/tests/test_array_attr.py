@@ -46,6 +46,14 @@ def nested_array_size(a):
     return a.f.size
 
 
+def array_unboxed_attrs(a):
+    return a.shape, a.strides, a.size, a.itemsize, a.sum()
+
+
+class ArraySubclass(np.ndarray):
+    pass
+
+
 def size_after_slicing_usecase(buf, i):
     sliced = buf[i]
     # Make sure size attribute is not lost
@@ -146,5 +154,44 @@ class TestSlicedArrayAttr(unittest.TestCase):
             self.assertEqual(pyfunc(arr, i), cfunc(arr, i))
 
 
+class TestArrayUnboxing(unittest.TestCase):
+    """
+    Test array arguments are unboxed correctly, both by the inline fast
+    path for exact ndarrays and by the generic path.
+    """
+
+    def check(self, cfunc, arrays):
+        for a in arrays:
+            expected = (a.shape, a.strides, a.size, a.itemsize, a.sum())
+            self.assertEqual(cfunc(a), expected)
+
+    def test_layouts(self):
+        cfunc = njit(array_unboxed_attrs)
+        a = np.arange(60, dtype=np.int32).reshape(3, 4, 5)
+        self.check(cfunc, [a, a.T, a[::2, 1:, ::-2], a[:0]])
+        b = np.linspace(0, 1, 10)
+        self.check(cfunc, [b, b[::3], b[::-1]])
+        self.check(cfunc, [np.ones((4, 4), dtype=np.complex64)])
+
+    def test_subclass(self):
+        cfunc = njit(array_unboxed_attrs)
+        a = np.arange(12.).reshape(3, 4)
+        self.check(cfunc, [a.view(ArraySubclass), a, a.view(ArraySubclass)])
+
+    def test_records(self):
+        cfunc = njit(array_size)
+        dtype = np.dtype([('a', np.int16), ('b', np.float64)])
+        a = np.zeros(5, dtype=dtype)
+        self.assertEqual(cfunc(a), 5)
+        self.assertEqual(cfunc(a[::2]), 3)
+
+    def test_many_arguments(self):
+        @njit
+        def add_sizes(a, b, c, d, e):
+            return a.size + b.size + c.size + d.size + e.size
+        arrays = [np.zeros(i + 1) for i in range(5)]
+        self.assertEqual(add_sizes(*arrays), 15)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -117,6 +117,27 @@ def array_std(arr):
 def array_std_global(arr):
     return np.std(arr)
 
+def array_sum_axis(arr, axis):
+    return arr.sum(axis=axis)
+
+def array_sum_axis_global(arr, axis):
+    return np.sum(arr, axis)
+
+def array_prod_axis(arr, axis):
+    return arr.prod(axis)
+
+def array_mean_axis(arr, axis):
+    return arr.mean(axis=axis)
+
+def array_mean_axis_global(arr, axis):
+    return np.mean(arr, axis=axis)
+
+def array_var_axis(arr, axis):
+    return arr.var(axis=axis)
+
+def array_std_axis_global(arr, axis):
+    return np.std(arr, axis)
+
 def array_min(arr):
     return arr.min()
 
@@ -223,6 +244,99 @@ class TestArrayMethods(TestCase):
         npr, nbr = run_comparative(array_argmax, arr)
         self.assertPreciseEqual(npr, nbr)
 
+    def reduction_test_arrays(self, dtype):
+        base = np.arange(60, dtype=dtype) % 7 + 1
+        if base.dtype.kind == 'f':
+            base /= 7
+        return [base,
+                base.reshape(3, 4, 5),
+                np.asfortranarray(base.reshape(3, 4, 5)),
+                base.reshape(3, 4, 5)[:, ::2, 1:],
+                base[::3]]
+
+    def check_layouts(self, pyfunc):
+        for dtype in (np.float64, np.float32, np.int32):
+            for arr in self.reduction_test_arrays(dtype):
+                npr, nbr = run_comparative(pyfunc, arr)
+                prec = "single" if arr.dtype == np.float32 else "double"
+                self.assertPreciseEqual(npr, nbr, prec=prec, ulps=2)
+
+    def test_sum_layouts(self):
+        self.check_layouts(array_sum)
+
+    def test_mean_layouts(self):
+        self.check_layouts(array_mean)
+
+    def test_var_layouts(self):
+        self.check_layouts(array_var)
+
+    def test_std_layouts(self):
+        self.check_layouts(array_std)
+
+    def test_sum_accuracy(self):
+        # The summation error mustn't grow linearly with the array size
+        arr = np.random.RandomState(42).random_sample(10 ** 6)
+        arr = arr.astype(np.float32)
+        expected = arr.astype(np.float64).sum()
+        cres = compile_isolated(array_sum, (typeof(arr),))
+        got = cres.entry_point(arr)
+        self.assertLess(abs(got - expected) / expected, 1e-6)
+
+    def test_var_accuracy(self):
+        # A large offset makes the naive formula catastrophically wrong
+        arr = np.random.RandomState(42).random_sample(10 ** 5) + 1e8
+        for pyfunc in (array_var, array_std):
+            for a in (arr, arr.reshape(100, 1000)[:, ::2]):
+                npr, nbr = run_comparative(pyfunc, a)
+                np.testing.assert_allclose(nbr, npr, rtol=1e-6)
+
+    def check_axis_reduction(self, pyfunc):
+        for dtype in (np.float64, np.int32):
+            for arr in self.reduction_test_arrays(dtype):
+                cres = compile_isolated(pyfunc, (typeof(arr), types.intp))
+                cfunc = cres.entry_point
+                for axis in range(-arr.ndim, arr.ndim):
+                    expected = pyfunc(arr, axis)
+                    got = cfunc(arr, axis)
+                    if arr.ndim == 1:
+                        self.assertPreciseEqual(got, expected, prec="double",
+                                                ulps=2)
+                    else:
+                        self.assertEqual(got.shape, expected.shape)
+                        self.assertEqual(got.dtype, expected.dtype)
+                        np.testing.assert_allclose(got, expected, rtol=1e-12)
+                with self.assertRaises(ValueError) as raises:
+                    cfunc(arr, arr.ndim)
+                self.assertIn("axis is out of bounds", str(raises.exception))
+
+    def test_sum_axis(self):
+        self.check_axis_reduction(array_sum_axis)
+        self.check_axis_reduction(array_sum_axis_global)
+
+    def test_prod_axis(self):
+        self.check_axis_reduction(array_prod_axis)
+
+    def test_mean_axis(self):
+        self.check_axis_reduction(array_mean_axis)
+        self.check_axis_reduction(array_mean_axis_global)
+
+    def test_var_axis(self):
+        self.check_axis_reduction(array_var_axis)
+
+    def test_std_axis(self):
+        self.check_axis_reduction(array_std_axis_global)
+
+    def test_empty_lanes(self):
+        # Like Numpy, reducing empty lanes gives NaN instead of raising
+        arr = np.zeros((3, 0))
+        for pyfunc in (array_mean_axis, array_mean_axis_global,
+                       array_var_axis, array_std_axis_global):
+            cres = compile_isolated(pyfunc, (typeof(arr), types.intp))
+            got = cres.entry_point(arr, 1)
+            self.assertEqual(got.shape, (3,))
+            self.assertTrue(np.all(np.isnan(got)), got)
+            self.assertEqual(cres.entry_point(arr, 0).shape, (0,))
+
     def check_array_flat(self, arr, arrty=None):
         out = np.zeros(arr.size, dtype=arr.dtype)
         nb_out = out.copy()
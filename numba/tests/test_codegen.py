@@ -0,0 +1,155 @@
+"""
+Tests for numba.targets.codegen.
+"""
+from __future__ import print_function
+
+import ctypes
+
+import llvmlite.binding as ll
+
+import numba.unittest_support as unittest
+from numba import jit
+from numba.targets.codegen import AOTCPUCodegen, JITCPUCodegen
+from .support import TestCase, override_config
+
+
+asm_foo = """
+    @foo_counter = global i32 0
+
+    define i32 @foo(i32 %x) {
+        %y = add i32 %x, 42
+        ret i32 %y
+    }
+    """
+
+asm_bar = """
+    declare i32 @foo(i32)
+
+    define i32 @bar(i32 %x) {
+        %y = call i32 @foo(i32 %x)
+        %z = mul i32 %y, 2
+        ret i32 %z
+    }
+    """
+
+asm_baz = """
+    define i32 @baz(i32 %x) {
+        %y = sub i32 %x, 1
+        ret i32 %y
+    }
+    """
+
+asm_qux = """
+    @foo_counter = external global i32
+
+    define i32 @qux(i32 %x) {
+        %c = load i32* @foo_counter
+        %y = add i32 %x, %c
+        ret i32 %y
+    }
+    """
+
+
+class TestLinking(TestCase):
+    """
+    Test the linking of libraries added to the codegen with
+    add_linking_library().
+    """
+
+    def setUp(self):
+        self.codegen = JITCPUCodegen("test_codegen")
+        foo = self.make_library("foo", asm_foo)
+        self.codegen.add_linking_library(foo)
+
+    def make_library(self, name, asm):
+        library = self.codegen.create_library(name)
+        ll_module = ll.parse_assembly(asm)
+        ll_module.triple = ll.get_default_triple()
+        library.add_llvm_module(ll_module)
+        return library
+
+    def get_cfunc(self, library, name):
+        ptr = library.get_pointer_to_function(name)
+        return ctypes.CFUNCTYPE(ctypes.c_int32, ctypes.c_int32)(ptr)
+
+    def test_referenced_library(self):
+        bar = self.make_library("bar", asm_bar)
+        self.assertEqual(self.get_cfunc(bar, "bar")(3), 90)
+        self.assertIn("foo_counter", bar.get_llvm_str())
+
+    def test_referenced_global_variable(self):
+        # The "foo" library is linked in for its global variable
+        qux = self.make_library("qux", asm_qux)
+        self.assertEqual(self.get_cfunc(qux, "qux")(3), 3)
+        self.assertIn("define i32 @foo", qux.get_llvm_str())
+
+    def test_unreferenced_library(self):
+        # The "foo" library isn't linked in as it's not needed
+        baz = self.make_library("baz", asm_baz)
+        self.assertEqual(self.get_cfunc(baz, "baz")(3), 2)
+        self.assertNotIn("foo_counter", baz.get_llvm_str())
+
+
+class TestTargetCPU(TestCase):
+    """
+    Test the selection of the CPU and features code is generated for.
+    """
+
+    def test_jit_default(self):
+        codegen = JITCPUCodegen("test_codegen")
+        self.assertEqual(codegen._tm_cpu, ll.get_host_cpu_name())
+
+    def test_jit_override(self):
+        with override_config('CPU_NAME', 'generic'):
+            with override_config('CPU_FEATURES', '+sse2'):
+                codegen = JITCPUCodegen("test_codegen")
+        self.assertEqual(codegen._tm_cpu, 'generic')
+        self.assertEqual(codegen._tm_features, '+sse2')
+        self.assertEqual(codegen.magic_tuple()[1:], ('generic', '+sse2'))
+
+    def test_jit_explicit(self):
+        # Explicit arguments override the environment variables
+        with override_config('CPU_NAME', 'generic'):
+            codegen = JITCPUCodegen("test_codegen", 'core2', '+ssse3')
+        self.assertEqual(codegen._tm_cpu, 'core2')
+        self.assertEqual(codegen._tm_features, '+ssse3')
+
+    def test_jit_host(self):
+        codegen = JITCPUCodegen("test_codegen", 'host')
+        self.assertEqual(codegen._tm_cpu, ll.get_host_cpu_name())
+        with override_config('CPU_NAME', 'host'):
+            codegen = JITCPUCodegen("test_codegen")
+        self.assertEqual(codegen._tm_cpu, ll.get_host_cpu_name())
+
+    def test_dispatcher(self):
+        @jit(nopython=True)
+        def inner(x):
+            return x + 1
+
+        def outer(x):
+            return inner(x) * 2
+
+        generic = jit(nopython=True, target_cpu='generic')(outer)
+        self.assertPreciseEqual(generic(2), 6)
+        codegen = generic.targetctx.jit_codegen()
+        self.assertEqual(codegen.magic_tuple()[1], 'generic')
+        # The same codegen is reused for the same target
+        other = jit(nopython=True, target_cpu='generic')(outer)
+        self.assertPreciseEqual(other(3), 8)
+        self.assertIs(other.targetctx.jit_codegen(), codegen)
+        # Other functions are unaffected
+        host = jit(nopython=True)(outer)
+        self.assertPreciseEqual(host(2), 6)
+        self.assertEqual(host.targetctx.jit_codegen()._tm_cpu,
+                         ll.get_host_cpu_name())
+
+    def test_aot(self):
+        codegen = AOTCPUCodegen("test_codegen")
+        self.assertEqual(codegen._tm_cpu, '')
+        codegen = AOTCPUCodegen("test_codegen", 'host', '+sse2')
+        self.assertEqual(codegen._tm_cpu, ll.get_host_cpu_name())
+        self.assertEqual(codegen._tm_features, '+sse2')
+
+
+if __name__ == '__main__':
+    unittest.main()
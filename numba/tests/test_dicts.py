@@ -1,7 +1,10 @@
 from __future__ import print_function
 
+import numpy as np
+
+from numba import njit
 import numba.unittest_support as unittest
-from .support import TestCase, force_pyobj_flags
+from .support import MemoryLeakMixin, TestCase, force_pyobj_flags
 
 
 def build_map():
@@ -13,6 +16,99 @@ def build_map_from_local_vars():
     return {0: x, x: 1}
 
 
+def setitem_usecase(n):
+    d = {}
+    for i in range(n):
+        d[i * 7] = i * 0.5
+    return d
+
+def display_usecase(x):
+    d = {1: x, 2: x * 2, 3: x * 3}
+    return d
+
+def getitem_usecase(n, k):
+    d = {}
+    for i in range(n):
+        d[i] = i * i
+    return d[k]
+
+def get_usecase(n, k):
+    d = {}
+    for i in range(n):
+        d[i] = i * i
+    return d.get(k, -1)
+
+def count_usecase(arr):
+    counts = {}
+    for x in arr:
+        counts[x] = counts.get(x, 0) + 1
+    return counts
+
+def contains_usecase(n, k):
+    d = {}
+    for i in range(n):
+        d[i * 2] = True
+    return k in d, k not in d
+
+def delitem_usecase(n):
+    d = {}
+    for i in range(n):
+        d[i] = i
+    for i in range(0, n, 2):
+        del d[i]
+    return d
+
+def pop_usecase(n, k):
+    d = {}
+    for i in range(n):
+        d[i] = float(i)
+    return d.pop(k, -1.0), len(d)
+
+def pop_missing_usecase(n, k):
+    d = {}
+    for i in range(n):
+        d[i] = float(i)
+    return d.pop(k)
+
+def reinsert_usecase(n):
+    # Deleting and reinserting keys shouldn't fill the table with
+    # deleted entries
+    d = {}
+    for i in range(n):
+        d[i] = i
+        del d[i]
+    d[n] = n
+    return d
+
+def len_usecase(n):
+    d = {}
+    for i in range(n):
+        d[i % 5] = i
+    return len(d)
+
+def iter_usecase(n):
+    d = {}
+    for i in range(n):
+        d[i] = i + 1
+    keys = 0
+    for k in d:
+        keys += k
+    values = 0
+    for v in d.values():
+        values += v
+    items = 0
+    for k, v in d.items():
+        items += k * v
+    return keys, values, items
+
+def float_keys_usecase():
+    d = {}
+    d[0.0] = 1
+    d[-0.0] = 2
+    d[1.5] = 3
+    return d
+
+
 class DictTestCase(TestCase):
 
     def test_build_map(self, flags=force_pyobj_flags):
@@ -22,5 +118,67 @@ class DictTestCase(TestCase):
         self.run_nullary_func(build_map_from_local_vars, flags=flags)
 
 
+class TestNativeDicts(MemoryLeakMixin, TestCase):
+    """
+    Tests for typed dicts in nopython mode.
+    """
+
+    def test_setitem(self):
+        for n in (0, 1, 5, 1000):
+            self.check(setitem_usecase, n)
+
+    def test_display(self):
+        self.check(display_usecase, 4)
+
+    def test_getitem(self):
+        self.check(getitem_usecase, 10, 3)
+
+    def test_getitem_missing(self):
+        cfunc = njit(getitem_usecase)
+        with self.assertRaises(KeyError):
+            cfunc(10, 42)
+        self.assert_no_leak()
+
+    def test_get(self):
+        for k in (3, 42):
+            self.check(get_usecase, 10, k)
+
+    def test_count(self):
+        arr = np.array([3, 1, 4, 1, 5, 9, 2, 6, 5, 3, 5])
+        self.check(count_usecase, arr)
+
+    def test_contains(self):
+        for k in (4, 5, 100):
+            self.check(contains_usecase, 10, k)
+
+    def test_delitem(self):
+        for n in (0, 10, 100):
+            self.check(delitem_usecase, n)
+
+    def test_pop_missing(self):
+        cfunc = njit(pop_missing_usecase)
+        with self.assertRaises(KeyError):
+            cfunc(5, 42)
+        self.assert_no_leak()
+
+    def test_pop(self):
+        for k in (3, 42):
+            self.check(pop_usecase, 10, k)
+
+    def test_reinsert(self):
+        self.check(reinsert_usecase, 1000)
+
+    def test_len(self):
+        for n in (0, 3, 20):
+            self.check(len_usecase, n)
+
+    def test_iter(self):
+        for n in (0, 1, 100):
+            self.check(iter_usecase, n)
+
+    def test_float_keys(self):
+        self.check(float_keys_usecase)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,11 +1,20 @@
 from __future__ import print_function, division, absolute_import
 
+import array
+import ctypes
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
 import threading
+import warnings
 
 import numpy as np
 
 from numba import unittest_support as unittest
-from numba import utils, vectorize, jit
+from numba import config, dispatcher, utils, vectorize, jit, types
+from numba.typeinfer import TypingError
 from .support import TestCase
 
 
@@ -25,6 +34,25 @@ def addsub_defaults(x, y=2, z=3):
     return x - y + z
 
 
+def ignore(x):
+    return 0
+
+
+def floordiv(x, y):
+    return x // y
+
+
+class UserType(object):
+    _numba_type_ = types.float32
+
+    def __float__(self):
+        return 1.0
+
+
+class UntypedUserType(object):
+    pass
+
+
 class TestDispatcher(TestCase):
 
     def compile_func(self, pyfunc):
@@ -164,6 +192,30 @@ class TestDispatcher(TestCase):
             f(y=6, z=7)
         self.assertIn("missing argument 'x'", str(cm.exception))
 
+    def test_fast_entry(self):
+        """
+        Test calls going through the overloads' fast entry points.
+        """
+        f, check = self.compile_func(addsub_defaults)
+        check(3, 4, 10)
+        cres, = f._compileinfos.values()
+        self.assertNotEqual(f._get_fast_entry(cres), 0)
+        # Named arguments and default values are folded beforehand
+        check(3, z=10, y=4)
+        check(3)
+        self.assertEqual(len(f.overloads), 1)
+        # Objects are passed through in object mode
+        f = jit(forceobj=True)(add)
+        self.assertPreciseEqual(f([1], [2]), [1, 2])
+        self.assertPreciseEqual(f("a", "b"), "ab")
+        cres, = f._compileinfos.values()
+        self.assertNotEqual(f._get_fast_entry(cres), 0)
+        # Exceptions are propagated
+        f = jit(nopython=True)(floordiv)
+        self.assertPreciseEqual(f(7, 2), 3)
+        with self.assertRaises(ZeroDivisionError):
+            f(7, 0)
+
     def test_explicit_signatures(self):
         f = jit("(int64,int64)")(add)
         # Approximate match (unsafe conversion)
@@ -185,6 +237,26 @@ class TestDispatcher(TestCase):
         self.assertPreciseEqual(f(np.float32(1), np.float32(2**-25)), 1.0)
         self.assertPreciseEqual(f(1, 2**-25), 1.0000000298023224)
 
+    def test_many_signatures(self):
+        # Resolutions are cached per dispatcher; repeated calls, including
+        # failed ones, must keep resolving the same way.
+        scalars = [types.int8, types.int16, types.int32, types.int64,
+                   types.uint8, types.uint16, types.uint32, types.uint64,
+                   types.float32, types.float64, types.complex128]
+        sigs = [(a, b) for a in scalars[:-1] for b in scalars[-3:]]
+        f = jit(sigs, nopython=True)(add)
+        self.assertEqual(len(f.overloads), len(sigs))
+        for i in range(3):
+            self.assertPreciseEqual(f(np.int8(1), 2.5), 3.5)
+            self.assertPreciseEqual(f(np.uint16(1), np.float32(2.5)),
+                                    np.float32(3.5))
+            self.assertPreciseEqual(f(1, 2j), 1 + 2j)
+            with self.assertRaises(TypeError):
+                f(1j, 1j)
+        # Adding a definition invalidates the cached failure
+        f.compile((types.complex128, types.complex128))
+        self.assertPreciseEqual(f(1j, 1j), 2j)
+
     def test_signature_mismatch(self):
         tmpl = "Signature mismatch: %d argument types given, but function takes 2 arguments"
         with self.assertRaises(TypeError) as cm:
@@ -211,6 +283,86 @@ class TestDispatcher(TestCase):
                          "complex128, complex128")
 
 
+class TestArgumentTypecodes(TestCase):
+    """
+    Test the resolution of argument types by the C dispatcher.
+    """
+
+    def check_values(self, values, expected_type=None):
+        """
+        Check that all *values* are typed the same by the C dispatcher
+        as by the Python typing context, and only compile one version.
+        """
+        f = jit(ignore)
+        if expected_type is None:
+            expected_type = f.typeof_pyval(values[0])
+        for i in range(2):
+            for val in values:
+                self.assertPreciseEqual(f(val), 0)
+                self.assertEqual(f.signatures, [(expected_type,)])
+
+    def test_bool_none(self):
+        self.check_values([True, False], types.boolean)
+        self.check_values([None], types.none)
+
+    def test_homogeneous_tuple(self):
+        self.check_values([(1, 2), (3, 4)], types.UniTuple(types.int32, 2))
+        self.check_values([(1.5, 2.5, 3.5)], types.UniTuple(types.float64, 3))
+        self.check_values([(2**40, -2**40)], types.UniTuple(types.int64, 2))
+        self.check_values([(2**63, 2**64 - 1)],
+                          types.UniTuple(types.uint64, 2))
+
+    def test_heterogeneous_tuple(self):
+        self.check_values([(1, 2.5, True, None), (3, 4.5, False, None)])
+        self.check_values([(1, 2**40)],
+                          types.Tuple((types.int32, types.int64)))
+        self.check_values([(np.int8(1), np.float32(2.5), 1j)])
+        self.check_values([(np.arange(3), np.zeros((2, 2)))])
+
+    def test_nested_tuple(self):
+        self.check_values([((1, 2), (3.5, (4, None))),
+                           ((5, 6), (7.5, (8, None)))])
+
+    def test_tuple_fallback(self):
+        # Tuples of unhandled items or too many items are still typed
+        # correctly
+        self.check_values([("a", "b")])
+        self.check_values([tuple(range(20))])
+
+    def test_distinct_tuples(self):
+        f = jit(ignore)
+        values = [(1,), (1.5,), (1, 2), (1, 2.5), (2.5, 1), ((1,),), ()]
+        for i in range(2):
+            for val in values:
+                f(val)
+        self.assertEqual(sorted(f.signatures, key=str),
+                         sorted([(f.typeof_pyval(val),) for val in values],
+                                key=str))
+
+    def test_record(self):
+        dtype = np.dtype([('a', np.int32), ('b', np.float64)])
+        rec = np.zeros(2, dtype=dtype)
+        self.check_values([rec[0], rec[1]])
+
+    def test_ctypes_funcptr(self):
+        proto = ctypes.CFUNCTYPE(ctypes.c_double, ctypes.c_double)
+        funcs = [proto(lambda x: x), proto(lambda x: -x)]
+        self.check_values(funcs)
+        self.assertIsInstance(jit(ignore).typeof_pyval(funcs[0]),
+                              types.ExternalFunctionPointer)
+
+    @unittest.skipIf(sys.version_info < (2, 7), "needs memoryview")
+    def test_buffers(self):
+        self.check_values([bytearray(b"xyz"), bytearray(b"abcd")])
+        self.check_values([array.array('d', [1.0, 2.0])])
+        self.check_values([memoryview(bytearray(b"xyz"))])
+
+    def test_user_types(self):
+        self.check_values([UserType(), UserType()], types.float32)
+        self.check_values([UntypedUserType(), UntypedUserType()],
+                          types.pyobject)
+
+
 class TestDispatcherMethods(TestCase):
 
     def test_recompile(self):
@@ -301,5 +453,355 @@ class TestDispatcherMethods(TestCase):
         foo.inspect_types(utils.StringIO())
 
 
+class TestBackgroundCompile(TestCase):
+
+    def test_exact_signatures(self):
+        sigs = ["(int64,int64)", "(float64,float64)",
+                "(complex128,complex128)"]
+        f = jit(sigs, nopython=True, background=True)(add)
+        self.assertPreciseEqual(f(1, 2), 3)
+        self.assertPreciseEqual(f(1.5, 2.5), 4.0)
+        self.assertPreciseEqual(f(1j, 2), 2 + 1j)
+        self.assertEqual(len(f.overloads), 3, f.overloads)
+        self.assertFalse(f._pending)
+        self.assertFalse(f._can_compile)
+
+    def test_conversions(self):
+        f = jit(["(int64,int64)", "(float64,float64)"],
+                nopython=True, background=True)(add)
+        # Approximate match (int32 -> float64 is a safe conversion)
+        self.assertPreciseEqual(f(np.int32(1), 2.5), 3.5)
+        self.assertEqual(len(f.overloads), 2, f.overloads)
+        self.assertPreciseEqual(f(1, 2), 3)
+        with self.assertRaises(TypeError) as cm:
+            f(1j, 1j)
+        self.assertIn("No matching definition", str(cm.exception))
+
+    def test_called_from_jitted(self):
+        f = jit(["(int64,int64)", "(float64,float64)"],
+                nopython=True, background=True)(add)
+
+        @jit(nopython=True)
+        def g(x, y):
+            return f(x, y) * 2
+
+        self.assertPreciseEqual(g(1, 2), 6)
+        self.assertEqual(len(f.overloads), 2, f.overloads)
+
+    def test_object_mode(self):
+        # Object mode functions are compiled again in the calling process
+        f = jit(["(int64,int64)", "(float64,float64)"], forceobj=True,
+                background=True)(add)
+        self.assertPreciseEqual(f(1, 2), 3)
+        self.assertPreciseEqual(f(1.5, 2.5), 4.0)
+
+    def test_compile_error(self):
+        def bad(x):
+            return object()
+
+        # Errors are reported the first time the signature is needed
+        f = jit(["(int64,)"], nopython=True, background=True)(bad)
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always', config.NumbaWarning)
+            with self.assertRaises(TypingError):
+                f(1)
+        # The worker's failure isn't silently discarded either
+        self.assertTrue(any("background compilation of bad" in str(x.message)
+                            for x in w), [str(x.message) for x in w])
+
+    def test_pool_closed_when_idle(self):
+        f = jit(["(int64,int64)", "(float64,float64)"], nopython=True,
+                background=True)(add)
+        self.assertPreciseEqual(f(1, 2), 3)
+        self.assertPreciseEqual(f(1.5, 2.5), 4.0)
+        # All the work is done: the worker processes are released
+        self.assertIsNone(dispatcher._background_pool)
+        self.assertEqual(dispatcher._background_tasks, 0)
+
+
+class TestTieredCompile(TestCase):
+
+    def compile_tiered(self, pyfunc, threshold, **options):
+        f = jit(nopython=True, **options)(pyfunc)
+        f.enable_tiered_compilation(threshold)
+        return f
+
+    def test_tier_up(self):
+        f = self.compile_tiered(add, 5)
+        self.assertPreciseEqual(f(1, 2), 3)
+        [quick] = f._compileinfos.values()
+        self.assertEqual(f._quick_sigs, set(f.overloads))
+        for i in range(10):
+            self.assertPreciseEqual(f(i, 2), i + 2)
+        f._wait_tiering()
+        [optimized] = f._compileinfos.values()
+        self.assertIsNot(optimized, quick)
+        self.assertEqual(f._retired, [quick])
+        self.assertFalse(f._quick_sigs)
+        self.assertEqual(f.overloads[quick.signature.args],
+                         optimized.entry_point)
+        # The optimized version is called from now on
+        self.assertPreciseEqual(f(3, 4), 7)
+        self.assertPreciseEqual(f(1.5, 2.5), 4.0)
+        self.assertEqual(len(f.overloads), 2, f.overloads)
+
+    def test_several_overloads(self):
+        f = self.compile_tiered(add, 3)
+        self.assertPreciseEqual(f(1, 2), 3)
+        self.assertPreciseEqual(f(1j, 2j), 3j)
+        self.assertEqual(len(f._quick_sigs), 2)
+        self.assertPreciseEqual(f(1, 2), 3)
+        # Only the hot overload is recompiled
+        for i in range(5):
+            self.assertPreciseEqual(f(i, 2), i + 2)
+        f._wait_tiering()
+        self.assertEqual(len(f._quick_sigs), 1)
+        self.assertEqual(len(f._retired), 1)
+        self.assertPreciseEqual(f(1, 2), 3)
+        self.assertPreciseEqual(f(1j, 2j), 3j)
+        # Finished recompilation threads aren't kept around
+        for i in range(3):
+            self.assertPreciseEqual(f(1j, 2j), 3j)
+        f._wait_tiering()
+        self.assertEqual(len(f._tiering_threads), 1)
+
+    def test_recompile(self):
+        # Tiering up after recompile() replaces the right definition
+        f = self.compile_tiered(add, 2)
+        self.assertPreciseEqual(f(1, 2), 3)
+        f.recompile()
+        for i in range(4):
+            self.assertPreciseEqual(f(i, 1), i + 1)
+        f._wait_tiering()
+        self.assertFalse(f._quick_sigs)
+        self.assertPreciseEqual(f(1, 2), 3)
+
+    def test_decorator(self):
+        f = jit(nopython=True, tiered=True)(add)
+        self.assertGreater(f._tier_threshold, 0)
+        self.assertPreciseEqual(f(1, 2), 3)
+        f = jit(nopython=True)(add)
+        self.assertEqual(f._tier_threshold, 0)
+        with self.assertRaises(ValueError):
+            f.enable_tiered_compilation(0)
+
+
+class TestCache(TestCase):
+
+    here = os.path.dirname(__file__)
+    usecases_file = os.path.join(here, "cache_usecases.py")
+    modname = "caching_test_fodder"
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        sys.path.insert(0, self.tempdir)
+        self.modfile = os.path.join(self.tempdir, self.modname + ".py")
+        self.cache_dir = os.path.join(self.tempdir, "__pycache__")
+        shutil.copy(self.usecases_file, self.modfile)
+
+    def tearDown(self):
+        sys.modules.pop(self.modname, None)
+        sys.path.remove(self.tempdir)
+        shutil.rmtree(self.tempdir)
+
+    def import_module(self):
+        # Import a fresh version of the test module
+        old = sys.modules.pop(self.modname, None)
+        if old is not None:
+            # Make sure cached bytecode is removed
+            if sys.version_info >= (3,):
+                cached = [old.__cached__]
+            else:
+                fn = old.__file__
+                if fn.endswith(('.pyc', '.pyo')):
+                    fn = fn[:-1]
+                cached = [fn + 'c', fn + 'o']
+            for fn in cached:
+                try:
+                    os.unlink(fn)
+                except OSError:
+                    pass
+        mod = __import__(self.modname)
+        self.assertEqual(mod.__file__.rstrip('co'), self.modfile)
+        return mod
+
+    def cache_contents(self):
+        try:
+            return [fn for fn in os.listdir(self.cache_dir)
+                    if not fn.endswith(('.pyc', ".pyo"))]
+        except OSError:
+            return []
+
+    def get_cache_mtimes(self):
+        return dict((fn, os.path.getmtime(os.path.join(self.cache_dir, fn)))
+                    for fn in sorted(self.cache_contents()))
+
+    def check_cache(self, n):
+        c = self.cache_contents()
+        self.assertEqual(len(c), n, c)
+
+    def check_hits(self, func, hits, misses=None):
+        st = func.stats
+        self.assertEqual(sum(st.cache_hits.values()), hits, st.cache_hits)
+        if misses is not None:
+            self.assertEqual(sum(st.cache_misses.values()), misses,
+                             st.cache_misses)
+
+    def run_in_separate_process(self):
+        # Cached functions can be run from a distinct process.
+        code = """if 1:
+            import sys
+
+            sys.path.insert(0, %(tempdir)r)
+            mod = __import__(%(modname)r)
+            mod.self_test()
+            """ % dict(tempdir=self.tempdir, modname=self.modname)
+
+        popen = subprocess.Popen([sys.executable, "-c", code],
+                                 stdout=subprocess.PIPE,
+                                 stderr=subprocess.PIPE)
+        out, err = popen.communicate()
+        if popen.returncode != 0:
+            raise AssertionError("process failed with code %s: stderr follows"
+                                 "\n%s\n" % (popen.returncode, err.decode()))
+
+    def test_caching(self):
+        self.check_cache(0)
+        mod = self.import_module()
+        self.check_cache(0)
+
+        f = mod.add_usecase
+        self.assertPreciseEqual(f(2, 3), 6)
+        self.check_cache(2)  # 1 index, 1 data
+        self.assertPreciseEqual(f(2.5, 3), 6.5)
+        self.check_cache(3)  # 1 index, 2 data
+        self.check_hits(f, 0, 2)
+
+        f = mod.add_objmode_usecase
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            self.assertPreciseEqual(f(2, 3), 6)
+        # Object mode functions can't be cached
+        self.check_cache(3)
+        self.assertEqual(len(w), 1)
+        self.assertIn('Cannot cache compiled function "add_objmode_usecase" '
+                      'as it was compiled in object mode', str(w[0].message))
+
+        f = mod.array_sum_usecase
+        self.assertPreciseEqual(f(np.arange(5.)), 10.)
+        self.check_cache(5)
+
+        # Now import a fresh version of the module: overloads are
+        # loaded from the cache.
+        mod2 = self.import_module()
+        self.assertIsNot(mod, mod2)
+        f = mod2.add_usecase
+        self.assertPreciseEqual(f(2, 3), 6)
+        self.assertPreciseEqual(f(2.5, 3), 6.5)
+        self.check_hits(f, 2, 0)
+        self.check_cache(5)
+
+        # Check the code runs ok from another process
+        self.run_in_separate_process()
+
+    def test_inner_then_outer(self):
+        # Caching inner then outer function is ok
+        mod = self.import_module()
+        self.assertPreciseEqual(mod.inner(3, 2), 6)
+        self.check_cache(2)  # 1 index, 1 data
+        # Uncached outer function shouldn't fail (issue #1603)
+        f = mod.outer
+        self.assertPreciseEqual(f(3.5, 2), 2.5)
+        self.check_cache(4)  # 2 index, 2 data
+
+        mod = self.import_module()
+        f = mod.outer
+        self.assertPreciseEqual(f(3.5, 2), 2.5)
+        self.check_hits(f, 1, 0)
+        self.check_cache(4)
+
+    def test_ambiguous_function(self):
+        # Functions with the same qualified name and line number
+        # don't share their cache entries.
+        mod = self.import_module()
+        f1 = mod.renamed_function1
+        self.assertPreciseEqual(f1(2), 4)
+        f2 = mod.renamed_function2
+        self.assertPreciseEqual(f2(2), 8)
+
+        mod = self.import_module()
+        f1 = mod.renamed_function1
+        self.assertPreciseEqual(f1(2), 4)
+        self.check_hits(f1, 1, 0)
+        f2 = mod.renamed_function2
+        self.assertPreciseEqual(f2(2), 8)
+        self.check_hits(f2, 1, 0)
+
+    def test_different_options(self):
+        # Dispatchers of the same function with different compile
+        # options don't share their cache entries.
+        arr = np.arange(5)
+        mod = self.import_module()
+        f = mod.getitem_usecase
+        self.assertPreciseEqual(f(arr, 2), 2)
+        self.check_cache(2)  # 1 index, 1 data
+        g = mod.getitem_boundcheck_usecase
+        self.assertPreciseEqual(g(arr, 2), 2)
+        self.check_hits(g, 0, 1)
+        self.check_cache(3)  # 1 index, 2 data
+
+        mod = self.import_module()
+        f = mod.getitem_usecase
+        self.assertPreciseEqual(f(arr, 3), 3)
+        self.check_hits(f, 1, 0)
+        g = mod.getitem_boundcheck_usecase
+        self.assertPreciseEqual(g(arr, 3), 3)
+        self.check_hits(g, 1, 0)
+        self.check_cache(3)
+
+    def test_source_changed(self):
+        mod = self.import_module()
+        self.assertPreciseEqual(mod.add_usecase(2, 3), 6)
+        self.check_cache(2)
+        mtimes = self.get_cache_mtimes()
+
+        # Modify the source file: the cache must be invalidated
+        with open(self.modfile, "a") as f:
+            f.write("\nZ = 10\n")
+        # Make sure the file's modification time actually changes
+        st = os.stat(self.modfile)
+        os.utime(self.modfile, (st.st_atime, st.st_mtime + 2))
+
+        mod = self.import_module()
+        f = mod.add_usecase
+        self.assertPreciseEqual(f(2, 3), 15)
+        self.check_hits(f, 0, 1)
+        # The same files were overwritten
+        self.check_cache(2)
+        self.assertNotEqual(mtimes, self.get_cache_mtimes())
+
+    def test_non_creatable_pycache(self):
+        # Make the __pycache__ directory impossible to create and
+        # check the cache falls back on NUMBA_CACHE_DIR.
+        if os.name == 'nt' or (hasattr(os, 'getuid') and os.getuid() == 0):
+            self.skipTest("cannot make directory read-only as administrator")
+        cache_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_root)
+
+        from numba import config
+        old_cache_dir = config.CACHE_DIR
+        config.CACHE_DIR = cache_root
+        os.chmod(self.tempdir, 0o500)
+        try:
+            mod = self.import_module()
+            self.assertPreciseEqual(mod.add_usecase(2, 3), 6)
+        finally:
+            os.chmod(self.tempdir, 0o700)
+            config.CACHE_DIR = old_cache_dir
+        self.assertFalse(os.path.exists(self.cache_dir))
+        cached = [fn for _, _, files in os.walk(cache_root) for fn in files]
+        self.assertEqual(len(cached), 2, cached)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,84 @@
+from __future__ import print_function, division, absolute_import
+
+import numpy as np
+
+from numba import unittest_support as unittest
+from numba import jit, compiler
+from numba.targets.cpu import CPUTargetOptions
+from .support import TestCase
+
+
+def loop_sum(a):
+    c = 0.0
+    for v in a:
+        c += v
+    return c
+
+def array_sum(a):
+    return a.sum()
+
+def array_var(a):
+    return a.var()
+
+def array_std(a):
+    return a.std()
+
+
+class TestFastMath(TestCase):
+
+    def compile(self, pyfunc, fastmath):
+        return jit(nopython=True, fastmath=fastmath)(pyfunc)
+
+    def test_flags(self):
+        flags = compiler.Flags()
+        CPUTargetOptions.parse_as_flags(flags, {'fastmath': True})
+        self.assertTrue(flags.fastmath)
+        flags = compiler.Flags()
+        CPUTargetOptions.parse_as_flags(flags, {})
+        self.assertFalse(flags.fastmath)
+
+    def test_llvm_flags(self):
+        a = np.arange(10.0)
+        strict = self.compile(loop_sum, False)
+        fast = self.compile(loop_sum, True)
+        strict(a)
+        fast(a)
+        [strict_ir] = strict.inspect_llvm().values()
+        [fast_ir] = fast.inspect_llvm().values()
+        self.assertNotIn("fadd fast", strict_ir)
+        self.assertIn("fadd fast", fast_ir)
+
+    def assert_close(self, got, expected, rtol=1e-12):
+        self.assertIsInstance(got, float)
+        self.assertAlmostEqual(got, expected, delta=abs(expected) * rtol)
+
+    def test_results(self):
+        a = np.random.random(1000)
+        # The strict loop sums in the same order as the interpreter
+        strict = self.compile(loop_sum, False)
+        self.assertPreciseEqual(strict(a), loop_sum(a), prec="double")
+        for pyfunc in (loop_sum, array_sum, array_var, array_std):
+            expected = pyfunc(a)
+            strict = self.compile(pyfunc, False)
+            fast = self.compile(pyfunc, True)
+            # Numpy uses pairwise summation, and with fastmath the
+            # operations may also be reordered: the results are only
+            # equal up to rounding errors.
+            self.assert_close(strict(a), expected)
+            self.assert_close(fast(a), expected)
+
+    def test_internal_functions_not_shared(self):
+        # Implementations compiled with compile_internal() are cached
+        # separately for strict and fast math
+        a = np.arange(10.0)
+        fast = self.compile(array_sum, True)
+        strict = self.compile(array_sum, False)
+        self.assertPreciseEqual(fast(a), 45.0)
+        self.assertPreciseEqual(strict(a), 45.0)
+        for func, flag in ((fast, True), (strict, False)):
+            ir = "\n".join(func.inspect_llvm().values())
+            self.assertEqual("fadd fast" in ir, flag)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,14 @@
 
 from __future__ import print_function
+import math
+
+import numpy as np
+
 from numba.compiler import compile_isolated, Flags
-from numba import types
-from numba.tests.support import TestCase
+from numba import types, njit
+from numba.tests.support import MemoryLeakMixin, TestCase
 import numba.unittest_support as unittest
 from numba import testing
-import math
 
 enable_pyobj_flags = Flags()
 enable_pyobj_flags.set("enable_pyobject")
@@ -92,6 +95,81 @@ def list_reverse(l):
     l.reverse()
     return l
 
+def append_usecase(n):
+    l = []
+    for i in range(n):
+        l.append(i * 2)
+    return l
+
+def append_convert_usecase(n):
+    l = [0.5]
+    for i in range(n):
+        l.append(i)
+    return l
+
+def getitem_usecase(n, i):
+    l = [1, 2, 3]
+    for j in range(n):
+        l.append(j)
+    return l[i]
+
+def setitem_usecase(n, i, x):
+    l = [1, 2, 3]
+    l[i] = x
+    return l
+
+def len_usecase(n):
+    l = []
+    for i in range(n):
+        l.append(i)
+    return len(l)
+
+def iter_usecase(n):
+    l = []
+    for i in range(n):
+        l.append(i * 1.5)
+    total = 0.0
+    for x in l:
+        total += x
+    return total
+
+def pop_usecase(n):
+    l = [1]
+    for i in range(n):
+        l.append(i)
+    a = l.pop()
+    b = l.pop()
+    return a, b, len(l)
+
+def pop_empty_usecase():
+    l = [1]
+    l.pop()
+    return l.pop()
+
+def extend_usecase(n):
+    l = [1.0, 2.0]
+    m = []
+    for i in range(n):
+        m.append(i)
+    l.extend(m)
+    l.extend(l)
+    return l
+
+def to_array_usecase(n):
+    l = []
+    for i in range(n):
+        l.append(i * 0.5)
+    return np.array(l)
+
+def list_of_arrays_usecase(n):
+    l = []
+    for i in range(n):
+        l.append(np.ones(i + 1))
+    total = 0.0
+    for a in l:
+        total += a.sum()
+    return l[-1], total
+
 
 class TestLists(TestCase):
 
@@ -105,18 +183,16 @@ class TestLists(TestCase):
 
     def test_create_list(self):
         pyfunc = create_list
-        with self.assertTypingError():
-            cr = compile_isolated(pyfunc, (types.int32, types.int32, types.int32))
-            cfunc = cr.entry_point
-            self.assertEqual(cfunc(1, 2, 3), pyfunc(1, 2, 3))
+        cr = compile_isolated(pyfunc, (types.int32, types.int32, types.int32))
+        cfunc = cr.entry_point
+        self.assertEqual(cfunc(1, 2, 3), pyfunc(1, 2, 3))
 
     def test_create_nested_list(self):
         pyfunc = create_nested_list
-        with self.assertTypingError():
-            cr = compile_isolated(pyfunc, (types.int32, types.int32, types.int32,
-                types.int32, types.int32, types.int32))
-            cfunc = cr.entry_point
-            self.assertEqual(cfunc(1, 2, 3, 4, 5, 6), pyfunc(1, 2, 3, 4, 5, 6))
+        cr = compile_isolated(pyfunc, (types.int32, types.int32, types.int32,
+            types.int32, types.int32, types.int32))
+        cfunc = cr.entry_point
+        self.assertEqual(cfunc(1, 2, 3, 4, 5, 6), pyfunc(1, 2, 3, 4, 5, 6))
 
     def test_get_list_item(self):
         pyfunc = get_list_item
@@ -252,6 +328,72 @@ class TestLists(TestCase):
             self.assertEqual(cfunc(l), pyfunc(l))
 
 
+class TestNativeLists(MemoryLeakMixin, TestCase):
+    """
+    Tests for typed lists in nopython mode.
+    """
+
+    def test_append(self):
+        for n in (0, 1, 5, 1000):
+            self.check(append_usecase, n)
+
+    def test_append_convert(self):
+        # The appended integers are converted to the list's item type
+        cfunc = njit(append_convert_usecase)
+        expected = [float(x) for x in append_convert_usecase(5)]
+        self.assertPreciseEqual(cfunc(5), expected)
+
+    def test_getitem(self):
+        for i in (0, 2, 5, -1, -8):
+            self.check(getitem_usecase, 5, i)
+
+    def test_getitem_out_of_bounds(self):
+        cfunc = njit(getitem_usecase)
+        for i in (8, -9):
+            with self.assertRaises(IndexError):
+                cfunc(5, i)
+        self.assert_no_leak()
+
+    def test_setitem(self):
+        for i in (0, 2, -3):
+            self.check(setitem_usecase, 5, i, 42)
+
+    def test_len(self):
+        for n in (0, 7):
+            self.check(len_usecase, n)
+
+    def test_iter(self):
+        for n in (0, 10):
+            self.check(iter_usecase, n)
+
+    def test_pop(self):
+        self.check(pop_usecase, 5)
+
+    def test_pop_empty(self):
+        cfunc = njit(pop_empty_usecase)
+        with self.assertRaises(IndexError):
+            cfunc()
+
+    def test_extend(self):
+        cfunc = njit(extend_usecase)
+        for n in (0, 5):
+            expected = [float(x) for x in extend_usecase(n)]
+            self.assertPreciseEqual(cfunc(n), expected)
+        self.assert_no_leak()
+
+    def test_to_array(self):
+        for n in (0, 10):
+            self.check(to_array_usecase, n)
+
+    def test_list_of_arrays(self):
+        cfunc = njit(list_of_arrays_usecase)
+        arr, total = cfunc(4)
+        self.assertPreciseEqual(arr, np.ones(4))
+        self.assertPreciseEqual(total, 10.0)
+        del arr
+        self.assert_no_leak()
+
+
 if __name__ == '__main__':
     unittest.main()
 
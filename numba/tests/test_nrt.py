@@ -0,0 +1,161 @@
+from __future__ import print_function, division, absolute_import
+
+import numpy as np
+
+from numba import njit, runtime
+from numba import unittest_support as unittest
+from .support import MemoryLeakMixin, TestCase
+
+
+def empty_usecase(n):
+    return np.empty(n)
+
+def zeros_usecase(m, n):
+    return np.zeros((m, n), np.int32)
+
+def ones_usecase(n):
+    return np.ones(n)
+
+def empty_like_usecase(a):
+    b = np.empty_like(a)
+    for i in range(a.size):
+        b[i] = a[i] * 2
+    return b
+
+def zeros_like_usecase(a):
+    return np.zeros_like(a)
+
+def ones_like_usecase(a):
+    return np.ones_like(a, np.float32)
+
+def array_expr_usecase(a, b):
+    return a + b * 2
+
+def unary_expr_usecase(a):
+    return -a
+
+def copy_usecase(a):
+    b = a.copy()
+    b[0] = 42
+    return b
+
+def slice_usecase(a):
+    return a[1:-1]
+
+def nested_alloc_usecase(n):
+    total = 0.0
+    for i in range(n):
+        a = np.ones(i + 1)
+        total += a.sum()
+    return total
+
+
+class TestNRT(MemoryLeakMixin, TestCase):
+    """
+    Tests for array allocation through the native runtime.
+    """
+
+    def test_empty(self):
+        cfunc = njit(empty_usecase)
+        res = cfunc(5)
+        self.assertEqual(res.shape, (5,))
+        self.assertEqual(res.dtype, np.dtype('float64'))
+        del res
+        self.assert_no_leak()
+
+    def test_zeros(self):
+        cfunc = njit(zeros_usecase)
+        res = cfunc(3, 4)
+        self.assertPreciseEqual(res, zeros_usecase(3, 4))
+        self.assertTrue(res.flags.c_contiguous)
+        del res
+        self.assert_no_leak()
+
+    def test_ones(self):
+        cfunc = njit(ones_usecase)
+        res = cfunc(7)
+        self.assertPreciseEqual(res, ones_usecase(7))
+        del res
+        self.assert_no_leak()
+
+    def test_empty_like(self):
+        cfunc = njit(empty_like_usecase)
+        a = np.arange(6, dtype=np.int64)
+        res = cfunc(a)
+        self.assertPreciseEqual(res, empty_like_usecase(a))
+        del res
+        self.assert_no_leak()
+
+    def test_zeros_like(self):
+        cfunc = njit(zeros_like_usecase)
+        a = np.arange(6, dtype=np.float32).reshape((2, 3))
+        res = cfunc(a)
+        self.assertPreciseEqual(res, zeros_like_usecase(a))
+        del res
+        self.assert_no_leak()
+
+    def test_ones_like(self):
+        cfunc = njit(ones_like_usecase)
+        a = np.arange(6)
+        res = cfunc(a)
+        self.assertPreciseEqual(res, ones_like_usecase(a))
+        del res
+        self.assert_no_leak()
+
+    def test_negative_shape(self):
+        cfunc = njit(empty_usecase)
+        with self.assertRaises(ValueError):
+            cfunc(-1)
+        self.assert_no_leak()
+
+    def test_array_expr(self):
+        cfunc = njit(array_expr_usecase)
+        a = np.arange(10.)
+        b = np.linspace(0., 1., 10)
+        res = cfunc(a, b)
+        self.assertPreciseEqual(res, array_expr_usecase(a, b))
+        del res
+        self.assert_no_leak()
+
+    def test_unary_expr(self):
+        cfunc = njit(unary_expr_usecase)
+        a = np.arange(10.)
+        self.assertPreciseEqual(cfunc(a), unary_expr_usecase(a))
+        self.assert_no_leak()
+
+    def test_copy(self):
+        cfunc = njit(copy_usecase)
+        a = np.arange(5)
+        res = cfunc(a)
+        self.assertPreciseEqual(res, copy_usecase(a))
+        # The input must not be modified
+        self.assertPreciseEqual(a, np.arange(5))
+        del res
+        self.assert_no_leak()
+
+    def test_return_view(self):
+        cfunc = njit(slice_usecase)
+        a = np.arange(10)
+        res = cfunc(a)
+        self.assertPreciseEqual(res, slice_usecase(a))
+        # The view must share memory with the input
+        res[0] = 42
+        self.assertEqual(a[1], 42)
+
+    def test_nested_alloc(self):
+        cfunc = njit(nested_alloc_usecase)
+        self.assertPreciseEqual(cfunc(10), nested_alloc_usecase(10))
+        self.assert_no_leak()
+
+    def test_returned_array_keeps_memory(self):
+        cfunc = njit(ones_usecase)
+        res = cfunc(100)
+        stats = runtime.get_allocation_stats()
+        self.assertGreater(stats.alloc, stats.free)
+        self.assertPreciseEqual(res, np.ones(100))
+        del res
+        self.assert_no_leak()
+
+
+if __name__ == '__main__':
+    unittest.main()
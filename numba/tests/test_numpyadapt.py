@@ -10,6 +10,7 @@ from numba import _helperlib
 class ArrayStruct3D(Structure):
     # Mimick the structure defined in numba.targets.arrayobj's make_array()
     _fields_ = [
+        ("meminfo", c_void_p),
         ("parent", c_void_p),
         ("nitems", c_ssize_t),
         ("itemsize", c_ssize_t),
@@ -0,0 +1,125 @@
+from __future__ import print_function, absolute_import, division
+
+import os
+import signal
+
+import numpy
+
+from numba import unittest_support as unittest
+from numba import vectorize, guvectorize
+from numba.npyufunc import parallel
+from .support import TestCase
+
+
+def add(a, b):
+    return a + b
+
+def axpy(a, x, y):
+    return a * x + y
+
+def gusum(a, out):
+    acc = 0
+    for i in range(a.shape[0]):
+        acc += a[i]
+    out[0] = acc
+
+def guincr(a, out):
+    for i in range(a.shape[0]):
+        out[i] = a[i] + 1
+
+
+class TestParallelVectorize(TestCase):
+
+    # Large enough to be split across all threads
+    n = parallel.UFUNC_MIN_CHUNK * 64 + 17
+
+    def test_thread_count(self):
+        self.assertGreaterEqual(parallel.get_thread_count(), 1)
+
+    def test_vectorize(self):
+        ufunc = vectorize(['float64(float64, float64, float64)'],
+                          target='parallel')(axpy)
+        x = numpy.linspace(0, 1, self.n)
+        y = numpy.linspace(1, 2, self.n)
+        self.assertPreciseEqual(ufunc(2.0, x, y), axpy(2.0, x, y))
+
+    def test_vectorize_strided(self):
+        ufunc = vectorize(['int64(int64, int64)'], target='parallel')(add)
+        a = numpy.arange(self.n * 2).reshape((2, self.n))
+        self.assertPreciseEqual(ufunc(a[:, ::3], a.T[::3].T),
+                                a[:, ::3] + a[:, ::3])
+        out = numpy.zeros_like(a)
+        ufunc(a, a, out=out)
+        self.assertPreciseEqual(out, a + a)
+
+    def test_vectorize_small(self):
+        ufunc = vectorize(['int32(int32, int32)'], target='parallel')(add)
+        a = numpy.arange(10, dtype='int32')
+        self.assertPreciseEqual(ufunc(a, a), a + a)
+
+    def test_vectorize_reduce(self):
+        # Reductions and accumulations carry a loop dependency and must
+        # give the same results as the serial loop.
+        ufunc = vectorize(['int64(int64, int64)'], identity=0,
+                          target='parallel')(add)
+        a = numpy.arange(self.n)
+        self.assertEqual(ufunc.reduce(a), a.sum())
+        self.assertPreciseEqual(ufunc.accumulate(a), numpy.cumsum(a))
+
+    @unittest.skipUnless(hasattr(os, 'fork'), "needs os.fork()")
+    def test_vectorize_after_fork(self):
+        # A forked child doesn't inherit the worker threads: they must
+        # be launched again rather than waited for forever.
+        ufunc = vectorize(['int64(int64, int64)'], target='parallel')(add)
+        a = numpy.arange(self.n)
+        self.assertPreciseEqual(ufunc(a, a), a + a)
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                # Die rather than hang
+                signal.alarm(60)
+                if (ufunc(a, a) == a + a).all():
+                    status = 0
+            finally:
+                os._exit(status)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(status, 0)
+
+    def test_vectorize_lazy(self):
+        with self.assertRaises(TypeError):
+            vectorize(target='parallel')(add)
+
+    def test_vectorize_objmode(self):
+        with self.assertRaises(ValueError):
+            vectorize(['int32(int32, int32)'], target='parallel',
+                      forceobj=True)(add)
+
+    def test_guvectorize(self):
+        ufunc = guvectorize(['void(float64[:], float64[:])'],
+                            '(n)->()', target='parallel')(gusum)
+        a = numpy.arange(1000 * 30, dtype=numpy.float64).reshape((1000, 30))
+        self.assertPreciseEqual(ufunc(a), a.sum(axis=1))
+
+    def test_guvectorize_core_overlap(self):
+        # The output overlaps the input only through the core dimension
+        # of the last input row: the results must be the same as with
+        # the serial loop.
+        serial = guvectorize(['void(int64[:], int64[:])'],
+                             '(n)->(n)', target='cpu')(guincr)
+        ufunc = guvectorize(['void(int64[:], int64[:])'],
+                            '(n)->(n)', target='parallel')(guincr)
+        m, n = 100, 10
+
+        def run(ufunc):
+            flat = numpy.arange(2 * m * n)
+            a = flat[:m * n].reshape((m, n))
+            out = flat[(m - 1) * n + 1:(2 * m - 1) * n + 1].reshape((m, n))
+            ufunc(a, out=out)
+            return flat
+
+        self.assertPreciseEqual(run(ufunc), run(serial))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+from __future__ import print_function, division, absolute_import
+
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from numba import njit, prange
+from numba import unittest_support as unittest
+from numba.targets import npyimpl
+from .support import TestCase
+
+
+def sum_usecase(n):
+    acc = 0
+    for i in prange(n):
+        acc += i
+    return acc
+
+def sub_usecase(a):
+    acc = 0.0
+    for i in prange(a.shape[0]):
+        acc -= a[i]
+    return acc
+
+def prod_usecase(a):
+    acc = 1
+    for i in prange(a.shape[0]):
+        acc *= a[i]
+    return acc
+
+def smooth_usecase(a, out):
+    norm = 0.0
+    for i in prange(1, a.shape[0] - 1):
+        out[i] = (a[i - 1] + a[i] + a[i + 1]) / 3
+        norm += out[i] ** 2
+    return norm
+
+def step_usecase(a):
+    for i in prange(a.shape[0] - 1, -1, -3):
+        a[i] = i
+
+def last_index_usecase(n):
+    # Not a reduction: the loop runs serially
+    j = 0
+    for i in prange(n):
+        j = i
+    return j
+
+def nested_usecase(a):
+    acc = 0
+    for i in prange(a.shape[0]):
+        for j in prange(a.shape[1]):
+            acc += a[i, j]
+    return acc
+
+def div_usecase(a, b):
+    acc = 0
+    for i in prange(a.shape[0]):
+        acc += a[i] // b[i]
+    return acc
+
+def array_expr_usecase(a, b):
+    return a * 2 + b
+
+
+class TestParfor(TestCase):
+
+    n = npyimpl.PARALLEL_MIN_SIZE * 4 + 3
+
+    def test_prange_python(self):
+        self.assertEqual(list(prange(5)), list(range(5)))
+        self.assertEqual(list(prange(1, 10, 3)), list(range(1, 10, 3)))
+
+    def test_prange_serial(self):
+        cfunc = njit(sum_usecase)
+        self.assertPreciseEqual(cfunc(1000), sum_usecase(1000))
+
+    def test_sum(self):
+        cfunc = njit(parallel=True)(sum_usecase)
+        for n in (0, 1, 3, 1000, self.n):
+            self.assertPreciseEqual(cfunc(n), sum_usecase(n))
+
+    def test_sub(self):
+        cfunc = njit(parallel=True)(sub_usecase)
+        a = np.linspace(0, 1, self.n)
+        self.assertAlmostEqual(cfunc(a), sub_usecase(a))
+
+    def test_prod(self):
+        cfunc = njit(parallel=True)(prod_usecase)
+        a = np.array([1, 2, -1, 3, 1, -2, 5, 1, 1, 2], dtype=np.int64)
+        self.assertPreciseEqual(cfunc(a), prod_usecase(a))
+
+    def test_array_writes(self):
+        cfunc = njit(parallel=True)(smooth_usecase)
+        a = np.arange(self.n, dtype=np.float64) % 17
+        expected = np.zeros_like(a)
+        got = np.zeros_like(a)
+        norm = smooth_usecase(a, expected)
+        self.assertAlmostEqual(cfunc(a, got), norm, places=2)
+        self.assertPreciseEqual(got, expected)
+
+    def test_negative_step(self):
+        cfunc = njit(parallel=True)(step_usecase)
+        expected = np.zeros(100, dtype=np.int64)
+        got = expected.copy()
+        step_usecase(expected)
+        cfunc(got)
+        self.assertPreciseEqual(got, expected)
+
+    def test_not_reduction(self):
+        cfunc = njit(parallel=True)(last_index_usecase)
+        self.assertPreciseEqual(cfunc(100), last_index_usecase(100))
+
+    def test_nested(self):
+        cfunc = njit(parallel=True)(nested_usecase)
+        a = np.arange(300).reshape((20, 15))
+        self.assertPreciseEqual(cfunc(a), nested_usecase(a))
+
+    def test_exception(self):
+        cfunc = njit(parallel=True)(div_usecase)
+        a = np.arange(self.n)
+        b = np.ones_like(a)
+        self.assertPreciseEqual(cfunc(a, b), div_usecase(a, b))
+        b[-1] = 0
+        with self.assertRaises(ZeroDivisionError):
+            cfunc(a, b)
+
+    def test_array_expr(self):
+        cfunc = njit(parallel=True)(array_expr_usecase)
+        for n in (10, self.n):
+            a = np.linspace(0, 1, n)
+            b = np.arange(n, dtype=np.float64)
+            self.assertPreciseEqual(cfunc(a, b), array_expr_usecase(a, b))
+        a = np.arange(self.n * 2).reshape((2, self.n))
+        self.assertPreciseEqual(cfunc(a, a[0]), array_expr_usecase(a, a[0]))
+        self.assertPreciseEqual(cfunc(a.T, 1), array_expr_usecase(a.T, 1))
+
+    def test_several_threads(self):
+        # Run prange loops and parallel array expressions with a fixed
+        # number of worker threads, regardless of the number of cores.
+        code = """if 1:
+            import numpy as np
+            from numba import njit
+            from numba.npyufunc import parallel
+            from numba.tests import test_parfor as mod
+
+            assert parallel.get_thread_count() == 4
+            n = mod.TestParfor.n
+            cfunc = njit(parallel=True)(mod.sum_usecase)
+            assert cfunc(n) == mod.sum_usecase(n)
+            a = np.arange(n, dtype=np.float64) % 17
+            expected = np.zeros_like(a)
+            got = np.zeros_like(a)
+            mod.smooth_usecase(a, expected)
+            njit(parallel=True)(mod.smooth_usecase)(a, got)
+            assert (got == expected).all()
+            cfunc = njit(parallel=True)(mod.array_expr_usecase)
+            assert (cfunc(a, a) == mod.array_expr_usecase(a, a)).all()
+            """
+        env = dict(os.environ, NUMBA_NUM_THREADS='4')
+        popen = subprocess.Popen([sys.executable, "-c", code], env=env,
+                                 stdout=subprocess.PIPE,
+                                 stderr=subprocess.PIPE)
+        out, err = popen.communicate()
+        if popen.returncode != 0:
+            raise AssertionError("process failed with code %s: stderr follows"
+                                 "\n%s\n" % (popen.returncode, err.decode()))
+
+
+if __name__ == '__main__':
+    unittest.main()
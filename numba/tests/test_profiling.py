@@ -0,0 +1,109 @@
+"""
+Tests for compile-time profiling (numba.profiling).
+"""
+from __future__ import print_function
+
+import json
+import os
+import shutil
+import tempfile
+
+from numba import jit, profiling, types
+from numba import unittest_support as unittest
+from .support import TestCase
+
+
+def add(x, y):
+    return x + y
+
+
+def loop(n):
+    s = 0
+    for i in range(n):
+        s += i
+    return s
+
+
+class TestProfiling(TestCase):
+
+    def setUp(self):
+        self.profiles = []
+        profiling.add_listener(self.profiles.append)
+
+    def tearDown(self):
+        profiling.remove_listener(self.profiles.append)
+
+    def check_profile(self, profile, func_name, args):
+        self.assertEqual(profile.func_name, func_name)
+        self.assertEqual(profile.args, args)
+        self.assertGreater(profile.duration, 0)
+        stages = profile.get_stage_times()
+        self.assertIn("nopython frontend", stages)
+        self.assertIn("nopython mode backend", stages)
+        for timing in profile.stages:
+            self.assertEqual(timing.pipeline, "nopython")
+            self.assertGreaterEqual(timing.start, profile.start)
+            self.assertLessEqual(timing.duration, profile.duration)
+        self.assertTrue(profile.llvm)
+        for timing in profile.llvm:
+            # IR sizes are measured as we are listening
+            self.assertGreater(timing.ir_size_before, 0)
+            self.assertGreater(timing.ir_size_after, 0)
+
+    def test_listener(self):
+        cfunc = jit(nopython=True)(add)
+        cfunc(1, 2)
+        cfunc(1.5, 2.5)
+        profiles = [p for p in self.profiles if p.func_name == "add"]
+        self.assertEqual(len(profiles), 2)
+        self.check_profile(profiles[0], "add", (types.int64, types.int64))
+        self.check_profile(profiles[1], "add",
+                           (types.float64, types.float64))
+
+    def test_dispatcher_stats(self):
+        cfunc = jit(nopython=True)(loop)
+        cfunc(5)
+        profiles = cfunc.stats.profiles
+        self.assertEqual(list(profiles), [(types.int64,)])
+        profile = profiles[(types.int64,)]
+        self.check_profile(profile, "loop", (types.int64,))
+        self.assertIn(profile, self.profiles)
+
+    def test_no_listener(self):
+        profiling.remove_listener(self.profiles.append)
+        try:
+            cfunc = jit(nopython=True)(add)
+            cfunc(1, 2)
+        finally:
+            profiling.add_listener(self.profiles.append)
+        [profile] = cfunc.stats.profiles.values()
+        self.assertGreater(profile.duration, 0)
+        for timing in profile.llvm:
+            self.assertIs(timing.ir_size_before, None)
+            self.assertIs(timing.ir_size_after, None)
+
+    def test_trace(self):
+        recorder = profiling.TraceRecorder()
+        profiling.add_listener(recorder)
+        try:
+            jit(nopython=True)(add)(1, 2)
+        finally:
+            profiling.remove_listener(recorder)
+        tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tempdir)
+        path = os.path.join(tempdir, "trace.json")
+        recorder.write(path)
+        with open(path) as f:
+            trace = json.load(f)
+        events = trace["traceEvents"]
+        names = set(ev["name"] for ev in events)
+        self.assertIn("add(int64, int64)", names)
+        self.assertIn("nopython frontend", names)
+        self.assertIn("LLVM finalize", names)
+        for ev in events:
+            self.assertEqual(ev["ph"], "X")
+            self.assertGreaterEqual(ev["dur"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
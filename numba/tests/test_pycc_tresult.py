@@ -4,7 +4,8 @@ import tempfile
 import sys
 from ctypes import *
 from numba import unittest_support as unittest
-from numba.pycc import find_shared_ending, main
+import llvmlite.binding as ll
+from numba.pycc import find_shared_ending, main, multiversion
 
 base_path = os.path.dirname(os.path.abspath(__file__))
 
@@ -21,10 +22,7 @@ def unset_macosx_deployment_target():
 @unittest.skipIf(sys.platform.startswith("win32"), "Skip win32 test for now")
 class TestPYCC(unittest.TestCase):
 
-    def test_pycc_ctypes_lib(self):
-        """
-        Test creating a C shared library object using pycc.
-        """
+    def check_pycc_ctypes_lib(self, extra_args=()):
         unset_macosx_deployment_target()
 
         modulename = os.path.join(base_path, 'compile_with_pycc')
@@ -36,7 +34,7 @@ class TestPYCC(unittest.TestCase):
         _cleanup()
         self.addCleanup(_cleanup)
 
-        main(args=[modulename + '.py'])
+        main(args=list(extra_args) + [modulename + '.py'])
         lib = CDLL(cdll_modulename)
         lib.mult.argtypes = [POINTER(c_double), c_void_p, c_void_p,
                              c_double, c_double]
@@ -54,6 +52,29 @@ class TestPYCC(unittest.TestCase):
         lib.multf(byref(res), None, None, 987, 321)
         self.assertEqual(res.value, 987 * 321)
 
+    def test_pycc_ctypes_lib(self):
+        """
+        Test creating a C shared library object using pycc.
+        """
+        self.check_pycc_ctypes_lib()
+
+    def test_pycc_ctypes_lib_target_cpu(self):
+        """
+        Test creating a C shared library object for the host CPU.
+        """
+        self.check_pycc_ctypes_lib(['--target-cpu', 'host'])
+
+    @unittest.skipUnless(multiversion.is_supported_triple(
+                             ll.get_default_triple()),
+                         "CPU variants not supported on this platform")
+    def test_pycc_ctypes_lib_cpu_variants(self):
+        """
+        Test creating a C shared library object with multiversioned
+        functions.  Whatever variant gets selected, results must be
+        the same.
+        """
+        self.check_pycc_ctypes_lib(['--cpu-variants', 'sse42,avx2,avx512'])
+
     def test_pycc_pymodule(self):
         """
         Test creating a CPython extension module using pycc.
@@ -112,6 +133,14 @@ class TestPYCC(unittest.TestCase):
         bitcode_magic = b'BC\xc0\xde'
         self.assertTrue(bc.startswith((bitcode_magic, bitcode_wrapper_magic)), bc)
 
+    def test_cpu_variants(self):
+        variants = multiversion.get_variants(['avx512', 'sse42'])
+        self.assertEqual([v.name for v in variants], ['sse42', 'avx512'])
+        self.assertIn('+avx512f', variants[1].features)
+        self.assertIn('osxsave', variants[1].cpuid_bits)
+        with self.assertRaises(ValueError):
+            multiversion.get_variants(['sse42', 'foo'])
+
 
 if __name__ == "__main__":
     unittest.main()
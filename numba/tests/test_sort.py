@@ -0,0 +1,148 @@
+from __future__ import print_function
+
+import numpy as np
+
+from numba import njit
+import numba.unittest_support as unittest
+from .support import TestCase
+
+
+def sort_usecase(a):
+    a.sort()
+
+def np_sort_usecase(a):
+    return np.sort(a)
+
+def argsort_usecase(a):
+    return a.argsort()
+
+def np_argsort_usecase(a):
+    return np.argsort(a)
+
+def np_searchsorted_usecase(a, v):
+    return np.searchsorted(a, v)
+
+
+class TestArraySort(TestCase):
+    """
+    Tests for sorting and searching 1D arrays in nopython mode.
+    """
+
+    def int_arrays(self):
+        np.random.seed(42)
+        # Small arrays use the introsort, large ones the radix sort
+        for n in (0, 1, 2, 10, 100, 5000):
+            for dtype in (np.int8, np.uint16, np.int32, np.int64, np.uint64):
+                info = np.iinfo(dtype)
+                yield np.random.randint(max(info.min, -1000),
+                                        min(info.max, 1000),
+                                        size=n).astype(dtype)
+        # Already sorted, reversed and constant inputs
+        yield np.arange(3000)
+        yield np.arange(3000)[::-1].copy()
+        yield np.zeros(3000, dtype=np.int64)
+        yield np.array([np.iinfo(np.int64).min, -1, 0, 1,
+                        np.iinfo(np.int64).max] * 300)
+
+    def float_arrays(self):
+        np.random.seed(42)
+        for n in (0, 1, 2, 10, 100, 5000):
+            for dtype in (np.float32, np.float64):
+                a = np.random.random(n).astype(dtype) - 0.5
+                a[::7] = np.nan
+                yield a
+        yield np.array([0.0, -np.inf, np.inf, np.nan, -0.0, 1.0])
+
+    def datetime_arrays(self):
+        np.random.seed(42)
+        for n in (0, 10, 5000):
+            a = np.random.randint(0, 10**12, size=n).astype('M8[ms]')
+            yield a
+            # Where NaTs are sorted depends on the Numpy version: the
+            # expected results are always computed by Numpy itself
+            a = a.copy()
+            a[::7] = np.datetime64('NaT')
+            yield a
+            yield a.astype('m8[ms]')
+        yield np.array(['2012-01-01', 'NaT', '2000-01-01'], dtype='M8[D]')
+
+    def assertArraysEqual(self, got, expected):
+        # NaT doesn't compare equal to itself in recent Numpy versions,
+        # so compare datetimes and timedeltas as their int64 values
+        if expected.dtype.kind in 'mM':
+            self.assertEqual(got.dtype, expected.dtype)
+            got = got.view(np.int64)
+            expected = expected.view(np.int64)
+        self.assertPreciseEqual(got, expected)
+
+    def all_arrays(self):
+        for arrays in (self.int_arrays(), self.float_arrays(),
+                       self.datetime_arrays()):
+            for a in arrays:
+                yield a
+        yield np.array([True, False, True, False] * 500)
+
+    def test_sort(self):
+        cfunc = njit(sort_usecase)
+        for a in self.all_arrays():
+            expected = a.copy()
+            got = a.copy()
+            sort_usecase(expected)
+            cfunc(got)
+            self.assertArraysEqual(got, expected)
+
+    def test_sort_non_contiguous(self):
+        cfunc = njit(sort_usecase)
+        a = np.arange(100)[::-1].copy()
+        expected = a.copy()
+        sort_usecase(expected[::3])
+        cfunc(a[::3])
+        self.assertPreciseEqual(a, expected)
+
+    def test_np_sort(self):
+        cfunc = njit(np_sort_usecase)
+        for a in self.all_arrays():
+            orig = a.copy()
+            self.assertArraysEqual(cfunc(a), np_sort_usecase(a))
+            # The input is left untouched
+            self.assertArraysEqual(a, orig)
+
+    def check_argsort(self, pyfunc):
+        cfunc = njit(pyfunc)
+        for a in self.all_arrays():
+            got = cfunc(a)
+            self.assertEqual(got.dtype, np.intp)
+            # The sort isn't stable, so only compare the sorted values
+            self.assertPreciseEqual(np.sort(got), np.arange(len(a)))
+            self.assertArraysEqual(a[got], a[pyfunc(a)])
+
+    def test_argsort(self):
+        self.check_argsort(argsort_usecase)
+
+    def test_np_argsort(self):
+        self.check_argsort(np_argsort_usecase)
+
+    def test_searchsorted(self):
+        pyfunc = np_searchsorted_usecase
+        cfunc = njit(pyfunc)
+        for a in (np.sort(np.random.randint(0, 50, size=200)),
+                  np.sort(np.random.random(200)),
+                  np.array([1.0, 2.0, np.nan, np.nan])):
+            values = np.linspace(-1, 51, 500)
+            values[::11] = np.nan
+            self.assertPreciseEqual(cfunc(a, values), pyfunc(a, values))
+            self.assertPreciseEqual(cfunc(a, values[::-1]),
+                                    pyfunc(a, values[::-1]))
+            for v in (-1, 0, 25, 49.5, 100, np.nan):
+                self.assertPreciseEqual(cfunc(a, v), pyfunc(a, v))
+        a = np.random.randint(0, 10**12, size=100).astype('M8[ms]')
+        self.assertPreciseEqual(cfunc(np.sort(a), a[::-7]),
+                                pyfunc(np.sort(a), a[::-7]))
+        a[::9] = np.datetime64('NaT')
+        a = np.sort(a)
+        for v in (a, a[::-7], a[0], a[-1], np.datetime64('NaT', 'ms')):
+            self.assertPreciseEqual(cfunc(a, v), pyfunc(a, v))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+Tests for the lookup of lowering implementations (numba.targets.base).
+"""
+from __future__ import print_function
+
+from numba import types, typing
+from numba import unittest_support as unittest
+from numba.targets.base import Overloads
+from numba.targets.registry import CPUOverloaded
+from .support import linear_find
+
+
+class TestOverloads(unittest.TestCase):
+
+    def make_overloads(self, *sigs):
+        ovs = Overloads()
+        for i, sig in enumerate(sigs):
+            ovs.append("impl%d" % i, sig)
+        return ovs
+
+    def test_exact(self):
+        ovs = self.make_overloads(
+            typing.signature(types.int32, types.int32, types.int32),
+            typing.signature(types.float64, types.float64, types.float64))
+        sig = typing.signature(types.float64, types.float64, types.float64)
+        self.assertEqual(ovs.find(sig), "impl1")
+        # A cached lookup gives the same result
+        self.assertEqual(ovs.find(sig), "impl1")
+        with self.assertRaises(NotImplementedError):
+            ovs.find(typing.signature(types.int64, types.int64, types.int64))
+        with self.assertRaises(NotImplementedError):
+            ovs.find(typing.signature(types.int64, types.int64, types.int64))
+
+    def test_registration_order(self):
+        # The first matching version wins, be it generic or exact
+        ovs = self.make_overloads(
+            typing.signature(types.Any, types.Kind(types.Integer),
+                             types.int64),
+            typing.signature(types.int64, types.int64, types.int64),
+            typing.signature(types.Any, types.Any, types.Any))
+        sig = typing.signature(types.int64, types.int64, types.int64)
+        self.assertEqual(ovs.find(sig), "impl0")
+        sig = typing.signature(types.int64, types.int64, types.float64)
+        self.assertEqual(ovs.find(sig), "impl2")
+        sig = typing.signature(types.float64, types.float64, types.int64)
+        self.assertEqual(ovs.find(sig), "impl2")
+
+    def test_kind_and_vararg(self):
+        ovs = self.make_overloads(
+            typing.signature(types.none),
+            typing.signature(types.Any, types.Kind(types.Float)),
+            typing.signature(types.Any, types.VarArg(types.Any)))
+        self.assertEqual(ovs.find(typing.signature(types.none)), "impl0")
+        self.assertEqual(ovs.find(typing.signature(types.float32,
+                                                   types.float32)),
+                         "impl1")
+        self.assertEqual(ovs.find(typing.signature(types.int32,
+                                                   types.int32)),
+                         "impl2")
+        self.assertEqual(ovs.find(typing.signature(types.int32, types.int32,
+                                                   types.float32)),
+                         "impl2")
+
+    def test_append_invalidates(self):
+        ovs = self.make_overloads(
+            typing.signature(types.int32, types.int32))
+        sig = typing.signature(types.float32, types.float32)
+        with self.assertRaises(NotImplementedError):
+            ovs.find(sig)
+        ovs.append("new", sig)
+        self.assertEqual(ovs.find(sig), "new")
+
+    def test_builtin_registry(self):
+        # The indexed lookup agrees with a linear scan on all concrete
+        # signatures of the builtin implementations
+        context = CPUOverloaded.targetdescr.target_context
+        concrete = (types.Kind, types.VarArg)
+        for key, overloads in list(context.defns.items()):
+            for sig, _ in overloads.versions:
+                if any(isinstance(a, concrete) or a == types.Any
+                       for a in sig.args):
+                    continue
+                self.assertIs(overloads.find(sig),
+                              linear_find(overloads, sig), (key, sig))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,7 +4,7 @@ import itertools
 import numpy as np
 from numba import unittest_support as unittest
 from numba.compiler import compile_isolated
-from numba import types, typeinfer, typing, jit
+from numba import bytecode, compiler, types, typeinfer, typing, jit
 
 
 class TestArgRetCasting(unittest.TestCase):
@@ -261,5 +261,121 @@ class TestCoercion(unittest.TestCase):
         self.assertEqual(str(unified), expect, msg=msg)
 
 
+class TestResolutionCache(unittest.TestCase):
+
+    def test_hits(self):
+        ctx = typing.Context()
+        args = (types.int32, types.float64)
+        sig = ctx.resolve_function_type("+", args, ())
+        self.assertEqual(sig.return_type, types.float64)
+        self.assertEqual(ctx.get_resolution_cache_stats(), (0, 1, 1))
+        self.assertIs(ctx.resolve_function_type("+", args, ()), sig)
+        self.assertEqual(ctx.get_resolution_cache_stats(), (1, 1, 1))
+        # Keyword arguments are part of the key
+        self.assertIs(ctx.resolve_function_type("+", args, {}), sig)
+        self.assertEqual(ctx.get_resolution_cache_stats(), (2, 1, 1))
+
+    def test_failures(self):
+        ctx = typing.Context()
+        args = (types.pyobject, types.float64)
+        self.assertIs(ctx.resolve_function_type("+", args, ()), None)
+        self.assertIs(ctx.resolve_function_type("+", args, ()), None)
+        self.assertEqual(ctx.get_resolution_cache_stats(), (1, 1, 1))
+
+    def test_invalidation(self):
+        ctx = typing.Context()
+        ctx.resolve_function_type("+", (types.int32, types.int32), ())
+        self.assertEqual(ctx.get_resolution_cache_stats().size, 1)
+
+        def user_func():
+            pass
+
+        class UserTemplate(typing.templates.ConcreteTemplate):
+            key = user_func
+            cases = [typing.signature(types.int32, types.int32)]
+
+        ctx.insert_user_function(user_func, UserTemplate)
+        self.assertEqual(ctx.get_resolution_cache_stats().size, 0)
+
+        fnty = ctx.resolve_value_type(user_func)
+        sig = ctx.resolve_function_type(fnty, (types.float64,), ())
+        self.assertIs(sig, None)
+
+        class ExtraTemplate(typing.templates.ConcreteTemplate):
+            key = user_func
+            cases = [typing.signature(types.float64, types.float64)]
+
+        # Extending the user function drops the cached failure
+        ctx.extend_user_function(user_func, ExtraTemplate)
+        sig = ctx.resolve_function_type(fnty, (types.float64,), ())
+        self.assertEqual(sig.return_type, types.float64)
+
+        ctx.resolve_function_type("+", (types.int32, types.int32), ())
+        disp = jit(nopython=True)(user_func)
+        ctx.insert_overloaded(disp)
+        self.assertEqual(ctx.get_resolution_cache_stats().size, 0)
+
+
+def propagation_usecase(n, a):
+    acc = 0.0
+    t = (n, 1)
+    i, j = t
+    while i < n:
+        x = a[i] * 2
+        acc += x
+        j = i
+        i += 1
+    a[j] = acc
+    return acc, a.shape[0], j
+
+
+def propagation_loop_usecase(n):
+    # The type of *x* grows from int to float across the back-edge
+    x = 0
+    y = 0
+    for i in range(n):
+        y = x
+        x = y + 0.5
+    return x + y
+
+
+class TestPropagation(unittest.TestCase):
+    """
+    Check the worklist-based constrain propagation against applying
+    every constrain until the typesets stop growing.
+    """
+
+    def infer(self, func, args, exhaustive):
+        ctx = typing.Context()
+        interp = compiler.translate_stage(bytecode.ByteCode(func=func))
+        infer = typeinfer.TypeInferer(ctx, interp)
+        for index, (name, ty) in enumerate(zip(interp.argspec.args, args)):
+            infer.seed_argument(name, index, ty)
+        infer.build_constrain()
+        if exhaustive:
+            oldtoken = None
+            while infer.get_state_token() != oldtoken:
+                oldtoken = infer.get_state_token()
+                for constrain in infer.constrains.constrains:
+                    constrain(ctx, infer.typevars)
+        else:
+            infer.propagate()
+        return infer.unify()
+
+    def check(self, func, args):
+        typemap, restype, _ = self.infer(func, args, exhaustive=False)
+        expected_typemap, expected_restype, _ = self.infer(func, args,
+                                                           exhaustive=True)
+        self.assertEqual(dict(typemap), dict(expected_typemap))
+        self.assertEqual(restype, expected_restype)
+
+    def test_straight_line_and_loop(self):
+        self.check(propagation_usecase,
+                   (types.intp, types.Array(types.float32, 1, 'C')))
+
+    def test_back_edge(self):
+        self.check(propagation_loop_usecase, (types.int32,))
+
+
 if __name__ == '__main__':
     unittest.main()
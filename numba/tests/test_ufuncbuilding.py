@@ -1,5 +1,6 @@
 from __future__ import print_function, absolute_import, division
 
+import itertools
 import sys
 
 import numpy
@@ -22,6 +23,9 @@ def mul(a, b):
     """A multiplication"""
     return a * b
 
+def axpy(a, x, y):
+    return a * x + y
+
 def guadd(a, b, c):
     """A generalized addition"""
     x, y = c.shape
@@ -96,6 +100,29 @@ class TestUfuncBuilding(unittest.TestCase):
         b = ufunc(a, a)
         self.assertTrue(numpy.all(a + a == b))
 
+    def test_ufunc_layouts(self):
+        # Exercise the loops specialized for mixes of contiguous and
+        # broadcast operands, as well as the general loop.
+        ufb = UFuncBuilder(axpy)
+        ufb.add("float32(float32, float32, float32)")
+        ufb.add("float64(float64, float64, float64)")
+        ufb.add("complex128(complex128, complex128, complex128)")
+        ufunc = ufb.build_ufunc()
+
+        for dtype in ('float32', 'float64', 'complex128'):
+            base = numpy.arange(40, dtype=dtype)
+            # Contiguous, broadcast scalar and strided operands
+            operands = {'C': base[:20], 'S': base[3], 'A': base[::2]}
+            for layout in itertools.product('CSA', repeat=3):
+                args = [operands[c] for c in layout]
+                expected = axpy(*args)
+                numpy.testing.assert_allclose(ufunc(*args), expected)
+                # Strided output
+                out = numpy.zeros(40, dtype=dtype)
+                ufunc(*(args + [out[::2]]))
+                numpy.testing.assert_allclose(out[::2], expected)
+                self.assertTrue(numpy.all(out[1::2] == 0))
+
 
 class TestGUfuncBuilding(unittest.TestCase):
 
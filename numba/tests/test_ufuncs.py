@@ -9,7 +9,7 @@ import warnings
 import numpy as np
 
 import numba.unittest_support as unittest
-from numba import types, typing, utils
+from numba import types, typing, utils, typeof
 from numba.compiler import compile_isolated, Flags, DEFAULT_FLAGS
 from numba.numpy_support import from_dtype
 from numba import vectorize
@@ -1007,12 +1007,51 @@ class TestUFuncs(TestCase):
             self.assertTrue(np.all(result == expected))
 
     def test_implicit_output_npm(self):
-        with self.assertRaises(TypeError):
-            def myadd(a0, a1):
-                return np.add(a0, a1)
-            arr_ty = types.Array(types.uint64, 1, 'C')
-            cr = compile_isolated(myadd, (arr_ty, arr_ty),
-                                  flags=no_pyobj_flags)
+        def myadd(a0, a1):
+            return np.add(a0, a1)
+        arr_ty = types.Array(types.uint64, 1, 'C')
+        cr = compile_isolated(myadd, (arr_ty, arr_ty),
+                              flags=no_pyobj_flags)
+        cfunc = cr.entry_point
+        a = np.arange(10, dtype='u8')
+        b = np.arange(10, 20, dtype='u8')
+        np.testing.assert_equal(cfunc(a, b), np.add(a, b))
+
+    def test_layouts(self):
+        # Contiguous operands of the same shape are iterated over with
+        # a flat loop, other operands with the general loop nest.
+        pyfunc = _make_binary_ufunc_usecase(np.add)
+        base = np.arange(24, dtype='f8').reshape(4, 6)
+        # All operands broadcast to a (4, 6) shape
+        operands = [base, base.T.copy().T,
+                    np.arange(48, dtype='f8').reshape(8, 6)[::2],
+                    np.arange(48, dtype='f8').reshape(4, 12)[:, ::2],
+                    base[:1], base[:, :1], np.float64(1.5)]
+        for x, y in itertools.product(operands, operands):
+            expected = np.add(x, y)
+            if expected.ndim == 0:
+                continue
+            outputs = [np.zeros(expected.shape, order='C'),
+                       np.zeros(expected.shape, order='F'),
+                       np.zeros((expected.shape[0] * 2,) +
+                                expected.shape[1:])[::2]]
+            for out in outputs:
+                argtys = tuple(typeof(v) for v in (x, y, out))
+                cr = self.cache.compile(pyfunc, argtys, flags=no_pyobj_flags)
+                out[...] = 0
+                cr.entry_point(x, y, out)
+                np.testing.assert_equal(out, expected)
+
+        # Same with 'A' layout types, whose contiguity is checked at runtime
+        aty = types.Array(types.float64, 2, 'A')
+        cr = self.cache.compile(pyfunc, (aty, aty, aty), flags=no_pyobj_flags)
+        for x, y in itertools.product(operands[:-1], operands[:-1]):
+            expected = np.add(x, y)
+            for order in 'CF':
+                out = np.zeros(expected.shape, order=order)
+                cr.entry_point(x, y, out)
+                np.testing.assert_equal(out, expected)
+
 
 class TestScalarUFuncs(TestCase):
     """check the machinery of ufuncs works when the result is an scalar.
@@ -1131,6 +1170,101 @@ class TestUfuncIssues(TestCase):
         self.assertEqual(foo(1j, 1j), cr.entry_point(1j, 1j))
 
 
+def fused_chain_usecase(a, b, c, out):
+    tmp = np.empty_like(a)
+    np.multiply(a, b, tmp)
+    np.add(tmp, c, out)
+    np.sqrt(out, out)
+
+def fused_live_temp_usecase(a, b, out):
+    tmp = np.empty_like(a)
+    np.multiply(a, b, tmp)
+    np.add(tmp, b, out)
+    return tmp
+
+def fused_scalar_usecase(a, b, out):
+    np.multiply(a, 3, out)
+    np.subtract(out, b, out)
+    np.negative(out, out)
+
+
+class TestFusedUfuncs(TestCase):
+    """
+    Test chains of explicit-output ufunc calls, which are computed in
+    a single loop when the operands allow it.
+    """
+
+    def compile(self, pyfunc, args):
+        argtys = tuple(typeof(a) for a in args)
+        cr = compile_isolated(pyfunc, argtys, flags=no_pyobj_flags)
+        self.assertIn("fused_ufuncs", cr.type_annotation.annotate())
+        return cr.entry_point
+
+    def check_chain(self, a, b, c, out):
+        cfunc = self.compile(fused_chain_usecase, (a, b, c, out))
+        expected = out.copy()
+        fused_chain_usecase(a, b, c, expected)
+        cfunc(a, b, c, out)
+        np.testing.assert_allclose(out, expected)
+
+    def test_chain(self):
+        a = np.linspace(1, 2, 24).reshape(4, 6)
+        b = a[::-1].copy()
+        c = np.arange(24, dtype='f8').reshape(4, 6)
+        self.check_chain(a, b, c, np.zeros_like(a))
+        # Non-contiguous output
+        self.check_chain(a, b, c, np.zeros((8, 6))[::2])
+        # Broadcast operand
+        self.check_chain(a, b, c[:1], np.zeros_like(a))
+        # Empty arrays
+        self.check_chain(a[:0], b[:0], c[:0], np.zeros((0, 6)))
+
+    def test_live_temporary(self):
+        # The temporary is used after the chain, so it must be written to
+        a = np.linspace(1, 2, 10)
+        b = np.linspace(3, 4, 10)
+        cfunc = self.compile(fused_live_temp_usecase, (a, b, a))
+        expected = np.zeros_like(a)
+        got = np.zeros_like(a)
+        tmp = cfunc(a, b, got)
+        np.testing.assert_allclose(tmp,
+                                   fused_live_temp_usecase(a, b, expected))
+        np.testing.assert_allclose(got, expected)
+
+    def test_aliasing(self):
+        # The output is the memory of an input of an earlier call, or
+        # partially overlaps with it
+        b = np.linspace(3, 4, 10)
+        c = np.linspace(5, 6, 10)
+        cases = [lambda base: (base[:-1], b, c, base[:-1]),
+                 lambda base: (base[:-1], b, c, base[1:]),
+                 lambda base: (base[1:], b, c, base[:-1])]
+        for make_args in cases:
+            base = np.linspace(1, 2, 11)
+            expected = base.copy()
+            fused_chain_usecase(*make_args(expected))
+            cfunc = self.compile(fused_chain_usecase, make_args(base))
+            cfunc(*make_args(base))
+            np.testing.assert_allclose(base, expected)
+
+    def test_scalar_operands(self):
+        pyfunc = fused_scalar_usecase
+        for a in (np.arange(10),
+                  np.asfortranarray(np.arange(12).reshape(3, 4))):
+            b = a * 2 + 1
+            cfunc = self.compile(pyfunc, (a, b, a))
+            expected = np.zeros_like(a)
+            got = np.zeros_like(a)
+            pyfunc(a, b, expected)
+            cfunc(a, b, got)
+            self.assertPreciseEqual(got, expected)
+            # The output is also the first input
+            expected = a.copy(order='A')
+            got = a.copy(order='A')
+            pyfunc(expected, b, expected)
+            cfunc(got, b, got)
+            self.assertPreciseEqual(got, expected)
+
 class TestLoopTypes(TestCase):
     """Test code generation for the different loop types defined by ufunc.
 
@@ -74,6 +74,8 @@ TypeCompatibleCode TCCMap::find(TypePair key) const {
 
 // ------ TypeManager ------
 
+TypeManager::TypeManager() :generation(0) { }
+
 bool TypeManager::canPromote(Type from, Type to) const {
     return isCompatible(from, to) == TCC_PROMOTE;
 }
@@ -101,6 +103,11 @@ void TypeManager::addSafeConversion(Type from, Type to) {
 void TypeManager::addCompatibility(Type from, Type to, TypeCompatibleCode tcc) {
     TypePair pair(from, to);
     tccmap.insert(pair, tcc);
+    ++generation;
+}
+
+unsigned int TypeManager::getGeneration() const {
+    return generation;
 }
 
 TypeCompatibleCode TypeManager::isCompatible(Type from, Type to) const {
@@ -76,6 +76,8 @@ struct Rating{
 
 class TypeManager{
 public:
+    TypeManager();
+
     bool canPromote(Type from, Type to) const;
     bool canUnsafeConvert(Type from, Type to) const;
     bool canSafeConvert(Type from, Type to) const;
@@ -95,11 +97,18 @@ public:
     int selectOverload(Type sig[], Type ovsigs[], int &selected, int sigsz,
                        int ovct, bool allow_unsafe) const;
 
+    /**
+    Incremented whenever a compatibility rule is added, so that callers
+    caching the results of selectOverload() can detect stale entries.
+    */
+    unsigned int getGeneration() const;
+
 private:
     int _selectOverload(Type sig[], Type ovsigs[], int &selected, int sigsz,
                         int ovct, bool allow_unsafe, Rating ratings[]) const;
 
     TCCMap tccmap;
+    unsigned int generation;
 };
 
 
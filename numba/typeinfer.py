@@ -14,7 +14,9 @@ Constrains push types forward following the dataflow.
 
 from __future__ import print_function, division, absolute_import
 
+from collections import defaultdict
 from pprint import pprint
+import heapq
 import itertools
 
 from numba import ir, types, utils, config, six
@@ -91,8 +93,13 @@ class TypeVar(object):
 
 class ConstrainNetwork(object):
     """
-    TODO: It is possible to optimize constrain propagation to consider only
-          dirty type variables.
+    A network of constrains, each reading the typesets of its input
+    variables (get_inputs()) and growing those of its output variables
+    (get_outputs()).
+
+    Propagation uses a worklist: all constrains are applied once, in
+    order, then a constrain is only applied again when the typeset of
+    one of its inputs has grown.
     """
 
     def __init__(self):
@@ -102,15 +109,43 @@ class ConstrainNetwork(object):
         self.constrains.append(constrain)
 
     def propagate(self, context, typevars):
-        for constrain in self.constrains:
-            try:
-                constrain(context, typevars)
-            except TypingError:
-                raise
-            except Exception as e:
-                msg = "Internal error at {con}:\n{err}"
-                raise TypingError(msg.format(con=constrain, err=e),
-                                  loc=constrain.loc)
+        """
+        Apply the constrains until the typesets stop growing.
+        """
+        # { variable name: indices of the constrains reading it }
+        dependents = defaultdict(list)
+        for i, constrain in enumerate(self.constrains):
+            for name in set(constrain.get_inputs()):
+                dependents[name].append(i)
+
+        # Constrains are applied in order of their index, so that a
+        # straight-line dataflow is fully propagated in a single sweep.
+        worklist = list(range(len(self.constrains)))
+        queued = set(worklist)
+        while worklist:
+            i = heapq.heappop(worklist)
+            queued.discard(i)
+            constrain = self.constrains[i]
+            outputs = [typevars[name] for name in constrain.get_outputs()]
+            sizes = [len(tv) for tv in outputs]
+            self._apply(constrain, context, typevars)
+            for tv, size in zip(outputs, sizes):
+                if len(tv) == size:
+                    continue
+                for j in dependents[tv.var]:
+                    if j not in queued:
+                        heapq.heappush(worklist, j)
+                        queued.add(j)
+
+    def _apply(self, constrain, context, typevars):
+        try:
+            constrain(context, typevars)
+        except TypingError:
+            raise
+        except Exception as e:
+            msg = "Internal error at {con}:\n{err}"
+            raise TypingError(msg.format(con=constrain, err=e),
+                              loc=constrain.loc)
 
 
 class Propagate(object):
@@ -126,6 +161,12 @@ class Propagate(object):
     def __call__(self, context, typevars):
         typevars[self.dst].union(typevars[self.src])
 
+    def get_inputs(self):
+        return [self.src]
+
+    def get_outputs(self):
+        return [self.dst]
+
 
 class BuildTupleConstrain(object):
     def __init__(self, target, items, loc):
@@ -144,6 +185,88 @@ class BuildTupleConstrain(object):
                 tup = types.Tuple(vals)
             oset.add_types(tup)
 
+    def get_inputs(self):
+        return [i.name for i in self.items]
+
+    def get_outputs(self):
+        return [self.target]
+
+
+class BuildListConstrain(object):
+    """
+    Constrain for list displays.  The list's item type is unified from
+    the types of its *items*, or for an empty list, from the types of
+    the values later appended to it (*appended*).
+    """
+
+    def __init__(self, target, items, loc, appended=()):
+        self.target = target
+        self.items = items
+        self.appended = appended
+        self.loc = loc
+
+    def __call__(self, context, typevars):
+        itemvars = self.items or self.appended
+        tsets = [typevars[v.name].get() for v in itemvars]
+        if not tsets or not all(tsets):
+            # Wait until all items are typed
+            return
+        itemtys = set(itertools.chain.from_iterable(tsets))
+        dtype = context.unify_types(*itemtys)
+        if dtype == types.pyobject:
+            raise TypingError("Cannot unify list items of types %s"
+                              % ", ".join(sorted(str(t) for t in itemtys)),
+                              loc=self.loc)
+        typevars[self.target].add_types(types.List(dtype))
+
+    def get_inputs(self):
+        return [v.name for v in self.items or self.appended]
+
+    def get_outputs(self):
+        return [self.target]
+
+
+class BuildMapConstrain(object):
+    """
+    Constrain for dict displays.  The dict's key and value types are
+    unified from the (key, value) pairs later stored in it (*items*).
+    Pairs which aren't typed yet (e.g. because they depend on the dict
+    itself) are ignored, as long as at least one key and one value are.
+    """
+    # Only scalar keys and values are supported in nopython mode
+    item_classes = (types.Boolean, types.Integer, types.Float, types.Complex,
+                    types.NPDatetime, types.NPTimedelta)
+
+    def __init__(self, target, items, loc):
+        self.target = target
+        self.items = items
+        self.loc = loc
+
+    def __call__(self, context, typevars):
+        keytys = set()
+        valtys = set()
+        for key, value in self.items:
+            keytys.update(typevars[key.name].get())
+            valtys.update(typevars[value.name].get())
+        if not keytys or not valtys:
+            return
+        key_type = context.unify_types(*keytys)
+        value_type = context.unify_types(*valtys)
+        for what, tys, ty in (("keys", keytys, key_type),
+                              ("values", valtys, value_type)):
+            if not isinstance(ty, self.item_classes):
+                raise TypingError("Unsupported dict %s of types %s"
+                                  % (what, ", ".join(sorted(str(t)
+                                                            for t in tys))),
+                                  loc=self.loc)
+        typevars[self.target].add_types(types.Dict(key_type, value_type))
+
+    def get_inputs(self):
+        return [v.name for pair in self.items for v in pair]
+
+    def get_outputs(self):
+        return [self.target]
+
 
 class ExhaustIterConstrain(object):
     def __init__(self, target, count, iterator, loc):
@@ -161,6 +284,12 @@ class ExhaustIterConstrain(object):
             elif isinstance(tp, types.Tuple):
                 oset.add_types(tp)
 
+    def get_inputs(self):
+        return [self.iterator.name]
+
+    def get_outputs(self):
+        return [self.target]
+
 
 class PairFirstConstrain(object):
     def __init__(self, target, pair, loc):
@@ -176,6 +305,12 @@ class PairFirstConstrain(object):
                 continue
             oset.add_types(tp.first_type)
 
+    def get_inputs(self):
+        return [self.pair.name]
+
+    def get_outputs(self):
+        return [self.target]
+
 
 class PairSecondConstrain(object):
     def __init__(self, target, pair, loc):
@@ -191,6 +326,12 @@ class PairSecondConstrain(object):
                 continue
             oset.add_types(tp.second_type)
 
+    def get_inputs(self):
+        return [self.pair.name]
+
+    def get_outputs(self):
+        return [self.target]
+
 
 class StaticGetItemConstrain(object):
     def __init__(self, target, value, index, loc):
@@ -207,6 +348,12 @@ class StaticGetItemConstrain(object):
             elif isinstance(tp, types.Tuple):
                 oset.add_types(tp.types[self.index])
 
+    def get_inputs(self):
+        return [self.value.name]
+
+    def get_outputs(self):
+        return [self.target]
+
 
 class CallConstrain(object):
     """Constrain for calling functions.
@@ -242,11 +389,22 @@ class CallConstrain(object):
             restypes.append(sig.return_type)
         typevars[self.target].add_types(*restypes)
 
+    def get_inputs(self):
+        return ([self.func] + [a.name for a in self.args] +
+                [var.name for (kw, var) in self.kws])
+
+    def get_outputs(self):
+        return [self.target]
+
 
 class IntrinsicCallConstrain(CallConstrain):
     def __call__(self, context, typevars):
         self.resolve(context, typevars, fnty=self.func)
 
+    def get_inputs(self):
+        return ([a.name for a in self.args] +
+                [var.name for (kw, var) in self.kws])
+
 
 class GetAttrConstrain(object):
     def __init__(self, target, attr, value, loc, inst):
@@ -270,6 +428,12 @@ class GetAttrConstrain(object):
                 restypes.append(attrty)
         typevars[self.target].add_types(*restypes)
 
+    def get_inputs(self):
+        return [self.value.name]
+
+    def get_outputs(self):
+        return [self.target]
+
     def __repr__(self):
         return 'resolving type of attribute "{attr}" of "{value}"'.format(
             value=self.value, attr=self.attr)
@@ -292,6 +456,34 @@ class SetItemConstrain(object):
                 raise TypingError("Cannot resolve setitem: %s[%s] = %s" %
                                   (ty, it, vt), loc=self.loc)
 
+    def get_inputs(self):
+        return [self.target.name, self.index.name, self.value.name]
+
+    def get_outputs(self):
+        return []
+
+
+class DelItemConstrain(object):
+    def __init__(self, target, index, loc):
+        self.target = target
+        self.index = index
+        self.loc = loc
+
+    def __call__(self, context, typevars):
+        targettys = typevars[self.target.name].get()
+        idxtys = typevars[self.index.name].get()
+
+        for ty, it in itertools.product(targettys, idxtys):
+            if not context.resolve_delitem(target=ty, index=it):
+                raise TypingError("Cannot resolve delitem: %s[%s]" %
+                                  (ty, it), loc=self.loc)
+
+    def get_inputs(self):
+        return [self.target.name, self.index.name]
+
+    def get_outputs(self):
+        return []
+
 
 class SetAttrConstrain(object):
     def __init__(self, target, attr, value, loc):
@@ -310,6 +502,12 @@ class SetAttrConstrain(object):
                 raise TypingError("Cannot resolve setattr: (%s).%s = %s" %
                                   (ty, self.attr, vt), loc=self.loc)
 
+    def get_inputs(self):
+        return [self.target.name, self.value.name]
+
+    def get_outputs(self):
+        return []
+
 
 class TypeVarMap(dict):
     def set_context(self, context):
@@ -350,6 +548,8 @@ class TypeInferer(object):
         self.usercalls = []
         self.intrcalls = []
         self.setitemcalls = []
+        self.storemapcalls = []
+        self.delitemcalls = []
         self.setattrcalls = []
 
     def dump(self):
@@ -379,25 +579,104 @@ class TypeInferer(object):
                 self.typevars[inst.value.name].lock(typ)
 
     def build_constrain(self):
+        self._list_appends = self._find_list_appends()
+        self._dict_stores = self._find_dict_stores()
         for blk in utils.itervalues(self.blocks):
             for inst in blk.body:
                 self.constrain_statement(inst)
 
+    def _find_aliases(self):
+        """
+        Return a dict mapping variable names to the set of variables
+        they are directly assigned to or from.
+        """
+        aliases = defaultdict(set)
+        for blk in utils.itervalues(self.blocks):
+            for inst in blk.body:
+                if (isinstance(inst, ir.Assign) and
+                        isinstance(inst.value, ir.Var)):
+                    aliases[inst.value.name].add(inst.target.name)
+                    aliases[inst.target.name].add(inst.value.name)
+        return aliases
+
+    def _spread_over_aliases(self, mapping):
+        """
+        Given a dict mapping variable names to lists of values, return
+        a dict mapping each variable to the values of all its aliases.
+        """
+        aliases = self._find_aliases()
+        result = {}
+        for name in list(mapping):
+            seen = set([name])
+            todo = [name]
+            while todo:
+                for alias in aliases[todo.pop()]:
+                    if alias not in seen:
+                        seen.add(alias)
+                        todo.append(alias)
+            for alias in seen:
+                result.setdefault(alias, []).extend(mapping[name])
+        return result
+
+    def _find_method_calls(self, attr, nargs):
+        """
+        Yield (variable name, argument variables) for all calls to the
+        method *attr* with *nargs* positional arguments.
+        """
+        methods = {}
+        for blk in utils.itervalues(self.blocks):
+            for inst in blk.body:
+                if not (isinstance(inst, ir.Assign) and
+                        isinstance(inst.value, ir.Expr)):
+                    continue
+                value = inst.value
+                if value.op == 'getattr' and value.attr == attr:
+                    methods[inst.target.name] = value.value.name
+                elif (value.op == 'call' and not value.kws and
+                      len(value.args) == nargs and
+                      isinstance(value.func, ir.Var) and
+                      value.func.name in methods):
+                    yield methods[value.func.name], value.args
+
+    def _find_list_appends(self):
+        """
+        Return a dict mapping variable names to the list of variables
+        passed to their append() method, accounting for aliases.  This
+        allows typing empty lists from the items later appended to them.
+        """
+        appends = defaultdict(list)
+        for name, args in self._find_method_calls('append', 1):
+            appends[name].append(args[0])
+        return self._spread_over_aliases(appends)
+
+    def _find_dict_stores(self):
+        """
+        Return a dict mapping variable names to the list of (key, value)
+        variable pairs stored in them (by dict displays or item
+        assignment) or passed as defaults to their get() method,
+        accounting for aliases.  This allows typing dicts from the
+        items later stored in them.
+        """
+        stores = defaultdict(list)
+        for blk in utils.itervalues(self.blocks):
+            for inst in blk.body:
+                if isinstance(inst, ir.StoreMap):
+                    stores[inst.dct.name].append((inst.key, inst.value))
+                elif isinstance(inst, ir.SetItem):
+                    stores[inst.target.name].append((inst.index, inst.value))
+        for name, args in self._find_method_calls('get', 2):
+            stores[name].append(tuple(args))
+        return self._spread_over_aliases(stores)
+
     def propagate(self):
-        newtoken = self.get_state_token()
-        oldtoken = None
         if config.DEBUG:
             self.dump()
+            print("propagate".center(80, '-'))
         # Since the number of types are finite, the typesets will eventually
         # stop growing.
-        while newtoken != oldtoken:
-            if config.DEBUG:
-                print("propagate".center(80, '-'))
-            oldtoken = newtoken
-            self.constrains.propagate(self.context, self.typevars)
-            newtoken = self.get_state_token()
-            if config.DEBUG:
-                self.dump()
+        self.constrains.propagate(self.context, self.typevars)
+        if config.DEBUG:
+            self.dump()
 
     def unify(self):
         typdict = utils.UniqueDict()
@@ -463,6 +742,19 @@ class TypeInferer(object):
             signature = self.context.resolve_setitem(target, index, value)
             calltypes[inst] = signature
 
+        for inst in self.storemapcalls:
+            target = typemap[inst.dct.name]
+            index = typemap[inst.key.name]
+            value = typemap[inst.value.name]
+            signature = self.context.resolve_setitem(target, index, value)
+            calltypes[inst] = signature
+
+        for inst in self.delitemcalls:
+            target = typemap[inst.target.name]
+            index = typemap[inst.index.name]
+            signature = self.context.resolve_delitem(target, index)
+            calltypes[inst] = signature
+
         for inst in self.setattrcalls:
             target = typemap[inst.target.name]
             attr = inst.attr
@@ -505,6 +797,10 @@ class TypeInferer(object):
             self.typeof_assign(inst)
         elif isinstance(inst, ir.SetItem):
             self.typeof_setitem(inst)
+        elif isinstance(inst, ir.StoreMap):
+            self.typeof_storemap(inst)
+        elif isinstance(inst, ir.DelItem):
+            self.typeof_delitem(inst)
         elif isinstance(inst, ir.SetAttr):
             self.typeof_setattr(inst)
         elif isinstance(inst, (ir.Jump, ir.Branch, ir.Return, ir.Del)):
@@ -520,6 +816,18 @@ class TypeInferer(object):
         self.constrains.append(constrain)
         self.setitemcalls.append(inst)
 
+    def typeof_storemap(self, inst):
+        constrain = SetItemConstrain(target=inst.dct, index=inst.key,
+                                     value=inst.value, loc=inst.loc)
+        self.constrains.append(constrain)
+        self.storemapcalls.append(inst)
+
+    def typeof_delitem(self, inst):
+        constrain = DelItemConstrain(target=inst.target, index=inst.index,
+                                     loc=inst.loc)
+        self.constrains.append(constrain)
+        self.delitemcalls.append(inst)
+
     def typeof_setattr(self, inst):
         constrain = SetAttrConstrain(target=inst.target, attr=inst.attr,
                                      value=inst.value, loc=inst.loc)
@@ -650,6 +958,18 @@ class TypeInferer(object):
             constrain = BuildTupleConstrain(target.name, items=expr.items,
                                             loc=inst.loc)
             self.constrains.append(constrain)
+        elif expr.op == 'build_list':
+            appended = ()
+            if not expr.items:
+                appended = self._list_appends.get(target.name, ())
+            constrain = BuildListConstrain(target.name, items=expr.items,
+                                           loc=inst.loc, appended=appended)
+            self.constrains.append(constrain)
+        elif expr.op == 'build_map':
+            constrain = BuildMapConstrain(
+                target.name, items=self._dict_stores.get(target.name, ()),
+                loc=inst.loc)
+            self.constrains.append(constrain)
         elif expr.op == 'cast':
             self.constrains.append(Propagate(dst=target.name,
                                              src=expr.value.name,
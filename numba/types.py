@@ -48,7 +48,14 @@ class _TypeMetaclass(type):
         the new instance is returned.
         """
         inst = type.__call__(cls, *args, **kwargs)
-        # Try to intern the created instance
+        return cls._intern(inst)
+
+    def _intern(cls, inst):
+        """
+        Intern the fully initialized instance *inst*: if an equal instance
+        already exists it is returned, otherwise *inst* is registered,
+        given a fresh typecode and returned.
+        """
         wr = weakref.ref(inst, _on_type_disposal)
         orig = _typecache.get(wr)
         orig = orig and orig()
@@ -61,6 +68,16 @@ class _TypeMetaclass(type):
             return inst
 
 
+def _type_reconstructor(reconstructor, reconstructor_args, state):
+    """
+    Rebuild function for unpickling types.
+    """
+    obj = reconstructor(*reconstructor_args)
+    if state:
+        obj.__dict__.update(state)
+    return type(obj)._intern(obj)
+
+
 @add_metaclass(_TypeMetaclass)
 class Type(object):
     """
@@ -102,6 +119,14 @@ class Type(object):
     def __ne__(self, other):
         return not (self == other)
 
+    def __reduce__(self):
+        reconstructor, args, state = super(Type, self).__reduce__()
+        # The typecode is process-specific: a new one is assigned
+        # when the unpickled type gets interned.
+        state = dict(state or ())
+        state.pop('_code', None)
+        return (_type_reconstructor, (reconstructor, args, state))
+
     def __call__(self, *args):
         if len(args) == 1 and not isinstance(args[0], Type):
             return self.cast_python_value(args[0])
@@ -335,6 +360,14 @@ class Function(Type):
     def key(self):
         return self.template
 
+    @property
+    def pysig(self):
+        """
+        The inspect.Signature for folding keyword arguments, if the
+        template declares one (AttributeError is raised otherwise).
+        """
+        return self.template.pysig
+
     def extend(self, template):
         self.template.cases.extend(template.cases)
 
@@ -951,6 +984,97 @@ class Tuple(BaseTuple):
         return NotImplemented
 
 
+class List(IterableType):
+    """
+    Type class for typed lists of *dtype* items, stored in nopython mode
+    as a growable buffer owned by the Numba runtime.
+    """
+    mutable = True
+
+    def __init__(self, dtype):
+        self.dtype = dtype
+        name = "list(%s)" % (dtype,)
+        super(List, self).__init__(name, param=True)
+        self.iterator_type = ListIter(self)
+
+    @property
+    def key(self):
+        return self.dtype
+
+
+class ListIter(IteratorType):
+
+    def __init__(self, list_type):
+        self.list_type = list_type
+        self.yield_type = list_type.dtype
+        name = 'iter(%s)' % list_type
+        super(ListIter, self).__init__(name, param=True)
+
+    @property
+    def key(self):
+        return self.list_type
+
+
+class Dict(IterableType):
+    """
+    Type class for typed dicts mapping *key_type* keys to *value_type*
+    values, stored in nopython mode as an open-addressing hash table
+    owned by the Numba runtime.
+    """
+    mutable = True
+
+    def __init__(self, key_type, value_type):
+        self.key_type = key_type
+        self.value_type = value_type
+        name = "dict(%s, %s)" % (key_type, value_type)
+        super(Dict, self).__init__(name, param=True)
+        self.iterator_type = DictIter(self, 'keys')
+
+    @property
+    def key(self):
+        return self.key_type, self.value_type
+
+    def coerce(self, typingctx, other):
+        """
+        Unify Dicts with their key and value types
+        """
+        if isinstance(other, Dict):
+            key_type = typingctx.unify_pairs(self.key_type, other.key_type)
+            value_type = typingctx.unify_pairs(self.value_type,
+                                               other.value_type)
+            if pyobject not in (key_type, value_type):
+                return Dict(key_type, value_type)
+
+        return NotImplemented
+
+
+class DictIter(IteratorType):
+    """
+    Type class for iterators over the keys, values or items of a dict
+    (depending on *kind*).
+    """
+
+    def __init__(self, dict_type, kind):
+        assert kind in ('keys', 'values', 'items')
+        self.dict_type = dict_type
+        self.kind = kind
+        if kind == 'keys':
+            self.yield_type = dict_type.key_type
+        elif kind == 'values':
+            self.yield_type = dict_type.value_type
+        elif dict_type.key_type == dict_type.value_type:
+            self.yield_type = UniTuple(dict_type.key_type, 2)
+        else:
+            self.yield_type = Tuple((dict_type.key_type,
+                                     dict_type.value_type))
+        name = '%s(%s)' % (kind, dict_type)
+        super(DictIter, self).__init__(name, param=True)
+
+    @property
+    def key(self):
+        return self.dict_type, self.kind
+
+
 class CPointer(Type):
     """
     Type class for pointers to other types.
@@ -1116,6 +1240,7 @@ complex128 = Complex('complex128', float64)
 
 len_type = Phantom('len')
 range_type = Phantom('range')
+prange_type = Phantom('prange')
 slice_type = Phantom('slice')
 abs_type = Phantom('abs')
 neg_type = Phantom('neg')
@@ -2,13 +2,15 @@ from __future__ import print_function, division, absolute_import
 
 
 from numba import types, intrinsics
-from numba.utils import PYVERSION, RANGE_ITER_OBJECTS
+from numba.utils import PYVERSION, RANGE_ITER_OBJECTS, pysignature
+from numba.special import prange
 from numba.typing.templates import (AttributeTemplate, ConcreteTemplate,
                                     AbstractTemplate, builtin_global, builtin,
                                     builtin_attr, signature, bound_function)
 
 for obj in RANGE_ITER_OBJECTS:
     builtin_global(obj, types.range_type)
+builtin_global(prange, types.prange_type)
 builtin_global(len, types.len_type)
 builtin_global(slice, types.slice_type)
 builtin_global(abs, types.abs_type)
@@ -84,6 +86,11 @@ class Range(ConcreteTemplate):
     ]
 
 
+@builtin
+class PRange(Range):
+    key = types.prange_type
+
+
 @builtin
 class GetIter(AbstractTemplate):
     key = "getiter"
@@ -480,6 +487,86 @@ class SetItemBuffer(AbstractTemplate):
             return signature(types.none, ary, normalize_index(idx), ary.dtype)
 
 
+@builtin
+class GetItemList(AbstractTemplate):
+    key = "getitem"
+
+    def generic(self, args, kws):
+        assert not kws
+        lst, idx = args
+        if isinstance(lst, types.List) and isinstance(idx, types.Integer):
+            return signature(lst.dtype, lst, normalize_index(idx))
+
+
+@builtin
+class SetItemList(AbstractTemplate):
+    key = "setitem"
+
+    def generic(self, args, kws):
+        assert not kws
+        lst, idx, val = args
+        if isinstance(lst, types.List) and isinstance(idx, types.Integer):
+            return signature(types.none, lst, normalize_index(idx), lst.dtype)
+
+
+@builtin
+class GetItemDict(AbstractTemplate):
+    key = "getitem"
+
+    def generic(self, args, kws):
+        assert not kws
+        dct, key = args
+        if (isinstance(dct, types.Dict) and
+                self.context.type_compatibility(key, dct.key_type)
+                is not None):
+            return signature(dct.value_type, dct, dct.key_type)
+
+
+@builtin
+class SetItemDict(AbstractTemplate):
+    key = "setitem"
+
+    def generic(self, args, kws):
+        assert not kws
+        dct, key, val = args
+        if (isinstance(dct, types.Dict) and
+                self.context.type_compatibility(key, dct.key_type) is not None
+                and self.context.type_compatibility(val, dct.value_type)
+                is not None):
+            return signature(types.none, dct, dct.key_type, dct.value_type)
+
+
+@builtin
+class DelItemDict(AbstractTemplate):
+    key = "delitem"
+
+    def generic(self, args, kws):
+        assert not kws
+        dct, key = args
+        if (isinstance(dct, types.Dict) and
+                self.context.type_compatibility(key, dct.key_type)
+                is not None):
+            return signature(types.none, dct, dct.key_type)
+
+
+@builtin
+class InDict(AbstractTemplate):
+    key = "in"
+
+    def generic(self, args, kws):
+        assert not kws
+        key, dct = args
+        if (isinstance(dct, types.Dict) and
+                self.context.type_compatibility(key, dct.key_type)
+                is not None):
+            return signature(types.boolean, dct.key_type, dct)
+
+
+@builtin
+class NotInDict(InDict):
+    key = "not in"
+
+
 @builtin
 class Len(AbstractTemplate):
     key = types.len_type
@@ -487,12 +574,23 @@ class Len(AbstractTemplate):
     def generic(self, args, kws):
         assert not kws
         (val,) = args
-        if isinstance(val, (types.Buffer, types.Tuple, types.UniTuple)):
+        if isinstance(val, (types.Buffer, types.Tuple, types.UniTuple,
+                            types.List, types.Dict)):
             return signature(types.intp, val)
 
 
 #-------------------------------------------------------------------------------
 
+def is_sortable_array(ary):
+    """
+    Whether *ary* is an array type supported by the sorting and
+    searching functions.
+    """
+    return (isinstance(ary, types.Array) and ary.ndim == 1 and
+            isinstance(ary.dtype, (types.Boolean, types.Integer, types.Float,
+                                   types.NPDatetime, types.NPTimedelta)))
+
+
 @builtin_attr
 class ArrayAttribute(AttributeTemplate):
     key = types.Array
@@ -515,6 +613,26 @@ class ArrayAttribute(AttributeTemplate):
     def resolve_flat(self, ary):
         return types.NumpyFlatType(ary)
 
+    @bound_function("array.copy")
+    def resolve_copy(self, ary, args, kws):
+        assert not args
+        assert not kws
+        return signature(ary.copy(layout='C', readonly=False))
+
+    @bound_function("array.sort")
+    def resolve_sort(self, ary, args, kws):
+        assert not args
+        assert not kws
+        if is_sortable_array(ary) and ary.mutable:
+            return signature(types.none)
+
+    @bound_function("array.argsort")
+    def resolve_argsort(self, ary, args, kws):
+        assert not args
+        assert not kws
+        if is_sortable_array(ary):
+            return signature(types.Array(types.intp, 1, 'C'))
+
     def generic_resolve(self, ary, attr):
         if isinstance(ary.dtype, types.Record):
             if attr in ary.dtype.fields:
@@ -527,34 +645,151 @@ class NestedArrayAttribute(ArrayAttribute):
     key = types.NestedArray
 
 
+@builtin_attr
+class ListAttribute(AttributeTemplate):
+    key = types.List
+
+    @bound_function("list.append")
+    def resolve_append(self, lst, args, kws):
+        assert not kws
+        if len(args) == 1:
+            item, = args
+            if self.context.type_compatibility(item, lst.dtype) is not None:
+                return signature(types.none, lst.dtype)
+
+    @bound_function("list.extend")
+    def resolve_extend(self, lst, args, kws):
+        assert not kws
+        if len(args) == 1 and isinstance(args[0], types.List):
+            other, = args
+            if self.context.type_compatibility(other.dtype,
+                                               lst.dtype) is not None:
+                return signature(types.none, other)
+
+    @bound_function("list.pop")
+    def resolve_pop(self, lst, args, kws):
+        assert not kws
+        if not args:
+            return signature(lst.dtype)
+
+
+@builtin_attr
+class DictAttribute(AttributeTemplate):
+    key = types.Dict
+
+    def _resolve_lookup(self, dct, args, kws):
+        # Typing of get() and pop(): the default value, if given,
+        # is unified with the dict's value type
+        assert not kws
+        if not args or len(args) > 2:
+            return
+        key = args[0]
+        if self.context.type_compatibility(key, dct.key_type) is None:
+            return
+        if len(args) == 1:
+            return signature(dct.value_type, dct.key_type)
+        restype = self.context.unify_types(dct.value_type, args[1])
+        if restype != types.pyobject:
+            return signature(restype, dct.key_type, restype)
+
+    @bound_function("dict.get")
+    def resolve_get(self, dct, args, kws):
+        # get() without a default would return an optional value
+        if len(args) == 2:
+            return self._resolve_lookup(dct, args, kws)
+
+    @bound_function("dict.pop")
+    def resolve_pop(self, dct, args, kws):
+        return self._resolve_lookup(dct, args, kws)
+
+    @bound_function("dict.keys")
+    def resolve_keys(self, dct, args, kws):
+        assert not args and not kws
+        return signature(types.DictIter(dct, 'keys'))
+
+    @bound_function("dict.values")
+    def resolve_values(self, dct, args, kws):
+        assert not args and not kws
+        return signature(types.DictIter(dct, 'values'))
+
+    @bound_function("dict.items")
+    def resolve_items(self, dct, args, kws):
+        assert not args and not kws
+        return signature(types.DictIter(dct, 'items'))
+
+
+def _reduction_method_stub(axis=None):
+    pass
+
+def _reduction_function_stub(a, axis=None):
+    pass
+
+# The Python signatures of reductions accepting an axis, for folding
+# keyword arguments
+reduction_method_pysig = pysignature(_reduction_method_stub)
+reduction_function_pysig = pysignature(_reduction_function_stub)
+
+
+def reduction_signature(dtype, ary, pysig, args, kws, recvr=None):
+    """
+    Return the signature of a reduction of array type *ary* to *dtype*
+    values, called with argument types *args* and *kws* matching
+    *pysig*, or None if they are invalid.  If an integer axis is
+    given, the result is an array with one dimension less (or a scalar
+    for 1-d arrays).
+    """
+    try:
+        axis = pysig.bind(*args, **kws).arguments.get('axis')
+    except TypeError:
+        return
+    if axis is None:
+        restype = dtype
+        axis_args = ()
+    elif isinstance(axis, types.Integer) and ary.ndim >= 1:
+        if ary.ndim == 1:
+            restype = dtype
+        else:
+            restype = types.Array(dtype, ary.ndim - 1, 'C')
+        axis_args = (axis,)
+    else:
+        return
+    if recvr is not None:
+        return signature(restype, *axis_args, recvr=recvr)
+    return signature(restype, ary, *axis_args)
+
+
 def generic_homog(self, args, kws):
     assert not args
     assert not kws
     return signature(self.this.dtype, recvr=self.this)
 
 def generic_expand(self, args, kws):
-    if isinstance(self.this.dtype, types.Integer):
+    dtype = self.this.dtype
+    if isinstance(dtype, types.Integer):
         # Expand to a machine int, not larger (like Numpy)
-        if self.this.dtype.signed:
-            return signature(max(types.intp, self.this.dtype), recvr=self.this)
+        if dtype.signed:
+            dtype = max(types.intp, dtype)
         else:
-            return signature(max(types.uintp, self.this.dtype), recvr=self.this)
-    return signature(self.this.dtype, recvr=self.this)
+            dtype = max(types.uintp, dtype)
+    return reduction_signature(dtype, self.this, self.pysig, args, kws,
+                               recvr=self.this)
 
 def generic_hetero_real(self, args, kws):
-    assert not args
-    assert not kws
-    if self.this.dtype in types.integer_domain:
-        return signature(types.float64, recvr=self.this)
-    return signature(self.this.dtype, recvr=self.this)
+    dtype = self.this.dtype
+    if dtype in types.integer_domain:
+        dtype = types.float64
+    return reduction_signature(dtype, self.this, self.pysig, args, kws,
+                               recvr=self.this)
 
 def generic_index(self, args, kws):
     assert not args
     assert not kws
     return signature(types.intp, recvr=self.this)
 
-def install_array_method(name, generic):
+def install_array_method(name, generic, pysig=None):
     my_attr = {"key": "array." + name, "generic": generic}
+    if pysig is not None:
+        my_attr["pysig"] = pysig
     temp_class = type("Array_" + name, (AbstractTemplate,), my_attr)
 
     def array_attribute_attachment(self, ary):
@@ -568,28 +803,17 @@ for fname in ["min", "max"]:
 
 # Functions that return a machine-width type, to avoid overflows
 for fname in ["sum", "prod"]:
-    install_array_method(fname, generic_expand)
+    install_array_method(fname, generic_expand, reduction_method_pysig)
 
 # Functions that require integer arrays get promoted to float64 return
 for fName in ["mean", "var", "std"]:
-    install_array_method(fName, generic_hetero_real)
+    install_array_method(fName, generic_hetero_real, reduction_method_pysig)
 
 # Functions that return an index (intp)
 install_array_method("argmin", generic_index)
 install_array_method("argmax", generic_index)
 
 
-@builtin
-class CmpOpEqArray(AbstractTemplate):
-    key = '=='
-
-    def generic(self, args, kws):
-        assert not kws
-        [va, vb] = args
-        if isinstance(va, types.Array) and va == vb:
-            return signature(va.copy(dtype=types.boolean), va, vb)
-
-
 #-------------------------------------------------------------------------------
 
 @builtin_attr
@@ -1,6 +1,6 @@
 from __future__ import print_function, absolute_import
 
-from collections import defaultdict
+from collections import defaultdict, namedtuple
 import functools
 import types as pytypes
 import sys
@@ -20,6 +20,10 @@ from numba import numpy_support, utils
 from . import ctypes_utils, cffi_utils, bufproto
 
 
+ResolutionCacheStats = namedtuple("ResolutionCacheStats",
+                                  ("hits", "misses", "size"))
+
+
 class BaseContext(object):
     """A typing context for storing function typing constrain template.
     """
@@ -29,6 +33,10 @@ class BaseContext(object):
         self.attributes = {}
         self._globals = utils.UniqueDict()
         self.tm = rules.default_type_manager
+        # Memoized results of resolve_function_type()
+        self._resolve_cache = {}
+        self._resolve_cache_hits = 0
+        self._resolve_cache_misses = 0
         self._load_builtins()
         self.init()
 
@@ -57,6 +65,56 @@ class BaseContext(object):
         Resolve function type *func* for argument types *args* and *kws*.
         A signature is returned.
         """
+        key = self._resolve_cache_key(func, args, kws)
+        if key is None:
+            return self._resolve_function_type(func, args, kws)
+        try:
+            sig = self._resolve_cache[key]
+        except KeyError:
+            self._resolve_cache_misses += 1
+            sig = self._resolve_cache[key] = \
+                self._resolve_function_type(func, args, kws)
+        else:
+            self._resolve_cache_hits += 1
+        return sig
+
+    def _resolve_cache_key(self, func, args, kws):
+        """
+        Return the key for caching the resolution of *func* for argument
+        types *args* and *kws*, or None if it mustn't be cached.
+        """
+        if isinstance(func, (types.BoundFunction, types.Method)):
+            # Bound functions are created anew for each attribute
+            # resolution, and different methods can compare equal.
+            return None
+        if isinstance(func, types.Dispatcher):
+            # The dispatcher's overloads change as it compiles.
+            return None
+        kws = tuple(sorted(dict(kws).items()))
+        key = func, tuple(args), kws
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def invalidate_resolution_cache(self):
+        """
+        Forget the memoized results of resolve_function_type().  This is
+        called whenever typing declarations are added to the context.
+        """
+        self._resolve_cache.clear()
+
+    def get_resolution_cache_stats(self):
+        """
+        Return a ResolutionCacheStats tuple with the number of hits and
+        misses of the resolve_function_type() cache, and its current size.
+        """
+        return ResolutionCacheStats(self._resolve_cache_hits,
+                                    self._resolve_cache_misses,
+                                    len(self._resolve_cache))
+
+    def _resolve_function_type(self, func, args, kws):
         if isinstance(func, types.Function):
             return func.template(self).apply(args, kws)
 
@@ -103,6 +161,11 @@ class BaseContext(object):
         kws = ()
         return self.resolve_function_type("setitem", args, kws)
 
+    def resolve_delitem(self, target, index):
+        args = target, index
+        kws = ()
+        return self.resolve_function_type("delitem", args, kws)
+
     def resolve_setattr(self, target, attr, value):
         if isinstance(target, types.Record):
             expectedty = target.typeof(attr)
@@ -282,6 +345,7 @@ class BaseContext(object):
 
     def insert_global(self, gv, gty):
         self._insert_global(gv, gty)
+        self.invalidate_resolution_cache()
 
     def insert_attributes(self, at):
         key = at.key
@@ -291,9 +355,11 @@ class BaseContext(object):
     def insert_function(self, ft):
         key = ft.key
         self.functions[key].append(ft)
+        self.invalidate_resolution_cache()
 
     def insert_overloaded(self, overloaded):
         self._insert_global(overloaded, types.Dispatcher(overloaded))
+        self.invalidate_resolution_cache()
 
     def insert_user_function(self, fn, ft):
         """Insert a user function.
@@ -306,6 +372,7 @@ class BaseContext(object):
             function template
         """
         self._insert_global(fn, types.Function(ft))
+        self.invalidate_resolution_cache()
 
     def extend_user_function(self, fn, ft):
         """ Insert of extend a user function.
@@ -323,6 +390,7 @@ class BaseContext(object):
             self.insert_user_function(fn, ft)
         else:
             gty.extend(ft)
+            self.invalidate_resolution_cache()
 
     def insert_class(self, cls, attrs):
         clsty = types.Object(cls)
@@ -10,6 +10,8 @@ from ..numpy_support import (ufunc_find_matching_loop,
                              supported_ufunc_loop, as_dtype)
 
 from ..typeinfer import TypingError
+from .builtins import (reduction_function_pysig, reduction_signature,
+                       is_sortable_array)
 
 registry = Registry()
 builtin = registry.register
@@ -24,6 +26,10 @@ class NumpyModuleAttribute(AttributeTemplate):
 
 
 class Numpy_rules_ufunc(AbstractTemplate):
+    @property
+    def ufunc(self):
+        return self.key
+
     @classmethod
     def _handle_inputs(cls, ufunc, args, kws):
         nin = ufunc.nin
@@ -66,7 +72,7 @@ class Numpy_rules_ufunc(AbstractTemplate):
         return base_types, explicit_outputs, ndims
 
     def generic(self, args, kws):
-        ufunc = self.key
+        ufunc = self.ufunc
         base_types, explicit_outputs, ndims = self._handle_inputs(ufunc, args,
                                                                   kws)
         ufunc_loop = ufunc_find_matching_loop(ufunc, base_types)
@@ -97,8 +103,8 @@ class Numpy_rules_ufunc(AbstractTemplate):
             # as ufunc_find_matching_loop() doesn't do any type inference.
             ret_tys = ufunc_loop.outputs[-implicit_output_count:]
             if ndims > 0:
-                # XXX Not sure 'A' layout is correct...
-                ret_tys = [types.Array(dtype=ret_ty, ndim=ndims, layout='A')
+                # Implicit outputs are freshly allocated C-contiguous arrays
+                ret_tys = [types.Array(dtype=ret_ty, ndim=ndims, layout='C')
                            for ret_ty in ret_tys]
             out.extend(ret_tys)
 
@@ -188,6 +194,67 @@ all_ufuncs = [getattr(numpy, name) for name in all_ufuncs]
 supported_ufuncs = [getattr(numpy, name) for name in supported_ufuncs]
 
 
+
+class NumpyRulesArrayOperator(Numpy_rules_ufunc):
+    """
+    Typing of Python operators applied to arrays (array expressions),
+    following the rules of the equivalent Numpy ufunc.
+    """
+    _op_map = {
+         '+': "add",
+         '-': "subtract",
+         '*': "multiply",
+        '/?': "divide",
+         '/': "true_divide",
+        '//': "floor_divide",
+         '%': "remainder",
+        '**': "power",
+        '<<': "left_shift",
+        '>>': "right_shift",
+         '&': "bitwise_and",
+         '|': "bitwise_or",
+         '^': "bitwise_xor",
+        '==': "equal",
+         '>': "greater",
+        '>=': "greater_equal",
+         '<': "less",
+        '<=': "less_equal",
+        '!=': "not_equal",
+    }
+
+    @property
+    def ufunc(self):
+        return getattr(numpy, self._op_map[self.key])
+
+    @classmethod
+    def install_operations(cls):
+        for op, ufunc_name in cls._op_map.items():
+            builtin(type("NumpyRulesArrayOperator_" + ufunc_name, (cls,),
+                         dict(key=op)))
+
+    def generic(self, args, kws):
+        # Only operations involving an array are handled here
+        if not any(isinstance(arg, types.Array) for arg in args):
+            return
+        if len(args) != self.ufunc.nin:
+            return
+        try:
+            return super(NumpyRulesArrayOperator, self).generic(args, kws)
+        except TypingError:
+            return
+
+
+class NumpyRulesUnaryArrayOperator(NumpyRulesArrayOperator):
+    _op_map = {
+        '-': "negative",
+        '~': "invert",
+    }
+
+
+NumpyRulesArrayOperator.install_operations()
+NumpyRulesUnaryArrayOperator.install_operations()
+
+
 del _math_operations, _trigonometric_functions, _bit_twiddling_functions
 del _comparison_functions, _floating_functions, _unsupported
 del _aliases, _numpy_ufunc
@@ -205,26 +272,28 @@ class Numpy_homogenous_reduction(AbstractTemplate):
 
 # Functions where domain and range are possibly different formats
 class Numpy_expanded_reduction(AbstractTemplate):
+    pysig = reduction_function_pysig
+
     def generic(self, args, kws):
-        assert not kws
-        [arr] = args
-        if isinstance(arr.dtype, types.Integer):
+        arr = args[0]
+        dtype = arr.dtype
+        if isinstance(dtype, types.Integer):
             # Expand to a machine int, not larger (like Numpy)
-            if arr.dtype.signed:
-                return signature(max(arr.dtype, types.intp), arr)
+            if dtype.signed:
+                dtype = max(dtype, types.intp)
             else:
-                return signature(max(arr.dtype, types.uintp), arr)
-        else:
-            return signature(arr.dtype, arr)
+                dtype = max(dtype, types.uintp)
+        return reduction_signature(dtype, arr, self.pysig, args, kws)
 
 class Numpy_heterogenous_reduction_real(AbstractTemplate):
+    pysig = reduction_function_pysig
+
     def generic(self, args, kws):
-        assert not kws
-        [arr] = args
-        if arr.dtype in types.integer_domain:
-            return signature(types.float64, arr)
-        else:
-            return signature(arr.dtype, arr)
+        arr = args[0]
+        dtype = arr.dtype
+        if dtype in types.integer_domain:
+            dtype = types.float64
+        return reduction_signature(dtype, arr, self.pysig, args, kws)
 
 class Numpy_index_reduction(AbstractTemplate):
     def generic(self, args, kws):
@@ -354,4 +423,174 @@ builtin_global(numpy.round, types.Function(Round))
 builtin_global(numpy.around, types.Function(Round))
 
 
+# -----------------------------------------------------------------------------
+# Array creation functions
+
+def _parse_shape(shape):
+    """
+    Return the number of dimensions for the given *shape* type
+    (an integer or a tuple of integers), or None if invalid.
+    """
+    if isinstance(shape, types.Integer):
+        return 1
+    elif isinstance(shape, types.UniTuple):
+        if isinstance(shape.dtype, types.Integer):
+            return shape.count
+
+
+def _parse_dtype(dtype):
+    """
+    Return the Numba type for the given *dtype* argument type
+    (e.g. the type of np.float32), or None if invalid.
+    """
+    if isinstance(dtype, types.Function):
+        restype = getattr(dtype.template, 'restype', None)
+        if restype in types.number_domain:
+            return restype
+
+
+class NdConstructor(AbstractTemplate):
+    """
+    Typing template for np.empty(shape[, dtype]) and friends.
+    """
+
+    def generic(self, args, kws):
+        assert not kws
+        if len(args) == 1:
+            shape, = args
+            nb_dtype = types.float64
+        elif len(args) == 2:
+            shape, dtype = args
+            nb_dtype = _parse_dtype(dtype)
+        else:
+            return
+
+        ndim = _parse_shape(shape)
+        if nb_dtype is not None and ndim is not None:
+            return_type = types.Array(dtype=nb_dtype, ndim=ndim, layout='C')
+            return signature(return_type, *args)
+
+
+class NdConstructorLike(AbstractTemplate):
+    """
+    Typing template for np.empty_like(array[, dtype]) and friends.
+    """
+
+    def generic(self, args, kws):
+        assert not kws
+        if len(args) == 1:
+            arr, = args
+            nb_dtype = getattr(arr, 'dtype', None)
+        elif len(args) == 2:
+            arr, dtype = args
+            nb_dtype = _parse_dtype(dtype)
+        else:
+            return
+
+        if isinstance(arr, types.Array) and nb_dtype is not None:
+            return_type = types.Array(dtype=nb_dtype, ndim=arr.ndim,
+                                      layout='C')
+            return signature(return_type, *args)
+
+
+def _install_array_constructors():
+    for name in ('empty', 'zeros', 'ones'):
+        for func_name, template in ((name, NdConstructor),
+                                    (name + '_like', NdConstructorLike)):
+            func = getattr(numpy, func_name)
+            cls = type("Numpy_" + func_name, (template,), dict(key=func))
+            builtin(cls)
+            builtin_global(func, types.Function(cls))
+
+_install_array_constructors()
+
+
+@builtin
+class NdArrayFromList(AbstractTemplate):
+    """
+    Typing template for np.array(list).
+    """
+    key = numpy.array
+
+    def generic(self, args, kws):
+        assert not kws
+        if len(args) == 1:
+            lst, = args
+            if (isinstance(lst, types.List) and
+                lst.dtype in types.number_domain | set([types.boolean])):
+                return_type = types.Array(dtype=lst.dtype, ndim=1, layout='C')
+                return signature(return_type, lst)
+
+builtin_global(numpy.array, types.Function(NdArrayFromList))
+
+
+@builtin
+class NdSort(AbstractTemplate):
+    """
+    Typing template for np.sort(array).
+    """
+    key = numpy.sort
+
+    def generic(self, args, kws):
+        assert not kws
+        if len(args) == 1:
+            ary, = args
+            if is_sortable_array(ary):
+                return signature(ary.copy(layout='C', readonly=False), ary)
+
+builtin_global(numpy.sort, types.Function(NdSort))
+
+
+@builtin
+class NdArgsort(AbstractTemplate):
+    """
+    Typing template for np.argsort(array).
+    """
+    key = numpy.argsort
+
+    def generic(self, args, kws):
+        assert not kws
+        if len(args) == 1:
+            ary, = args
+            if is_sortable_array(ary):
+                return signature(types.Array(types.intp, 1, 'C'), ary)
+
+builtin_global(numpy.argsort, types.Function(NdArgsort))
+
+
+@builtin
+class NdSearchsorted(AbstractTemplate):
+    """
+    Typing template for np.searchsorted(array, values), with values
+    either a scalar or a 1D array.
+    """
+    key = numpy.searchsorted
+
+    def generic(self, args, kws):
+        assert not kws
+        if len(args) != 2:
+            return
+        ary, values = args
+        if not is_sortable_array(ary):
+            return
+        if isinstance(values, types.Array):
+            if values.ndim != 1:
+                return
+            dtype = values.dtype
+            return_type = types.Array(types.intp, 1, 'C')
+        else:
+            dtype = values
+            return_type = types.intp
+        if isinstance(ary.dtype, (types.NPDatetime, types.NPTimedelta)):
+            # Only values of the same unit can be compared
+            if dtype != ary.dtype:
+                return
+        elif (dtype not in types.real_domain | types.integer_domain and
+              dtype != types.boolean):
+            return
+        return signature(return_type, ary, values)
+
+builtin_global(numpy.searchsorted, types.Function(NdSearchsorted))
+
+
 builtin_global(numpy, types.Module(numpy))
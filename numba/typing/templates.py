@@ -212,8 +212,20 @@ class AbstractTemplate(FunctionTemplate):
 
         if sig:
             cases = [sig]
+            args, kws = self._fold_arguments(args, kws)
             return self._select(cases, args, kws)
 
+    def _fold_arguments(self, args, kws):
+        """
+        Fold keyword arguments into positional ones using the template's
+        *pysig*, if any, as signatures only have positional arguments.
+        """
+        pysig = getattr(self, 'pysig', None)
+        if not kws or pysig is None:
+            return args, kws
+        ba = pysig.bind(*args, **dict(kws))
+        return tuple(ba.args), {}
+
 
 class ConcreteTemplate(FunctionTemplate):
     """
@@ -32,9 +32,11 @@ else:
 
 try:
     from inspect import signature as pysignature
+    from inspect import Signature as pySignature, Parameter as pyParameter
 except ImportError:
     try:
         from funcsigs import signature as pysignature
+        from funcsigs import Signature as pySignature, Parameter as pyParameter
     except ImportError:
         raise ImportError("please install the 'funcsigs' package "
                           "('pip install funcsigs')")
@@ -84,6 +86,12 @@ class ConfigOptions(object):
     def __repr__(self):
         return "Flags(%s)" % ', '.join(str(x) for x in self._enabled)
 
+    def enabled_options(self):
+        """
+        Return a sorted tuple of the names of the enabled options.
+        """
+        return tuple(sorted(self._enabled))
+
     def copy(self):
         copy = type(self)()
         copy._enabled = set(self._enabled)
@@ -96,7 +104,7 @@ class ConfigOptions(object):
         return not self == other
 
     def __hash__(self):
-        return hash(tuple(sorted(self._enabled)))
+        return hash(self.enabled_options())
 
 
 class SortedMap(collections.Mapping):
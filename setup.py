@@ -81,11 +81,25 @@ ext_npyufunc_ufunc = Extension(name="numba.npyufunc._internal",
                                         "numba/npyufunc/_internal.h",
                                         "numba/_pymodule.h"])
 
+ext_npyufunc_workqueue = Extension(
+    name='numba.npyufunc.workqueue',
+    sources=['numba/npyufunc/workqueue.c'],
+    depends=['numba/_pymodule.h'],
+    libraries=[] if sys.platform.startswith('win') else ['pthread'])
+
 ext_mviewbuf = Extension(name='numba.mviewbuf',
                          sources=['numba/mviewbuf.c'])
 
+ext_nrt_python = Extension(name='numba.runtime._nrt_python',
+                           sources=['numba/runtime/_nrt_python.c',
+                                    'numba/runtime/nrt.c'],
+                           depends=['numba/runtime/nrt.h',
+                                    'numba/_pymodule.h'],
+                           include_dirs=[numpy.get_include()])
+
 ext_modules = [ext_dynfunc, ext_npymath_exports, ext_dispatcher,
-               ext_helperlib, ext_typeconv, ext_npyufunc_ufunc, ext_mviewbuf]
+               ext_helperlib, ext_typeconv, ext_npyufunc_ufunc,
+               ext_npyufunc_workqueue, ext_mviewbuf, ext_nrt_python]
 
 packages = [
     "numba",
@@ -105,6 +119,7 @@ packages = [
     "numba.cuda.tests.cudapy",
     "numba.cuda.tests.nocuda",
     "numba.annotations",
+    "numba.runtime",
 ]
 
 setup(name='numba',
@@ -126,6 +141,7 @@ setup(name='numba',
       package_data={
         "numba": ["*.c", "*.h", "*.cpp", "*.inc"],
         "numba.npyufunc": ["*.c", "*.h"],
+        "numba.runtime": ["*.c", "*.h"],
         "numba.typeconv": ["*.cpp", "*.hpp"],
         "numba.cuda.tests.cudadrv.data": ["*.ptx"],
         "numba.annotations": ["*.html"],